@@ -7,6 +7,7 @@ from fiber.chain.weights import _normalize_and_quantize_weights
 
 from core.constants import NETUID
 from core.models.tournament_models import TournamentAuditData
+from core.utils import close_download_session
 from core.utils import download_s3_file
 from validator.core.config import Config
 from validator.core.config import load_config
@@ -155,7 +156,10 @@ async def main():
             await asyncio.sleep(sleep_duration)
             continue
 
-        success = await audit_weights(config)
+        try:
+            success = await audit_weights(config)
+        finally:
+            await close_download_session()
         if success:
             break
 
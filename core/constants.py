@@ -66,3 +66,9 @@ YARN_HUGGINGFACE_USERNAME = os.getenv("YARN_HUGGINGFACE_USERNAME", "gradients-io
 YARN_HUGGINGFACE_TOKEN = os.getenv("YARN_HUGGINGFACE_TOKEN")
 
 YARN_VALID_FACTORS = [2, 4, 8, 16, 32]
+
+# S3 downloads
+S3_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+S3_DOWNLOAD_MAX_ATTEMPTS = 3
+S3_DOWNLOAD_CACHE_DIR = os.path.expanduser(os.getenv("S3_DOWNLOAD_CACHE_DIR", "~/.cache/gradients/s3"))
+S3_DOWNLOAD_CACHE_MAX_BYTES = int(os.getenv("S3_DOWNLOAD_CACHE_MAX_BYTES", 20 * 1024**3))
@@ -1,12 +1,193 @@
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import shutil
+import weakref
 from urllib.parse import urlparse
 
+import aiofiles
 import aiohttp
 
+from core import constants as cst
 
-async def download_s3_file(file_url: str, save_path: str = None, tmp_dir: str = "/tmp") -> str:
+
+# Standard library logger, this module also runs in the trainer downloader image which has no fiber
+logger = logging.getLogger(__name__)
+
+# aiohttp sessions are bound to the loop they were created on, so keep one pooled session per loop
+_download_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+
+def _get_download_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _download_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=300))
+        _download_sessions[loop] = session
+    return session
+
+
+async def close_download_session():
+    session = _download_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def _object_key(file_url: str) -> str:
+    # Presigned URLs change signature on every request, the object is identified by host and path
+    parsed_url = urlparse(file_url)
+    return hashlib.sha256(f"{parsed_url.netloc}{parsed_url.path}".encode()).hexdigest()
+
+
+def _cache_index_path(object_key: str) -> str:
+    return os.path.join(cst.S3_DOWNLOAD_CACHE_DIR, "index", f"{object_key}.json")
+
+
+def _cache_blob_path(sha256: str) -> str:
+    return os.path.join(cst.S3_DOWNLOAD_CACHE_DIR, "blobs", sha256)
+
+
+def _read_cache_entry(object_key: str) -> dict | None:
+    try:
+        with open(_cache_index_path(object_key)) as f:
+            entry = json.load(f)
+        return entry if os.path.exists(_cache_blob_path(entry["sha256"])) else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cache_entry(object_key: str, file_path: str, sha256: str, etag: str | None):
+    blob_path = _cache_blob_path(sha256)
+    index_path = _cache_index_path(object_key)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    if not os.path.exists(blob_path):
+        tmp_blob_path = f"{blob_path}.{os.getpid()}.tmp"
+        shutil.copyfile(file_path, tmp_blob_path)
+        os.replace(tmp_blob_path, blob_path)
+    tmp_index_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_index_path, "w") as f:
+        json.dump({"sha256": sha256, "etag": etag}, f)
+    os.replace(tmp_index_path, index_path)
+    _evict_cache(cst.S3_DOWNLOAD_CACHE_MAX_BYTES)
+
+
+def _evict_cache(max_bytes: int):
+    """Drop least recently used blobs until the cache fits; dangling index entries are ignored on read."""
+    blobs_dir = os.path.join(cst.S3_DOWNLOAD_CACHE_DIR, "blobs")
+    blobs = []
+    for entry in os.scandir(blobs_dir):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            blobs.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in blobs)
+    for _, size, path in sorted(blobs):
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
+
+
+async def _hash_existing(file_path: str) -> "hashlib._Hash":
+    hasher = hashlib.sha256()
+    async with aiofiles.open(file_path, "rb") as f:
+        while chunk := await f.read(cst.S3_DOWNLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher
+
+
+def _part_etag_path(part_path: str) -> str:
+    return f"{part_path}.etag"
+
+
+def _discard_part(part_path: str):
+    for path in (part_path, _part_etag_path(part_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _read_part_etag(part_path: str) -> str | None:
+    try:
+        with open(_part_etag_path(part_path)) as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+async def _stream_to_file(file_url: str, part_path: str, etag: str | None) -> tuple[str, str | None, bool]:
+    """
+    Stream file_url into part_path, resuming from its current size if it exists and still belongs to the same
+    version of the object: the ETag the part file was started with is kept next to it and sent as If-Range.
+
+    Returns:
+        (sha256 of the full file, etag, not_modified) - not_modified is True on a 304 for the cached etag
+    """
+    session = _get_download_session()
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    part_etag = _read_part_etag(part_path) if offset else None
+    if offset and part_etag is None:
+        # No way to tell which version of the object the part file holds
+        _discard_part(part_path)
+        offset = 0
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = part_etag
+    if etag:
+        headers["If-None-Match"] = etag
+
+    async with session.get(file_url, headers=headers) as response:
+        if response.status == 304:
+            return "", etag, True
+        if response.status == 200:
+            # No range sent, or the object changed since the part file was started, start over
+            offset = 0
+        elif response.status == 206 and offset:
+            pass
+        elif response.status == 416 and offset:
+            # Complete only if the object is exactly as long as the part file, a longer part file is a leftover
+            if response.headers.get("Content-Range", "").rpartition("/")[2] == str(offset):
+                hasher = await _hash_existing(part_path)
+                return hasher.hexdigest(), part_etag, False
+            offset = None  # discarded and downloaded again below, once this response is released
+        else:
+            raise Exception(f"Failed to download file: {response.status}")
+
+        if offset == 0:
+            _discard_part(part_path)
+            if response.headers.get("ETag"):
+                with open(_part_etag_path(part_path), "w") as f:
+                    f.write(response.headers["ETag"])
+        if offset is not None:
+            hasher = await _hash_existing(part_path) if offset else hashlib.sha256()
+            async with aiofiles.open(part_path, "ab" if offset else "wb") as f:
+                async for chunk in response.content.iter_chunked(cst.S3_DOWNLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    await f.write(chunk)
+            return hasher.hexdigest(), response.headers.get("ETag"), False
+
+    _discard_part(part_path)
+    return await _stream_to_file(file_url, part_path, etag)
+
+
+async def download_s3_file(
+    file_url: str,
+    save_path: str = None,
+    tmp_dir: str = "/tmp",
+    expected_sha256: str | None = None,
+    use_cache: bool = True,
+) -> str:
     """Download a file from an S3 URL and save it locally.
 
+    The body is streamed to disk in chunks over a shared connection pool. Interrupted transfers are resumed
+    with range requests, and completed objects are kept in a local content-addressed cache so the same object
+    (even behind a fresh presigned URL) is only re-validated with a conditional request, not re-downloaded.
+
     Args:
         file_url (str): The URL of the file to download.
         save_path (str, optional): The path where the file should be saved. If a directory is provided,
@@ -14,12 +195,15 @@ async def download_s3_file(file_url: str, save_path: str = None, tmp_dir: str =
             the file will be saved at that exact location. Defaults to None.
         tmp_dir (str, optional): The temporary directory to use when save_path is not provided.
             Defaults to "/tmp".
+        expected_sha256 (str, optional): Hex sha256 the downloaded content must match.
+        use_cache (bool, optional): Serve and populate the local download cache. Defaults to True.
 
     Returns:
         str: The local file path where the file was saved.
 
     Raises:
-        Exception: If the download fails with a non-200 status code.
+        Exception: If the download fails with an unexpected status code, keeps failing after retries,
+            or does not match expected_sha256.
 
     Example:
         >>> file_path = await download_s3_file("https://example.com/file.txt", save_path="/data")
@@ -36,12 +220,40 @@ async def download_s3_file(file_url: str, save_path: str = None, tmp_dir: str =
     else:
         local_file_path = os.path.join(tmp_dir, file_name)
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(file_url) as response:
-            if response.status == 200:
-                with open(local_file_path, "wb") as f:
-                    f.write(await response.read())
-            else:
-                raise Exception(f"Failed to download file: {response.status}")
+    object_key = _object_key(file_url)
+    cache_entry = _read_cache_entry(object_key) if use_cache else None
+    if cache_entry and expected_sha256 and cache_entry["sha256"] != expected_sha256:
+        cache_entry = None
+
+    # Keyed by object so a leftover part file of a different object with the same name is never resumed
+    part_path = f"{local_file_path}.{object_key[:16]}.part"
+    for attempt in range(1, cst.S3_DOWNLOAD_MAX_ATTEMPTS + 1):
+        try:
+            sha256, etag, not_modified = await _stream_to_file(
+                file_url, part_path, cache_entry.get("etag") if cache_entry else None
+            )
+            break
+        except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == cst.S3_DOWNLOAD_MAX_ATTEMPTS:
+                raise
+            await asyncio.sleep(2**attempt)
+
+    if not_modified:
+        await asyncio.to_thread(shutil.copyfile, _cache_blob_path(cache_entry["sha256"]), local_file_path)
+        os.utime(_cache_blob_path(cache_entry["sha256"]))
+        return local_file_path
+
+    if expected_sha256 and sha256 != expected_sha256:
+        _discard_part(part_path)
+        raise Exception(f"Checksum mismatch for {file_name}: expected {expected_sha256}, got {sha256}")
+
+    os.replace(part_path, local_file_path)
+    _discard_part(part_path)
+    if use_cache:
+        try:
+            await asyncio.to_thread(_write_cache_entry, object_key, local_file_path, sha256, etag)
+        except OSError as e:
+            # The cache is an optimisation, a full disk there must not fail the download
+            logger.warning(f"Could not cache {file_name}: {e}")
 
     return local_file_path
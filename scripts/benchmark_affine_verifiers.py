@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batch affine verifiers against the per-completion SAT/ABD/DED reward functions.
+
+Builds synthetic GRPO batches where every prompt appears group-size times with the same extra_data, scores them with
+the per-completion code (the path stored copies take without the validator package) and with the batch verifiers,
+and checks both give the same scores.
+Usage: python -m scripts.benchmark_affine_verifiers [--prompts 32] [--group-sizes 8 16] [--variables 50] [--clauses 200]
+"""
+import argparse
+import random
+import sys
+import time
+
+import validator.utils.affine_verifiers as affine_verifiers
+from validator.utils.affine_reward_functions import abd_reward_function
+from validator.utils.affine_reward_functions import ded_reward_function
+from validator.utils.affine_reward_functions import sat_reward_function
+
+
+PROGRAM = "n = int(input())\nresult = 1\nfor i in range(1, {k}):\n    result = (result * (n + i)) % 1000003\nprint(result)"
+
+
+def _sat_batch(num_prompts: int, group_size: int, num_variables: int, num_clauses: int) -> tuple[list[str], list[dict]]:
+    rng = random.Random(0)
+    completions, extra_data = [], []
+    for _ in range(num_prompts):
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, num_variables) for _ in range(3)] for _ in range(num_clauses)]
+        item = {"task_type": "SAT", "cls": clauses}
+        for _ in range(group_size):
+            completions.append(", ".join(f"x{v}={rng.choice(['True', 'False'])}" for v in range(1, num_variables + 1)))
+            extra_data.append(item)
+    return completions, extra_data
+
+
+def _program_batches(num_prompts: int, group_size: int) -> dict[str, tuple[list[str], list[dict]]]:
+    rng = random.Random(0)
+    batches = {"abd": ([], []), "ded": ([], [])}
+    for prompt in range(num_prompts):
+        program = PROGRAM.format(k=200 + prompt)
+        abd_item = {"task_type": "ABD", "program": f"```python\n{program}\n```", "expected_output": "1"}
+        ded_item = {"task_type": "DED", "solution": f"```python\n{program}\n```", "premises": ["7"]}
+        for _ in range(group_size):
+            batches["abd"][0].append(f"<think>the answer is small</think><INPUT>{rng.randint(0, 3)}</INPUT>")
+            batches["abd"][1].append(abd_item)
+            # Generations of one prompt often submit the same program
+            submitted = program if rng.random() < 0.5 else program.replace("% 1000003", "% 1000033")
+            batches["ded"][0].append(f"```python\n{submitted}\n```")
+            batches["ded"][1].append(ded_item)
+    return batches
+
+
+def _clear_caches() -> None:
+    for cache in (affine_verifiers._sat_problem, affine_verifiers._abd_problem, affine_verifiers._ded_problem):
+        cache.cache_clear()
+    affine_verifiers.cached_restricted_execution.cache_clear()
+
+
+def _per_completion(reward_function, completions: list[str], extra_data: list[dict]) -> list[float]:
+    saved = sys.modules.get("validator.utils.affine_verifiers")
+    sys.modules["validator.utils.affine_verifiers"] = None  # makes the guarded import fail
+    try:
+        return reward_function(completions, extra_data=extra_data)
+    finally:
+        sys.modules["validator.utils.affine_verifiers"] = saved
+
+
+def _timed(score) -> tuple[list[float], float]:
+    start = time.perf_counter()
+    scores = score()
+    return scores, time.perf_counter() - start
+
+
+def main(num_prompts: int, group_sizes: list[int], num_variables: int, num_clauses: int) -> None:
+    print(f"{num_prompts} prompts, SAT with {num_variables} variables and {num_clauses} clauses")
+    print(f"{'task':>5} | {'group':>5} | {'per-completion/s':>16} | {'batch cold/s':>12} | {'batch warm/s':>12}")
+    for group_size in group_sizes:
+        batches = {"sat": _sat_batch(num_prompts, group_size, num_variables, num_clauses)}
+        batches.update(_program_batches(num_prompts, group_size))
+        for task_type, reward_function in (
+            ("sat", sat_reward_function),
+            ("abd", abd_reward_function),
+            ("ded", ded_reward_function),
+        ):
+            completions, extra_data = batches[task_type]
+            _clear_caches()
+            expected, baseline = _timed(lambda: _per_completion(reward_function, completions, extra_data))
+            _clear_caches()
+            cold_scores, cold = _timed(lambda: reward_function(completions, extra_data=extra_data))
+            warm_scores, warm = _timed(lambda: reward_function(completions, extra_data=extra_data))
+            assert cold_scores == warm_scores == expected, task_type
+
+            rates = [len(completions) / seconds for seconds in (baseline, cold, warm)]
+            print(f"{task_type:>5} | {group_size:>5} | {rates[0]:>16.0f} | {rates[1]:>12.0f} | {rates[2]:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=32, help="Distinct prompts per batch")
+    parser.add_argument("--group-sizes", type=int, nargs="+", default=[8, 16], help="Generations per prompt")
+    parser.add_argument("--variables", type=int, default=50, help="Variables per SAT instance")
+    parser.add_argument("--clauses", type=int, default=200, help="Clauses per SAT instance")
+    args = parser.parse_args()
+    main(args.prompts, args.group_sizes, args.variables, args.clauses)
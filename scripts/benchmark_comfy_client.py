@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark ComfyClient throughput against the number of prompts it keeps in flight.
+
+Runs a fake ComfyUI server that executes queued prompts one after another, sending the same websocket events as the
+real one, with a fixed execution time per prompt and a fixed network round trip on every HTTP call. At depth 1 the
+server sits idle for a /prompt round trip between prompts, as it did when prompts were sent one at a time; deeper
+windows keep the next prompt queued so execution runs back to back.
+Usage: python -m scripts.benchmark_comfy_client [--prompts 40] [--depths 1,2,4,8] [--exec-ms 50] [--rtt-ms 20] [--image-kb 512]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from aiohttp import web
+
+from validator.utils.comfy_client import ComfyClient
+
+
+def workflow(seed: int) -> dict:
+    return {
+        "Checkpoint_loader": {"class_type": "CheckpointLoaderSimple", "inputs": {}},
+        "Sampler": {"class_type": "KSampler", "inputs": {"seed": seed}},
+        "Decode": {"class_type": "VAEDecode", "inputs": {}},
+        "Save": {"class_type": "SaveImage", "inputs": {}},
+    }
+
+
+class FakeComfyServer:
+    """
+    Executes prompts sequentially, spending `exec_time` spread over the workflow's nodes, and answers every HTTP
+    request after `rtt` seconds. A prompt whose workflow has a node with `"fail": True` in its inputs errors out.
+    """
+
+    def __init__(self, exec_time: float = 0.05, rtt: float = 0.0, image_size: int = 1024):
+        self.exec_time = exec_time
+        self.rtt = rtt
+        self.image_size = image_size
+        self.queue: asyncio.Queue | None = None
+        self.sockets: dict[str, web.WebSocketResponse] = {}
+        self.history: dict[str, dict] = {}
+        self.deleted: set[str] = set()
+        self.executed: list[str] = []
+        self.busy = 0.0  # seconds spent executing prompts
+        self.max_queue_depth = 0
+        self.url = None
+        self._runner = None
+        self._worker = None
+
+    async def _send(self, client_id: str, message_type: str, data: dict):
+        ws = self.sockets.get(client_id)
+        if ws is not None and not ws.closed:
+            await ws.send_json({"type": message_type, "data": data})
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets[request.query["clientId"]] = ws
+        await ws.send_json({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": 0}}}})
+        async for _ in ws:
+            pass
+        return ws
+
+    async def _prompt(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(self.rtt / 2)
+        prompt_id = str(uuid.uuid4())
+        self.queue.put_nowait((prompt_id, body["client_id"], body["prompt"]))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        # Execution may start, and send its first events, before this response reaches the client
+        await asyncio.sleep(self.rtt / 2)
+        return web.json_response({"prompt_id": prompt_id, "number": len(self.executed)})
+
+    async def _history(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.rtt)
+        prompt_id = request.match_info["prompt_id"]
+        return web.json_response({prompt_id: self.history[prompt_id]} if prompt_id in self.history else {})
+
+    async def _view(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.rtt)
+        return web.Response(body=request.query["filename"].encode().ljust(self.image_size, b"\0"))
+
+    async def _queue(self, request: web.Request) -> web.Response:
+        self.deleted.update((await request.json()).get("delete", []))
+        return web.json_response({})
+
+    async def _execute(self):
+        while True:
+            prompt_id, client_id, prompt = await self.queue.get()
+            if prompt_id in self.deleted:
+                continue
+            started_at = time.perf_counter()
+            await self._send(client_id, "execution_start", {"prompt_id": prompt_id})
+            for node_id, node in prompt.items():
+                await self._send(client_id, "executing", {"node": node_id, "prompt_id": prompt_id})
+                await asyncio.sleep(self.exec_time / len(prompt))
+                if node["inputs"].get("fail"):
+                    await self._send(
+                        client_id, "execution_error", {"prompt_id": prompt_id, "exception_message": f"{node_id} failed"}
+                    )
+                    break
+            else:
+                self.history[prompt_id] = {
+                    "outputs": {
+                        "Save": {"images": [{"filename": f"{prompt_id}.png", "subfolder": "", "type": "output"}]},
+                        "Decode": {},
+                    }
+                }
+                self.executed.append(prompt_id)
+                await self._send(client_id, "executing", {"node": None, "prompt_id": prompt_id})
+            self.busy += time.perf_counter() - started_at
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        app = web.Application()
+        app.router.add_get("/ws", self._ws)
+        app.router.add_post("/prompt", self._prompt)
+        app.router.add_get("/history/{prompt_id}", self._history)
+        app.router.add_get("/view", self._view)
+        app.router.add_post("/queue", self._queue)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = "127.0.0.1:%d" % site._server.sockets[0].getsockname()[1]
+        self._worker = asyncio.create_task(self._execute())
+
+    async def stop(self):
+        self._worker.cancel()
+        for ws in list(self.sockets.values()):
+            await ws.close()
+        await self._runner.cleanup()
+
+    def reset(self):
+        self.executed.clear()
+        self.busy = 0.0
+        self.max_queue_depth = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def main(args: argparse.Namespace):
+    prompts = [workflow(seed) for seed in range(args.prompts)]
+    print(
+        f"{args.prompts} prompts, {args.exec_ms}ms execution each, {args.rtt_ms}ms round trip per request, "
+        f"{args.image_kb}KB images"
+    )
+    async with FakeComfyServer(args.exec_ms / 1000, args.rtt_ms / 1000, args.image_kb * 1024) as server:
+        for depth in (int(depth) for depth in args.depths.split(",")):
+            server.reset()
+            async with ComfyClient(server.url, max_in_flight=depth) as client:
+                start = time.perf_counter()
+                first_result = None
+                async for _ in client.generate_stream(prompts):
+                    first_result = first_result or time.perf_counter() - start
+                elapsed = time.perf_counter() - start
+            print(
+                f"depth {depth:>2}  {args.prompts / elapsed:>7.1f} prompts/s  {elapsed:>6.2f}s total  "
+                f"first image after {first_result * 1000:>6.0f}ms  server busy {server.busy / elapsed:>4.0%}  "
+                f"max server queue {server.max_queue_depth}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=40)
+    parser.add_argument("--depths", default="1,2,4,8", help="comma separated prompts in flight to compare")
+    parser.add_argument("--exec-ms", type=float, default=50.0)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--image-kb", type=int, default=512)
+    asyncio.run(main(parser.parse_args()))
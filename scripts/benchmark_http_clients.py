@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pooled HTTP client registry against a fresh httpx.AsyncClient per call, the way call_endpoint used to.
+
+Runs a local fake server (plain HTTP, or TLS with a throwaway self-signed certificate via --tls) that answers every
+request after a fixed delay, fires bursts of concurrent GETs at it, and reports throughput, client-side latency and
+how many connections the server had to accept.
+Usage: python -m scripts.benchmark_http_clients [--requests 500] [--concurrency 50] [--delay-ms 5] [--duplicates 10] [--tls]
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from validator.utils.http_clients import HttpClientRegistry
+
+
+class FakeServer:
+    """Keep-alive HTTP/1.1 server answering every request with a small JSON body after `delay` seconds."""
+
+    def __init__(self, delay: float, ssl_context: ssl.SSLContext | None = None):
+        self.delay = delay
+        self.ssl_context = ssl_context
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+        self.url = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                self.requests += 1
+                body = json.dumps({"request": self.requests, "columns": ["instruction", "output"]}).encode()
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=self.ssl_context)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"{'https' if self.ssl_context else 'http'}://127.0.0.1:{port}"
+
+    def reset(self):
+        self.connections = 0
+        self.requests = 0
+
+    def stop(self):
+        self.server.close()
+
+
+def _self_signed_context(directory: str) -> ssl.SSLContext:
+    """
+    Server context for 127.0.0.1. The certificate is appended to a copy of the certifi bundle exported through
+    SSL_CERT_FILE, so httpx trusts it and every new client still pays for loading a full CA bundle.
+    """
+    import certifi
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    bundle_path = os.path.join(directory, "bundle.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(bundle_path, "wb") as f, open(certifi.where(), "rb") as bundle:
+        f.write(bundle.read() + b"\n" + cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    os.environ["SSL_CERT_FILE"] = bundle_path
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+async def _per_call_get(url: str) -> httpx.Response:
+    async with httpx.AsyncClient(timeout=30) as client:
+        return await client.get(url)
+
+
+async def _burst(urls: list[str], concurrency: int, get) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def _one(url: str):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await get(url)
+            response.raise_for_status()
+            response.json()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(url) for url in urls))
+    return time.perf_counter() - start, latencies
+
+
+def _report(label: str, server: FakeServer, elapsed: float, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(
+        f"{label:<22} {len(latencies) / elapsed:>9.0f} req/s  p50 {statistics.median(latencies) * 1000:>7.1f}ms  "
+        f"p95 {p95 * 1000:>7.1f}ms  {server.requests:>5} served  {server.connections:>5} new connections"
+    )
+
+
+async def main(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory() as directory:
+        server = FakeServer(args.delay_ms / 1000, _self_signed_context(directory) if args.tls else None)
+        await server.start()
+        registry = HttpClientRegistry()
+        unique = [f"{server.url}/models/random?i={i}" for i in range(args.requests)]
+        # Column lookups repeat: every dataset id is asked for `duplicates` times in the same burst
+        datasets = max(1, args.requests // args.duplicates)
+        repeated = [f"{server.url}/dataset/d{i % datasets}/columns/suggest" for i in range(args.requests)]
+
+        print(
+            f"{args.requests} GETs, concurrency {args.concurrency}, {args.delay_ms}ms server delay, "
+            f"{'TLS' if args.tls else 'plain HTTP'}, HTTP/2 {'on' if registry.http2 else 'off (h2 not installed)'}"
+        )
+        runs = [
+            ("per-call clients", unique, _per_call_get),
+            ("pooled", unique, lambda url: registry.get(url, timeout=30)),
+            ("per-call, repeated", repeated, _per_call_get),
+            ("pooled, repeated", repeated, lambda url: registry.get(url, timeout=30)),
+            ("pooled+coalesce", repeated, lambda url: registry.get(url, timeout=30, coalesce=True)),
+        ]
+        for label, urls, get in runs:
+            server.reset()
+            elapsed, latencies = await _burst(urls, args.concurrency, get)
+            _report(label, server, elapsed, latencies)
+
+        await registry.aclose()
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    parser.add_argument("--duplicates", type=int, default=10, help="times each url repeats in the repeated bursts")
+    parser.add_argument("--tls", action="store_true", help="serve over TLS with a throwaway self-signed certificate")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark calculate_kl_divergence (chunked, streaming) against the old full-vocabulary softmax implementation.
+
+Uses two randomly initialised tiny GPT-2 models, so nothing is downloaded. Reports wall time, the KL values of both
+implementations, and peak allocated memory when running on CUDA.
+Usage: python -m scripts.benchmark_kl_divergence [--vocab-size 32000] [--prompts 64] [--prompt-words 200] [--top-k 0,256]
+"""
+import argparse
+import time
+
+import torch
+import torch.nn.functional as F
+from datasets import Dataset
+from tokenizers import Tokenizer
+from tokenizers import models
+from tokenizers import pre_tokenizers
+from transformers import GPT2Config
+from transformers import GPT2LMHeadModel
+from transformers import PreTrainedTokenizerFast
+
+from validator.core import constants as cst
+from validator.evaluation.common import calculate_kl_divergence
+
+
+def _tiny_model(vocab_size: int, seed: int, device: str) -> GPT2LMHeadModel:
+    torch.manual_seed(seed)
+    config = GPT2Config(n_layer=2, n_embd=64, n_head=2, vocab_size=vocab_size, n_positions=1024)
+    return GPT2LMHeadModel(config).to(device).eval()
+
+
+def _tokenizer(vocab_size: int) -> PreTrainedTokenizerFast:
+    word_level = Tokenizer(models.WordLevel({f"w{i}": i for i in range(vocab_size)}, unk_token="w0"))
+    word_level.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=word_level, pad_token="w0", eos_token="w1")
+
+
+def _full_softmax_kl(original_model, finetuned_model, dataset, tokenizer, batch_size: int) -> float:
+    """The previous implementation: softmax over the whole [batch, seq, vocab] logits of both models."""
+    device = next(original_model.parameters()).device
+    total_kl_div = 0.0
+    prompts = dataset[cst.TRL_GRPO_FIELD_PROMPT]
+    for i in range(0, len(prompts), batch_size):
+        inputs = tokenizer(prompts[i : i + batch_size], padding=True, return_tensors="pt").to(device)
+        with torch.no_grad():
+            original_probs = F.softmax(original_model(**inputs).logits, dim=-1)
+            finetuned_log_probs = F.log_softmax(finetuned_model(**inputs).logits, dim=-1)
+        kl_div = F.kl_div(finetuned_log_probs, original_probs, reduction="none").sum(dim=-1)
+        mask = inputs["attention_mask"]
+        total_kl_div += ((kl_div * mask).sum(dim=-1) / mask.sum(dim=-1)).sum().item()
+    return total_kl_div / len(prompts)
+
+
+def _measure(fn, device: str) -> tuple[float, float, int | None]:
+    if device == "cuda":
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+    start = time.perf_counter()
+    value = fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    elapsed = time.perf_counter() - start
+    peak_memory = torch.cuda.max_memory_allocated() if device == "cuda" else None
+    return value, elapsed, peak_memory
+
+
+def main(vocab_size: int, num_prompts: int, prompt_words: int, top_ks: list[int], chunk_size: int) -> None:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    tokenizer = _tokenizer(vocab_size)
+    original_model = _tiny_model(vocab_size, 0, device)
+    finetuned_model = _tiny_model(vocab_size, 0, device)
+    with torch.no_grad():
+        for parameter in finetuned_model.parameters():
+            parameter.add_(0.02 * torch.randn_like(parameter))
+    prompts = [
+        " ".join(f"w{(i * 31 + j * 7) % vocab_size}" for j in range(prompt_words // 2 + (i * 13) % (prompt_words // 2 + 1)))
+        for i in range(num_prompts)
+    ]
+    dataset = Dataset.from_dict({cst.TRL_GRPO_FIELD_PROMPT: prompts})
+
+    print(f"device={device} vocab={vocab_size} prompts={num_prompts} words<={prompt_words} chunk_size={chunk_size}")
+    print(f"{'implementation':>22} | {'seconds':>8} | {'peak MiB':>9} | {'kl':>12}")
+
+    def report(name: str, value: float, elapsed: float, peak_memory: int | None):
+        peak = f"{peak_memory / 2**20:>9.1f}" if peak_memory is not None else f"{'n/a':>9}"
+        print(f"{name:>22} | {elapsed:>8.3f} | {peak} | {value:>12.6f}")
+
+    report(
+        "full softmax",
+        *_measure(
+            lambda: _full_softmax_kl(original_model, finetuned_model, dataset, tokenizer, cst.GRPO_KL_BATCH_SIZE), device
+        ),
+    )
+    for top_k in top_ks:
+        report(
+            "streaming exact" if not top_k else f"streaming top-{top_k}",
+            *_measure(
+                lambda: calculate_kl_divergence(
+                    original_model, finetuned_model, dataset, tokenizer, top_k=top_k or None, chunk_size=chunk_size
+                ),
+                device,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vocab-size", type=int, default=32000, help="Vocabulary size of the tiny models")
+    parser.add_argument("--prompts", type=int, default=64, help="Number of prompts")
+    parser.add_argument("--prompt-words", type=int, default=200, help="Maximum prompt length in tokens")
+    parser.add_argument("--top-k", type=str, default="0,256", help="Comma separated top-k values, 0 for exact")
+    parser.add_argument("--chunk-size", type=int, default=cst.GRPO_KL_CHUNK_SIZE, help="Positions per logits chunk")
+    args = parser.parse_args()
+    main(args.vocab_size, args.prompts, args.prompt_words, [int(k) for k in args.top_k.split(",")], args.chunk_size)
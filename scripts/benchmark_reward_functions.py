@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark reward function throughput (completions per second) with and without the compiled-code cache and the
+process-pool executor.
+
+Runs the manual reward functions from core/manual_reward_funcs.py that work without extra packages or model
+downloads, and the affine SAT/ABD/DED reward functions on synthetic tasks. Reward functions are scored from their
+source, the way stored reward functions are.
+Usage: python -m scripts.benchmark_reward_functions [--completions 512] [--workers 4] [--chunk-size 8]
+"""
+import argparse
+import inspect
+import logging
+import random
+import time
+from typing import Callable
+
+import core.manual_reward_funcs as manual_reward_funcs
+import validator.utils.affine_reward_functions as affine_reward_functions
+from validator.utils.reward_functions import RewardFunctionPool
+from validator.utils.reward_functions import compiled_code_cache
+from validator.utils.reward_functions import load_reward_function
+from validator.utils.reward_functions import process_reward_function_code
+
+
+WORDS = "the model reasons about every step before it answers and checks the result twice".split()
+PROGRAMS = [
+    "n = int(input())\nprint(sum(i * i for i in range({k})) + n)",
+    "values = [int(x) for x in input().split()]\nprint(max(values) * {k} - min(values))",
+    "s = input()\nprint(''.join(sorted(s)) + str({k}))",
+    "n = int(input())\nresult = 1\nfor i in range(1, {k}):\n    result = (result * (n + i)) % 1000003\nprint(result)",
+]
+
+
+def _text_completions(num_completions: int) -> list[str]:
+    rng = random.Random(0)
+    return [
+        f"<think>{' '.join(rng.choices(WORDS, k=rng.randint(5, 60)))}</think><answer>{rng.randint(0, 99)}</answer>"
+        for _ in range(num_completions)
+    ]
+
+
+def _affine_batches(num_completions: int) -> dict[str, tuple[list[str], list[dict]]]:
+    """Completions and extra_data for each affine task type; tasks repeat like generations of the same prompt."""
+    rng = random.Random(0)
+    batches = {"sat": ([], []), "abd": ([], []), "ded": ([], [])}
+    for i in range(num_completions):
+        task = i // 8
+        program = PROGRAMS[task % len(PROGRAMS)].format(k=10 + task)
+        test_input = "3 5 7" if "split" in program else ("abcabc" if "sorted" in program else "7")
+
+        clauses = [[rng.choice([-1, 1]) * rng.randint(1, 20) for _ in range(3)] for _ in range(40)]
+        assignment = " ".join(f"x{v}={rng.choice(['True', 'False'])}" for v in range(1, 21))
+        batches["sat"][0].append(assignment)
+        batches["sat"][1].append({"task_type": "SAT", "cls": clauses})
+
+        batches["abd"][0].append(f"<INPUT>{test_input}</INPUT>")
+        batches["abd"][1].append({"task_type": "ABD", "program": program, "expected_output": "0"})
+
+        submitted = program if rng.random() < 0.5 else program.replace("print(", "print(1 + ")
+        batches["ded"][0].append(f"```python\n{submitted}\n```")
+        batches["ded"][1].append({"task_type": "DED", "solution": f"```python\n{program}\n```", "premises": [test_input]})
+    return batches
+
+
+def _cases(num_completions: int) -> list[tuple[str, str, list[str], dict]]:
+    """(name, source, completions, kwargs) for every benchmarked reward function."""
+    cases = []
+    text_completions = _text_completions(num_completions)
+    for name, func in inspect.getmembers(manual_reward_funcs, inspect.isfunction):
+        if not name.startswith("reward_"):
+            continue
+        try:
+            func(text_completions[:2])
+        except Exception:
+            continue  # needs textstat, langcheck, detoxify or a model download
+        cases.append((name, inspect.getsource(func), text_completions, {}))
+
+    for task_type, (completions, extra_data) in _affine_batches(num_completions).items():
+        func = getattr(affine_reward_functions, f"{task_type}_reward_function")
+        source = process_reward_function_code(inspect.getsource(func))
+        cases.append((func.__name__, source, completions, {"extra_data": extra_data}))
+    return cases
+
+
+def _throughput(score: Callable[[], list[float]], num_completions: int, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        score()
+    return num_completions * repeats / (time.perf_counter() - start)
+
+
+def main(num_completions: int, workers: int, chunk_size: int, repeats: int) -> None:
+    logging.disable(logging.CRITICAL)
+    cases = _cases(num_completions)
+    pool = RewardFunctionPool(max_workers=workers, chunk_size=chunk_size)
+
+    print(f"{num_completions} completions per call, {repeats} calls, pool of {workers} workers x {chunk_size} completions")
+    print(f"{'reward function':>38} | {'uncached/s':>11} | {'cached/s':>11} | {'pool/s':>11}")
+    try:
+        for name, source, completions, kwargs in cases:
+            func = load_reward_function(source)
+
+            compiled_code_cache.maxsize = 0
+            compiled_code_cache.clear()
+            uncached = _throughput(lambda: func(completions, **kwargs), num_completions, repeats)
+
+            compiled_code_cache.maxsize = 1024
+            cached = _throughput(lambda: func(completions, **kwargs), num_completions, repeats)
+
+            pool.score(source, completions[: workers * chunk_size], **kwargs)  # spawn workers, load the function
+            pooled = _throughput(lambda: pool.score(source, completions, **kwargs), num_completions, repeats)
+            assert pool.score(source, completions, **kwargs) == func(completions, **kwargs), name
+
+            print(f"{name:>38} | {uncached:>11.0f} | {cached:>11.0f} | {pooled:>11.0f}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--completions", type=int, default=512, help="Completions per reward function call")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes in the pool")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Completions per worker call")
+    parser.add_argument("--repeats", type=int, default=3, help="Calls per measurement")
+    args = parser.parse_args()
+    main(args.completions, args.workers, args.chunk_size, args.repeats)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark query count and latency of get_tasks_with_status against the old per-row (N+1) hydration.
+
+Runs against an in-memory fake connection that charges a fixed round-trip per query, so no database is needed.
+Usage: python -m scripts.benchmark_task_hydration [--rtt-ms 1.0] [--sizes 10,50,200,1000]
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from uuid import UUID
+from uuid import uuid4
+
+import validator.db.constants as cst
+import validator.db.sql.tasks as tasks_sql
+from core.models.utility_models import TaskStatus
+from core.models.utility_models import TaskType
+
+
+BENCHMARK_TASK_TYPES = [
+    TaskType.INSTRUCTTEXTTASK,
+    TaskType.CHATTASK,
+    TaskType.DPOTASK,
+    TaskType.GRPOTASK,
+    TaskType.IMAGETASK,
+    TaskType.ENVIRONMENTTASK,
+]
+PAIRS_PER_IMAGE_TASK = 10
+REWARD_FUNCTIONS_PER_GRPO_TASK = 3
+
+
+def _make_base_row(task_type: TaskType) -> dict:
+    return {
+        cst.TASK_ID: uuid4(),
+        "model_id": "unsloth/Llama-3.2-1B",
+        "ds": "some/dataset",
+        "status": TaskStatus.PREEVALUATION.value,
+        "hours_to_complete": 4,
+        "is_organic": False,
+        "account_id": uuid4(),
+        "created_at": datetime.now(),
+        cst.TASK_TYPE: task_type.value,
+    }
+
+
+def _make_specific_row(base_row: dict) -> dict:
+    task_type = base_row[cst.TASK_TYPE]
+    row = dict(base_row)
+    if task_type == TaskType.INSTRUCTTEXTTASK.value:
+        row.update(field_instruction="instruction", field_output="output")
+    elif task_type == TaskType.DPOTASK.value:
+        row.update(field_prompt="prompt", field_chosen="chosen", field_rejected="rejected")
+    elif task_type == TaskType.GRPOTASK.value:
+        row.update(field_prompt="prompt")
+    elif task_type == TaskType.ENVIRONMENTTASK.value:
+        row.update(environment_name="alfworld")
+    return row
+
+
+class FakeConnection:
+    """Answers the task queries from in-memory rows, sleeping rtt seconds per round trip."""
+
+    def __init__(self, base_rows: list[dict], rtt: float):
+        self.rtt = rtt
+        self.query_count = 0
+        self.base_rows = base_rows
+        self.specific_rows = {row[cst.TASK_ID]: _make_specific_row(row) for row in base_rows}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def _ids(self, args) -> list[UUID]:
+        return args[0] if isinstance(args[0], list) else [args[0]]
+
+    async def fetch(self, query: str, *args) -> list[dict]:
+        self.query_count += 1
+        await asyncio.sleep(self.rtt)
+
+        if cst.IMAGE_TEXT_PAIRS_TABLE in query:
+            return [
+                {cst.TASK_ID: task_id, cst.IMAGE_URL: f"s3://img/{task_id}/{i}", cst.TEXT_URL: f"s3://txt/{task_id}/{i}"}
+                for task_id in self._ids(args)
+                for i in range(PAIRS_PER_IMAGE_TASK)
+            ]
+        if cst.GRPO_TASK_FUNCTIONS_TABLE in query:
+            rows = []
+            for task_id in self._ids(args):
+                for i in range(REWARD_FUNCTIONS_PER_GRPO_TASK):
+                    reward_func = f"def reward_{i}(completions, **kwargs):\n    return [0.0] * len(completions)"
+                    rows.append(
+                        {
+                            cst.TASK_ID: task_id,
+                            cst.REWARD_ID: uuid4(),
+                            cst.REWARD_FUNC: reward_func,
+                            cst.FUNC_HASH: hashlib.sha256(reward_func.encode()).hexdigest(),
+                            cst.IS_GENERIC: True,
+                            cst.IS_MANUAL: False,
+                            cst.REWARD_WEIGHT: 1.0,
+                        }
+                    )
+            return rows
+        if "LEFT JOIN" in query:
+            return [self.specific_rows[task_id] for task_id in self._ids(args)]
+        return self.base_rows
+
+    async def fetchrow(self, query: str, *args) -> dict | None:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+
+class FakePSQLDB:
+    def __init__(self, connection: FakeConnection):
+        self._connection = connection
+
+    async def connection(self) -> FakeConnection:
+        return self._connection
+
+
+async def _get_tasks_per_row(connection: FakeConnection, psql_db: FakePSQLDB) -> list:
+    """The previous hydration strategy: one join query per task plus one auxiliary query per image/GRPO task."""
+    base_rows = await connection.fetch(f"SELECT * FROM {cst.TASKS_TABLE} WHERE {cst.STATUS} = $1", TaskStatus.PREEVALUATION.value)
+    tasks = []
+    for row in base_rows:
+        task_type = row[cst.TASK_TYPE]
+        task_id = row[cst.TASK_ID]
+        specific_row = await connection.fetchrow(tasks_sql._get_specific_query_for_task_type(task_type), [task_id])
+        image_text_pairs = None
+        reward_functions = None
+        if task_type == TaskType.IMAGETASK.value:
+            image_text_pairs = await tasks_sql.get_image_text_pairs(task_id, psql_db, connection)
+        elif task_type == TaskType.GRPOTASK.value:
+            reward_functions = await tasks_sql.get_reward_functions(task_id, psql_db, connection)
+        tasks.append(tasks_sql._create_task_from_data(task_type, specific_row, image_text_pairs, reward_functions))
+    return tasks
+
+
+async def _measure(num_tasks: int, rtt: float, batched: bool) -> tuple[int, float, int]:
+    base_rows = [_make_base_row(BENCHMARK_TASK_TYPES[i % len(BENCHMARK_TASK_TYPES)]) for i in range(num_tasks)]
+    connection = FakeConnection(base_rows, rtt)
+    psql_db = FakePSQLDB(connection)
+
+    start = time.perf_counter()
+    if batched:
+        tasks = await tasks_sql.get_tasks_with_status(TaskStatus.PREEVALUATION, psql_db, benchmark_filter="include")
+    else:
+        tasks = await _get_tasks_per_row(connection, psql_db)
+    elapsed = time.perf_counter() - start
+    return connection.query_count, elapsed, len(tasks)
+
+
+async def main(sizes: list[int], rtt: float) -> None:
+    print(f"Simulated round trip: {rtt * 1000:.2f}ms per query")
+    print(f"{'tasks':>8} | {'per-row queries':>15} | {'per-row ms':>10} | {'batched queries':>15} | {'batched ms':>10}")
+    for num_tasks in sizes:
+        per_row_queries, per_row_elapsed, per_row_count = await _measure(num_tasks, rtt, batched=False)
+        batched_queries, batched_elapsed, batched_count = await _measure(num_tasks, rtt, batched=True)
+        assert per_row_count == batched_count == num_tasks
+        print(
+            f"{num_tasks:>8} | {per_row_queries:>15} | {per_row_elapsed * 1000:>10.1f} | "
+            f"{batched_queries:>15} | {batched_elapsed * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="Simulated database round trip per query")
+    parser.add_argument("--sizes", type=str, default="10,50,200,1000", help="Comma separated task counts")
+    args = parser.parse_args()
+    asyncio.run(main([int(size) for size in args.sizes.split(",")], args.rtt_ms / 1000))
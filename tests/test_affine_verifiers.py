@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import json
+import random
+import sys
+
+import pytest
+
+from validator.utils.affine_reward_functions import abd_reward_function
+from validator.utils.affine_reward_functions import ded_reward_function
+from validator.utils.affine_reward_functions import sat_reward_function
+
+
+def _per_completion_scores(reward_function, monkeypatch, completions, extra_data):
+    """Scores from the original per-completion code path, taken when the verifier module can't be imported."""
+    with monkeypatch.context() as patch:
+        patch.setitem(sys.modules, "validator.utils.affine_verifiers", None)
+        return reward_function(completions, extra_data=extra_data)
+
+
+def _sat_batch(seed: int, group_size: int = 8):
+    rng = random.Random(seed)
+    completions, extra_data = [], []
+    for prompt in range(6):
+        num_variables = rng.randint(1, 30)
+        clauses = [
+            [rng.choice([-1, 1]) * rng.randint(0, num_variables) for _ in range(rng.randint(1, 4))]
+            for _ in range(rng.randint(1, 50))
+        ]
+        if prompt == 1:
+            clauses.append("not a clause")
+        if prompt == 2:
+            clauses.append([1, "2"])  # malformed literal, only fails when reached
+        item = {"task_type": "SAT", "cls": clauses}
+        for generation in range(group_size):
+            assignment = " ".join(
+                f"x{v} = {rng.choice(['True', 'false', '1', '0'])}" for v in rng.sample(range(num_variables + 3), k=num_variables)
+            )
+            completions.append(assignment if generation else "no assignment here")
+            extra_data.append(json.dumps(item) if prompt % 2 else item)
+    completions += ["x1=True", "x1=True", "x1=True"]
+    extra_data += ["not json", {"task_type": "ABD"}, {"task_type": "SAT", "cls": []}]
+    return completions, extra_data
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sat_batch_matches_per_completion(monkeypatch, seed):
+    completions, extra_data = _sat_batch(seed)
+    expected = _per_completion_scores(sat_reward_function, monkeypatch, completions, extra_data)
+    assert sat_reward_function(completions, extra_data=extra_data) == expected
+
+
+def test_abd_batch_matches_per_completion(monkeypatch):
+    program = "```python\nvalues = [int(x) for x in input().split()]\nprint(sum(values))\n```"
+    item = {"task_type": "ABD", "program": program, "expected_output": "6"}
+    completions = [
+        "<think><INPUT>9</INPUT></think><INPUT>1 2 3</INPUT>",
+        "<INPUT>1 2 3\n\n</INPUT>",
+        "<INPUT>2 2</INPUT>",
+        "<INPUT>a b</INPUT>",
+        "<input>no closing tag",
+        "nothing",
+    ]
+    extra_data = [item] * 3 + [json.dumps(item)] * 3 + [{"task_type": "ABD", "program": 5}, {"task_type": "DED"}]
+    completions += ["<INPUT>1</INPUT>", "<INPUT>1</INPUT>"]
+
+    expected = _per_completion_scores(abd_reward_function, monkeypatch, completions, extra_data)
+    assert abd_reward_function(completions, extra_data=extra_data) == expected
+
+
+def test_ded_batch_matches_per_completion(monkeypatch):
+    solution = "```python\nn = int(input())\nprint(n * 2)\n```"
+    item = {"task_type": "DED", "solution": solution, "premises": ["21"]}
+    completions = [
+        "```python\nn = int(input())\nprint(n + n)\n```",
+        "```python\nn = int(input())\nprint(n * 2, 0)\n```",
+        "```python\nprint(1)\n```",
+        "```python\nprint(int(input()) / 0)\n```",
+        "```python\ndef broken(:\n```",
+        "def solve(): return 1",
+        "no code",
+    ]
+    extra_data = [item] * len(completions)
+    broken_items = [
+        {"task_type": "DED", "solution": "print(", "premises": ["1"]},
+        {"task_type": "DED", "solution": solution, "premises": []},
+        {"task_type": "DED", "solution": 7, "premises": ["1"]},
+    ]
+    for broken_item in broken_items:
+        completions += ["```python\nprint(42)\n```", "no code"]
+        extra_data += [broken_item, json.dumps(broken_item)]
+
+    expected = _per_completion_scores(ded_reward_function, monkeypatch, completions, extra_data)
+    assert ded_reward_function(completions, extra_data=extra_data) == expected
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+import pytest
+
+from scripts.benchmark_comfy_client import FakeComfyServer
+from scripts.benchmark_comfy_client import workflow
+from validator.utils.comfy_client import ComfyClient
+
+
+async def test_prompts_stream_back_in_order_with_a_rolling_window():
+    async with FakeComfyServer(exec_time=0.02, rtt=0.01) as server:
+        async with ComfyClient(server.url, max_in_flight=3) as client:
+            prompts = [workflow(seed) for seed in range(8)]
+            results = [item async for item in client.generate_stream(prompts)]
+
+        assert [index for index, _ in results] == list(range(8))
+        for (index, images), prompt_id in zip(results, server.executed):
+            assert list(images) == ["Save"]
+            assert images["Save"][0].startswith(f"{prompt_id}.png".encode())
+        assert server.max_queue_depth == 2  # one prompt running, the rest of the window waiting behind it
+        assert client.stage_timings["sampling"] > 0 and client.stage_timings["fetch"] > 0
+        assert client._prompts == {}
+
+
+async def test_events_sent_before_the_prompt_response_are_replayed():
+    # The whole prompt executes while the /prompt response is still on its way back
+    async with FakeComfyServer(exec_time=0.01, rtt=0.2) as server:
+        async with ComfyClient(server.url, max_in_flight=2) as client:
+            results = await asyncio.wait_for(client.generate_batch([workflow(1), workflow(2)]), timeout=5)
+
+    assert [images["Save"][0].split(b".")[0].decode() for images in results] == server.executed
+
+
+async def test_failed_prompt_stops_the_stream_and_drops_the_queued_ones():
+    prompts = [workflow(seed) for seed in range(6)]
+    prompts[1]["Sampler"]["inputs"]["fail"] = True
+    async with FakeComfyServer(exec_time=0.05) as server:
+        async with ComfyClient(server.url, max_in_flight=4) as client:
+            received = []
+            with pytest.raises(RuntimeError, match="prompt 1 of 6: Sampler failed"):
+                async for index, _ in client.generate_stream(prompts):
+                    received.append(index)
+            await asyncio.sleep(0.2)
+
+    assert received == [0]
+    # The prompt ComfyUI picked up right after the failure still runs, the three queued behind it are dropped
+    assert len(server.executed) == 2
+    assert len(server.deleted) == 4
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import json
+
+from datasets import Dataset
+
+from validator.core import constants as cst
+from validator.utils.dataset_pipeline import all_equal_mask
+from validator.utils.dataset_pipeline import count_matching_rows
+from validator.utils.dataset_pipeline import filter_rows
+from validator.utils.dataset_pipeline import non_blank_mask
+from validator.utils.dataset_pipeline import stringify_columns
+from validator.utils.dataset_pipeline import write_json_rows
+
+
+def _mixed_dataset() -> Dataset:
+    dataset = Dataset.from_dict(
+        {
+            "text": ["a", None, "", " b ", "\u3000"],
+            "number": [1.0, None, 2.5, 3.0, None],
+            "meta": [{"k": 1}, None, {"k": None}, {"k": 2}, None],
+            "unused": ["x"] * 5,
+        }
+    )
+    # Task datasets arrive shuffled behind an indices mapping
+    return dataset.train_test_split(test_size=1, seed=0)["train"]
+
+
+def _str_rows(dataset: Dataset, columns: list[str]) -> list[dict]:
+    return [{col: str(row[col]) if row[col] is not None else "" for col in columns} for row in dataset]
+
+
+def test_stringify_matches_row_wise_str(monkeypatch):
+    dataset = _mixed_dataset()
+    columns = ["text", "number", "meta"]
+    monkeypatch.setattr(cst, "DATASET_PREP_BATCH_SIZE", 2)
+
+    stringified = stringify_columns(dataset, columns)
+
+    assert stringified.column_names == columns
+    assert stringified.to_list() == _str_rows(dataset, columns)
+
+
+def test_string_columns_without_nulls_are_not_copied():
+    dataset = Dataset.from_dict({"text": ["a", "b"], "other": [1, 2]})
+    stringified = stringify_columns(dataset, ["text"])
+    assert stringified.cache_files == dataset.cache_files
+    assert stringified.to_list() == [{"text": "a"}, {"text": "b"}]
+
+
+def test_masks_filter_and_count(monkeypatch):
+    monkeypatch.setattr(cst, "DATASET_PREP_BATCH_SIZE", 2)
+    dataset = stringify_columns(_mixed_dataset(), ["text", "number"])
+    rows = dataset.to_list()
+
+    assert count_matching_rows(dataset, lambda table: all_equal_mask(table, ["text", "number"], "")) == sum(
+        row["text"] == "" and row["number"] == "" for row in rows
+    )
+    kept = filter_rows(dataset, lambda table: non_blank_mask(table, ["text"]))
+    assert kept.to_list() == [row for row in rows if row["text"].strip()]
+    assert len(filter_rows(dataset, lambda table: non_blank_mask(table, ["missing"]))) == 0
+
+
+def test_write_json_rows_matches_json_dump(tmp_path, monkeypatch):
+    monkeypatch.setattr(cst, "DATASET_PREP_BATCH_SIZE", 2)
+    dataset = _mixed_dataset().select_columns(["text", "meta"])
+    path = tmp_path / "rows.json"
+
+    num_rows, head = write_json_rows(dataset, str(path), head_rows=3)
+    assert path.read_text() == json.dumps(dataset.to_list())
+    assert (num_rows, head) == (len(dataset), dataset.to_list()[:3])
+
+    num_rows, head = write_json_rows(dataset, str(path), transform=lambda rows: [r for r in rows if r["meta"]], head_rows=1)
+    expected = [row for row in dataset.to_list() if row["meta"]]
+    assert path.read_text() == json.dumps(expected)
+    assert (num_rows, head) == (len(expected), expected[:1])
+
+    num_rows, _ = write_json_rows(dataset, str(path), transform=lambda rows: [])
+    assert (num_rows, json.loads(path.read_text())) == (0, [])
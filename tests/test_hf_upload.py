@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+
+import pytest
+from huggingface_hub import CommitOperationAdd
+
+from trainer.utils import hf_upload
+from trainer.utils.hf_upload import UploadManifest
+from trainer.utils.hf_upload import upload_folder_resumable
+
+
+class FakeApi:
+    """Records pre-uploads and commits; pre-uploading a path in `fail_paths` raises, like a dropped connection."""
+
+    def __init__(self, fail_paths: set[str] = frozenset()):
+        self.fail_paths = set(fail_paths)
+        self.preuploaded: list[str] = []
+        self.commits: list[list[CommitOperationAdd]] = []
+
+    def preupload_lfs_files(self, repo_id: str, additions: list[CommitOperationAdd], token=None, num_threads=1):
+        for operation in additions:
+            if operation.path_in_repo in self.fail_paths:
+                raise ConnectionError(f"upload of {operation.path_in_repo} dropped")
+            self.preuploaded.append(operation.path_in_repo)
+
+    def create_commit(self, repo_id: str, operations: list[CommitOperationAdd], commit_message: str, token=None):
+        self.commits.append(operations)
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(hf_upload.cst, "HF_UPLOAD_PREUPLOAD_MIN_BYTES", 1024)
+    monkeypatch.setattr(hf_upload.cst, "HF_UPLOAD_WORKERS", 2)
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "model-00001.safetensors").write_bytes(os.urandom(4096))
+    (output / "model-00002.safetensors").write_bytes(os.urandom(2048))
+    (output / "config.json").write_bytes(b'{"layers": 2}')
+    return output
+
+
+def test_restarted_upload_reuses_the_manifest(tmp_path, folder, monkeypatch):
+    manifest_path = str(tmp_path / "manifests" / "user--repo.json")
+    failing = FakeApi(fail_paths={"model-00002.safetensors"})
+    with pytest.raises(ConnectionError):
+        upload_folder_resumable(failing, "user/repo", str(folder), "upload", manifest_path)
+    assert failing.preuploaded == ["model-00001.safetensors"]
+    assert not failing.commits
+
+    manifest = UploadManifest(manifest_path, "user/repo")
+    assert manifest.entries["model-00001.safetensors"].preuploaded
+    assert not manifest.entries["model-00002.safetensors"].preuploaded
+
+    # A hashed file is rebuilt from its manifest entry instead of being read again
+    hashed = []
+    original_init = CommitOperationAdd.__post_init__
+
+    def recording_init(operation):
+        if isinstance(operation.path_or_fileobj, str):
+            hashed.append(operation.path_in_repo)
+        original_init(operation)
+
+    monkeypatch.setattr(CommitOperationAdd, "__post_init__", recording_init)
+    api = FakeApi()
+    upload_folder_resumable(api, "user/repo", str(folder), "upload", manifest_path)
+
+    assert api.preuploaded == ["model-00002.safetensors"]
+    assert hashed == ["config.json"]
+    (operations,) = api.commits
+    by_path = {operation.path_in_repo: operation for operation in operations}
+    assert sorted(by_path) == ["config.json", "model-00001.safetensors", "model-00002.safetensors"]
+    for name in ("model-00001.safetensors", "model-00002.safetensors"):
+        content = (folder / name).read_bytes()
+        assert by_path[name].path_or_fileobj == str(folder / name)
+        assert by_path[name].upload_info.sha256 == hashlib.sha256(content).digest()
+        assert by_path[name].upload_info.size == len(content)
+        assert by_path[name].upload_info.sample == content[:512]
+    assert not os.path.exists(manifest_path)
+
+
+def test_manifest_entries_are_dropped_once_the_file_changes(tmp_path, folder):
+    manifest_path = str(tmp_path / "user--repo.json")
+    with pytest.raises(ConnectionError):
+        upload_folder_resumable(FakeApi({"model-00002.safetensors"}), "user/repo", str(folder), "upload", manifest_path)
+
+    (folder / "model-00001.safetensors").write_bytes(os.urandom(4096))
+    api = FakeApi()
+    upload_folder_resumable(api, "user/repo", str(folder), "upload", manifest_path)
+
+    assert sorted(api.preuploaded) == ["model-00001.safetensors", "model-00002.safetensors"]
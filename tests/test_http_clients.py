@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+
+import pytest
+
+from validator.utils.http_clients import HttpClientRegistry
+from validator.utils.http_clients import LatencyHistogram
+
+
+class KeepAliveServer:
+    """Minimal HTTP/1.1 server answering every request with its sequence number after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+        self.url = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                self.requests += 1
+                body = json.dumps({"request": self.requests}).encode()
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+
+
+@pytest.fixture
+async def registry():
+    registry = HttpClientRegistry()
+    yield registry
+    await registry.aclose()
+
+
+async def test_requests_to_a_host_share_keep_alive_connections(registry):
+    async with KeepAliveServer() as server:
+        for _ in range(5):
+            await registry.get(f"{server.url}/models/random")
+        await registry.post(f"{server.url}/generate", json={"prompt": "x"})
+        await asyncio.gather(*(registry.get(f"{server.url}/models/random") for _ in range(3)))
+
+    assert server.requests == 9
+    assert server.connections <= 3
+    histograms = registry.latency_histograms()
+    assert histograms[f"{server.url}/models/random"]["count"] == 8
+    assert histograms[f"{server.url}/generate"]["count"] == 1
+
+
+async def test_identical_in_flight_gets_are_coalesced_only_when_asked(registry):
+    async with KeepAliveServer(delay=0.1) as server:
+        url = f"{server.url}/dataset/a/columns/suggest"
+        name = f"{server.url}/dataset/{{dataset}}/columns/suggest"
+        responses = await asyncio.gather(
+            *(registry.get(url, params={"x": 1}, headers={"nonce": str(i)}, name=name, coalesce=True) for i in range(4)),
+            registry.get(url, params={"x": 2}, name=name, coalesce=True),
+        )
+        assert [response.json()["request"] for response in responses[:4]] == [1, 1, 1, 1]
+        assert responses[4].json()["request"] == 2
+
+        responses = await asyncio.gather(*(registry.get(f"{server.url}/datasets/random") for _ in range(3)))
+        assert sorted(response.json()["request"] for response in responses) == [3, 4, 5]
+
+    assert registry.latency_histograms()[name]["coalesced"] == 3
+    assert registry._in_flight == {}
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = LatencyHistogram(bounds=(0.1, 1.0))
+    for seconds in [0.05] * 90 + [0.5] * 9 + [3.0]:
+        histogram.observe(seconds)
+    histogram.observe(0.2, error=True)
+
+    summary = histogram.summary()
+    assert (summary["count"], summary["errors"], summary["max"]) == (101, 1, 3.0)
+    assert (summary["p50"], summary["p95"], histogram.quantile(1.0)) == (0.1, 1.0, 3.0)
+    assert summary["buckets"] == {0.1: 90, 1.0: 100, float("inf"): 101}
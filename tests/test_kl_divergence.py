@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import pytest
+import torch
+import torch.nn.functional as F
+from datasets import Dataset
+from peft import LoraConfig
+from peft import get_peft_model
+from tokenizers import Tokenizer
+from tokenizers import models
+from tokenizers import pre_tokenizers
+from transformers import GPT2Config
+from transformers import GPT2LMHeadModel
+from transformers import GraniteConfig
+from transformers import GraniteForCausalLM
+from transformers import PreTrainedTokenizerFast
+
+from validator.core import constants as cst
+from validator.evaluation.common import AdapterDisabledView
+from validator.evaluation.common import calculate_kl_divergence
+from validator.evaluation.common import calculate_kl_divergence_from_reference
+from validator.evaluation.common import compute_reference_top_k_logprobs
+
+
+VOCAB_SIZE = 96
+
+
+def _tiny_model(seed: int) -> GPT2LMHeadModel:
+    torch.manual_seed(seed)
+    config = GPT2Config(n_layer=2, n_embd=32, n_head=2, vocab_size=VOCAB_SIZE, n_positions=128)
+    return GPT2LMHeadModel(config).eval()
+
+
+def _word_level_tokenizer(**kwargs) -> PreTrainedTokenizerFast:
+    vocab = {f"w{i}": i for i in range(VOCAB_SIZE)}
+    word_level = Tokenizer(models.WordLevel(vocab, unk_token="w0"))
+    word_level.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=word_level, pad_token="w0", eos_token="w1", **kwargs)
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    return _word_level_tokenizer()
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    prompts = [" ".join(f"w{(i * 7 + j) % VOCAB_SIZE}" for j in range(2 + i % 13)) for i in range(24)]
+    return Dataset.from_dict({cst.TRL_GRPO_FIELD_PROMPT: prompts})
+
+
+@pytest.fixture(scope="module")
+def original_model():
+    return _tiny_model(0)
+
+
+@pytest.fixture(scope="module")
+def finetuned_model(original_model):
+    model = _tiny_model(0)
+    torch.manual_seed(1)
+    model.load_state_dict({name: value + 0.05 * torch.randn_like(value) for name, value in original_model.state_dict().items()})
+    return model.eval()
+
+
+def _full_softmax_kl(original_model, finetuned_model, dataset, tokenizer) -> float:
+    """The previous implementation: full-vocabulary softmax of both models, one sample per batch."""
+    total = 0.0
+    for prompt in dataset[cst.TRL_GRPO_FIELD_PROMPT]:
+        inputs = tokenizer([prompt], return_tensors="pt")
+        with torch.no_grad():
+            original_probs = F.softmax(original_model(**inputs).logits, dim=-1)
+            finetuned_log_probs = F.log_softmax(finetuned_model(**inputs).logits, dim=-1)
+        kl_div = F.kl_div(finetuned_log_probs, original_probs, reduction="none")
+        total += kl_div.sum(dim=-1).mean(dim=-1).sum().item()
+    return total / len(dataset)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_streaming_kl_matches_full_softmax(original_model, finetuned_model, dataset, tokenizer, chunk_size):
+    expected = _full_softmax_kl(original_model, finetuned_model, dataset, tokenizer)
+    kl = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, chunk_size=chunk_size)
+    assert kl == pytest.approx(expected, rel=1e-5)
+
+
+def test_top_k_kl_is_a_tight_lower_bound(original_model, finetuned_model, dataset, tokenizer):
+    exact = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer)
+    assert calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, top_k=VOCAB_SIZE) == pytest.approx(
+        exact, rel=1e-3
+    )
+
+    previous = 0.0
+    for top_k in [1, 8, 32, VOCAB_SIZE]:
+        approximate = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, top_k=top_k)
+        assert previous - 1e-5 <= approximate <= exact + 1e-5
+        previous = approximate
+
+
+def test_cached_reference_kl_matches_top_k(original_model, finetuned_model, dataset, tokenizer):
+    reference = compute_reference_top_k_logprobs(original_model, dataset, tokenizer, max_length=64, top_k=8, chunk_size=3)
+    assert reference["lengths"].sum().item() == reference["values"].shape[0]
+
+    cached = calculate_kl_divergence_from_reference(finetuned_model, dataset, tokenizer, reference, max_length=64, chunk_size=3)
+    direct = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, top_k=8)
+    assert cached == pytest.approx(direct, rel=1e-4)
+
+
+def test_full_vocabulary_reference_gives_the_exact_kl(original_model, finetuned_model, dataset, tokenizer):
+    reference = compute_reference_top_k_logprobs(original_model, dataset, tokenizer, max_length=64, top_k=None, chunk_size=5)
+    assert reference["values"].shape[-1] == VOCAB_SIZE
+
+    exact = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer)
+    cached = calculate_kl_divergence_from_reference(finetuned_model, dataset, tokenizer, reference, max_length=64)
+    assert cached == pytest.approx(exact, rel=1e-4)
+    truncated = calculate_kl_divergence_from_reference(finetuned_model, dataset, tokenizer, reference, max_length=64, top_k=8)
+    direct = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, top_k=8)
+    assert truncated == pytest.approx(direct, rel=1e-4)
+
+
+def _tiny_granite_model(seed: int) -> GraniteForCausalLM:
+    torch.manual_seed(seed)
+    config = GraniteConfig(
+        vocab_size=VOCAB_SIZE,
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        max_position_embeddings=128,
+        logits_scaling=8.0,
+    )
+    return GraniteForCausalLM(config).eval()
+
+
+def test_scaled_logits_go_through_the_model_forward(dataset):
+    # Granite divides its logits by logits_scaling in forward, the output embedding alone would skip that
+    tokenizer = _word_level_tokenizer(model_input_names=["input_ids", "attention_mask"])
+    original_model = _tiny_granite_model(3)
+    finetuned_model = _tiny_granite_model(4)
+
+    expected = _full_softmax_kl(original_model, finetuned_model, dataset, tokenizer)
+    kl = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer, chunk_size=5)
+    assert kl == pytest.approx(expected, rel=1e-3)
+
+
+def test_adapter_disabled_view_is_the_base_model(dataset, tokenizer):
+    base_model = _tiny_model(2)
+    expected_base = _tiny_model(2)
+    peft_model = get_peft_model(base_model, LoraConfig(r=4, target_modules=["c_attn"], init_lora_weights=False)).eval()
+
+    via_view = calculate_kl_divergence(AdapterDisabledView(peft_model), peft_model, dataset, tokenizer, chunk_size=4)
+    expected = _full_softmax_kl(expected_base, peft_model, dataset, tokenizer)
+    assert via_view > 0
+    assert via_view == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import os
+
+import pytest
+
+from core import constants as cst
+from validator.utils import model_cache_index
+from validator.utils.cache_clear import manage_models_cache
+from validator.utils.model_cache_index import ModelCacheIndex
+
+
+def _add_blob(hub, repo: str, blob: str, size: int, mtime: float | None = None):
+    repo_dir = hub / f"models--{repo.replace('/', '--')}"
+    (repo_dir / "blobs").mkdir(parents=True, exist_ok=True)
+    (repo_dir / "snapshots" / "main").mkdir(parents=True, exist_ok=True)
+    (repo_dir / "blobs" / blob).write_bytes(b"x" * size)
+    (repo_dir / "snapshots" / "main" / f"{blob}.bin").symlink_to(repo_dir / "blobs" / blob)
+    if mtime is not None:
+        os.utime(repo_dir / "blobs", (mtime, mtime))
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    hub = tmp_path / "hub"
+    hub.mkdir()
+    monkeypatch.setattr(cst, "CACHE_DIR_HUB", str(hub))
+    return hub
+
+
+def _index(tmp_path, hub) -> ModelCacheIndex:
+    return ModelCacheIndex(tmp_path / "index.db", cache_dir=str(hub))
+
+
+def test_refresh_only_rescans_changed_repos(tmp_path, hub, monkeypatch):
+    _add_blob(hub, "org/a", "h1", 100)
+    _add_blob(hub, "org/b", "h2", 50)
+    (hub / "models--org--a-extra.safetensors").write_bytes(b"x" * 7)
+    (hub / ".locks").mkdir()
+    (hub / ".locks" / "l.lock").write_bytes(b"x" * 3)
+    index = _index(tmp_path, hub)
+    index.refresh()
+    assert index.total_size() == 160
+    assert index.model_usage("Org/A")[0] == 107
+
+    scanned = []
+    scan_blobs = ModelCacheIndex._scan_blobs
+
+    def counting_scan_blobs(self, name, *args, **kwargs):
+        scanned.append(name)
+        return scan_blobs(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(ModelCacheIndex, "_scan_blobs", counting_scan_blobs)
+    index.refresh()
+    assert scanned == []
+
+    _add_blob(hub, "org/a", "h3", 20)
+    index.refresh()
+    assert scanned == ["models--org--a"]
+    assert index.model_usage("org/a")[0] == 127
+
+    (hub / "models--org--b" / "blobs" / "h2").unlink()
+    index.refresh(full=True)
+    assert index.model_usage("org/b")[0] == 0
+    assert index.total_size() == 130
+
+
+def test_in_progress_downloads_are_rescanned_until_done(tmp_path, hub):
+    _add_blob(hub, "org/a", "h1.incomplete", 10)
+    index = _index(tmp_path, hub)
+    index.refresh()
+    # The download keeps writing without touching the blobs directory
+    (hub / "models--org--a" / "blobs" / "h1.incomplete").write_bytes(b"x" * 30)
+    index.refresh()
+    assert index.total_size() == 30
+
+
+def test_eviction_prefers_low_score_then_least_recently_used(tmp_path, hub, monkeypatch):
+    monkeypatch.setattr(model_cache_index.vcst, "MODEL_CACHE_RECONCILE_INTERVAL", 10**9)
+    _add_blob(hub, "org/old", "h1", 100, mtime=1_000)
+    _add_blob(hub, "org/new", "h2", 100, mtime=2_000)
+    _add_blob(hub, "org/best", "h3", 100, mtime=500)
+    _add_blob(hub, "org/unscored", "h4", 100)
+    index = _index(tmp_path, hub)
+    stats = {"org/old": {"cache_score": 1.0}, "org/new": {"cache_score": 1.0}, "org/best": {"cache_score": 5.0}}
+
+    manage_models_cache(stats, max_size=250, index=index)
+    assert sorted(os.listdir(hub)) == ["models--org--best", "models--org--new"]
+    assert index.total_size() == 200
+
+    index.touch("org/best")
+    stats["org/best"]["cache_score"] = 1.0
+    manage_models_cache(stats, max_size=150, index=index)
+    assert os.listdir(hub) == ["models--org--best"]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import json
+from types import SimpleNamespace
+
+import torch
+from safetensors.torch import save_file
+
+from validator.utils import model_params
+from validator.utils.model_params import count_checkpoint_parameters
+from validator.utils.model_params import count_local_parameters
+
+
+def _tensors(*shapes, dtype=torch.bfloat16) -> dict[str, torch.Tensor]:
+    return {f"t{i}": torch.zeros(shape, dtype=dtype) for i, shape in enumerate(shapes)}
+
+
+def test_single_file(tmp_path):
+    save_file({**_tensors((4, 8), (3,)), "scale": torch.zeros(5, dtype=torch.float32)}, tmp_path / "model.safetensors")
+
+    stats = count_local_parameters(str(tmp_path / "model.safetensors"))
+    assert stats.params_by_dtype == {"BF16": 35, "F32": 5}
+    assert stats.num_params == 40
+    assert stats.num_bytes == 35 * 2 + 5 * 4
+
+
+def test_sharded_index_ignores_unlisted_files(tmp_path):
+    save_file(_tensors((10, 10)), tmp_path / "model-00001-of-00002.safetensors")
+    save_file({"t1": torch.zeros(7)}, tmp_path / "model-00002-of-00002.safetensors")
+    save_file(_tensors((1000,)), tmp_path / "consolidated.safetensors")
+    weight_map = {"t0": "model-00001-of-00002.safetensors", "t1": "model-00002-of-00002.safetensors"}
+    (tmp_path / "model.safetensors.index.json").write_text(json.dumps({"metadata": {}, "weight_map": weight_map}))
+
+    assert count_local_parameters(str(tmp_path)).num_params == 107
+
+
+def test_diffusers_pipeline_skips_variants(tmp_path):
+    for component, shape in [("unet", (6, 6)), ("vae", (5,))]:
+        (tmp_path / component).mkdir()
+        save_file(_tensors(shape, dtype=torch.float32), tmp_path / component / "diffusion_pytorch_model.safetensors")
+        save_file(_tensors(shape, dtype=torch.float16), tmp_path / component / "diffusion_pytorch_model.fp16.safetensors")
+
+    assert count_local_parameters(str(tmp_path)).num_params == 0
+    assert count_local_parameters(str(tmp_path), recursive=True).num_params == 41
+
+
+def test_hub_counts_are_cached_per_revision(monkeypatch):
+    calls = []
+
+    def model_info(repo_id, revision=None):
+        calls.append(revision)
+        return SimpleNamespace(sha=revision or "abc", safetensors=None)
+
+    def get_safetensors_metadata(repo_id, revision=None):
+        calls.append(f"headers@{revision}")
+        return SimpleNamespace(parameter_count={"BF16": 70_000_000_000})
+
+    monkeypatch.setattr(model_params, "_local_snapshot", lambda repo_id, revision: None)
+    monkeypatch.setattr(model_params.hf_api, "model_info", model_info)
+    monkeypatch.setattr(model_params.hf_api, "get_safetensors_metadata", get_safetensors_metadata)
+    monkeypatch.setattr(model_params, "_stats_cache", {})
+
+    assert count_checkpoint_parameters("org/model").num_params == 70_000_000_000
+    assert count_checkpoint_parameters("org/model").num_bytes == 140_000_000_000
+    assert calls == [None, "headers@abc", None]
+
+    count_checkpoint_parameters("org/model", revision="def")
+    assert calls[-2:] == ["def", "headers@def"]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+from huggingface_hub.hf_api import BlobLfsInfo
+from huggingface_hub.hf_api import RepoSibling
+
+from trainer.utils.model_store import ChecksumMismatchError
+from trainer.utils.model_store import ModelStore
+
+
+class FakeHub:
+    """Serves repos of {path: bytes}; files of 100 bytes or more are reported as LFS files, like the Hub does."""
+
+    def __init__(self, repos: dict[str, dict[str, bytes]]):
+        self.repos = repos
+        self.downloads = []
+        self.corrupt = set()
+
+    def model_info(self, repo_id: str, revision: str | None = None, files_metadata: bool = False):
+        siblings = []
+        for path, content in self.repos[repo_id].items():
+            if len(content) >= 100:
+                lfs = BlobLfsInfo(size=len(content), sha256=hashlib.sha256(content).hexdigest(), pointer_size=134)
+                siblings.append(RepoSibling(rfilename=path, size=len(content), lfs=lfs))
+            else:
+                blob_id = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+                siblings.append(RepoSibling(rfilename=path, size=len(content), blob_id=blob_id))
+        return SimpleNamespace(sha=f"{repo_id}-commit".replace("/", "-"), siblings=siblings)
+
+    def download(self, repo_id: str, filename: str, revision: str, local_dir: str) -> str:
+        self.downloads.append((repo_id, filename))
+        path = os.path.join(local_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = self.repos[repo_id][filename]
+        with open(path, "wb") as f:
+            f.write(content[:-1] if (repo_id, filename) in self.corrupt else content)
+        return path
+
+
+SHARED_SHARD = os.urandom(4096)
+
+
+@pytest.fixture
+def hub() -> FakeHub:
+    return FakeHub(
+        {
+            "org/base": {"config.json": b'{"layers": 2}', "model.safetensors": SHARED_SHARD},
+            "org/finetune": {"config.json": b'{"layers": 3}', "model.safetensors": SHARED_SHARD},
+        }
+    )
+
+
+def _store(tmp_path, hub: FakeHub) -> ModelStore:
+    return ModelStore(str(tmp_path / "store"), api=hub, download=hub.download, workers=4)
+
+
+def test_shared_blobs_are_fetched_once_and_hardlinked(tmp_path, hub):
+    store = _store(tmp_path, hub)
+    base = store.ensure("org/base", str(tmp_path / "models" / "org--base"))
+    finetune = store.ensure("org/finetune", str(tmp_path / "models" / "org--finetune"))
+
+    assert sorted(hub.downloads) == [
+        ("org/base", "config.json"),
+        ("org/base", "model.safetensors"),
+        ("org/finetune", "config.json"),
+    ]
+    base_shard = os.stat(os.path.join(base, "model.safetensors"))
+    assert base_shard.st_ino == os.stat(os.path.join(finetune, "model.safetensors")).st_ino
+    assert base_shard.st_nlink == 3
+    with open(os.path.join(finetune, "config.json"), "rb") as f:
+        assert f.read() == b'{"layers": 3}'
+
+    store.ensure("org/base", base)
+    assert len(hub.downloads) == 3
+    assert (store.stats.models_hit, store.stats.files_fetched, store.stats.bytes_downloaded) == (1, 3, 4096 + 26)
+    assert store.stats.bytes_reused == 4096 + 4096 + 13
+
+
+def test_partial_legacy_directory_is_verified_not_trusted(tmp_path, hub):
+    dest = tmp_path / "models" / "org--base"
+    dest.mkdir(parents=True)
+    (dest / "model.safetensors").write_bytes(SHARED_SHARD)
+    (dest / "config.json").write_bytes(b'{"lay')  # interrupted download
+
+    store = _store(tmp_path, hub)
+    store.ensure("org/base", str(dest))
+
+    assert hub.downloads == [("org/base", "config.json")]
+    assert (dest / "config.json").read_bytes() == b'{"layers": 2}'
+    assert not [name for name in os.listdir(dest.parent) if name.startswith(".")]
+
+
+def test_corrupt_download_leaves_the_previous_directory_alone(tmp_path, hub):
+    store = _store(tmp_path, hub)
+    dest = tmp_path / "models" / "org--base"
+    hub.repos["org/base"]["model.safetensors"] = os.urandom(4096)
+    hub.corrupt.add(("org/base", "model.safetensors"))
+    (dest / "old").mkdir(parents=True)
+
+    with pytest.raises(ChecksumMismatchError):
+        store.ensure("org/base", str(dest))
+
+    assert os.listdir(dest) == ["old"]
+    assert len(os.listdir(tmp_path / "store" / "blobs")) == 1  # the verified config.json, not the corrupt shard
+    assert not os.listdir(tmp_path / "store" / "tmp")
+
+
+def test_single_file_is_materialised_under_its_local_name(tmp_path, hub):
+    store = _store(tmp_path, hub)
+    dest = tmp_path / "models" / "org--base"
+    store.ensure("org/base", str(dest), files={"model.safetensors": "org_base.safetensors"})
+
+    assert os.listdir(dest) == ["org_base.safetensors"]
+    assert hub.downloads == [("org/base", "model.safetensors")]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+
+from fiber.chain.models import Node
+
+from validator.utils import node_fanout
+from validator.utils.node_fanout import NodeHealthTracker
+from validator.utils.node_fanout import fan_out
+
+
+def _nodes(count: int) -> list[Node]:
+    return [Node(hotkey=f"hk{i}") for i in range(count)]
+
+
+def _query(latencies: dict[str, float], calls: list | None = None):
+    """Answers after the node's latency; nodes without one never answer."""
+
+    async def query(node: Node, timeout: float) -> dict | None:
+        if calls is not None:
+            calls.append((node.hotkey, timeout))
+        if node.hotkey not in latencies:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(latencies[node.hotkey])
+        return {"hotkey": node.hotkey}
+
+    return query
+
+
+async def _collect(*args, **kwargs) -> list:
+    return [reply async for reply in fan_out(*args, **kwargs)]
+
+
+async def test_round_takes_the_slowest_reply_not_the_sum_of_timeouts():
+    nodes = _nodes(64)
+    latencies = {node.hotkey: 0.01 * (i % 10) for i, node in enumerate(nodes) if i % 4}
+    tracker = NodeHealthTracker()
+
+    start = time.monotonic()
+    replies = []
+    async for reply in fan_out(nodes, _query(latencies), timeout=0.5, deadline=5, concurrency=64, tracker=tracker):
+        replies.append((reply, time.monotonic() - start))
+    elapsed = time.monotonic() - start
+
+    assert 0.5 <= elapsed < 1.0
+    answered = [reply for reply, _ in replies if reply.response is not None]
+    assert {reply.node.hotkey for reply in answered} == set(latencies)
+    # Replies stream out as they land, well before the dead nodes time out
+    assert max(at for reply, at in replies if reply.response is not None) < 0.4
+    assert tracker.get("hk1").rtt is not None and tracker.get("hk0").consecutive_failures == 1
+
+
+async def test_failing_nodes_get_short_timeouts_then_are_skipped(monkeypatch):
+    monkeypatch.setattr(node_fanout.cst, "NODE_SUSPECT_TIMEOUT", 0.05)
+    monkeypatch.setattr(node_fanout.cst, "NODE_DEAD_AFTER_FAILURES", 2)
+    monkeypatch.setattr(node_fanout.cst, "NODE_DEAD_RETRY_AFTER", 3600)
+    nodes = _nodes(3)
+    latencies = {"hk0": 0.01, "hk1": 0.01}
+    tracker = NodeHealthTracker()
+
+    rounds = []
+    for _ in range(3):
+        calls = []
+        replies = await _collect(nodes, _query(latencies, calls), timeout=0.2, deadline=5, concurrency=1, tracker=tracker)
+        rounds.append((sorted(calls), [reply.skipped for reply in replies if reply.node.hotkey == "hk2"]))
+
+    assert rounds[0] == ([("hk0", 0.2), ("hk1", 0.2), ("hk2", 0.2)], [False])
+    assert rounds[1][0][2][0] == "hk2" and rounds[1][0][2][1] <= 0.05
+    assert rounds[2] == ([("hk0", 0.2), ("hk1", 0.2)], [True])
+
+    monkeypatch.setattr(node_fanout.cst, "NODE_DEAD_RETRY_AFTER", 0)
+    assert tracker.timeout_for("hk2", 0.2) == 0.05
+
+
+async def test_global_deadline_cuts_the_round_without_blaming_nodes():
+    nodes = _nodes(10)
+    latencies = {node.hotkey: 0.3 for node in nodes}
+    tracker = NodeHealthTracker()
+
+    start = time.monotonic()
+    replies = await _collect(nodes, _query(latencies), timeout=1.0, deadline=0.4, concurrency=5, tracker=tracker)
+
+    assert time.monotonic() - start < 0.7
+    assert len(replies) == 10
+    assert sum(reply.response is not None for reply in replies) == 5
+    assert all(tracker.get(node.hotkey).consecutive_failures == 0 for node in nodes)
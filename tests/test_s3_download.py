@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+
+import pytest
+from aiohttp import web
+
+from core import utils as core_utils
+from core.utils import close_download_session
+from core.utils import download_s3_file
+
+
+class FakeS3:
+    """Serves one object with an ETag, honouring Range and If-Range like S3 does."""
+
+    def __init__(self, body: bytes, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests: list[dict] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(dict(request.headers))
+        headers = {"ETag": self.etag}
+        range_header = request.headers.get("Range")
+        if range_header and request.headers.get("If-Range", self.etag) == self.etag:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(self.body):
+                return web.Response(status=416, headers={**headers, "Content-Range": f"bytes */{len(self.body)}"})
+            headers["Content-Range"] = f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+            return web.Response(status=206, body=self.body[start:], headers=headers)
+        return web.Response(body=self.body, headers=headers)
+
+
+@pytest.fixture
+async def s3():
+    server = FakeS3(os.urandom(3000))
+    app = web.Application()
+    app.router.add_get("/bucket/{name}", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    server.url = "http://127.0.0.1:%d/bucket/data.json" % site._server.sockets[0].getsockname()[1]
+    yield server
+    await close_download_session()
+    await runner.cleanup()
+
+
+def _part_path(save_path: str, url: str) -> str:
+    return f"{save_path}.{core_utils._object_key(url)[:16]}.part"
+
+
+async def _download(s3: FakeS3, save_path: str) -> bytes:
+    path = await download_s3_file(s3.url, save_path, use_cache=False, expected_sha256=hashlib.sha256(s3.body).hexdigest())
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def test_interrupted_download_resumes_with_if_range(s3, tmp_path):
+    save_path = str(tmp_path / "data.json")
+    part_path = _part_path(save_path, s3.url)
+    with open(part_path, "wb") as f:
+        f.write(s3.body[:1000])
+    with open(f"{part_path}.etag", "w") as f:
+        f.write(s3.etag)
+
+    assert await _download(s3, save_path) == s3.body
+    assert s3.requests[-1]["Range"] == "bytes=1000-"
+    assert s3.requests[-1]["If-Range"] == s3.etag
+    assert not os.path.exists(part_path) and not os.path.exists(f"{part_path}.etag")
+
+
+async def test_part_file_of_an_older_version_is_replaced(s3, tmp_path):
+    save_path = str(tmp_path / "data.json")
+    part_path = _part_path(save_path, s3.url)
+    with open(part_path, "wb") as f:
+        f.write(os.urandom(1000))
+    with open(f"{part_path}.etag", "w") as f:
+        f.write('"v0"')
+
+    assert await _download(s3, save_path) == s3.body
+    assert len(s3.requests) == 1
+
+
+async def test_leftover_part_file_longer_than_the_object_is_discarded(s3, tmp_path):
+    save_path = str(tmp_path / "data.json")
+    part_path = _part_path(save_path, s3.url)
+    with open(part_path, "wb") as f:
+        f.write(s3.body + os.urandom(500))
+    with open(f"{part_path}.etag", "w") as f:
+        f.write(s3.etag)
+
+    assert await _download(s3, save_path) == s3.body
+    assert [request.get("Range") for request in s3.requests] == ["bytes=3500-", None]
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+import pytest
+
+import validator.db.constants as db_cst
+from validator.db import task_events
+from validator.db.task_events import TaskEventBus
+
+
+async def test_listener_outage_wakes_subscribers_once_and_backs_off(monkeypatch):
+    bus = TaskEventBus(psql_db=None)
+    subscription = bus.subscribe(db_cst.TASK_STATUS_CHANNEL)
+    wakes = []
+    monkeypatch.setattr(subscription, "wake", lambda: wakes.append(len(delays)))
+
+    # Three failed connects, one session that drops, then failures until the test stops the bus
+    outcomes = iter(["fail", "fail", "fail", "listen", "fail", "fail"])
+
+    async def listen_postgres():
+        if next(outcomes) == "fail":
+            raise OSError("connection refused")
+        bus._listening = True
+        bus._wake_all()
+
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 6:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(bus, "_listen_postgres", listen_postgres)
+    monkeypatch.setattr(task_events.asyncio, "sleep", sleep)
+    with pytest.raises(asyncio.CancelledError):
+        await bus._run()
+
+    interval = db_cst.TASK_EVENTS_RECONNECT_INTERVAL
+    assert delays == [interval, 2 * interval, 4 * interval, interval, interval, 2 * interval]
+    # Woken when the listener came up and once when it dropped, never by the failed reconnects
+    assert wakes == [3, 3]
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from core.models.utility_models import GPUInfo
+from core.models.utility_models import GPUType
+from core.models.utility_models import TrainerInfo
+from validator.tournament import trainer_fleet
+from validator.tournament.trainer_fleet import TrainerFleet
+
+
+def _gpu(gpu_id: int, available: bool) -> GPUInfo:
+    used_until = None if available else datetime.now(timezone.utc) + timedelta(hours=1)
+    return GPUInfo(gpu_id=gpu_id, gpu_type=GPUType.H100, vram_gb=80, available=available, used_until=used_until)
+
+
+class FakeTrainersTable:
+    """Stands in for the trainers_gpus table: whether each (trainer, gpu) is free."""
+
+    def __init__(self, trainers: dict[str, list[bool]]):
+        self.free = {ip: dict(enumerate(gpus)) for ip, gpus in trainers.items()}
+        self.updates = []
+
+    async def get_trainers(self, psql_db) -> list[TrainerInfo]:
+        return [
+            TrainerInfo(trainer_ip=ip, gpus=[_gpu(gpu_id, free) for gpu_id, free in gpus.items()])
+            for ip, gpus in self.free.items()
+        ]
+
+    async def update_gpu_availability(self, trainer_ip, gpu_ids, hours_to_complete, psql_db):
+        self.updates.append((trainer_ip, sorted(gpu_ids), hours_to_complete))
+        for gpu_id in gpu_ids:
+            self.free[trainer_ip][gpu_id] = hours_to_complete == 0
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(psql_db=None)
+
+
+def _use_table(monkeypatch, table: FakeTrainersTable):
+    monkeypatch.setattr(trainer_fleet.tournament_sql, "get_trainers", table.get_trainers)
+    monkeypatch.setattr(trainer_fleet.tournament_sql, "update_gpu_availability", table.update_gpu_availability)
+
+
+async def test_poll_is_concurrent_and_syncs_the_database(monkeypatch, config):
+    table = FakeTrainersTable({"a": [False, True], "b": [True, True], "c": [True], "d": [True]})
+    _use_table(monkeypatch, table)
+    monkeypatch.setattr(trainer_fleet.cst, "TRAINER_POLL_TIMEOUT", 0.5)
+    reported = {"a": [True, True], "b": [True, False]}
+
+    async def fetch(trainer_ip: str) -> list[GPUInfo]:
+        await asyncio.sleep(0.2)
+        if trainer_ip == "c":
+            await asyncio.sleep(10)
+        if trainer_ip == "d":
+            raise httpx.ConnectError("refused")
+        return [_gpu(gpu_id, free) for gpu_id, free in enumerate(reported[trainer_ip])]
+
+    fleet = TrainerFleet(fetch)
+    start = time.monotonic()
+    snapshot = await fleet.poll(config)
+
+    assert time.monotonic() - start < 1.0
+    assert sorted(table.updates) == [("a", [0], 0), ("b", [1], 2), ("c", [0], 2), ("d", [0], 2)]
+    assert {trainer.trainer_ip: [gpu.available for gpu in trainer.gpus] for trainer in snapshot.trainers} == {
+        "a": [True, True],
+        "b": [True, False],
+        "c": [False],
+        "d": [False],
+    }
+    assert {ip: poll.error for ip, poll in snapshot.polls.items()} == {
+        "a": None,
+        "b": None,
+        "c": "is unreachable (TimeoutError)",
+        "d": "is unreachable (ConnectError)",
+    }
+    metrics = fleet.metrics()
+    assert (metrics["trainers"], metrics["failed_trainers"], metrics["free_gpus"]) == (4, 2, 3)
+    assert 0.4 <= metrics["max_trainer_latency_seconds"] < 1.0
+
+
+async def test_snapshot_is_reused_until_stale_and_reservations_stick(monkeypatch, config):
+    table = FakeTrainersTable({"a": [True, True]})
+    _use_table(monkeypatch, table)
+    polls = []
+
+    async def fetch(trainer_ip: str) -> list[GPUInfo]:
+        polls.append(trainer_ip)
+        return [_gpu(0, True), _gpu(1, True)]
+
+    fleet = TrainerFleet(fetch)
+    assert fleet.metrics() == {}
+    await fleet.snapshot(config, max_age=60)
+    fleet.reserve("a", [1], hours=3)
+    snapshot = await fleet.snapshot(config, max_age=60)
+
+    assert polls == ["a"]
+    assert [gpu.available for gpu in snapshot.trainers[0].gpus] == [True, False]
+    assert snapshot.trainers[0].gpus[1].used_until > datetime.now(timezone.utc) + timedelta(hours=2)
+
+    await fleet.snapshot(config, max_age=0)
+    assert polls == ["a", "a"]
@@ -2,7 +2,8 @@ DEFAULT_IMAGE_DOCKERFILE_PATH = "dockerfiles/standalone-image-trainer.dockerfile
 DEFAULT_IMAGE_TOOLKIT_DOCKERFILE_PATH = "dockerfiles/standalone-image-toolkit-trainer.dockerfile"
 DEFAULT_TEXT_DOCKERFILE_PATH = "dockerfiles/standalone-text-trainer.dockerfile"
 TEMP_REPO_PATH = "/tmp/trainer/repos/"
-TASKS_FILE_PATH = "trainer/task_history.json"
+TASKS_FILE_PATH = "trainer/task_history.json"  # log-free snapshot for the cache cleaner, see tasks.save_task_history
+TASKS_DB_PATH = "trainer/task_history.db"
 VOLUME_NAMES = ["checkpoints", "cache"]
 HF_UPLOAD_DOCKER_IMAGE = "diagonalge/hf-uploader:latest"
 TRAINER_DOWNLOADER_DOCKER_IMAGE = "trainer-downloader:latest"
@@ -20,6 +21,18 @@ CACHE_CLEANUP_CUTOFF_HOURS = 72
 STALE_TASK_GRACE_MINUTES = 10
 CONTAINER_START_MAX_RETRIES = 3
 CONTAINER_START_RETRY_DELAY_SECONDS = 3
+ENV_CONTAINER_IP_TIMEOUT_SECONDS = 10
+
+# HF upload container
+HF_UPLOAD_MANIFEST_DIR = "/cache/hf_upload_manifests"  # one resumable manifest per target repo, on the cache volume
+HF_UPLOAD_WORKERS = 8  # files hashed and pre-uploaded in parallel
+HF_UPLOAD_PREUPLOAD_MIN_BYTES = 10 * 1024 * 1024  # smaller files go straight into the final commit
+HF_UPLOAD_PROGRESS_INTERVAL_SECONDS = 30
+HF_UPLOAD_PROGRESS_PREFIX = "[UPLOAD_PROGRESS]"  # lines the trainer forwards to the task log
+HF_UPLOAD_MAX_ATTEMPTS = 3  # upload container runs per task, each one resuming from the manifest
+HF_UPLOAD_RETRY_DELAY_SECONDS = 30  # multiplied by the attempt number
+HF_UPLOAD_MANIFEST_MAX_AGE_HOURS = 72  # manifests of uploads that never finished are deleted by the cache cleaner
+WANDB_SYNC_WORKERS = 4
 
 # TRAINING PATHS
 CACHE_ROOT_PATH = "/cache"
@@ -27,6 +40,8 @@ HUGGINGFACE_CACHE_PATH = "/cache/hf_cache"
 OUTPUT_CHECKPOINTS_PATH = "/app/checkpoints/"
 CACHE_MODELS_DIR = "/cache/models"
 CACHE_DATASETS_DIR = "/cache/datasets"
+MODEL_STORE_DIR = "/cache/model_store"  # content-addressed blobs hardlinked into CACHE_MODELS_DIR, same volume
+MODEL_STORE_DOWNLOAD_WORKERS = 8
 WANDB_LOGS_DIR = "/app/checkpoints/wandb_logs"
 IMAGE_CONTAINER_CONFIG_TEMPLATE_PATH = "/workspace/core/config"
 IMAGE_CONTAINER_CONFIG_SAVE_PATH = "/dataset/configs"
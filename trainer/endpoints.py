@@ -85,8 +85,8 @@ async def get_available_gpus() -> list[GPUInfo]:
     return gpu_info
 
 
-async def get_task_details(task_id: str, hotkey: str) -> TrainerTaskLog:
-    task = get_task(task_id, hotkey)
+async def get_task_details(task_id: str, hotkey: str, log_offset: int = 0, log_limit: int | None = None) -> TrainerTaskLog:
+    task = get_task(task_id, hotkey, log_offset=log_offset, log_limit=log_limit)
     if task is None:
         raise HTTPException(status_code=404, detail=f"Task with ID '{task_id}' and hotkey '{hotkey}' not found.")
     return task
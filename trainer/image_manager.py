@@ -31,6 +31,8 @@ from trainer.utils.misc import extract_container_error
 from validator.utils.logging import get_all_context_tags
 from validator.utils.logging import stream_container_logs
 from validator.utils.logging import stream_image_build_logs
+from validator.utils.readiness import container_ip_probe
+from validator.utils.readiness import wait_until_ready
 
 
 # logger = get_logger(__name__)
@@ -109,32 +111,16 @@ def delete_image_and_cleanup(tag: str):
 
 
 async def wait_for_env_container_ip(environment_server_container) -> str:
-    ip_address = None
-    for _ in range(10):
-        environment_server_container.reload()
-        settings = environment_server_container.attrs.get("NetworkSettings", {})
-
-        # First, try to get IP from the specific internal_bridge network
-        networks = settings.get("Networks", {})
-        if cst.INTERNAL_BRIDGE_NAME in networks:
-            ip_address = networks[cst.INTERNAL_BRIDGE_NAME].get("IPAddress")
-        
-        # Fallback: try the direct field (for default bridge network)
-        if not ip_address:
-            ip_address = settings.get("IPAddress")
-
-        # Fallback: check any other network (shouldn't happen, but safer)
-        if not ip_address:
-            for net_name in networks:
-                ip_address = networks[net_name].get("IPAddress")
-                if ip_address:
-                    break
-
-        if ip_address:
-            break
-        await asyncio.sleep(0.5)
-
-    if not ip_address:
+    try:
+        ip_address, _ = await wait_until_ready(
+            container_ip_probe(environment_server_container, preferred_network=cst.INTERNAL_BRIDGE_NAME),
+            name=f"environment server {environment_server_container.name}",
+            container=environment_server_container,
+            timeout=cst.ENV_CONTAINER_IP_TIMEOUT_SECONDS,
+            initial_delay=0.25,
+            max_delay=2.0,
+        )
+    except TimeoutError:
         raise RuntimeError("Environment server started but could not retrieve internal IP.")
 
     return ip_address
@@ -433,6 +419,68 @@ async def run_environment_server_container(environment_name: str, log_labels: di
         return None
 
 
+def _forward_upload_progress(container: Container, task_id: str, hotkey: str, loop: asyncio.AbstractEventLoop):
+    """Copies the upload container's progress lines into the task log as they are printed."""
+    buffer = ""
+    try:
+        for log_chunk in container.logs(stream=True, follow=True):
+            buffer += log_chunk.decode("utf-8", errors="replace")
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                if line.startswith(cst.HF_UPLOAD_PROGRESS_PREFIX):
+                    message = f"Upload progress: {line[len(cst.HF_UPLOAD_PROGRESS_PREFIX) :].strip()}"
+                    asyncio.run_coroutine_threadsafe(log_task(task_id, hotkey, message), loop)
+    except Exception as e:
+        logger.warning(f"Stopped forwarding upload progress for task {task_id}: {e}")
+
+
+async def _run_upload_container(
+    client: docker.DockerClient,
+    environment: dict,
+    volumes: dict,
+    task_id: str,
+    hotkey: str,
+    docker_labels: dict[str, str] | None,
+) -> tuple[int, str, str]:
+    """Runs one upload container to completion and returns (exit code, logs, container name)."""
+    container = None
+    try:
+        container_name = f"hf-upload-{uuid.uuid4().hex}"
+
+        logger.info(f"Starting upload container {container_name} for task {task_id}...", extra=docker_labels)
+
+        container = client.containers.run(
+            image=cst.HF_UPLOAD_DOCKER_IMAGE,
+            environment=environment,
+            volumes=volumes,
+            labels=docker_labels,
+            detach=True,
+            remove=False,
+            name=container_name,
+        )
+
+        asyncio.create_task(asyncio.to_thread(stream_container_logs, container, get_all_context_tags()))
+        progress_task = asyncio.create_task(
+            asyncio.to_thread(_forward_upload_progress, container, task_id, hotkey, asyncio.get_running_loop())
+        )
+
+        # Waited on in a thread so the forwarded progress reaches the task log while the upload runs
+        result = await asyncio.to_thread(container.wait)
+        await progress_task
+        logs = container.logs().decode("utf-8", errors="ignore")
+        return result.get("StatusCode", -1), logs, container_name
+
+    finally:
+        if container and isinstance(container, Container):
+            try:
+                container.reload()
+                if container.status == "running":
+                    container.kill()
+                container.remove(force=True)
+            except Exception as cleanup_err:
+                logger.warning(f"Failed to remove upload container {container.name}: {cleanup_err}")
+
+
 async def upload_repo_to_hf(
     task_id: str,
     hotkey: str,
@@ -444,7 +492,10 @@ async def upload_repo_to_hf(
     wandb_token: str | None = None,
     path_in_repo: str | None = None,
 ):
-    container = None
+    """
+    Uploads the task output through the upload container, rerunning a failed container up to HF_UPLOAD_MAX_ATTEMPTS
+    times. Each rerun picks up the upload manifest on the cache volume, so only unfinished files are uploaded again.
+    """
     try:
         client = docker.from_env()
         local_container_folder = train_paths.get_checkpoints_output_path(task_id, expected_repo_name)
@@ -466,52 +517,37 @@ async def upload_repo_to_hf(
             cst.VOLUME_NAMES[1]: {"bind": cst.CACHE_ROOT_PATH, "mode": "rw"},
         }
 
-        container_name = f"hf-upload-{uuid.uuid4().hex}"
-
-        logger.info(f"Starting upload container {container_name} for task {task_id}...", extra=docker_labels)
-
-        container = client.containers.run(
-            image=cst.HF_UPLOAD_DOCKER_IMAGE,
-            environment=environment,
-            volumes=volumes,
-            labels=docker_labels,
-            detach=True,
-            remove=False,
-            name=container_name,
-        )
+        max_attempts = cst.HF_UPLOAD_MAX_ATTEMPTS
+        for attempt in range(1, max_attempts + 1):
+            exit_code, logs, container_name = await _run_upload_container(
+                client, environment, volumes, task_id, hotkey, docker_labels
+            )
+            if wandb_token:
+                m = re.search(r"https://wandb\.ai/\S+", logs)
+                wandb_url = m.group(0) if m else None
+                if wandb_url:
+                    await update_wandb_url(task_id, hotkey, wandb_url)
 
-        log_streaming_task = asyncio.create_task(asyncio.to_thread(stream_container_logs, container, get_all_context_tags()))
+            if exit_code == 0:
+                return
 
-        result = container.wait()
-        logs = container.logs().decode("utf-8", errors="ignore")
-        exit_code = result.get("StatusCode", -1)
-        wandb_url = None
-        if wandb_token:
-            m = re.search(r"https://wandb\.ai/\S+", logs)
-            wandb_url = m.group(0) if m else None
-            if wandb_url:
-                await update_wandb_url(task_id, hotkey, wandb_url)
-
-        if exit_code != 0:
             last_err = extract_container_error(logs) or "unknown error"
-            msg = f"HF upload failed | exit_code={exit_code} | container={container_name} | last_error={last_err}"
-            await log_task(task_id, hotkey, f"[ERROR] {msg}")
-            raise RuntimeError(msg)
+            msg = (
+                f"HF upload failed | attempt={attempt}/{max_attempts} | exit_code={exit_code} | "
+                f"container={container_name} | last_error={last_err}"
+            )
+            if attempt == max_attempts:
+                await log_task(task_id, hotkey, f"[ERROR] {msg}")
+                raise RuntimeError(msg)
+
+            retry_delay = cst.HF_UPLOAD_RETRY_DELAY_SECONDS * attempt
+            await log_task(task_id, hotkey, f"[WARNING] {msg} | resuming in {retry_delay}s")
+            await asyncio.sleep(retry_delay)
 
     except Exception as e:
         logger.exception(f"Unexpected error during upload_repo_to_hf for task {task_id}: {e}", extra=docker_labels)
         raise
 
-    finally:
-        if container and isinstance(container, Container):
-            try:
-                container.reload()
-                if container.status == "running":
-                    container.kill()
-                container.remove(force=True)
-            except Exception as cleanup_err:
-                logger.warning(f"Failed to remove upload container {container.name}: {cleanup_err}")
-
 
 def get_task_type(request: TrainerProxyRequest) -> TaskType:
     training_data = request.training_data
@@ -1,4 +1,3 @@
-import asyncio
 import json
 from datetime import datetime
 from datetime import timedelta
@@ -10,122 +9,112 @@ from core.models.payload_models import TrainerProxyRequest
 from core.models.payload_models import TrainerTaskLog
 from core.models.utility_models import TaskStatus
 from trainer import constants as cst
+from trainer.utils.task_store import TaskStore
 from validator.utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
-task_history: list[TrainerTaskLog] = []
 TASK_HISTORY_FILE = Path(cst.TASKS_FILE_PATH)
-_task_lock = asyncio.Lock()
+_store: TaskStore | None = None
+
+
+def _get_store() -> TaskStore:
+    global _store
+    if _store is None:
+        _store = TaskStore(cst.TASKS_DB_PATH)
+        if _store.is_empty():
+            _import_legacy_task_history(_store)
+    return _store
+
+
+def _import_legacy_task_history(store: TaskStore):
+    """One-off migration of the old whole-file JSON history into the task store."""
+    if not TASK_HISTORY_FILE.exists():
+        return
+    try:
+        with open(TASK_HISTORY_FILE, "r") as f:
+            data = json.load(f)
+        store.import_tasks([TrainerTaskLog(**item) for item in data])
+        logger.info(f"Imported {len(data)} tasks from {TASK_HISTORY_FILE} into {cst.TASKS_DB_PATH}")
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.error(f"Failed to load task history from {TASK_HISTORY_FILE}: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error loading task history: {e}")
 
 
 async def start_task(task: TrainerProxyRequest) -> tuple[str, str]:
-    async with _task_lock:
-        load_task_history()
-        
-        task_id = task.training_data.task_id
-        hotkey = task.hotkey
-
-        existing_task = get_task(task_id, hotkey)
-        if existing_task:
-            existing_task.logs.clear()
-            existing_task.status = TaskStatus.TRAINING
-            existing_task.started_at = datetime.utcnow()
-            existing_task.finished_at = None
-            existing_task.gpu_ids = task.gpu_ids
-            await save_task_history()
-            return task_id, hotkey
-
-        log_entry = TrainerTaskLog(
-            **task.dict(),
-            status=TaskStatus.TRAINING,
-            started_at=datetime.utcnow(),
-            finished_at=None,
-        )
-        task_history.append(log_entry)
-        await save_task_history()
-        return log_entry.training_data.task_id, log_entry.hotkey
+    log_entry = _get_store().start(task, started_at=datetime.utcnow())
+    return log_entry.training_data.task_id, log_entry.hotkey
 
 
 async def complete_task(task_id: str, hotkey: str, success: bool = True):
-    async with _task_lock:
-        load_task_history()
-        
-        task = get_task(task_id, hotkey)
-        if task is None:
-            return
-        task.status = TaskStatus.SUCCESS if success else TaskStatus.FAILURE
-        task.finished_at = datetime.utcnow()
-        await save_task_history()
+    _get_store().update(
+        task_id, hotkey, status=TaskStatus.SUCCESS if success else TaskStatus.FAILURE, finished_at=datetime.utcnow()
+    )
+
+
+def get_task(task_id: str, hotkey: str, log_offset: int = 0, log_limit: int | None = None) -> TrainerTaskLog | None:
+    return _get_store().get(task_id, hotkey, log_offset=log_offset, log_limit=log_limit)
 
 
-def get_task(task_id: str, hotkey: str) -> TrainerTaskLog | None:
-    for task in task_history:
-        if task.training_data.task_id == task_id and task.hotkey == hotkey:
-            return task
-    return None
+def get_task_logs(task_id: str, hotkey: str, offset: int = 0, limit: int | None = None) -> list[str]:
+    return _get_store().get_logs(task_id, hotkey, offset, limit)
 
 
 async def log_task(task_id: str, hotkey: str, message: str):
-    async with _task_lock:
-        load_task_history()
-        
-        task = get_task(task_id, hotkey)
-        if task:
-            timestamped_message = f"[{datetime.utcnow().isoformat()}] {message}"
-            task.logs.append(timestamped_message)
-            await save_task_history()
+    timestamped_message = f"[{datetime.utcnow().isoformat()}] {message}"
+    _get_store().append_log(task_id, hotkey, timestamped_message)
 
 
 async def update_wandb_url(task_id: str, hotkey: str, wandb_url: str):
-    async with _task_lock:
-        load_task_history()
-        
-        task = get_task(task_id, hotkey)
-        if task:
-            task.wandb_url = wandb_url
-            await save_task_history()
-            logger.info(f"Updated wandb_url for task {task_id}: {wandb_url}")
-        else:
-            logger.warning(f"Task not found for task_id={task_id} and hotkey={hotkey}")
+    if _get_store().update(task_id, hotkey, wandb_url=wandb_url):
+        logger.info(f"Updated wandb_url for task {task_id}: {wandb_url}")
+    else:
+        logger.warning(f"Task not found for task_id={task_id} and hotkey={hotkey}")
 
 
 def get_running_tasks() -> list[TrainerTaskLog]:
-    load_task_history()
-    return [t for t in task_history if t.status == TaskStatus.TRAINING]
+    return _get_store().running()
 
 
 def get_recent_tasks(hours: float = 1.0) -> list[TrainerTaskLog]:
-    load_task_history()
     cutoff = datetime.utcnow() - timedelta(hours=hours)
+    recent_tasks = _get_store().recent(cutoff)
+    recent_tasks.sort(key=lambda t: max(t.finished_at or datetime.min, t.started_at or datetime.min), reverse=True)
+    return recent_tasks
 
-    recent_tasks = [
-        task
-        for task in task_history
-        if (task.started_at and task.started_at >= cutoff) or (task.finished_at and task.finished_at >= cutoff)
-    ]
 
-    recent_tasks.sort(key=lambda t: max(t.finished_at or datetime.min, t.started_at or datetime.min), reverse=True)
+async def fail_stale_tasks() -> int:
+    """Mark running tasks that are past their deadline plus grace period as failed."""
+    now = datetime.utcnow()
+    failed = 0
+    for task in get_running_tasks():
+        if not task.started_at:
+            continue
+
+        timeout = timedelta(hours=task.training_data.hours_to_complete) + timedelta(minutes=cst.STALE_TASK_GRACE_MINUTES)
+        if now > task.started_at + timeout:
+            await complete_task(task.training_data.task_id, task.hotkey, success=False)
+            await log_task(task.training_data.task_id, task.hotkey, "Task marked as FAILED due to timeout.")
+            failed += 1
+    return failed
 
-    return recent_tasks
 
+async def save_task_history() -> int:
+    """
+    Export a log-free summary of every task to TASKS_FILE_PATH, the format the cache-cleaner container reads.
+    The task store is the source of truth; this file is only a snapshot for cleanup.
 
-async def save_task_history():
+    Returns:
+        Number of tasks exported
+    """
+    tasks = _get_store().all()
     async with aiofiles.open(TASK_HISTORY_FILE, "w") as f:
-        data = json.dumps([t.model_dump() for t in task_history], indent=2, default=str)
-        await f.write(data)
+        await f.write(json.dumps([t.model_dump(exclude={"logs"}) for t in tasks], default=str))
+    return len(tasks)
 
 
 def load_task_history():
-    global task_history
-    if TASK_HISTORY_FILE.exists():
-        try:
-            with open(TASK_HISTORY_FILE, "r") as f:
-                data = json.load(f)
-                task_history.clear()
-                task_history.extend(TrainerTaskLog(**item) for item in data)
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to load task history from {TASK_HISTORY_FILE}: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error loading task history: {e}")
+    """Open the task store, importing the legacy JSON history on first use."""
+    _get_store()
@@ -1,17 +1,16 @@
 import asyncio
 import threading
 from datetime import datetime
-from datetime import timedelta
 from datetime import timezone
 from pathlib import Path
 
 import docker
 from dateutil.parser import isoparse
 
-from core.models.utility_models import TaskStatus
 from trainer import constants as cst
+from trainer.tasks import fail_stale_tasks
+from trainer.tasks import get_running_tasks
 from trainer.tasks import save_task_history
-from trainer.tasks import task_history
 from validator.utils.logging import get_all_context_tags
 from validator.utils.logging import get_logger
 from validator.utils.logging import stream_container_logs
@@ -30,21 +29,16 @@ def start_cleanup_loop_in_thread():
 
 async def periodically_cleanup_tasks_and_cache(poll_interval_seconds: int = 600):
     while True:
-        if len(task_history) > 0:
-            now = datetime.utcnow()
-            for task in task_history:
-                if task.status != TaskStatus.TRAINING or not task.started_at:
-                    continue
-
-                timeout = timedelta(hours=task.training_data.hours_to_complete) + timedelta(minutes=cst.STALE_TASK_GRACE_MINUTES)
-                deadline = task.started_at + timeout
-
-                if now > deadline:
-                    task.status = TaskStatus.FAILURE
-                    task.finished_at = now
-                    task.logs.append(f"[{now.isoformat()}] Task marked as FAILED due to timeout.")
-                    await save_task_history()
+        has_tasks = False
+        try:
+            stale_count = await fail_stale_tasks()
+            if stale_count:
+                logger.info(f"Marked {stale_count} stale tasks as failed, {len(get_running_tasks())} still running")
+            has_tasks = await save_task_history() > 0
+        except Exception as e:
+            logger.error(f"Error while updating task history: {e}")
 
+        if has_tasks:
             client = docker.from_env()
             abs_task_path = Path(cst.TASKS_FILE_PATH).resolve()
 
@@ -1,5 +1,7 @@
 import json
+import os
 import shutil
+import time
 from datetime import datetime
 from datetime import timedelta
 from pathlib import Path
@@ -11,6 +13,8 @@ TASK_HISTORY_FILE = Path(cst.TASKS_FILE_PATH)
 CHECKPOINTS_DIR = Path(cst.OUTPUT_CHECKPOINTS_PATH)
 CACHE_MODELS_DIR = Path(cst.CACHE_MODELS_DIR)
 CACHE_DATASETS_DIR = Path(cst.CACHE_DATASETS_DIR)
+MODEL_STORE_DIR = Path(cst.MODEL_STORE_DIR)
+HF_UPLOAD_MANIFEST_DIR = Path(cst.HF_UPLOAD_MANIFEST_DIR)
 CUTOFF_HOURS = cst.CACHE_CLEANUP_CUTOFF_HOURS
 
 
@@ -107,12 +111,57 @@ def clean_models(task_history: list[dict]):
                 shutil.rmtree(model_dir, ignore_errors=True)
 
 
+def clean_model_store():
+    """
+    Deletes model store blobs no model folder links to any more (link count 1) once they have been unlinked for
+    CUTOFF_HOURS, and the records of model folders that are gone.
+    """
+    blobs_dir = MODEL_STORE_DIR / "blobs"
+    records_dir = MODEL_STORE_DIR / "materialized"
+    if not blobs_dir.exists():
+        return
+
+    freed = 0
+    cutoff = time.time() - CUTOFF_HOURS * 3600
+    for blob in blobs_dir.iterdir():
+        stat = blob.stat()
+        # ctime moves whenever a hardlink to the blob is added or removed
+        if stat.st_nlink == 1 and stat.st_ctime < cutoff:
+            blob.unlink()
+            freed += stat.st_size
+    print(f"Freed {freed / 1024**3:.2f} GB of unreferenced model store blobs")
+
+    for record_file in records_dir.glob("*.json"):
+        try:
+            dest = json.loads(record_file.read_text())["dest"]
+        except (OSError, ValueError, KeyError):
+            dest = None
+        if dest is None or not os.path.isdir(dest):
+            record_file.unlink()
+
+
+def clean_upload_manifests():
+    """
+    Deletes the manifests of uploads that failed for good. A running upload rewrites its manifest after every file,
+    so only manifests untouched for HF_UPLOAD_MANIFEST_MAX_AGE_HOURS go.
+    """
+    if not HF_UPLOAD_MANIFEST_DIR.exists():
+        return
+    cutoff = time.time() - cst.HF_UPLOAD_MANIFEST_MAX_AGE_HOURS * 3600
+    for manifest_file in HF_UPLOAD_MANIFEST_DIR.iterdir():
+        if manifest_file.is_file() and manifest_file.stat().st_mtime < cutoff:
+            print(f"Deleting stale upload manifest: {manifest_file}")
+            manifest_file.unlink()
+
+
 def main():
     print(f"[{datetime.utcnow()}] Starting cleanup...")
     task_history = load_task_history()
     clean_checkpoints(task_history)
     clean_datasets(task_history)
     clean_models(task_history)
+    clean_model_store()
+    clean_upload_manifests()
     print(f"[{datetime.utcnow()}] Cleanup complete.")
 
 
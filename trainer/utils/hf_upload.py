@@ -4,10 +4,21 @@ import os
 import re
 import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from dataclasses import dataclass
 
 import wandb
+from huggingface_hub import CommitOperationAdd
 from huggingface_hub import HfApi
 from huggingface_hub import login
+from huggingface_hub.lfs import UploadInfo
+from huggingface_hub.utils import DEFAULT_IGNORE_PATTERNS
+from huggingface_hub.utils import filter_repo_objects
+
+from trainer import constants as cst
 
 
 def patch_model_metadata(output_dir: str, base_model_id: str):
@@ -74,6 +85,32 @@ def is_folder_empty_or_metadata_only(folder_path: str) -> bool:
     return True
 
 
+def _sync_wandb_run(run_dir: str):
+    run_id = os.path.basename(run_dir).split("-")[-1]
+    print(f"Syncing run: {run_dir}", flush=True)
+
+    try:
+        proc = subprocess.run(
+            ["wandb", "sync", "--include-offline", run_dir],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        output = proc.stdout + proc.stderr
+        match = re.search(r"https://wandb\.ai/\S+", output)
+        run_url = match.group(0) if match else None
+
+        if run_url:
+            print(f"Synced W&B Run: {run_url}", flush=True)
+
+        print(f"Synced Run: {run_id}", flush=True)
+        shutil.rmtree(run_dir)
+        print(f"Deleted synced folder: {run_dir}", flush=True)
+
+    except Exception as e:
+        print(f"Failed to sync {run_dir}: {e}", flush=True)
+
+
 def sync_wandb_logs(cache_dir: str):
     sync_root = os.path.join(cache_dir, "wandb")
     run_dirs = glob.glob(os.path.join(sync_root, "offline-run-*"))
@@ -82,30 +119,196 @@ def sync_wandb_logs(cache_dir: str):
         print("No offline runs found.")
         return
 
-    for run_dir in run_dirs:
-        run_id = os.path.basename(run_dir).split("-")[-1]
-        print(f"Syncing run: {run_dir}")
-
-        try:
-            proc = subprocess.run(
-                ["wandb", "sync", "--include-offline", run_dir],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            output = proc.stdout + proc.stderr
-            match = re.search(r"https://wandb\.ai/\S+", output)
-            run_url = match.group(0) if match else None
+    # Each sync is a separate wandb process that mostly waits on the network
+    with ThreadPoolExecutor(max_workers=cst.WANDB_SYNC_WORKERS) as pool:
+        list(pool.map(_sync_wandb_run, run_dirs))
 
-            if run_url:
-                print(f"Synced W&B Run: {run_url}")
 
-            print(f"Synced Run: {run_id}")
-            shutil.rmtree(run_dir)
-            print(f"Deleted synced folder: {run_dir}")
+def _login_and_sync_wandb(wandb_token: str, wandb_logs_path: str):
+    try:
+        wandb.login(key=wandb_token)
+        sync_wandb_logs(cache_dir=wandb_logs_path)
+    except Exception as e:
+        print(f"Failed to sync W&B logs: {e}", flush=True)
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    sha256: str
+    sample: str  # hex of the first 512 bytes, all that is needed besides the hash to rebuild the upload info
+    preuploaded: bool = False
+
+
+class UploadManifest:
+    """
+    Per-repo record of the files already hashed and pre-uploaded, rewritten after every file so a restarted upload
+    skips the work a failed one finished. Entries are only trusted while the file's size and mtime still match.
+    """
+
+    def __init__(self, path: str, repo_id: str):
+        self.path = path
+        self.repo_id = repo_id
+        self.entries: dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if data.get("repo_id") == repo_id:
+                    self.entries = {path_in_repo: ManifestEntry(**entry) for path_in_repo, entry in data["files"].items()}
+                    print(f"Resuming upload from {path} ({len(self.entries)} files recorded)", flush=True)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                print(f"Ignoring unreadable upload manifest {path}: {e}", flush=True)
+
+    def lookup(self, path_in_repo: str, stat: os.stat_result) -> ManifestEntry | None:
+        entry = self.entries.get(path_in_repo)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return entry
+        return None
 
-        except Exception as e:
-            print(f"Failed to sync {run_dir}: {e}")
+    def record(self, path_in_repo: str, entry: ManifestEntry):
+        with self._lock:
+            self.entries[path_in_repo] = entry
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"repo_id": self.repo_id, "files": {k: asdict(v) for k, v in self.entries.items()}}, f)
+            os.replace(tmp_path, self.path)
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class UploadProgress:
+    """Prints throughput lines the trainer forwards to the task log, at most every interval plus a final one."""
+
+    def __init__(self, total_files: int, total_bytes: int, interval: float = cst.HF_UPLOAD_PROGRESS_INTERVAL_SECONDS):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.files_done = 0
+        self.bytes_uploaded = 0
+        self.bytes_resumed = 0
+        self.started_at = time.monotonic()
+        self._last_report = self.started_at
+        self._lock = threading.Lock()
+
+    def add(self, size: int, resumed: bool = False):
+        with self._lock:
+            self.files_done += 1
+            if resumed:
+                self.bytes_resumed += size
+            else:
+                self.bytes_uploaded += size
+            if time.monotonic() - self._last_report >= self.interval:
+                self.report()
+
+    def report(self, stage: str = "uploading"):
+        self._last_report = time.monotonic()
+        elapsed = max(self._last_report - self.started_at, 1e-6)
+        done_gb = (self.bytes_uploaded + self.bytes_resumed) / 1024**3
+        print(
+            f"{cst.HF_UPLOAD_PROGRESS_PREFIX} {stage}: {self.files_done}/{self.total_files} files, "
+            f"{done_gb:.2f}/{self.total_bytes / 1024**3:.2f} GB ({self.bytes_resumed / 1024**3:.2f} GB resumed), "
+            f"{self.bytes_uploaded / 1024**2 / elapsed:.1f} MB/s over {elapsed:.0f}s",
+            flush=True,
+        )
+
+
+def _list_upload_files(folder: str, path_in_repo: str | None) -> list[tuple[str, str]]:
+    """(local path, path in repo) of every file upload_folder would upload."""
+    relpaths = sorted(
+        os.path.relpath(os.path.join(root, name), folder).replace(os.sep, "/")
+        for root, _, names in os.walk(folder)
+        for name in names
+    )
+    prefix = f"{path_in_repo.strip('/')}/" if path_in_repo else ""
+    return [
+        (os.path.join(folder, relpath), prefix + relpath)
+        for relpath in filter_repo_objects(relpaths, ignore_patterns=DEFAULT_IGNORE_PATTERNS)
+    ]
+
+
+def _commit_operation(local_path: str, path_in_repo: str, manifest: UploadManifest) -> tuple[CommitOperationAdd, ManifestEntry]:
+    stat = os.stat(local_path)
+    entry = manifest.lookup(path_in_repo, stat)
+    if entry is None:
+        operation = CommitOperationAdd(path_in_repo=path_in_repo, path_or_fileobj=local_path)  # hashes the file
+        entry = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=operation.upload_info.sha256.hex(),
+            sample=operation.upload_info.sample.hex(),
+        )
+        manifest.record(path_in_repo, entry)
+        return operation, entry
+
+    # Rebuilt from the manifest so a multi-GB shard is not hashed again
+    operation = CommitOperationAdd(path_in_repo=path_in_repo, path_or_fileobj=b"")
+    operation.path_or_fileobj = local_path
+    operation.upload_info = UploadInfo(
+        sha256=bytes.fromhex(entry.sha256), size=entry.size, sample=bytes.fromhex(entry.sample)
+    )
+    return operation, entry
+
+
+def upload_folder_resumable(
+    api: HfApi,
+    repo_id: str,
+    folder_path: str,
+    commit_message: str,
+    manifest_path: str,
+    path_in_repo: str | None = None,
+    token: str | None = None,
+):
+    """
+    Same result as api.upload_folder, but large files are hashed and pre-uploaded in parallel, largest first, with
+    each finished file recorded in the manifest at `manifest_path`. After a failure the next run only hashes and
+    uploads what is missing. Everything lands in a single commit at the end, after which the manifest is removed.
+    """
+    files = [
+        (local_path, repo_path, os.path.getsize(local_path))
+        for local_path, repo_path in _list_upload_files(folder_path, path_in_repo)
+    ]
+    large = sorted(
+        (file for file in files if file[2] >= cst.HF_UPLOAD_PREUPLOAD_MIN_BYTES), key=lambda file: file[2], reverse=True
+    )
+    manifest = UploadManifest(manifest_path, repo_id)
+    progress = UploadProgress(len(files), sum(size for _, _, size in files))
+
+    def _preupload(local_path: str, repo_path: str, size: int):
+        operation, entry = _commit_operation(local_path, repo_path, manifest)
+        if entry.preuploaded:
+            progress.add(size, resumed=True)
+            return
+        api.preupload_lfs_files(repo_id=repo_id, additions=[operation], token=token, num_threads=1)
+        entry.preuploaded = True
+        manifest.record(repo_path, entry)
+        progress.add(size)
+
+    print(f"Pre-uploading {len(large)} large files with {cst.HF_UPLOAD_WORKERS} workers", flush=True)
+    with ThreadPoolExecutor(max_workers=cst.HF_UPLOAD_WORKERS) as pool:
+        futures = [pool.submit(_preupload, *file) for file in large]
+        # The pool finishes (and records) the other files before the first error propagates
+        for future in futures:
+            future.result()
+
+    operations = []
+    for local_path, repo_path, size in files:
+        if size >= cst.HF_UPLOAD_PREUPLOAD_MIN_BYTES:
+            operations.append(_commit_operation(local_path, repo_path, manifest)[0])
+        else:
+            operations.append(CommitOperationAdd(path_in_repo=repo_path, path_or_fileobj=local_path))
+    # Pre-uploaded objects are already on the Hub, so this only sends the small files and the commit itself
+    api.create_commit(repo_id=repo_id, operations=operations, commit_message=commit_message, token=token)
+    for _, _, size in files:
+        if size < cst.HF_UPLOAD_PREUPLOAD_MIN_BYTES:
+            progress.add(size)
+    progress.report(stage="committed")
+    manifest.delete()
 
 
 def detect_subfolder(base_folder: str) -> str | None:
@@ -167,27 +370,33 @@ def main():
     api = HfApi()
     api.create_repo(repo_id=repo_id, token=hf_token, exist_ok=True, private=False)
 
+    # W&B runs sync in the background while the checkpoint uploads
+    wandb_sync = None
+    if wandb_token:
+        wandb_sync = threading.Thread(target=_login_and_sync_wandb, args=(wandb_token, wandb_logs_path))
+        wandb_sync.start()
+
     print(f"Uploading contents of {local_folder} to {repo_id}", flush=True)
     if repo_subfolder:
         print(f"Uploading into subfolder: {repo_subfolder}", flush=True)
 
-    api.upload_folder(
-        repo_id=repo_id,
-        folder_path=local_folder,
-        path_in_repo=repo_subfolder if repo_subfolder else None,
-        commit_message=f"Upload task output {task_id}",
-        token=hf_token,
-    )
+    try:
+        upload_folder_resumable(
+            api,
+            repo_id=repo_id,
+            folder_path=local_folder,
+            commit_message=f"Upload task output {task_id}",
+            # One task can upload for several hotkeys at once, each to its own repo
+            manifest_path=os.path.join(cst.HF_UPLOAD_MANIFEST_DIR, f"{repo_id.replace('/', '--')}.json"),
+            path_in_repo=repo_subfolder if repo_subfolder else None,
+            token=hf_token,
+        )
+    finally:
+        if wandb_sync is not None:
+            wandb_sync.join()
 
     print(f"Uploaded successfully to https://huggingface.co/{repo_id}", flush=True)
 
-    if wandb_token:
-        try:
-            wandb.login(key=wandb_token)
-            sync_wandb_logs(cache_dir=wandb_logs_path)
-        except Exception as e:
-            print(f"Failed to sync W&B logs: {e}", flush=True)
-
     try:
         if os.path.isdir(local_folder):
             shutil.rmtree(local_folder)
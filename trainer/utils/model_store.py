@@ -0,0 +1,312 @@
+"""
+Content-addressed store for base models on the cache volume.
+
+Every file is kept once under MODEL_STORE_DIR/blobs, named after its LFS sha256 or, for small non-LFS files, its git
+blob id, so files shared between repos and revisions are downloaded and stored once. A model is resolved to a commit
+first and only the blobs it is missing are fetched, concurrently, each verified against the hash the Hub reports before
+it enters the store. The task directory the trainers read (CACHE_MODELS_DIR/<repo>) is then built from hardlinks in a
+temporary directory and renamed into place, so a half-finished download is never mistaken for a model.
+
+    python trainer/utils/model_store.py
+prints the cumulative cache hit rate and bytes saved.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Callable
+
+from huggingface_hub import HfApi
+from huggingface_hub import hf_hub_download
+
+from trainer import constants as cst
+
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass
+class RemoteFile:
+    path: str
+    size: int
+    key: str  # "sha256-<hex>" for LFS files, "git-<sha1>" otherwise
+
+
+@dataclass
+class StoreStats:
+    models_requested: int = 0
+    models_hit: int = 0  # task directory was already complete at the pinned revision
+    files_hit: int = 0
+    files_fetched: int = 0
+    bytes_reused: int = 0
+    bytes_downloaded: int = 0
+
+    def add(self, other: "StoreStats"):
+        for field, value in asdict(other).items():
+            setattr(self, field, getattr(self, field) + value)
+
+    def summary(self) -> str:
+        files = self.files_hit + self.files_fetched
+        total_bytes = self.bytes_reused + self.bytes_downloaded
+        hit_rate = self.bytes_reused / total_bytes if total_bytes else 0.0
+        return (
+            f"{self.models_hit}/{self.models_requested} models already in place, {self.files_hit}/{files} files "
+            f"from the store, byte hit rate {hit_rate:.0%}, {self.bytes_reused / 1024**3:.2f} GB reused, "
+            f"{self.bytes_downloaded / 1024**3:.2f} GB downloaded"
+        )
+
+
+class ChecksumMismatchError(RuntimeError):
+    pass
+
+
+def _content_key(path: str, size: int, lfs: bool) -> str:
+    # Files outside LFS are only known to the Hub by their git blob id
+    digest = hashlib.sha256() if lfs else hashlib.sha1(f"blob {size}\0".encode())
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return f"{'sha256' if lfs else 'git'}-{digest.hexdigest()}"
+
+
+def _verify(path: str, remote: RemoteFile):
+    size = os.path.getsize(path)
+    if size != remote.size:
+        raise ChecksumMismatchError(f"{remote.path}: expected {remote.size} bytes, got {size}")
+    key = _content_key(path, size, lfs=remote.key.startswith("sha256-"))
+    if key != remote.key:
+        raise ChecksumMismatchError(f"{remote.path}: expected {remote.key}, got {key}")
+
+
+class ModelStore:
+    def __init__(
+        self,
+        root: str = cst.MODEL_STORE_DIR,
+        api: HfApi | None = None,
+        download: Callable[..., str] = hf_hub_download,
+        workers: int = cst.MODEL_STORE_DOWNLOAD_WORKERS,
+    ):
+        self.root = root
+        self.api = api or HfApi()
+        self.download = download
+        self.workers = workers
+        self.stats = StoreStats()
+        self._stats_lock = threading.Lock()
+        for directory in ("blobs", "snapshots", "materialized", "locks", "tmp"):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    def blob_path(self, key: str) -> str:
+        return os.path.join(self.root, "blobs", key)
+
+    @contextmanager
+    def _lock(self, name: str):
+        """Cross-process lock, downloader containers for the same model may run side by side."""
+        with open(os.path.join(self.root, "locks", f"{name}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _record_path(self, dest: str) -> str:
+        return os.path.join(self.root, "materialized", f"{os.path.abspath(dest).strip('/').replace('/', '--')}.json")
+
+    def resolve(self, repo_id: str, revision: str | None = None) -> tuple[str, list[RemoteFile]]:
+        """Pins `revision` (default: main) to a commit and lists its files with their content keys."""
+        info = self.api.model_info(repo_id, revision=revision, files_metadata=True)
+        files = []
+        for sibling in info.siblings:
+            if sibling.lfs is not None:
+                files.append(RemoteFile(sibling.rfilename, sibling.lfs.size, f"sha256-{sibling.lfs.sha256}"))
+            else:
+                files.append(RemoteFile(sibling.rfilename, sibling.size, f"git-{sibling.blob_id}"))
+        snapshot_path = os.path.join(self.root, "snapshots", repo_id.replace("/", "--"), f"{info.sha}.json")
+        if not os.path.exists(snapshot_path):
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            _write_json(snapshot_path, {"repo_id": repo_id, "revision": info.sha, "files": [asdict(f) for f in files]})
+        return info.sha, files
+
+    def _count(self, **increments: int):
+        with self._stats_lock:
+            for field, value in increments.items():
+                setattr(self.stats, field, getattr(self.stats, field) + value)
+
+    def _fetch(self, repo_id: str, revision: str, remote: RemoteFile):
+        blob = self.blob_path(remote.key)
+        if os.path.exists(blob):
+            self._count(files_hit=1, bytes_reused=remote.size)
+            return
+        tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.root, "tmp"))
+        try:
+            local_path = self.download(repo_id=repo_id, filename=remote.path, revision=revision, local_dir=tmp_dir)
+            _verify(local_path, remote)
+            os.chmod(local_path, 0o444)  # shared by every task directory through hardlinks
+            try:
+                os.link(local_path, blob)
+            except FileExistsError:
+                pass  # another downloader finished the same blob first
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._count(files_fetched=1, bytes_downloaded=remote.size)
+
+    def _adopt(self, path: str, remote: RemoteFile) -> bool:
+        """Moves a verified file of an existing task directory into the store instead of downloading it again."""
+        if os.path.exists(self.blob_path(remote.key)) or not os.path.isfile(path) or os.path.getsize(path) != remote.size:
+            return False
+        try:
+            _verify(path, remote)
+        except ChecksumMismatchError as e:
+            print(f"Discarding {path}: {e}", flush=True)
+            return False
+        os.chmod(path, 0o444)
+        try:
+            os.link(path, self.blob_path(remote.key))
+        except FileExistsError:
+            pass
+        return True
+
+    def _is_materialized(self, dest: str, revision: str, wanted: dict[str, RemoteFile]) -> bool:
+        try:
+            with open(self._record_path(dest), "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if record.get("revision") != revision or record.get("files") != {name: f.key for name, f in wanted.items()}:
+            return False
+        for name, remote in wanted.items():
+            try:
+                # Still the store's inode, so neither truncated nor replaced since it was linked
+                if os.stat(os.path.join(dest, name)).st_ino != os.stat(self.blob_path(remote.key)).st_ino:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def ensure(self, repo_id: str, dest: str, revision: str | None = None, files: dict[str, str] | None = None) -> str:
+        """
+        Makes `dest` hold `repo_id` at `revision`, either the whole repo or only `files` (repo path -> path in
+        dest), and returns `dest`. Reuses what the store already has and downloads the rest.
+        """
+        self._count(models_requested=1)
+        name = os.path.basename(os.path.abspath(dest))
+        with self._lock(name):
+            try:
+                commit, remote_files = self.resolve(repo_id, revision)
+            except Exception as e:
+                if os.path.exists(self._record_path(dest)) and os.path.isdir(dest):
+                    print(f"Could not resolve {repo_id} ({e}), using the copy already at {dest}", flush=True)
+                    self._count(models_hit=1)
+                    return dest
+                raise
+
+            by_path = {remote.path: remote for remote in remote_files}
+            if files is None:
+                wanted = by_path
+            else:
+                missing = set(files) - set(by_path)
+                if missing:
+                    raise FileNotFoundError(f"{repo_id}@{commit} has no {sorted(missing)}")
+                wanted = {dest_name: by_path[repo_path] for repo_path, dest_name in files.items()}
+
+            if self._is_materialized(dest, commit, wanted):
+                print(f"Model {repo_id}@{commit[:8]} already at {dest}", flush=True)
+                self._count(models_hit=1, files_hit=len(wanted), bytes_reused=sum(f.size for f in wanted.values()))
+                return dest
+
+            if os.path.isdir(dest):
+                adopted = [name for name, remote in wanted.items() if self._adopt(os.path.join(dest, name), remote)]
+                if adopted:
+                    print(f"Kept {len(adopted)} verified files already in {dest}", flush=True)
+
+            unique = {remote.key: remote for remote in wanted.values()}.values()
+            print(f"Fetching {repo_id}@{commit[:8]}: {len(unique)} files with {self.workers} workers", flush=True)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # Every file is fetched (and kept in the store) before the first failure propagates
+                for future in [pool.submit(self._fetch, repo_id, commit, remote) for remote in unique]:
+                    future.result()
+
+            self._materialize(dest, wanted)
+            _write_json(
+                self._record_path(dest),
+                {"dest": dest, "repo_id": repo_id, "revision": commit, "files": {n: f.key for n, f in wanted.items()}},
+            )
+        return dest
+
+    def _materialize(self, dest: str, wanted: dict[str, RemoteFile]):
+        parent = os.path.dirname(os.path.abspath(dest))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(dest)}.")
+        try:
+            for name, remote in wanted.items():
+                target = os.path.join(staging, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.link(self.blob_path(remote.key), target)
+            if os.path.exists(dest):
+                retired = f"{staging}.old"
+                os.rename(dest, retired)
+                os.rename(staging, dest)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.rename(staging, dest)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def save_stats(self):
+        """Adds this run's counters to the store's cumulative stats."""
+        with self._lock("stats"):
+            totals = load_stats(self.root)
+            totals.add(self.stats)
+            _write_json(os.path.join(self.root, "stats.json"), asdict(totals))
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def load_stats(root: str = cst.MODEL_STORE_DIR) -> StoreStats:
+    try:
+        with open(os.path.join(root, "stats.json"), "r") as f:
+            return StoreStats(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return StoreStats()
+
+
+def disk_usage(root: str = cst.MODEL_STORE_DIR) -> tuple[int, int]:
+    """(bytes the blobs take on disk, bytes the task directories linking them would take as separate copies)."""
+    stored = linked = 0
+    blobs_dir = os.path.join(root, "blobs")
+    for entry in os.scandir(blobs_dir) if os.path.isdir(blobs_dir) else []:
+        stat = entry.stat()
+        stored += stat.st_size
+        linked += stat.st_size * (stat.st_nlink - 1)
+    return stored, linked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model store report")
+    parser.add_argument("--root", default=cst.MODEL_STORE_DIR)
+    args = parser.parse_args()
+
+    stored, linked = disk_usage(args.root)
+    print(f"Model store at {args.root}: {load_stats(args.root).summary()}")
+    print(
+        f"Blobs take {stored / 1024**3:.2f} GB for {linked / 1024**3:.2f} GB of task directories, "
+        f"{max(linked - stored, 0) / 1024**3:.2f} GB saved by hardlinking"
+    )
+
+
+if __name__ == "__main__":
+    main()
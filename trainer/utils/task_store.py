@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from core.models.payload_models import TrainerProxyRequest
+from core.models.payload_models import TrainerTaskLog
+from core.models.utility_models import TaskStatus
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+TaskKey = tuple[str, str]  # (task_id, hotkey)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT NOT NULL,
+        hotkey TEXT NOT NULL,
+        request TEXT NOT NULL,
+        status TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        wandb_url TEXT,
+        PRIMARY KEY (task_id, hotkey)
+    );
+    CREATE INDEX IF NOT EXISTS tasks_started_at_idx ON tasks (started_at);
+    CREATE INDEX IF NOT EXISTS tasks_finished_at_idx ON tasks (finished_at);
+    CREATE TABLE IF NOT EXISTS task_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id TEXT NOT NULL,
+        hotkey TEXT NOT NULL,
+        message TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS task_logs_task_idx ON task_logs (task_id, hotkey, id);
+"""
+
+_TASK_COLUMNS = "task_id, hotkey, request, status, started_at, finished_at, wandb_url"
+_REQUEST_EXCLUDE = {"status", "started_at", "finished_at", "wandb_url", "logs"}
+
+
+def _to_db_time(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _from_db_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+class TaskStore:
+    """
+    SQLite-backed trainer task journal keyed by (task_id, hotkey).
+
+    Log lines live in their own table so appending one is a single insert rather than a rewrite of the
+    whole history, and can be read back in pages. Running tasks are also kept in memory so GPU
+    availability checks never touch the database. Safe to share between the API event loop and the
+    cleanup thread.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._running: dict[TaskKey, TrainerTaskLog] = {}
+        self._load_running_index()
+
+    def _load_running_index(self) -> None:
+        rows = self._connection.execute(
+            f"SELECT {_TASK_COLUMNS} FROM tasks WHERE status = ?", (TaskStatus.TRAINING.value,)
+        ).fetchall()
+        self._running = {(row["task_id"], row["hotkey"]): self._row_to_task(row, logs=[]) for row in rows}
+
+    def _row_to_task(self, row: sqlite3.Row, logs: list[str]) -> TrainerTaskLog:
+        return TrainerTaskLog(
+            **json.loads(row["request"]),
+            status=TaskStatus(row["status"]),
+            started_at=_from_db_time(row["started_at"]),
+            finished_at=_from_db_time(row["finished_at"]),
+            wandb_url=row["wandb_url"],
+            logs=logs,
+        )
+
+    def _fetch_logs(self, task_id: str, hotkey: str, offset: int = 0, limit: int | None = None) -> list[str]:
+        rows = self._connection.execute(
+            "SELECT message FROM task_logs WHERE task_id = ? AND hotkey = ? ORDER BY id LIMIT ? OFFSET ?",
+            (task_id, hotkey, -1 if limit is None else limit, offset),
+        ).fetchall()
+        return [row["message"] for row in rows]
+
+    def _write_task(self, task: TrainerTaskLog) -> None:
+        self._connection.execute(
+            f"""
+            INSERT INTO tasks ({_TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (task_id, hotkey) DO UPDATE SET
+                request = excluded.request,
+                status = excluded.status,
+                started_at = excluded.started_at,
+                finished_at = excluded.finished_at,
+                wandb_url = excluded.wandb_url
+            """,
+            (
+                task.training_data.task_id,
+                task.hotkey,
+                task.model_dump_json(exclude=_REQUEST_EXCLUDE),
+                TaskStatus(task.status).value,
+                _to_db_time(task.started_at),
+                _to_db_time(task.finished_at),
+                task.wandb_url,
+            ),
+        )
+        key = (task.training_data.task_id, task.hotkey)
+        if task.status == TaskStatus.TRAINING:
+            self._running[key] = task.model_copy(update={"logs": []})
+        else:
+            self._running.pop(key, None)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+
+    def get(
+        self, task_id: str, hotkey: str, include_logs: bool = True, log_offset: int = 0, log_limit: int | None = None
+    ) -> TrainerTaskLog | None:
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE task_id = ? AND hotkey = ?", (task_id, hotkey)
+            ).fetchone()
+            if row is None:
+                return None
+            logs = self._fetch_logs(task_id, hotkey, log_offset, log_limit) if include_logs else []
+            return self._row_to_task(row, logs)
+
+    def get_logs(self, task_id: str, hotkey: str, offset: int = 0, limit: int | None = None) -> list[str]:
+        with self._lock:
+            return self._fetch_logs(task_id, hotkey, offset, limit)
+
+    def running(self) -> list[TrainerTaskLog]:
+        with self._lock:
+            return list(self._running.values())
+
+    def recent(self, cutoff: datetime, include_logs: bool = True) -> list[TrainerTaskLog]:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE started_at >= ? OR finished_at >= ?",
+                (_to_db_time(cutoff), _to_db_time(cutoff)),
+            ).fetchall()
+            return [
+                self._row_to_task(row, self._fetch_logs(row["task_id"], row["hotkey"]) if include_logs else [])
+                for row in rows
+            ]
+
+    def all(self) -> list[TrainerTaskLog]:
+        """Every task without its logs."""
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {_TASK_COLUMNS} FROM tasks").fetchall()
+            return [self._row_to_task(row, logs=[]) for row in rows]
+
+    def start(self, request: TrainerProxyRequest, started_at: datetime) -> TrainerTaskLog:
+        """Record a (re)started task, dropping the logs of any previous attempt."""
+        task_id = request.training_data.task_id
+        hotkey = request.hotkey
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE task_id = ? AND hotkey = ?", (task_id, hotkey)
+            ).fetchone()
+            if row is not None:
+                task = self._row_to_task(row, logs=[])
+                task.gpu_ids = request.gpu_ids
+                task.status = TaskStatus.TRAINING
+                task.started_at = started_at
+                task.finished_at = None
+            else:
+                task = TrainerTaskLog(**request.model_dump(), status=TaskStatus.TRAINING, started_at=started_at, finished_at=None)
+
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.execute("DELETE FROM task_logs WHERE task_id = ? AND hotkey = ?", (task_id, hotkey))
+                self._write_task(task)
+            return task
+
+    def update(self, task_id: str, hotkey: str, **fields) -> bool:
+        """Set top-level fields (status, finished_at, wandb_url, ...) of a task. Returns False if it doesn't exist."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE task_id = ? AND hotkey = ?", (task_id, hotkey)
+            ).fetchone()
+            if row is None:
+                return False
+            task = self._row_to_task(row, logs=[]).model_copy(update=fields)
+            self._write_task(task)
+            return True
+
+    def append_log(self, task_id: str, hotkey: str, message: str) -> bool:
+        with self._lock:
+            cursor = self._connection.execute(
+                """
+                INSERT INTO task_logs (task_id, hotkey, message)
+                SELECT task_id, hotkey, ? FROM tasks WHERE task_id = ? AND hotkey = ?
+                """,
+                (message, task_id, hotkey),
+            )
+            return cursor.rowcount > 0
+
+    def import_tasks(self, tasks: list[TrainerTaskLog]) -> None:
+        """Bulk load tasks with their logs, e.g. from the legacy JSON history file."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute("BEGIN")
+                for task in tasks:
+                    self._write_task(task)
+                    self._connection.executemany(
+                        "INSERT INTO task_logs (task_id, hotkey, message) VALUES (?, ?, ?)",
+                        [(task.training_data.task_id, task.hotkey, message) for message in task.logs],
+                    )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -14,8 +14,10 @@ import trainer.utils.training_paths as train_paths
 from core.models.utility_models import FileFormat
 from core.models.utility_models import TaskType
 from core.models.utility_models import ImageModelType
+from core.utils import close_download_session
 from core.utils import download_s3_file
 from trainer import constants as cst
+from trainer.utils.model_store import ModelStore
 
 
 hf_api = HfApi()
@@ -84,46 +86,22 @@ def write_environment_task_proxy_dataset(
     print(f"Wrote {len(records)} records to {out_path} with field '{prompt_field}'")
 
 
-def download_from_huggingface(repo_id: str, filename: str, local_dir: str) -> str:
-    try:
-        local_dir = os.path.expanduser(local_dir)
-        local_filename = f"{repo_id.replace('/', '_')}.safetensors"
-        final_path = os.path.join(local_dir, local_filename)
-        os.makedirs(local_dir, exist_ok=True)
-        if os.path.exists(final_path):
-            print(f"File {filename} already exists. Skipping download.")
-        else:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_file_path = hf_hub_download(repo_id=repo_id, filename=filename, local_dir=temp_dir)
-                shutil.move(temp_file_path, final_path)
-            print(f"File {filename} downloaded successfully")
-        return final_path
-    except Exception as e:
-        raise e
-
-
-async def download_base_model(repo_id: str, save_root: str, model_type: ImageModelType) -> str:
+async def download_base_model(
+    repo_id: str, save_root: str, model_type: ImageModelType, store: ModelStore, revision: str | None = None
+) -> str:
     model_name = repo_id.replace("/", "--")
     save_path = os.path.join(save_root, model_name)
-    if os.path.exists(save_path):
-        print(f"Model {repo_id} already exists at {save_path}. Skipping download.")
-        return save_path
-    else:
-        has_safetensors, safetensors_path = is_safetensors_available(repo_id)
-        if has_safetensors and safetensors_path and model_type in [ImageModelType.FLUX, ImageModelType.SDXL]:
-            return download_from_huggingface(repo_id, safetensors_path, save_path)
-        else:
-            snapshot_download(repo_id=repo_id, repo_type="model", local_dir=save_path, local_dir_use_symlinks=False)
-            return save_path
+    has_safetensors, safetensors_path = is_safetensors_available(repo_id)
+    if has_safetensors and safetensors_path and model_type in [ImageModelType.FLUX, ImageModelType.SDXL]:
+        local_filename = f"{repo_id.replace('/', '_')}.safetensors"
+        store.ensure(repo_id, save_path, revision=revision, files={safetensors_path: local_filename})
+        return os.path.join(save_path, local_filename)
+    return store.ensure(repo_id, save_path, revision=revision)
 
 
-async def download_axolotl_base_model(repo_id: str, save_dir: str) -> str:
+async def download_axolotl_base_model(repo_id: str, save_dir: str, store: ModelStore, revision: str | None = None) -> str:
     model_dir = os.path.join(save_dir, repo_id.replace("/", "--"))
-    if os.path.exists(model_dir):
-        print(f"Model {repo_id} already exists at {model_dir}. Skipping download.")
-        return model_dir
-    snapshot_download(repo_id=repo_id, repo_type="model", local_dir=model_dir, local_dir_use_symlinks=False)
-    return model_dir
+    return store.ensure(repo_id, model_dir, revision=revision)
 
 
 async def download_adapter(repo_id: str, filename: str, adapters_dir: str) -> str:
@@ -151,6 +129,7 @@ async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--task-id", required=True)
     parser.add_argument("--model", required=True)
+    parser.add_argument("--model-revision", help="branch, tag or commit of the model, defaults to main")
     parser.add_argument(
         "--task-type",
         required=True,
@@ -170,54 +149,60 @@ async def main():
 
     print(f"Downloading datasets to: {dataset_dir}", flush=True)
     print(f"Downloading models to: {model_dir}", flush=True)
+    store = ModelStore()
 
-    if args.task_type == TaskType.IMAGETASK.value:
-        dataset_zip_path = await download_image_dataset(args.dataset, args.task_id, dataset_dir)
-        model_path = await download_base_model(args.model, model_dir, args.model_type)
-
-        if args.model_type == ImageModelType.Z_IMAGE.value:
-            print("Downloading Z-Image adapter...", flush=True)
-            zimage_adapter_path = await download_adapter(
-                repo_id="ostris/zimage_turbo_training_adapter",
-                filename="zimage_turbo_training_adapter_v2.safetensors",
-                adapters_dir=adapters_dir
-            )
-            print(f"Z-Image adapter downloaded to: {zimage_adapter_path}", flush=True)
+    try:
+        if args.task_type == TaskType.IMAGETASK.value:
+            dataset_zip_path = await download_image_dataset(args.dataset, args.task_id, dataset_dir)
+            model_path = await download_base_model(args.model, model_dir, args.model_type, store, args.model_revision)
+
+            if args.model_type == ImageModelType.Z_IMAGE.value:
+                print("Downloading Z-Image adapter...", flush=True)
+                zimage_adapter_path = await download_adapter(
+                    repo_id="ostris/zimage_turbo_training_adapter",
+                    filename="zimage_turbo_training_adapter_v2.safetensors",
+                    adapters_dir=adapters_dir
+                )
+                print(f"Z-Image adapter downloaded to: {zimage_adapter_path}", flush=True)
             
-        elif args.model_type == ImageModelType.QWEN_IMAGE.value:
-            print("Downloading Qwen-Image adapter...", flush=True)
-            qwen_adapter_path = await download_adapter(
-                repo_id="ostris/accuracy_recovery_adapters",
-                filename="qwen_image_torchao_uint3.safetensors",
-                adapters_dir=adapters_dir
-            )
-            print(f"Qwen-Image adapter downloaded to: {qwen_adapter_path}", flush=True)
+            elif args.model_type == ImageModelType.QWEN_IMAGE.value:
+                print("Downloading Qwen-Image adapter...", flush=True)
+                qwen_adapter_path = await download_adapter(
+                    repo_id="ostris/accuracy_recovery_adapters",
+                    filename="qwen_image_torchao_uint3.safetensors",
+                    adapters_dir=adapters_dir
+                )
+                print(f"Qwen-Image adapter downloaded to: {qwen_adapter_path}", flush=True)
         
-        print("Downloading clip models", flush=True)
-        CLIPTokenizer.from_pretrained("openai/clip-vit-large-patch14", cache_dir=cst.HUGGINGFACE_CACHE_PATH)
-        CLIPTokenizer.from_pretrained("laion/CLIP-ViT-bigG-14-laion2B-39B-b160k", cache_dir=cst.HUGGINGFACE_CACHE_PATH)
-        snapshot_download(
-            repo_id="google/t5-v1_1-xxl",
-            repo_type="model",
-            cache_dir=cst.HUGGINGFACE_CACHE_PATH,
-            local_dir_use_symlinks=False,
-            allow_patterns=["tokenizer_config.json", "spiece.model", "special_tokens_map.json", "config.json"],
-        )
-    elif args.task_type == TaskType.ENVIRONMENTTASK.value:
-        model_path = await download_axolotl_base_model(args.model, model_dir)
-        input_data_path = train_paths.get_text_dataset_path(args.task_id)
-        write_environment_task_proxy_dataset(
-            out_path=input_data_path,
-            dataset_size=1000,
-            prompt_text="Interact with this environment.",
-            prompt_field="prompt",
-        )
-    else:
-        dataset_path, _ = await download_text_dataset(args.task_id, args.dataset, args.file_format, dataset_dir)
-        model_path = await download_axolotl_base_model(args.model, model_dir)
-
-    print(f"Model path: {model_path}", flush=True)
-    print(f"Dataset path: {dataset_dir}", flush=True)
+            print("Downloading clip models", flush=True)
+            CLIPTokenizer.from_pretrained("openai/clip-vit-large-patch14", cache_dir=cst.HUGGINGFACE_CACHE_PATH)
+            CLIPTokenizer.from_pretrained("laion/CLIP-ViT-bigG-14-laion2B-39B-b160k", cache_dir=cst.HUGGINGFACE_CACHE_PATH)
+            snapshot_download(
+                repo_id="google/t5-v1_1-xxl",
+                repo_type="model",
+                cache_dir=cst.HUGGINGFACE_CACHE_PATH,
+                local_dir_use_symlinks=False,
+                allow_patterns=["tokenizer_config.json", "spiece.model", "special_tokens_map.json", "config.json"],
+            )
+        elif args.task_type == TaskType.ENVIRONMENTTASK.value:
+            model_path = await download_axolotl_base_model(args.model, model_dir, store, args.model_revision)
+            input_data_path = train_paths.get_text_dataset_path(args.task_id)
+            write_environment_task_proxy_dataset(
+                out_path=input_data_path,
+                dataset_size=1000,
+                prompt_text="Interact with this environment.",
+                prompt_field="prompt",
+            )
+        else:
+            dataset_path, _ = await download_text_dataset(args.task_id, args.dataset, args.file_format, dataset_dir)
+            model_path = await download_axolotl_base_model(args.model, model_dir, store, args.model_revision)
+
+        print(f"Model path: {model_path}", flush=True)
+        print(f"Model store: {store.stats.summary()}", flush=True)
+        store.save_stats()
+        print(f"Dataset path: {dataset_dir}", flush=True)
+    finally:
+        await close_download_session()
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ from core.models.utility_models import GrpoDatasetType
 from core.models.utility_models import InstructTextDatasetType
 from core.models.utility_models import EnvironmentDatasetType
 from core.models.utility_models import TaskType
+from core.utils import close_download_session
 from core.utils import download_s3_file
 from validator.core.models import ChatTaskWithHotkeyDetails
 from validator.core.models import DpoTaskWithHotkeyDetails
@@ -166,8 +167,11 @@ async def run_evaluation_from_task_id(
         raise ValueError(f"Unsupported task type: {task_type}")
 
     logger.info("Downloading test and synth data...")
-    test_data_path = await download_s3_file(test_data_url)
-    synth_data_path = await download_s3_file(task_details.synthetic_data)
+    try:
+        test_data_path = await download_s3_file(test_data_url)
+        synth_data_path = await download_s3_file(task_details.synthetic_data)
+    finally:
+        await close_download_session()
     logger.info(f"Downloaded test and synth data to {test_data_path} and {synth_data_path}")
 
     try:
@@ -53,6 +53,9 @@ TEMP_PATH_FOR_IMAGES = "/tmp/validator/temp_images"
 SUPPORTED_IMAGE_FILE_EXTENSIONS = (".png", ".jpg", ".jpeg")
 MAX_FILE_SIZE_BYTES = 2_147_483_646  # pyarrow max json load size
 MINIMUM_DATASET_ROWS = 2_000  # Minimum number of rows required in a dataset
+DATASET_PREP_BATCH_SIZE = 10_000  # rows per Arrow batch when casting, filtering and writing task datasets
+DATASET_PREP_NUM_PROC = int(os.getenv("DATASET_PREP_NUM_PROC", min(8, os.cpu_count() or 1)))
+DATASET_PREP_PARALLEL_MIN_ROWS = 200_000  # smaller datasets are cast in-process, forking costs more than it saves
 EXAMPLE_PROMPTS_PATH = "validator/tasks/example_prompts.json"
 
 CONTAINER_EVAL_RESULTS_PATH = "/aplp/evaluation_results.json"
@@ -96,6 +99,19 @@ PROMPT_PATH = "validator/prompts.yml"
 NINETEEN_API_KEY = os.getenv("NINETEEN_API_KEY")
 EMISSION_BURN_HOTKEY = "5GU4Xkd3dCGTU3s8VLcHGc5wsD5M8XyxDca5yDQhYm1mVXFu"
 
+# pooled clients for content service and nineteen calls, one connection pool per host
+HTTP_POOL_MAX_CONNECTIONS = 100
+HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS = 50
+HTTP_POOL_KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection is kept open
+HTTP_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)  # seconds
+HTTP_LATENCY_LOG_EVERY = 100  # requests to an endpoint between latency summaries in the logs
+
+# fiber fan-out to miners: rolling per-node RTT and failure estimates
+NODE_RTT_EWMA_ALPHA = 0.3  # weight of the newest round trip in a node's RTT estimate
+NODE_SUSPECT_TIMEOUT = 3.0  # seconds given to a node that failed its last query
+NODE_DEAD_AFTER_FAILURES = 3  # consecutive failures before a node is skipped
+NODE_DEAD_RETRY_AFTER = 30 * 60  # seconds before a skipped node is probed again
+
 # Boss Round Historical Task Selection
 BOSS_ROUND_HISTORICAL_START_DATE = date(2025, 6, 1)
 BOSS_ROUND_HISTORICAL_END_DATE = date(2025, 8, 1)
@@ -143,6 +159,15 @@ FIRST_PLACE_SCORE = 3
 # processing stuff
 MAX_CONCURRENT_MINER_ASSIGNMENTS = 5
 MAX_CONCURRENT_TASK_PREPS = 3
+MAX_CONCURRENT_IMAGE_PAIR_DOWNLOADS = 16
+
+# model prefetch ahead of evaluation
+MAX_CONCURRENT_MODEL_PREFETCHES = 2  # tasks downloading at once
+MODEL_PREFETCH_MAX_WORKERS = 4  # parallel file downloads per repo, bounds bandwidth use
+MODEL_PREFETCH_INTERVAL = 30  # in seconds
+
+# loops woken by task status events only poll as a safety net
+TASK_EVENTS_SAFETY_POLL_INTERVAL = 120  # in seconds
 
 PERCENTAGE_OF_TASKS_THAT_SHOULD_BE_INSTRUCT_TEXT = 0.4
 PERCENTAGE_OF_INSTRUCT_TASKS_THAT_SHOULD_BE_CHAT = 0.5
@@ -262,10 +287,28 @@ CACHE_TAU_DAYS = 10  # Time constant (τ) for exponential decay in days
 CACHE_MAX_LOOKUP_DAYS = 30  # Maximum number of days to look back for usage data
 MAX_CACHE_SIZE_BYTES = 500 * 1024**3 if NETUID == 241 else 1000 * 1024**3  # in bytes
 CACHE_CLEANUP_INTERVAL = 8 * 60 * 60  # in seconds
+MODEL_CACHE_INDEX_PATH = os.path.expanduser(os.getenv("MODEL_CACHE_INDEX_PATH", "~/.cache/gradients/model_cache_index.db"))
+MODEL_CACHE_RECONCILE_INTERVAL = 24 * 60 * 60  # full rescan of the hub cache behind the size index, in seconds
 
 # Docker evaluation
 DOCKER_EVAL_HF_CACHE_DIR = "/root/.cache/huggingface"
 
+# Environment evaluation
+ENV_EVAL_MAX_CONCURRENT_EPISODES = int(os.getenv("ENV_EVAL_MAX_CONCURRENT_EPISODES", 16))  # in-flight episodes per repo
+ENV_EVAL_NUM_AGENT_REPLICAS = int(os.getenv("ENV_EVAL_NUM_AGENT_REPLICAS", 1))  # AgentGym servers behind the dispatcher
+ENV_EVAL_EPISODE_TIMEOUT = 2500  # in seconds
+ENV_EVAL_VLLM_READY_TIMEOUT = 300  # in seconds
+ENV_EVAL_AGENT_READY_TIMEOUT = 120  # in seconds
+# start vLLM once per task and hot-swap every repo in as a runtime LoRA adapter
+ENV_EVAL_SHARED_VLLM = os.getenv("ENV_EVAL_SHARED_VLLM", "true").lower() == "true"
+
+# Text evaluation: load the base model once per task and swap every LoRA repo in with peft
+LORA_EVAL_WORKER_ENABLED = os.getenv("LORA_EVAL_WORKER_ENABLED", "true").lower() == "true"
+LORA_EVAL_WORKER_STARTUP_TIMEOUT = 3600  # in seconds
+
+# reference logps and base top-k log-probs computed once per task and shared by every repo's evaluation
+EVAL_REFERENCE_CACHE_DIR = "/root/.cache/reference_cache"
+
 # DPO evaluation
 TRL_DPO_FIELD_PROMPT = "prompt"
 TRL_DPO_FIELD_CHOSEN = "chosen"
@@ -287,6 +330,26 @@ GRPO_INITIAL_BATCH_SIZE = 16
 GRPO_KL_BATCH_SIZE = 1
 GRPO_DEFAULT_NUM_GENERATIONS = 2
 GRPO_KL_SEQUENCE_LENGTH = 512
+GRPO_KL_CHUNK_SIZE = 64  # sequence positions turned into full-vocabulary logits at once
+# Set to cache the base model's top-k log-probs per position (the remaining mass folded into one bucket) once per task
+# instead of running the base model for every repo. That KL is a lower bound on the exact one and so weakens the
+# BETA_GRPO penalty, scoring uses the exact KL unless this is set.
+GRPO_KL_REFERENCE_TOP_K: int | None = None
+# per-container footprint (policy + reference), used to pack several repo containers onto one allocation
+GRPO_EVAL_PER_REPO_PARAM_MULTIPLIER = 2
+GRPO_EVAL_MAX_CONCURRENT_DOWNLOADS = 2
+
+# Reward function execution
+REWARD_FUNCTION_VALIDATION_ROWS = 5  # dataset rows GRPO reward functions are test-run on before the task is prepared
+RESTRICTED_CODE_CACHE_SIZE = 1024  # compiled RestrictedPython programs kept, keyed by source hash
+# worker processes scoring completion batches in parallel, 0 scores in the evaluation process itself
+REWARD_FUNCTION_POOL_WORKERS = int(os.getenv("REWARD_FUNCTION_POOL_WORKERS", "0"))
+REWARD_FUNCTION_POOL_CHUNK_SIZE = 8  # completions per worker call
+REWARD_FUNCTION_TIMEOUT_SECONDS = 30  # per worker call, completions that exceed it score 0
+REWARD_FUNCTION_MEMORY_LIMIT_BYTES = 4 * 1024**3  # data segment limit of each worker process
+AFFINE_PROBLEM_CACHE_SIZE = 4096  # parsed SAT/ABD/DED problems kept, keyed by their extra_data
+AFFINE_EXECUTION_CACHE_SIZE = 4096  # restricted program outputs kept, keyed by (code, input)
+SAT_BITSET_MAX_VARIABLES = 1 << 16  # larger variable numbers are checked clause by clause
 
 STANDARD_INSTRUCT_COLUMN = "instruct"
 STANDARD_INPUT_COLUMN = "input"
@@ -9,6 +9,7 @@ from validator.core.config import load_config
 from validator.core.refresh_nodes import refresh_nodes_periodically
 from validator.cycle.process_tasks import process_completed_tasks
 from validator.cycle.process_tasks import process_pending_tasks
+from validator.db.task_events import TaskEventBus
 from validator.utils.cache_clear import cleanup_temp_files
 from validator.utils.util import try_db_connections
 
@@ -19,10 +20,13 @@ async def run_validator_cycles() -> None:
 
     cleanup_temp_files()
 
+    task_events = TaskEventBus(config.psql_db, config.redis_db)
+    task_events.start()
+
     await asyncio.gather(
-        process_pending_tasks(config),
+        process_pending_tasks(config, task_events),
         refresh_nodes_periodically(config),
-        process_completed_tasks(config)
+        process_completed_tasks(config, task_events)
     )
 
 
@@ -0,0 +1,137 @@
+import asyncio
+import os
+from uuid import UUID
+
+from huggingface_hub import snapshot_download
+
+import validator.core.constants as cst
+import validator.db.constants as db_cst
+import validator.db.sql.tasks as tasks_sql
+from core import constants as core_cst
+from core.models.utility_models import TaskStatus
+from core.models.utility_models import TaskType
+from validator.core.models import AnyTypeRawTask
+from validator.db.database import PSQLDB
+from validator.db.task_events import TaskEventBus
+from validator.db.task_events import wait_for_task_event
+from validator.utils.logging import LogContext
+from validator.utils.logging import get_logger
+from validator.utils.model_cache_index import get_model_cache_index
+
+
+logger = get_logger(__name__)
+
+PREFETCHABLE_TASK_TYPES = [
+    TaskType.INSTRUCTTEXTTASK,
+    TaskType.CHATTASK,
+    TaskType.DPOTASK,
+    TaskType.GRPOTASK,
+    TaskType.ENVIRONMENTTASK,
+]
+PREFETCH_IGNORE_PATTERNS = ["*.h5", "*.ot", "*.msgpack", "*.pkl", "*.pth"]
+
+
+class ModelPrefetcher:
+    """
+    Downloads the base model and submission repos of PREEVALUATION tasks into the shared HF hub cache
+    while they wait for GPUs, so evaluation workers can prefer tasks whose weights are already local.
+    """
+
+    def __init__(
+        self,
+        psql_db: PSQLDB,
+        max_concurrent_prefetches: int = cst.MAX_CONCURRENT_MODEL_PREFETCHES,
+        max_download_workers: int = cst.MODEL_PREFETCH_MAX_WORKERS,
+    ):
+        self.psql_db = psql_db
+        self.max_download_workers = max_download_workers
+        self._semaphore = asyncio.Semaphore(max_concurrent_prefetches)
+        self._ready_task_ids: set[UUID] = set()
+        self._in_flight: dict[UUID, asyncio.Task] = {}
+        self._task_models: dict[UUID, set[str]] = {}
+
+    def is_ready(self, task_id: UUID) -> bool:
+        return task_id in self._ready_task_ids
+
+    def protected_models(self) -> set[str]:
+        """Every repo that is prefetched or being prefetched for a task that has not been evaluated yet."""
+        return {model for models in self._task_models.values() for model in models}
+
+    def release(self, task_id: UUID) -> None:
+        """Forget a task once it has been evaluated so its repos become evictable again."""
+        in_flight = self._in_flight.pop(task_id, None)
+        if in_flight is not None:
+            in_flight.cancel()
+        self._ready_task_ids.discard(task_id)
+        self._task_models.pop(task_id, None)
+
+    async def _get_submission_repos(self, task: AnyTypeRawTask) -> list[str]:
+        nodes = await tasks_sql.get_nodes_assigned_to_task(str(task.task_id), self.psql_db)
+        repos = []
+        for node in nodes:
+            expected_name = await tasks_sql.get_expected_repo_name(task.task_id, node.hotkey, self.psql_db)
+            if expected_name:
+                repos.append(f"{cst.RAYONLABS_HF_USERNAME}/{expected_name}")
+        return repos
+
+    async def _download(self, repo: str) -> None:
+        await asyncio.to_thread(
+            snapshot_download,
+            repo_id=repo,
+            cache_dir=os.path.expanduser(core_cst.CACHE_DIR_HUB),
+            ignore_patterns=PREFETCH_IGNORE_PATTERNS,
+            max_workers=self.max_download_workers,
+        )
+        # Repos already cached don't change on disk, so tell the cache index they were just used
+        await asyncio.to_thread(get_model_cache_index().touch, repo)
+
+    async def _prefetch_task(self, task: AnyTypeRawTask) -> None:
+        with LogContext(task_id=str(task.task_id)):
+            try:
+                async with self._semaphore:
+                    submission_repos = await self._get_submission_repos(task)
+                    self._task_models[task.task_id] = {str(task.model_id), *submission_repos}
+                    logger.info(f"Prefetching base model {task.model_id} and {len(submission_repos)} submission repos")
+
+                    # The base model is required by every repo's evaluation, so a failure here means not ready
+                    await self._download(str(task.model_id))
+                    for repo in submission_repos:
+                        try:
+                            await self._download(repo)
+                        except Exception as e:
+                            logger.warning(f"Failed to prefetch submission repo {repo}: {e}")
+
+                self._ready_task_ids.add(task.task_id)
+                logger.info(f"Prefetch complete for task {task.task_id}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to prefetch models for task {task.task_id}: {e}")
+            finally:
+                self._in_flight.pop(task.task_id, None)
+
+    def schedule(self, task: AnyTypeRawTask) -> None:
+        if task.task_id in self._ready_task_ids or task.task_id in self._in_flight:
+            return
+        if task.task_type not in PREFETCHABLE_TASK_TYPES:
+            # Nothing we can usefully prefetch (e.g. diffusion checkpoints) - don't deprioritise these tasks
+            self._ready_task_ids.add(task.task_id)
+            return
+        self._in_flight[task.task_id] = asyncio.create_task(self._prefetch_task(task))
+
+    async def prefetch_loop(self, task_events: TaskEventBus | None = None) -> None:
+        subscription = (
+            task_events.subscribe(db_cst.TASK_STATUS_CHANNEL, {TaskStatus.PREEVALUATION.value})
+            if task_events is not None
+            else None
+        )
+        while True:
+            try:
+                tasks_to_prefetch = await tasks_sql.get_tasks_with_status(
+                    TaskStatus.PREEVALUATION, psql_db=self.psql_db, tournament_filter="all", benchmark_filter="include"
+                )
+                for task in tasks_to_prefetch:
+                    self.schedule(task)
+            except Exception as e:
+                logger.error(f"Error in model prefetch loop: {e}", exc_info=True)
+            await wait_for_task_event(subscription, cst.MODEL_PREFETCH_INTERVAL)
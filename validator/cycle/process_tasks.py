@@ -1,7 +1,9 @@
 import asyncio
 import datetime
+from uuid import UUID
 
 import validator.core.constants as cst
+import validator.db.constants as db_cst
 import validator.db.sql.nodes as nodes_sql
 import validator.db.sql.tasks as tasks_sql
 from core.models.utility_models import TaskStatus
@@ -11,8 +13,12 @@ from validator.core.constants import EMISSION_BURN_HOTKEY
 from validator.core.models import AnyTypeRawTask
 from validator.core.models import RawTask
 from validator.core.task_config_models import get_task_config
+from validator.cycle.model_prefetch import ModelPrefetcher
+from validator.cycle.util_functions import get_gpus_required_for_params
 from validator.cycle.util_functions import get_model_num_params
 from validator.db.database import PSQLDB
+from validator.db.task_events import TaskEventBus
+from validator.db.task_events import wait_for_task_event
 from validator.evaluation.scoring import evaluate_and_score
 from validator.utils.cache_clear import clean_all_hf_datasets_cache
 from validator.utils.cache_clear import manage_models_cache
@@ -182,20 +188,28 @@ async def _move_any_prep_data_to_pending(config):
     await asyncio.gather(*[_move_back_to_pending_status(task, config) for task in stopped_in_prep])
 
 
-async def process_pending_tasks(config: Config) -> None:
+async def process_pending_tasks(config: Config, task_events: TaskEventBus | None = None) -> None:
     await _move_any_prep_data_to_pending(config)
+    # Delayed tasks become ready with time rather than through an event, so the 30s poll stays
+    subscription = (
+        task_events.subscribe(
+            db_cst.TASK_STATUS_CHANNEL, {TaskStatus.PENDING.value, TaskStatus.LOOKING_FOR_NODES.value}
+        )
+        if task_events is not None
+        else None
+    )
     while True:
         try:
             await _processing_pending_tasks(config)
             await _find_miners_for_task(config)
             await _handle_delayed_tasks(config)
-            await asyncio.sleep(30)
+            await wait_for_task_event(subscription, 30)
         except Exception as e:
             logger.info(f"There was a problem in processing: {e}")
             await asyncio.sleep(30)
 
 
-async def cleanup_model_cache_loop(psql_db: PSQLDB):
+async def cleanup_model_cache_loop(psql_db: PSQLDB, prefetcher: ModelPrefetcher | None = None):
     """Clean up model cache when it exceeds size limit."""
     while True:
         try:
@@ -213,6 +227,8 @@ async def cleanup_model_cache_loop(psql_db: PSQLDB):
             for task in evaluating_tasks + preevaluation_tasks + training_tasks:
                 if task.model_id:
                     protected_models.add(str(task.model_id))
+            if prefetcher is not None:
+                protected_models.update(prefetcher.protected_models())
 
             cache_stats = await tasks_sql.get_model_cache_stats(
                 psql_db, tau_days=cst.CACHE_TAU_DAYS, max_lookup_days=cst.CACHE_MAX_LOOKUP_DAYS
@@ -226,15 +242,18 @@ async def cleanup_model_cache_loop(psql_db: PSQLDB):
                 else:
                     cache_stats[model_id]["cache_score"] = float("inf")
 
-            manage_models_cache(cache_stats, cst.MAX_CACHE_SIZE_BYTES)
+            await asyncio.to_thread(manage_models_cache, cache_stats, cst.MAX_CACHE_SIZE_BYTES)
         except Exception as e:
             logger.error(f"Error in cache cleanup: {e}", exc_info=True)
         finally:
             await asyncio.sleep(cst.CACHE_CLEANUP_INTERVAL)
 
 
-async def evaluate_tasks_loop(config: Config):
-    task_queue = asyncio.Queue()
+async def evaluate_tasks_loop(
+    config: Config, prefetcher: ModelPrefetcher | None = None, task_events: TaskEventBus | None = None
+):
+    # Tasks waiting for GPUs, in arrival order
+    waiting_tasks: dict[UUID, AnyTypeRawTask] = {}
     gpu_queue = asyncio.Queue()
     processing_task_ids = set()
     # Lock to prevent race conditions (thus potential deadlocks) during GPU acquisition
@@ -243,10 +262,28 @@ async def evaluate_tasks_loop(config: Config):
     for gpu_id in cst.GPU_IDS:
         await gpu_queue.put(gpu_id)
 
+    max_queued_tasks = 2 * len(cst.GPU_IDS)
+    subscription = (
+        task_events.subscribe(db_cst.TASK_STATUS_CHANNEL, {TaskStatus.PREEVALUATION.value}) if task_events is not None else None
+    )
+    poll_interval = cst.TASK_EVENTS_SAFETY_POLL_INTERVAL if task_events is not None else 30
+
+    def pop_next_task() -> AnyTypeRawTask | None:
+        """Prefer tasks whose models are already prefetched, falling back to the oldest waiting task."""
+        if not waiting_tasks:
+            return None
+        task_id = next(iter(waiting_tasks))
+        if prefetcher is not None:
+            task_id = next((tid for tid in waiting_tasks if prefetcher.is_ready(tid)), task_id)
+        return waiting_tasks.pop(task_id)
+
     async def evaluation_worker():
         while True:
             try:
-                task = await asyncio.wait_for(task_queue.get(), timeout=1)
+                task = pop_next_task()
+                if task is None:
+                    await asyncio.sleep(5)
+                    continue
                 required_gpus = compute_required_gpus(task)
                 gpu_ids = []
 
@@ -260,11 +297,14 @@ async def evaluate_tasks_loop(config: Config):
                 finally:
                     for gpu_id in gpu_ids:
                         await gpu_queue.put(gpu_id)
+                    queue_was_full = len(processing_task_ids) >= max_queued_tasks
                     processing_task_ids.remove(task.task_id)
-                    task_queue.task_done()
-            except asyncio.TimeoutError:
-                await asyncio.sleep(5)
-                continue
+                    if queue_was_full and subscription is not None:
+                        # The main loop stopped picking up PREEVALUATION tasks while the queue was full, no status
+                        # event will tell it a slot has opened
+                        subscription.wake()
+                    if prefetcher is not None:
+                        prefetcher.release(task.task_id)
             except Exception as e:
                 logger.error(f"Error in evaluation worker: {str(e)}", exc_info=True)
                 continue
@@ -273,7 +313,7 @@ async def evaluate_tasks_loop(config: Config):
         asyncio.create_task(evaluation_worker())
 
     while True:
-        if len(processing_task_ids) < 2 * len(cst.GPU_IDS):
+        if len(processing_task_ids) < max_queued_tasks:
             tasks_to_evaluate = await tasks_sql.get_tasks_with_status(
                 TaskStatus.PREEVALUATION, psql_db=config.psql_db, tournament_filter="all", benchmark_filter="include"
             )
@@ -283,12 +323,14 @@ async def evaluate_tasks_loop(config: Config):
                     # Only add to queue if not already added, some tasks in the queue might still have TaskStatus.PREEVALUATION
                     if task.task_id not in processing_task_ids:
                         processing_task_ids.add(task.task_id)
-                        await task_queue.put(task)
+                        waiting_tasks[task.task_id] = task
+                        if prefetcher is not None:
+                            prefetcher.schedule(task)
             else:
-                logger.info("No new tasks awaiting evaluation - waiting 30 seconds")
+                logger.info(f"No new tasks awaiting evaluation - waiting up to {poll_interval} seconds")
         else:
-            logger.info("Evaluation queue is full - waiting for 30 seconds")
-        await asyncio.sleep(30)
+            logger.info(f"Evaluation queue is full - waiting up to {poll_interval} seconds")
+        await wait_for_task_event(subscription, poll_interval)
 
 
 def compute_required_gpus(task: RawTask) -> int:
@@ -305,17 +347,15 @@ def compute_required_gpus(task: RawTask) -> int:
     elif task.task_type == TaskType.ENVIRONMENTTASK:
         num_params = num_params * 3
 
-    if num_params < cst.MODEL_SIZE_REQUIRING_2_GPUS:
-        return 1
-    elif num_params < cst.MODEL_SIZE_REQUIRING_3_GPUS:
-        return 2
-    elif num_params < cst.MODEL_SIZE_REQUIRING_4_GPUS:
-        return 3
-    else:
-        return 4
+    return get_gpus_required_for_params(num_params)
 
 
-async def process_completed_tasks(config: Config) -> None:
+async def process_completed_tasks(config: Config, task_events: TaskEventBus | None = None) -> None:
     await _move_any_evaluating_tasks_to_pending_evaluation(config)
 
-    await asyncio.gather(evaluate_tasks_loop(config), cleanup_model_cache_loop(config.psql_db))
+    prefetcher = ModelPrefetcher(config.psql_db)
+    await asyncio.gather(
+        evaluate_tasks_loop(config, prefetcher, task_events),
+        cleanup_model_cache_loop(config.psql_db, prefetcher),
+        prefetcher.prefetch_loop(task_events),
+    )
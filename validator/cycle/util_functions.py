@@ -1,7 +1,6 @@
 import re
 
 from fiber import Keypair
-from huggingface_hub import HfApi
 
 from core.models.payload_models import TrainRequestImage
 from core.models.payload_models import TrainRequestText
@@ -21,11 +20,11 @@ from validator.core.models import InstructTextRawTask
 from validator.tasks.task_prep import prepare_image_task
 from validator.tasks.task_prep import prepare_text_task
 from validator.utils.logging import get_logger
+from validator.utils.model_params import count_checkpoint_parameters
 from validator.utils.yarn_extension import prepare_yarn_extended_model
 
 
 logger = get_logger(__name__)
-hf_api = HfApi()
 
 
 async def get_fake_text_dataset_size(task: AnyTextTypeRawTask) -> int:
@@ -33,16 +32,26 @@ async def get_fake_text_dataset_size(task: AnyTextTypeRawTask) -> int:
 
 
 def get_model_num_params(model_id: str) -> int:
-    try:
-        model_info = hf_api.model_info(model_id)
-        size = model_info.safetensors.total
-        return size
-    except Exception as e:
-        logger.warning(f"Error getting model size from safetensors: {e}")
-        model_size = re.search(r"(\d+)(?=[bB])", model_id)
-        model_size = int(model_size.group(1)) * 1_000_000_000 if model_size else None
-        logger.info(f"Model size from regex: {model_size}")
-        return model_size
+    stats = count_checkpoint_parameters(model_id)
+    if stats:
+        return stats.num_params
+    logger.warning(f"Could not get model size of {model_id} from safetensors headers")
+    model_size = re.search(r"(\d+)(?=[bB])", model_id)
+    model_size = int(model_size.group(1)) * 1_000_000_000 if model_size else None
+    logger.info(f"Model size from regex: {model_size}")
+    return model_size
+
+
+def get_gpus_required_for_params(num_params: int) -> int:
+    """Number of GPUs needed to hold a workload of num_params (already scaled by any task-type multiplier)."""
+    if num_params < cst.MODEL_SIZE_REQUIRING_2_GPUS:
+        return 1
+    elif num_params < cst.MODEL_SIZE_REQUIRING_3_GPUS:
+        return 2
+    elif num_params < cst.MODEL_SIZE_REQUIRING_4_GPUS:
+        return 3
+    else:
+        return 4
 
 
 async def get_total_image_dataset_size(task: ImageRawTask) -> int:
@@ -5,6 +5,12 @@ COMMAND_TIMEOUT = 20.0  # If sql query takes longer than this, raise an error
 TIMEOUT = 10.0  # If no connection is available after this time, raise an error
 MAX_QUERIES = 1000  # Maximum number of queries to execute before closing a connection in the pool ( and opening a new one)
 
+# Task event notifications (LISTEN/NOTIFY channels, mirrored on Redis pub/sub)
+TASK_STATUS_CHANNEL = "task_status_events"
+TRAINING_STATUS_CHANNEL = "training_status_events"
+TASK_EVENTS_RECONNECT_INTERVAL = 5.0  # seconds before the first listener reconnect attempt, doubled after each failure
+TASK_EVENTS_RECONNECT_MAX_INTERVAL = 300.0
+
 # Tables
 NODES_TABLE = "nodes"
 NODES_HISTORY_TABLE = "nodes_history"
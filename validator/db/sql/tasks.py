@@ -28,6 +28,8 @@ from validator.core.models import InstructTextTask
 from validator.core.models import NetworkStats
 from validator.core.models import RewardFunction
 from validator.db.database import PSQLDB
+from validator.db.task_events import TaskEvent
+from validator.db.task_events import publish_task_event
 from validator.utils.logging import get_logger
 from validator.utils.minio import async_minio_client
 
@@ -42,7 +44,11 @@ async def add_task(task: AnyTypeRawTask, psql_db: PSQLDB) -> AnyTypeRawTask:
             task_record = await _insert_base_task(connection, task)
             await _insert_task_specific_data(connection, task, task_record)
             task.task_id = task_record[cst.TASK_ID]
-            return task
+
+        await publish_task_event(
+            connection, cst.TASK_STATUS_CHANNEL, TaskEvent(task_id=str(task.task_id), status=TaskStatus(task.status).value)
+        )
+        return task
 
 
 async def _insert_base_task(connection: Connection, task: AnyTypeRawTask) -> dict:
@@ -309,7 +315,7 @@ async def get_tasks_with_status(
 
     async with await psql_db.connection() as connection:
         connection: Connection
-        
+
         base_query = f"""
             SELECT * FROM {cst.TASKS_TABLE}
             WHERE {cst.STATUS} = $1
@@ -320,84 +326,15 @@ async def get_tasks_with_status(
         """
         base_rows = await connection.fetch(base_query, *query_params)
 
-        tasks = []
+        # One join query per task type plus one bulk query per auxiliary table, regardless of task count
+        tasks_by_type = {}
         for row in base_rows:
-            task_type = row[cst.TASK_TYPE]
-            if task_type == TaskType.INSTRUCTTEXTTASK.value:
-                specific_query = f"""
-                    SELECT t.*, tt.field_system,
-                           tt.field_instruction, tt.field_input, tt.field_output,
-                           tt.format, tt.no_input_format, tt.file_format
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.INSTRUCT_TEXT_TASKS_TABLE} tt ON t.{cst.TASK_ID} = tt.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            elif task_type == TaskType.IMAGETASK.value:
-                specific_query = f"""
-                    SELECT t.*, it.model_type
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.IMAGE_TASKS_TABLE} it ON t.{cst.TASK_ID} = it.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            elif task_type == TaskType.DPOTASK.value:
-                specific_query = f"""
-                    SELECT t.*, dt.field_prompt, dt.field_system, dt.field_chosen, dt.field_rejected,
-                           dt.prompt_format, dt.chosen_format, dt.rejected_format, dt.file_format
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.DPO_TASKS_TABLE} dt ON t.{cst.TASK_ID} = dt.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            elif task_type == TaskType.GRPOTASK.value:
-                specific_query = f"""
-                    SELECT t.*, gt.field_prompt, gt.file_format, gt.extra_column
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.GRPO_TASKS_TABLE} gt ON t.{cst.TASK_ID} = gt.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            elif task_type == TaskType.ENVIRONMENTTASK.value:
-                specific_query = f"""
-                    SELECT t.*, et.environment_name
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.ENV_TASKS_TABLE} et ON t.{cst.TASK_ID} = et.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            elif task_type == TaskType.CHATTASK.value:
-                specific_query = f"""
-                    SELECT
-                        t.*,
-                        gt.file_format,
-                        gt.chat_template,
-                        gt.chat_column,
-                        gt.chat_role_field,
-                        gt.chat_content_field,
-                        gt.chat_user_reference,
-                        gt.chat_assistant_reference
-                    FROM {cst.TASKS_TABLE} t
-                    LEFT JOIN {cst.CHAT_TASKS_TABLE} gt
-                        ON t.{cst.TASK_ID} = gt.{cst.TASK_ID}
-                    WHERE t.{cst.TASK_ID} = $1
-                """
-            else:
-                logger.warning(f"Unknown task type {task_type} for task_id {row[cst.TASK_ID]}")
-                continue
-
-            specific_row = await connection.fetchrow(specific_query, row[cst.TASK_ID])
-            if specific_row:
-                task_data = dict(specific_row)
-                if task_type == TaskType.INSTRUCTTEXTTASK.value:
-                    tasks.append(InstructTextRawTask(**task_data))
-                elif task_type == TaskType.IMAGETASK.value:
-                    image_text_pairs = await get_image_text_pairs(row[cst.TASK_ID], psql_db)
-                    tasks.append(ImageRawTask(**task_data, image_text_pairs=image_text_pairs))
-                elif task_type == TaskType.DPOTASK.value:
-                    tasks.append(DpoRawTask(**task_data))
-                elif task_type == TaskType.GRPOTASK.value:
-                    reward_functions = await get_reward_functions(row[cst.TASK_ID], psql_db)
-                    tasks.append(GrpoRawTask(**task_data, reward_functions=reward_functions))
-                elif task_type == TaskType.CHATTASK.value:
-                    tasks.append(ChatRawTask(**task_data))
-                elif task_type == TaskType.ENVIRONMENTTASK.value:
-                    tasks.append(EnvRawTask(**task_data))
+            tasks_by_type.setdefault(row[cst.TASK_TYPE], []).append(row)
+
+        tasks = []
+        for task_type, type_rows in tasks_by_type.items():
+            type_task_ids = [row[cst.TASK_ID] for row in type_rows]
+            tasks.extend(await _load_tasks_by_type(connection, task_type, type_task_ids, type_rows))
 
         logger.info(f"Retrieved {len(tasks)} tasks with status {status.value}")
         return tasks
@@ -568,6 +505,13 @@ async def update_task(updated_task: AnyTypeRawTask, psql_db: PSQLDB) -> AnyTypeR
                     """
                     await connection.execute(query, updated_task.task_id, updated_task.assigned_miners, NETUID)
 
+        if cst.STATUS in updates:
+            await publish_task_event(
+                connection,
+                cst.TASK_STATUS_CHANNEL,
+                TaskEvent(task_id=str(updated_task.task_id), status=TaskStatus(updated_task.status).value),
+            )
+
     return await get_task(updated_task.task_id, psql_db)
 
 
@@ -1018,7 +962,7 @@ async def get_tasks_by_ids(task_ids: list[UUID], psql_db: PSQLDB, connection: Co
 
         for task_type, type_rows in tasks_by_type.items():
             type_task_ids = [row[cst.TASK_ID] for row in type_rows]
-            tasks = await _load_tasks_by_type(conn, task_type, type_task_ids, type_rows, psql_db)
+            tasks = await _load_tasks_by_type(conn, task_type, type_task_ids, type_rows)
             all_tasks.extend(tasks)
 
         # Create a mapping for quick lookup
@@ -1043,9 +987,9 @@ async def get_tasks_by_ids(task_ids: list[UUID], psql_db: PSQLDB, connection: Co
 
 
 async def _load_tasks_by_type(
-    conn: Connection, task_type: str, type_task_ids: list[UUID], type_rows: list, psql_db: PSQLDB
-) -> list[AnyTypeTask]:
-    """Load tasks of a specific type with their type-specific data"""
+    conn: Connection, task_type: str, type_task_ids: list[UUID], type_rows: list
+) -> list[AnyTypeRawTask]:
+    """Load tasks of a specific type with their type-specific data, using a fixed number of queries"""
     specific_query = _get_specific_query_for_task_type(task_type)
     if not specific_query:
         logger.warning(f"Unknown task type {task_type}, skipping tasks")
@@ -1054,13 +998,25 @@ async def _load_tasks_by_type(
     specific_rows = await conn.fetch(specific_query, type_task_ids)
     specific_rows_dict = {row[cst.TASK_ID]: row for row in specific_rows}
 
+    image_text_pairs_by_task = {}
+    reward_functions_by_task = {}
+    if task_type == TaskType.IMAGETASK.value:
+        image_text_pairs_by_task = await get_image_text_pairs_for_tasks(type_task_ids, conn)
+    elif task_type == TaskType.GRPOTASK.value:
+        reward_functions_by_task = await get_reward_functions_for_tasks(type_task_ids, conn)
+
     tasks = []
     for row in type_rows:
         task_id = row[cst.TASK_ID]
         specific_row = specific_rows_dict.get(task_id)
 
         if specific_row:
-            task = await _create_task_from_data(task_type, specific_row, task_id, psql_db, conn)
+            task = _create_task_from_data(
+                task_type,
+                specific_row,
+                image_text_pairs=image_text_pairs_by_task.get(task_id, []),
+                reward_functions=reward_functions_by_task.get(task_id, []),
+            )
             if task:
                 tasks.append(task)
         else:
@@ -1075,14 +1031,14 @@ def _get_specific_query_for_task_type(task_type: str) -> str | None:
         return f"""
             SELECT t.*, tt.field_system,
                    tt.field_instruction, tt.field_input, tt.field_output,
-                   tt.format, tt.no_input_format
+                   tt.format, tt.no_input_format, tt.file_format
             FROM {cst.TASKS_TABLE} t
             LEFT JOIN {cst.INSTRUCT_TEXT_TASKS_TABLE} tt ON t.{cst.TASK_ID} = tt.{cst.TASK_ID}
             WHERE t.{cst.TASK_ID} = ANY($1)
         """
     elif task_type == TaskType.CHATTASK.value:
         return f"""
-            SELECT t.*, ct.chat_template,
+            SELECT t.*, ct.file_format, ct.chat_template,
                    ct.chat_column, ct.chat_role_field, ct.chat_content_field,
                    ct.chat_user_reference, ct.chat_assistant_reference
             FROM {cst.TASKS_TABLE} t
@@ -1106,7 +1062,7 @@ def _get_specific_query_for_task_type(task_type: str) -> str | None:
         """
     elif task_type == TaskType.GRPOTASK.value:
         return f"""
-            SELECT t.*, gt.field_prompt, gt.file_format
+            SELECT t.*, gt.field_prompt, gt.file_format, gt.extra_column
             FROM {cst.TASKS_TABLE} t
             LEFT JOIN {cst.GRPO_TASKS_TABLE} gt ON t.{cst.TASK_ID} = gt.{cst.TASK_ID}
             WHERE t.{cst.TASK_ID} = ANY($1)
@@ -1121,9 +1077,12 @@ def _get_specific_query_for_task_type(task_type: str) -> str | None:
     return None
 
 
-async def _create_task_from_data(
-    task_type: str, task_data: dict, task_id: UUID, psql_db: PSQLDB, conn: Connection
-) -> AnyTypeTask | None:
+def _create_task_from_data(
+    task_type: str,
+    task_data: dict,
+    image_text_pairs: list[ImageTextPair] | None = None,
+    reward_functions: list[RewardFunction] | None = None,
+) -> AnyTypeRawTask | None:
     """Create a task object from the given data based on task type"""
     full_task_data = dict(task_data)
 
@@ -1132,13 +1091,11 @@ async def _create_task_from_data(
     elif task_type == TaskType.CHATTASK.value:
         return ChatRawTask(**full_task_data)
     elif task_type == TaskType.IMAGETASK.value:
-        image_text_pairs = await get_image_text_pairs(task_id, psql_db, conn)
-        return ImageRawTask(**full_task_data, image_text_pairs=image_text_pairs)
+        return ImageRawTask(**full_task_data, image_text_pairs=image_text_pairs or [])
     elif task_type == TaskType.DPOTASK.value:
         return DpoRawTask(**full_task_data)
     elif task_type == TaskType.GRPOTASK.value:
-        reward_functions = await get_reward_functions(task_id, psql_db, conn)
-        return GrpoRawTask(**full_task_data, reward_functions=reward_functions)
+        return GrpoRawTask(**full_task_data, reward_functions=reward_functions or [])
     elif task_type == TaskType.ENVIRONMENTTASK.value:
         return EnvRawTask(**full_task_data)
 
@@ -1392,6 +1349,23 @@ async def get_image_text_pairs(task_id: UUID, psql_db: PSQLDB, connection: Conne
         return await _get_image_text_pairs(connection)
 
 
+async def get_image_text_pairs_for_tasks(task_ids: list[UUID], connection: Connection) -> dict[UUID, list[ImageTextPair]]:
+    """Fetch the image-text pairs of many tasks in one query, keyed by task id."""
+    query = f"""
+        SELECT {cst.TASK_ID}, {cst.IMAGE_URL}, {cst.TEXT_URL}
+        FROM {cst.IMAGE_TEXT_PAIRS_TABLE}
+        WHERE {cst.TASK_ID} = ANY($1)
+        ORDER BY {cst.TASK_ID}, {cst.ID}
+    """
+    rows = await connection.fetch(query, task_ids)
+    pairs_by_task: dict[UUID, list[ImageTextPair]] = {}
+    for row in rows:
+        pairs_by_task.setdefault(row[cst.TASK_ID], []).append(
+            ImageTextPair(image_url=row["image_url"], text_url=row["text_url"])
+        )
+    return pairs_by_task
+
+
 async def delete_image_text_pairs(task_id: UUID, psql_db: PSQLDB) -> None:
     query = f"""
         DELETE FROM {cst.IMAGE_TEXT_PAIRS_TABLE}
@@ -1470,6 +1444,37 @@ async def get_reward_functions(task_id: UUID, psql_db: PSQLDB, connection: Conne
         return await _get_reward_functions(connection)
 
 
+async def get_reward_functions_for_tasks(task_ids: list[UUID], connection: Connection) -> dict[UUID, list[RewardFunction]]:
+    """Fetch the reward functions of many GRPO tasks in one query, keyed by task id."""
+    query = f"""
+        SELECT
+            gtf.{cst.TASK_ID},
+            rf.{cst.REWARD_ID},
+            rf.{cst.REWARD_FUNC},
+            rf.{cst.FUNC_HASH},
+            rf.{cst.IS_GENERIC},
+            rf.{cst.IS_MANUAL},
+            gtf.{cst.REWARD_WEIGHT}
+        FROM {cst.REWARD_FUNCTIONS_TABLE} rf
+        JOIN {cst.GRPO_TASK_FUNCTIONS_TABLE} gtf ON rf.{cst.REWARD_ID} = gtf.{cst.REWARD_ID}
+        WHERE gtf.{cst.TASK_ID} = ANY($1)
+    """
+    rows = await connection.fetch(query, task_ids)
+    reward_functions_by_task: dict[UUID, list[RewardFunction]] = {}
+    for row in rows:
+        reward_functions_by_task.setdefault(row[cst.TASK_ID], []).append(
+            RewardFunction(
+                reward_id=str(row[cst.REWARD_ID]),
+                reward_func=row[cst.REWARD_FUNC],
+                func_hash=row[cst.FUNC_HASH],
+                is_generic=row[cst.IS_GENERIC],
+                is_manual=row[cst.IS_MANUAL],
+                reward_weight=row[cst.REWARD_WEIGHT],
+            )
+        )
+    return reward_functions_by_task
+
+
 async def get_model_cache_stats(psql_db: PSQLDB, tau_days: float = 10, max_lookup_days: float = 30) -> dict[str, dict]:
     """Get cache statistics for models with time-weighted frequency calculation.
 
@@ -26,6 +26,8 @@ from validator.db.database import PSQLDB
 from validator.db.sql import tasks as task_sql
 from validator.db.sql.submissions_and_scoring import get_all_scores_and_losses_for_task
 from validator.db.sql.submissions_and_scoring import get_task_winners
+from validator.db.task_events import TaskEvent
+from validator.db.task_events import publish_task_event
 from validator.utils.logging import get_logger
 from validator.utils.util import normalise_float
 
@@ -675,6 +677,11 @@ async def add_tournament_task_hotkey_pairs_for_training(assignments: list[TaskTr
 
             logger.info(f"Added {len(assignments)} task training assignments - priorities: {priority_counts}")
 
+        for task_id in {str(assignment.task_id) for assignment in assignments}:
+            await publish_task_event(
+                connection, cst.TRAINING_STATUS_CHANNEL, TaskEvent(task_id=task_id, status=TrainingStatus.PENDING.value)
+            )
+
 
 async def get_tournament_training_tasks(psql_db: PSQLDB, status: TrainingStatus) -> list[TournamentTaskTraining]:
     """
@@ -759,6 +766,11 @@ async def update_tournament_task_training_status(
             params.append(trainer_ip)
         await connection.execute(query, *params)
         logger.info(f"Marked task-hotkey pair ({task_id}, {hotkey}) as {status}")
+        await publish_task_event(
+            connection,
+            cst.TRAINING_STATUS_CHANNEL,
+            TaskEvent(task_id=str(task_id), status=TrainingStatus(status).value, hotkey=hotkey),
+        )
 
 
 async def update_dstack_runname(task_id: str, hotkey: str, runname: str, psql_db: PSQLDB):
@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+import asyncpg
+from asyncpg.connection import Connection
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+import validator.db.constants as cst
+from validator.db.database import PSQLDB
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+TASK_EVENT_CHANNELS = [cst.TASK_STATUS_CHANNEL, cst.TRAINING_STATUS_CHANNEL]
+
+# Set by TaskEventBus when a Redis client is available, so events also reach listeners running on the fallback
+_redis_publisher: Redis | None = None
+
+
+class TaskEvent(BaseModel):
+    task_id: str
+    status: str
+    hotkey: str | None = None  # only set for tournament training-status events
+
+
+async def publish_task_event(connection: Connection, channel: str, event: TaskEvent) -> None:
+    """
+    Notify listeners of a status transition. Call this after the transaction that made the change has
+    committed so woken loops never read the old state. Failures are logged, never raised: the
+    listeners' polling safety net picks the change up anyway.
+    """
+    payload = event.model_dump_json()
+    try:
+        await connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+    except Exception as e:
+        logger.warning(f"Failed to send {channel} notification for task {event.task_id}: {e}")
+
+    if _redis_publisher is not None:
+        try:
+            await _redis_publisher.publish(channel, payload)
+        except Exception as e:
+            logger.warning(f"Failed to publish {channel} event to Redis for task {event.task_id}: {e}")
+
+
+class TaskEventSubscription:
+    """Latches matching events so a loop that is busy when one arrives still wakes on its next wait."""
+
+    def __init__(self, channel: str, statuses: set[str] | None = None):
+        self.channel = channel
+        self.statuses = statuses
+        self._event = asyncio.Event()
+
+    def matches(self, channel: str, event: TaskEvent) -> bool:
+        return channel == self.channel and (self.statuses is None or event.status in self.statuses)
+
+    def wake(self) -> None:
+        self._event.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a matching event or timeout seconds, whichever comes first. Returns True if woken by an event."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            woken = True
+        except asyncio.TimeoutError:
+            woken = False
+        self._event.clear()
+        return woken
+
+
+async def wait_for_task_event(subscription: TaskEventSubscription | None, timeout: float) -> bool:
+    """Loop pacing helper: wake on the subscription if there is one, otherwise just sleep."""
+    if subscription is None:
+        await asyncio.sleep(timeout)
+        return False
+    return await subscription.wait(timeout)
+
+
+class TaskEventBus:
+    """
+    Fans task and training status events out to in-process subscriptions.
+
+    Listens with Postgres LISTEN on a dedicated connection (the pool's connections are shared and recycled),
+    falling back to Redis pub/sub when LISTEN is unavailable, e.g. behind a transaction-pooling proxy.
+    Every subscription is woken once when a listener drops and again once one is back, since events may have been
+    missed in between; while neither backend is reachable the loops fall back to their safety poll interval and
+    reconnects back off.
+    """
+
+    def __init__(self, psql_db: PSQLDB, redis_db: Redis | None = None):
+        global _redis_publisher
+        self.psql_db = psql_db
+        self.redis_db = redis_db
+        self._subscriptions: list[TaskEventSubscription] = []
+        self._runner: asyncio.Task | None = None
+        self._listening = False
+        if redis_db is not None:
+            _redis_publisher = redis_db
+
+    def subscribe(self, channel: str, statuses: set[str] | None = None) -> TaskEventSubscription:
+        subscription = TaskEventSubscription(channel, statuses)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def _dispatch(self, channel: str, payload: str | bytes) -> None:
+        try:
+            event = TaskEvent(**json.loads(payload))
+        except Exception as e:
+            logger.warning(f"Ignoring malformed {channel} event {payload!r}: {e}")
+            return
+        for subscription in self._subscriptions:
+            if subscription.matches(channel, event):
+                subscription.wake()
+
+    def _wake_all(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.wake()
+
+    def _on_notification(self, connection: Connection, pid: int, channel: str, payload: str) -> None:
+        self._dispatch(channel, payload)
+
+    async def _listen_postgres(self) -> None:
+        connection = await asyncpg.connect(self.psql_db.connection_string)
+        terminated = asyncio.Event()
+        connection.add_termination_listener(lambda _: terminated.set())
+        try:
+            for channel in TASK_EVENT_CHANNELS:
+                await connection.add_listener(channel, self._on_notification)
+            logger.info(f"Listening for task events on {TASK_EVENT_CHANNELS} via Postgres")
+            self._listening = True
+            self._wake_all()
+            await terminated.wait()
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    async def _listen_redis(self) -> None:
+        pubsub = self.redis_db.pubsub()
+        try:
+            await pubsub.subscribe(*TASK_EVENT_CHANNELS)
+            logger.info(f"Listening for task events on {TASK_EVENT_CHANNELS} via Redis")
+            self._listening = True
+            self._wake_all()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    channel = message["channel"]
+                    self._dispatch(channel.decode() if isinstance(channel, bytes) else channel, message["data"])
+        finally:
+            await pubsub.aclose()
+
+    async def _run(self) -> None:
+        reconnect_interval = cst.TASK_EVENTS_RECONNECT_INTERVAL
+        while True:
+            self._listening = False
+            try:
+                await self._listen_postgres()
+                logger.warning("Task event Postgres listener disconnected")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.redis_db is None:
+                    logger.warning(f"Postgres LISTEN unavailable, relying on polling: {e}")
+                else:
+                    logger.warning(f"Postgres LISTEN unavailable, falling back to Redis pub/sub: {e}")
+                    try:
+                        await self._listen_redis()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as redis_error:
+                        logger.warning(f"Task event Redis listener failed: {redis_error}")
+
+            if self._listening:
+                # Switching to polling: one catch-up pass now, the safety poll interval paces the loops after that
+                self._wake_all()
+                reconnect_interval = cst.TASK_EVENTS_RECONNECT_INTERVAL
+            await asyncio.sleep(reconnect_interval)
+            if not self._listening:
+                reconnect_interval = min(reconnect_interval * 2, cst.TASK_EVENTS_RECONNECT_MAX_INTERVAL)
@@ -3,6 +3,8 @@ import os
 import re
 import time
 from math import ceil
+from typing import Callable
+from typing import Iterator
 
 import psutil
 import torch
@@ -12,6 +14,7 @@ from accelerate.utils import find_executable_batch_size
 from axolotl.utils.dict import DictDefault
 from datasets import Dataset
 from peft import AutoPeftModelForCausalLM
+from peft import PeftModel
 from transformers import AutoModelForCausalLM
 from transformers import AutoTokenizer
 from transformers import TrainerCallback
@@ -19,7 +22,12 @@ from transformers import TrainerCallback
 from core.config.config_handler import create_dataset_entry
 from validator.core import constants as cst
 from validator.core.models import EvaluationArgs
+from validator.evaluation.reference_cache import ReferenceCache
+from validator.evaluation.reference_cache import base_model_revision
+from validator.evaluation.reference_cache import file_sha256
+from validator.evaluation.reference_cache import reference_cache_key
 from validator.utils.logging import get_logger
+from validator.utils.model_params import count_checkpoint_parameters
 from validator.utils.retry_utils import retry_on_5xx
 
 
@@ -434,44 +442,178 @@ def _load_and_update_evaluation_config(
 
 
 def check_and_log_base_model_size(original_model: str) -> None:
-    """Check if base model size is logged in results, if not load and log it."""
+    """Check if base model size is logged in results, if not count it from the safetensors headers and log it."""
     results_dict = load_results_dict()
 
     if "model_params_count" not in results_dict:
-        logger.info("Base model size not logged, loading base model to calculate size")
-        base_model = load_model(original_model, is_base_model=True)
-        results_dict["model_params_count"] = count_model_parameters(base_model)
+        stats = count_checkpoint_parameters(original_model)
+        if stats:
+            results_dict["model_params_count"] = stats.num_params
+        else:
+            logger.info("No safetensors headers for the base model, loading it to calculate size")
+            base_model = load_model(original_model, is_base_model=True)
+            results_dict["model_params_count"] = count_model_parameters(base_model)
         save_results_dict(results_dict)
         logger.info(f"Logged base model size: {results_dict['model_params_count']} parameters")
     else:
         logger.info(f"Base model size already logged: {results_dict['model_params_count']} parameters")
 
 
+class AdapterDisabledView:
+    """The base model as seen through a peft model, i.e. with the active adapter bypassed."""
+
+    def __init__(self, peft_model: PeftModel):
+        self.peft_model = peft_model
+
+    @property
+    def config(self):
+        return self.peft_model.config
+
+    @property
+    def device(self):
+        return self.peft_model.device
+
+    def eval(self) -> "AdapterDisabledView":
+        self.peft_model.eval()
+        return self
+
+    def __call__(self, *args, **kwargs):
+        with self.peft_model.disable_adapter():
+            return self.peft_model(*args, **kwargs)
+
+
+# Model types whose forward turns the backbone's last hidden states into logits with the output embedding alone;
+# any other model (e.g. Granite's logits_scaling, Gemma 2's soft-capping) computes its full logits through forward
+_PLAIN_HEAD_MODEL_TYPES = {
+    "gemma",
+    "gpt2",
+    "gpt_neox",
+    "llama",
+    "mistral",
+    "mixtral",
+    "phi",
+    "phi3",
+    "qwen2",
+    "qwen2_moe",
+    "qwen3",
+    "qwen3_moe",
+    "starcoder2",
+}
+
+
+def _hidden_states_and_head(
+    model: AutoModelForCausalLM, inputs: dict[str, torch.Tensor]
+) -> tuple[torch.Tensor, Callable[[torch.Tensor], torch.Tensor]]:
+    """
+    Final hidden states and the output head that turns them into logits, so logits can be produced a few
+    positions at a time instead of for the whole (batch, sequence, vocab) block. Models not known to have a
+    plain projection head return their logits with an identity head.
+    """
+    if isinstance(model, AdapterDisabledView):
+        with model.peft_model.disable_adapter():
+            hidden_states, head = _hidden_states_and_head(model.peft_model, inputs)
+
+        def disabled_adapter_head(chunk: torch.Tensor) -> torch.Tensor:
+            with model.peft_model.disable_adapter():
+                return head(chunk)
+
+        return hidden_states, disabled_adapter_head
+
+    causal_lm = model.get_base_model() if isinstance(model, PeftModel) else model
+    head = causal_lm.get_output_embeddings()
+    backbone = getattr(causal_lm, causal_lm.base_model_prefix, None)
+    config = causal_lm.config
+    if (
+        head is None
+        or backbone is None
+        or config.model_type not in _PLAIN_HEAD_MODEL_TYPES
+        or getattr(config, "final_logit_softcapping", None)
+        or getattr(config, "logit_scale", None)
+        or getattr(config, "logits_scaling", 1) != 1
+    ):
+        return model(**inputs).logits, lambda chunk: chunk
+    return backbone(**inputs)[0], head
+
+
+def _log_prob_chunks(
+    hidden_states: torch.Tensor, head: Callable[[torch.Tensor], torch.Tensor], chunk_size: int
+) -> Iterator[tuple[int, torch.Tensor]]:
+    """Yield (start position, float32 log-probs of positions start:start + chunk_size)."""
+    for start in range(0, hidden_states.shape[1], chunk_size):
+        yield start, F.log_softmax(head(hidden_states[:, start : start + chunk_size]).float(), dim=-1)
+
+
+def _top_k_kl_per_position(reference_log_probs: torch.Tensor, top_indices: torch.Tensor, log_probs: torch.Tensor) -> torch.Tensor:
+    """
+    KL(original || finetuned) per position over the original's top-k tokens plus a single bucket for the
+    remaining probability mass. This is the exact KL of the coarsened distributions, so it never exceeds
+    the full-vocabulary KL; the gap is tail_mass * KL of the two distributions restricted to the tail,
+    and vanishes as the tail mass goes to zero.
+    """
+    finetuned_top = log_probs.gather(-1, top_indices.long())
+    reference_probs = reference_log_probs.exp()
+    kl = (reference_probs * (reference_log_probs - finetuned_top)).sum(dim=-1)
+
+    reference_tail = (1 - reference_probs.sum(dim=-1)).clamp_min(0)
+    finetuned_tail = (1 - finetuned_top.exp().sum(dim=-1)).clamp_min(torch.finfo(log_probs.dtype).tiny)
+    tail_kl = torch.where(
+        reference_tail > 0,
+        reference_tail * (reference_tail.clamp_min(torch.finfo(log_probs.dtype).tiny).log() - finetuned_tail.log()),
+        torch.zeros_like(reference_tail),
+    )
+    return kl + tail_kl
+
+
+def _kl_max_length(finetuned_model: AutoModelForCausalLM) -> int:
+    # Calculate max_length using same logic as GRPO evaluation
+    max_length = cst.GRPO_KL_SEQUENCE_LENGTH
+    max_embeddings = getattr(finetuned_model.config, "max_position_embeddings", None)
+    if max_embeddings and max_embeddings < 2 * max_length:
+        max_length = ceil(max_embeddings / 2)
+    return max_length
+
+
+def _tokenize_kl_prompts(tokenizer: AutoTokenizer, prompts: list[str], max_length: int, device) -> dict[str, torch.Tensor]:
+    # Right padding keeps every real token at the same position whatever the batch, so per-position
+    # outputs line up between the reference pass and the policy pass
+    padding_side = tokenizer.padding_side
+    tokenizer.padding_side = "right"
+    try:
+        inputs = tokenizer(prompts, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+    finally:
+        tokenizer.padding_side = padding_side
+    return {k: v.to(device) for k, v in inputs.items()}
+
+
 def calculate_kl_divergence(
     original_model: AutoModelForCausalLM,
     finetuned_model: AutoModelForCausalLM,
     dataset: Dataset,
     tokenizer: AutoTokenizer,
+    top_k: int | None = None,
+    chunk_size: int = cst.GRPO_KL_CHUNK_SIZE,
 ) -> float:
     """
     Calculate KL divergence between original and finetuned model outputs on a dataset.
 
+    Logits are produced from the final hidden states chunk_size positions at a time and reduced straight
+    into per-sample sums, so peak memory no longer grows with vocabulary size times sequence length.
+
     Args:
         original_model: The original/base model
         finetuned_model: The finetuned model
         dataset: Dataset to evaluate on
         tokenizer: Tokenizer for text processing
+        top_k: If set, approximate with the original model's top_k tokens plus one bucket for the rest of
+            the mass (see _top_k_kl_per_position); this is a lower bound on the exact value
+        chunk_size: Number of sequence positions turned into logits at once
 
     Returns:
         Average KL divergence across the dataset
     """
     logger.info("Starting KL divergence calculation...")
 
-    # Calculate max_length using same logic as GRPO evaluation
-    max_length = cst.GRPO_KL_SEQUENCE_LENGTH
-    max_embeddings = getattr(finetuned_model.config, "max_position_embeddings", None)
-    if max_embeddings and max_embeddings < 2 * max_length:
-        max_length = ceil(max_embeddings / 2)
+    max_length = _kl_max_length(finetuned_model)
 
     original_model.eval()
     finetuned_model.eval()
@@ -489,30 +631,33 @@ def calculate_kl_divergence(
             prompts = batch[cst.TRL_GRPO_FIELD_PROMPT]
 
             try:
-                inputs = tokenizer(prompts, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
-                inputs = {k: v.cuda() for k, v in inputs.items()}
+                inputs = _tokenize_kl_prompts(tokenizer, prompts, max_length, finetuned_model.device)
             except Exception as e:
                 logger.warning(f"Failed to tokenize batch starting at index {i}: {e}")
                 continue
 
             with torch.no_grad():
                 try:
-                    # Get logits from both models
-                    original_outputs = original_model(**inputs)
-                    finetuned_outputs = finetuned_model(**inputs)
-
-                    original_logits = original_outputs.logits
-                    finetuned_logits = finetuned_outputs.logits
-
-                    # Convert logits to probabilities
-                    original_probs = F.softmax(original_logits, dim=-1)
-                    finetuned_log_probs = F.log_softmax(finetuned_logits, dim=-1)
-
-                    # Calculate KL divergence: KL(original || finetuned)
-                    kl_div = F.kl_div(finetuned_log_probs, original_probs, reduction="none")
-
-                    # Average over sequence length and vocabulary, sum over batch
-                    batch_kl = kl_div.sum(dim=-1).mean(dim=-1).sum().item()
+                    original_hidden, original_head = _hidden_states_and_head(original_model, inputs)
+                    finetuned_hidden, finetuned_head = _hidden_states_and_head(finetuned_model, inputs)
+                    mask = inputs["attention_mask"].to(original_hidden.device, torch.float32)
+
+                    sample_kl = torch.zeros(len(prompts), device=original_hidden.device)
+                    for (start, original_log_probs), (_, finetuned_log_probs) in zip(
+                        _log_prob_chunks(original_hidden, original_head, chunk_size),
+                        _log_prob_chunks(finetuned_hidden, finetuned_head, chunk_size),
+                    ):
+                        finetuned_log_probs = finetuned_log_probs.to(original_log_probs.device)
+                        if top_k:
+                            top_values, top_indices = original_log_probs.topk(top_k, dim=-1)
+                            position_kl = _top_k_kl_per_position(top_values, top_indices, finetuned_log_probs)
+                        else:
+                            # KL(original || finetuned)
+                            position_kl = F.kl_div(finetuned_log_probs, original_log_probs.exp(), reduction="none").sum(dim=-1)
+                        sample_kl += (position_kl * mask[:, start : start + chunk_size]).sum(dim=-1)
+
+                    # Average over sequence length, sum over batch
+                    batch_kl = (sample_kl / mask.sum(dim=-1).clamp_min(1)).sum().item()
 
                     total_kl_div += batch_kl
                     total_samples += len(prompts)
@@ -523,8 +668,6 @@ def calculate_kl_divergence(
                 except Exception as e:
                     logger.warning(f"Failed to compute KL divergence for batch starting at index {i}: {e}")
                     continue
-                finally:
-                    torch.cuda.empty_cache()
 
         if total_samples == 0:
             logger.error("No samples were successfully processed for KL divergence calculation")
@@ -536,3 +679,184 @@ def calculate_kl_divergence(
         return avg_kl_div
 
     return calculate_kl_with_batch_size()
+
+
+def compute_reference_top_k_logprobs(
+    original_model: AutoModelForCausalLM,
+    dataset: Dataset,
+    tokenizer: AutoTokenizer,
+    max_length: int,
+    top_k: int | None = None,
+    chunk_size: int = cst.GRPO_KL_CHUNK_SIZE,
+) -> dict[str, torch.Tensor]:
+    """
+    Top-k log-probabilities of the original model at every prompt position, flattened over the dataset. With top_k
+    None the whole vocabulary is kept, so the KL computed from it is exact.
+
+    Returns:
+        {"values": (tokens, top_k) float32, "indices": (tokens, top_k) int32, "lengths": (samples,) int64};
+        a sample that can't be processed has length 0 and is skipped by the KL computation
+    """
+    logger.info(f"Computing top-{top_k or 'all'} reference log-probs over {len(dataset)} samples")
+    original_model.eval()
+
+    @find_executable_batch_size(starting_batch_size=cst.GRPO_KL_BATCH_SIZE)
+    def compute_with_batch_size(batch_size):
+        values, indices, lengths = [], [], []
+        for i in range(0, len(dataset), batch_size):
+            prompts = dataset[i : i + batch_size][cst.TRL_GRPO_FIELD_PROMPT]
+            try:
+                inputs = _tokenize_kl_prompts(tokenizer, prompts, max_length, original_model.device)
+                with torch.no_grad():
+                    hidden_states, head = _hidden_states_and_head(original_model, inputs)
+                    top_chunks = [
+                        log_probs.topk(top_k or log_probs.shape[-1], dim=-1)
+                        for _, log_probs in _log_prob_chunks(hidden_states, head, chunk_size)
+                    ]
+                top_values = torch.cat([chunk.values for chunk in top_chunks], dim=1)
+                top_indices = torch.cat([chunk.indices for chunk in top_chunks], dim=1)
+            except torch.cuda.OutOfMemoryError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to compute reference log-probs for batch starting at index {i}: {e}")
+                lengths.extend([0] * len(prompts))
+                continue
+
+            for row, length in enumerate(inputs["attention_mask"].sum(dim=-1).tolist()):
+                values.append(top_values[row, :length].cpu())
+                indices.append(top_indices[row, :length].to(torch.int32).cpu())
+                lengths.append(length)
+        return values, indices, lengths
+
+    values, indices, lengths = compute_with_batch_size()
+    if not values:
+        raise ValueError("No samples were successfully processed for reference log-probs")
+    return {
+        "values": torch.cat(values),
+        "indices": torch.cat(indices),
+        "lengths": torch.tensor(lengths, dtype=torch.int64),
+    }
+
+
+def calculate_kl_divergence_from_reference(
+    finetuned_model: AutoModelForCausalLM,
+    dataset: Dataset,
+    tokenizer: AutoTokenizer,
+    reference: dict[str, torch.Tensor],
+    max_length: int,
+    top_k: int | None = None,
+    chunk_size: int = cst.GRPO_KL_CHUNK_SIZE,
+) -> float:
+    """
+    Average per-sample KL divergence of finetuned_model against cached top-k reference log-probs. top_k uses only
+    the most likely top_k of the cached tokens; None uses all of them, which is the exact KL for a reference
+    computed with top_k None.
+    """
+    finetuned_model.eval()
+    width = reference["values"].shape[-1] if top_k is None else min(top_k, reference["values"].shape[-1])
+    lengths = reference["lengths"].tolist()
+    offsets = [0]
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    if len(lengths) != len(dataset):
+        raise ValueError(f"Reference log-probs cover {len(lengths)} samples, dataset has {len(dataset)}")
+
+    @find_executable_batch_size(starting_batch_size=cst.GRPO_KL_BATCH_SIZE)
+    def calculate_kl_with_batch_size(batch_size):
+        total_kl_div = 0.0
+        total_samples = 0
+        for i in range(0, len(dataset), batch_size):
+            sample_ids = [j for j in range(i, min(i + batch_size, len(dataset))) if lengths[j] > 0]
+            if not sample_ids:
+                continue
+            prompts = [dataset[j][cst.TRL_GRPO_FIELD_PROMPT] for j in sample_ids]
+            try:
+                inputs = _tokenize_kl_prompts(tokenizer, prompts, max_length, finetuned_model.device)
+                with torch.no_grad():
+                    hidden_states, head = _hidden_states_and_head(finetuned_model, inputs)
+            except torch.cuda.OutOfMemoryError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to compute KL divergence for batch starting at index {i}: {e}")
+                continue
+
+            sequence_length = hidden_states.shape[1]
+            mask = inputs["attention_mask"].to(hidden_states.device, torch.float32)
+            reference_values = torch.zeros(len(sample_ids), sequence_length, width)
+            reference_indices = torch.zeros(len(sample_ids), sequence_length, width, dtype=torch.int32)
+            for row, j in enumerate(sample_ids):
+                length = lengths[j]
+                if int(mask[row].sum()) != length:
+                    raise ValueError(f"Sample {j} tokenizes differently from the cached reference")
+                # topk sorts by probability, so the first width entries are the most likely tokens
+                reference_values[row, :length] = reference["values"][offsets[j] : offsets[j] + length, :width]
+                reference_indices[row, :length] = reference["indices"][offsets[j] : offsets[j] + length, :width]
+            reference_values = reference_values.to(hidden_states.device)
+            reference_indices = reference_indices.to(hidden_states.device)
+
+            sample_kl = torch.zeros(len(sample_ids), device=hidden_states.device)
+            with torch.no_grad():
+                for start, log_probs in _log_prob_chunks(hidden_states, head, chunk_size):
+                    end = start + log_probs.shape[1]
+                    position_kl = _top_k_kl_per_position(
+                        reference_values[:, start:end], reference_indices[:, start:end], log_probs.to(hidden_states.device)
+                    )
+                    sample_kl += (position_kl * mask[:, start:end]).sum(dim=-1)
+            total_kl_div += (sample_kl / mask.sum(dim=-1)).sum().item()
+            total_samples += len(sample_ids)
+
+            if (i // batch_size) % 10 == 0 and total_samples:
+                logger.info(f"Processed {i + batch_size} samples, running KL: {total_kl_div / total_samples:.6f}")
+
+        if total_samples == 0:
+            raise ValueError("No samples were successfully processed for KL divergence calculation")
+        return total_kl_div / total_samples
+
+    avg_kl_div = calculate_kl_with_batch_size()
+    logger.info(f"KL divergence calculation completed. Average KL divergence: {avg_kl_div:.6f}")
+    return avg_kl_div
+
+
+def calculate_cached_kl_divergence(
+    finetuned_model: AutoModelForCausalLM,
+    dataset: Dataset,
+    tokenizer: AutoTokenizer,
+    load_original_model: Callable[[], AutoModelForCausalLM],
+    original_model_name: str,
+    dataset_path: str,
+    local_files_only: bool = False,
+    top_k: int | None = cst.GRPO_KL_REFERENCE_TOP_K,
+) -> float:
+    """
+    KL divergence against top-k original model log-probs that are computed once per task and then read from
+    the reference cache, so later repos only run the finetuned model. load_original_model is only called on
+    a cache miss. With top_k None the exact KL is computed against a freshly loaded original model.
+    """
+    if top_k is None:
+        original_model = load_original_model()
+        kl_divergence = calculate_kl_divergence(original_model, finetuned_model, dataset, tokenizer)
+        del original_model
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return kl_divergence
+
+    max_length = _kl_max_length(finetuned_model)
+    key = reference_cache_key(
+        "kl_top_k",
+        base_model_revision(original_model_name, local_files_only=local_files_only),
+        file_sha256(dataset_path),
+        tokenizer,
+        max_length,
+        top_k=top_k,
+    )
+    reference_cache = ReferenceCache()
+    with reference_cache.lock(key):
+        reference = reference_cache.load(key)
+        if reference is None:
+            original_model = load_original_model()
+            reference_cache.save(key, compute_reference_top_k_logprobs(original_model, dataset, tokenizer, max_length, top_k))
+            del original_model
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            reference = reference_cache.load(key)
+    return calculate_kl_divergence_from_reference(finetuned_model, dataset, tokenizer, reference, max_length, top_k)
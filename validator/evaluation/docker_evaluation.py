@@ -4,13 +4,12 @@ import json
 import os
 import shutil
 import tarfile
+import tempfile
 
 import docker
 from docker.models.containers import Container
 from docker.types import Mount
 from huggingface_hub import snapshot_download
-import requests
-import time
 import random
 from core import constants as cst
 from core.models.payload_models import DockerEvaluationResults
@@ -25,10 +24,17 @@ from core.models.utility_models import ImageModelType
 from core.models.utility_models import InstructTextDatasetType
 from core.utils import download_s3_file
 from validator.core import constants as vcst
+from validator.cycle.util_functions import get_gpus_required_for_params
+from validator.evaluation.environment_episodes import load_lora_adapter
+from validator.evaluation.environment_episodes import run_environment_episodes
+from validator.evaluation.environment_episodes import unload_lora_adapter
 from validator.tasks.task_prep import unzip_to_temp_path
 from validator.utils.logging import get_all_context_tags
 from validator.utils.logging import get_logger
+from validator.utils.model_params import count_checkpoint_parameters
 from validator.utils.logging import stream_container_logs
+from validator.utils.readiness import http_probe
+from validator.utils.readiness import wait_until_ready
 
 
 logger = get_logger(__name__)
@@ -282,6 +288,79 @@ async def run_evaluation_docker_text(
         client.close()
 
 
+def _estimate_num_params_from_snapshot(model_path: str) -> int | None:
+    """Parameter count of the snapshot, read from its safetensors headers."""
+    try:
+        stats = count_checkpoint_parameters(model_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read safetensors headers in {model_path}: {e}")
+        return None
+    return stats.num_params if stats else None
+
+
+def _split_gpus_for_grpo_repos(gpu_ids: list[int], num_params: int | None, num_repos: int) -> list[list[int]]:
+    """
+    Split the task's GPU allocation into disjoint subsets, each big enough for one GRPO eval container.
+
+    Falls back to a single subset holding every GPU when the model size is unknown.
+    """
+    if not num_params or num_repos < 2:
+        return [gpu_ids]
+    gpus_per_repo = get_gpus_required_for_params(num_params * vcst.GRPO_EVAL_PER_REPO_PARAM_MULTIPLIER)
+    if gpus_per_repo >= len(gpu_ids):
+        return [gpu_ids]
+    num_subsets = min(len(gpu_ids) // gpus_per_repo, num_repos)
+    return [gpu_ids[i * gpus_per_repo : (i + 1) * gpus_per_repo] for i in range(num_subsets)]
+
+
+async def _run_grpo_repo_container(
+    repo: str,
+    gpu_subset: list[int],
+    command: list[str],
+    environment: dict,
+    volume_bindings: dict,
+) -> tuple[dict | str, int | None]:
+    """Run one GRPO eval container and return (repo result or error string, base model params count)."""
+    client = docker.from_env()
+    container = None
+    try:
+        container: Container = await asyncio.to_thread(
+            client.containers.run,
+            cst.VALIDATOR_DOCKER_IMAGE,
+            command=command,
+            environment=environment,
+            volumes=volume_bindings,
+            runtime="nvidia",
+            device_requests=[docker.types.DeviceRequest(capabilities=[["gpu"]], device_ids=[str(gid) for gid in gpu_subset])],
+            detach=True,
+            network_mode="none",
+        )
+
+        log_context = {**get_all_context_tags(), "repo": repo}
+        log_task = asyncio.create_task(asyncio.to_thread(stream_container_logs, container, None, log_context))
+        result = await asyncio.to_thread(container.wait)
+        log_task.cancel()
+
+        if result["StatusCode"] != 0:
+            logger.error(f"Container for {repo} exited with non-zero status: {result['StatusCode']}")
+            return f"Container for {repo} exited with status {result['StatusCode']}", None
+
+        eval_results = await get_evaluation_results(container)
+        return eval_results[repo], eval_results.get("model_params_count")
+
+    except Exception as e:
+        logger.error(f"Failed to evaluate repo {repo}: {str(e)}", exc_info=True)
+        return str(e), None
+
+    finally:
+        try:
+            if container is not None:
+                await asyncio.to_thread(container.remove, force=True)
+        except Exception as e:
+            logger.info(f"Problem with cleaning up container for {repo}: {e}")
+        client.close()
+
+
 async def run_evaluation_docker_grpo(
     dataset: str,
     models: list[str],
@@ -292,7 +371,10 @@ async def run_evaluation_docker_grpo(
 ) -> DockerEvaluationResults:
     """
     Run GRPO evaluation with separate containers for each model repo.
-    This approach launches one container per repo and merges results.
+
+    The GPU allocation is split into disjoint subsets sized for one repo each, and repos run
+    concurrently on those subsets. Repo downloads are prefetched in parallel so later repos are
+    usually local by the time a subset frees up. Results are merged before normalisation.
     """
     logger.info(f"Downloading original GRPO model: {original_model}")
     cache_dir = os.path.expanduser(cst.CACHE_DIR_HUB)
@@ -320,6 +402,8 @@ async def run_evaluation_docker_grpo(
         "HF_DATASETS_CACHE": "/root/.cache/huggingface/datasets",
     }
 
+    # Shared by the repo containers so the reference log-probs for the KL term are computed once per task
+    reference_cache_dir = tempfile.mkdtemp(prefix="grpo_reference_cache_")
     volume_bindings = {
         dataset_dir: {
             "bind": "/workspace/input_data",
@@ -328,75 +412,185 @@ async def run_evaluation_docker_grpo(
         os.path.expanduser(cst.CACHE_DIR_HUB): {
             "bind": "/root/.cache/huggingface/hub",
             "mode": "rw",
-        }
+        },
+        reference_cache_dir: {
+            "bind": vcst.EVAL_REFERENCE_CACHE_DIR,
+            "mode": "rw",
+        },
     }
 
-    logger.info(f"Starting sequential GRPO evaluation for {len(models)} repos: {models}")
+    num_params = await asyncio.to_thread(_estimate_num_params_from_snapshot, original_model_path)
+    gpu_subsets = _split_gpus_for_grpo_repos(gpu_ids, num_params, len(models))
+    logger.info(f"Starting GRPO evaluation for {len(models)} repos on GPU subsets {gpu_subsets}: {models}")
 
-    evaluation_results = {}
-    for repo in models:
-        client = docker.from_env()
-        environment = base_environment.copy()
-        environment["MODELS"] = repo
-        try:
-            model_path = await asyncio.to_thread(
+    free_gpu_subsets = asyncio.Queue()
+    for gpu_subset in gpu_subsets:
+        free_gpu_subsets.put_nowait(gpu_subset)
+    download_semaphore = asyncio.Semaphore(vcst.GRPO_EVAL_MAX_CONCURRENT_DOWNLOADS)
+
+    async def download_repo(repo: str) -> str:
+        async with download_semaphore:
+            return await asyncio.to_thread(
                 snapshot_download,
                 repo_id=repo,
                 cache_dir=cache_dir,
                 ignore_patterns=["*.h5", "*.ot", "*.msgpack", "*.pkl", "*.pth"]
             )
 
+    # Start every download now so they overlap with the evaluation of earlier repos
+    downloads = {repo: asyncio.create_task(download_repo(repo)) for repo in models}
+
+    async def evaluate_repo(repo: str) -> tuple[dict | str, int | None]:
+        try:
+            await downloads[repo]
         except Exception as e:
             logger.error(f"Failed to download {repo}: {str(e)}")
-            evaluation_results[repo] = f"Failed to download model: {str(e)}"
-            continue
+            return f"Failed to download model: {str(e)}", None
 
-        container = None  # Initialize container variable
+        gpu_subset = await free_gpu_subsets.get()
         try:
+            logger.info(f"Evaluating {repo} on GPUs {gpu_subset}")
+            environment = {**base_environment, "MODELS": repo}
+            return await _run_grpo_repo_container(repo, gpu_subset, command, environment, volume_bindings)
+        finally:
+            free_gpu_subsets.put_nowait(gpu_subset)
 
-            container: Container = await asyncio.to_thread(
-                client.containers.run,
-                cst.VALIDATOR_DOCKER_IMAGE,
-                command=command,
-                environment=environment,
-                volumes=volume_bindings,
-                runtime="nvidia",
-                device_requests=[docker.types.DeviceRequest(capabilities=[["gpu"]], device_ids=[str(gid) for gid in gpu_ids])],
-                detach=True,
-                network_mode="none",
-            )
+    try:
+        repo_outcomes = await asyncio.gather(*[evaluate_repo(repo) for repo in models])
+    finally:
+        await asyncio.to_thread(shutil.rmtree, reference_cache_dir, ignore_errors=True)
 
-            log_task = asyncio.create_task(asyncio.to_thread(stream_container_logs, container, None, get_all_context_tags()))
-            result = await asyncio.to_thread(container.wait)
-            log_task.cancel()
+    evaluation_results = {}
+    for repo, (repo_result, model_params_count) in zip(models, repo_outcomes):
+        evaluation_results[repo] = repo_result
+        if model_params_count is not None and "model_params_count" not in evaluation_results:
+            evaluation_results["model_params_count"] = model_params_count
 
-            if result["StatusCode"] != 0:
+    # Prune once at the end - pruning per repo could remove a finished container another repo is still reading
+    client = docker.from_env()
+    try:
+        await cleanup_resources(client)
+    finally:
+        client.close()
 
-                logger.error(f"Container for {repo} exited with non-zero status: {result['StatusCode']}")
-                evaluation_results[repo] = f"Container for {repo} exited with status {result['StatusCode']}"
+    evaluation_results = normalize_rewards_and_compute_loss(evaluation_results)
+    logger.info(f"Grpo evaluation results post normalization: {evaluation_results}")
+    return process_evaluation_results(evaluation_results, is_image=False)
 
-            else:
-                eval_results = await get_evaluation_results(container)
-                evaluation_results[repo] = eval_results[repo]
-                if "model_params_count" in eval_results and "model_params_count" not in evaluation_results:
-                    evaluation_results["model_params_count"] = eval_results["model_params_count"]
 
-        except Exception as e:
-            logger.error(f"Failed to evaluate repo {repo}: {str(e)}", exc_info=True)
-            evaluation_results[repo] = str(e)
+ENV_EVAL_VLLM_HOST_PORT = 53421
+ENV_EVAL_AGENT_HOST_PORT = 53422
+# AgentGym servers answer GET / once the app has started, the published port accepts connections before that
+ENV_EVAL_AGENT_READY_PATH = "/"
+ENV_EVAL_NETWORK = "agent_eval_net"
+ENV_EVAL_VLLM_CONTAINER_NAME = "vllm-server"
+
+
+def _score_environment_episodes(all_results: list[dict]) -> dict:
+    total_score = sum(result["score"] for result in all_results)
+    total_time = sum(result["time"] for result in all_results)
+    avg_score = total_score / len(all_results) if all_results else 0
+    logger.info(f"Calculated average score of model to be: {avg_score}")
+    avg_time = total_time / len(all_results) if all_results else 0
+    logger.info(f"Calculated average time of model to be: {avg_time}")
+    return {
+        'is_finetune': True,
+        'eval_loss': avg_score
+    }
 
-        finally:
-            try:
-                if container is not None:
-                    await asyncio.to_thread(container.remove, force=True)
-                await cleanup_resources(client)
-            except Exception as e:
-                logger.info(f"Problem with cleaning up container for {repo}: {e}")
-            client.close()
 
-    evaluation_results = normalize_rewards_and_compute_loss(evaluation_results)
-    logger.info(f"Grpo evaluation results post normalization: {evaluation_results}")
-    return process_evaluation_results(evaluation_results, is_image=False)
+async def _start_environment_eval_servers(
+    client: docker.DockerClient,
+    vllm_command: str,
+    vllm_environment: dict,
+    volume_bindings: dict,
+    gpu_ids: list[int],
+    environment_server_image: str,
+    agent_container_names: list[str],
+    log_tag: str,
+    containers: dict,
+    log_tasks: list,
+) -> None:
+    """Start the vLLM server and AgentGym replicas, registering them in containers/log_tasks as they come up."""
+    # Pre-cleanup: Ensure names are free to prevent "Conflict" errors
+    for container_name in [ENV_EVAL_VLLM_CONTAINER_NAME, *agent_container_names]:
+        try: await asyncio.to_thread(lambda name=container_name: client.containers.get(name).remove(force=True))
+        except: pass
+
+    # Docker Network Setup
+    networks = await asyncio.to_thread(client.networks.list, names=[ENV_EVAL_NETWORK])
+    if not networks: await asyncio.to_thread(client.networks.create, ENV_EVAL_NETWORK, driver="bridge")
+
+    logger.info(f"Starting vLLM: {vllm_command}")
+    vllm_container: Container = await asyncio.to_thread(
+        client.containers.run,
+        "vllm/vllm-openai:latest",
+        name=ENV_EVAL_VLLM_CONTAINER_NAME,
+        command=vllm_command,
+        environment=vllm_environment,
+        volumes=volume_bindings,
+        runtime="nvidia",
+        device_requests=[docker.types.DeviceRequest(capabilities=[["gpu"]], device_ids=[str(gid) for gid in gpu_ids])],
+        detach=True,
+        network=ENV_EVAL_NETWORK,
+        ports={'8000/tcp': ENV_EVAL_VLLM_HOST_PORT},
+    )
+    containers['vllm'] = vllm_container
+    vllm_log_context = {**get_all_context_tags(), "container_type": "vllm", "repo": log_tag}
+    log_tasks.append(asyncio.create_task(asyncio.to_thread(stream_container_logs, vllm_container, None, vllm_log_context)))
+
+    logger.info(f"Starting {len(agent_container_names)} AgentGym Server(s)...")
+    for replica, agent_container_name in enumerate(agent_container_names):
+        environment_container: Container = await asyncio.to_thread(
+            client.containers.run,
+            environment_server_image,
+            name=agent_container_name,
+            detach=True,
+            network=ENV_EVAL_NETWORK,
+            ports={'8000/tcp': ENV_EVAL_AGENT_HOST_PORT + replica}
+        )
+        containers[agent_container_name] = environment_container
+        agent_log_context = {**get_all_context_tags(), "container_type": "agentgym", "repo": log_tag}
+        log_tasks.append(
+            asyncio.create_task(asyncio.to_thread(stream_container_logs, environment_container, None, agent_log_context))
+        )
+
+
+async def _wait_for_environment_eval_servers(containers: dict, agent_container_names: list[str]) -> None:
+    """Wait for vLLM and every AgentGym replica concurrently, failing fast if any of them dies."""
+    await asyncio.gather(
+        wait_until_ready(
+            http_probe(f"http://localhost:{ENV_EVAL_VLLM_HOST_PORT}/v1/models"),
+            name="vllm",
+            container=containers['vllm'],
+            timeout=vcst.ENV_EVAL_VLLM_READY_TIMEOUT,
+        ),
+        *[
+            wait_until_ready(
+                http_probe(f"http://localhost:{ENV_EVAL_AGENT_HOST_PORT + replica}{ENV_EVAL_AGENT_READY_PATH}"),
+                name=agent_container_name,
+                container=containers[agent_container_name],
+                timeout=vcst.ENV_EVAL_AGENT_READY_TIMEOUT,
+            )
+            for replica, agent_container_name in enumerate(agent_container_names)
+        ],
+    )
+
+
+async def _ensure_container_running(container: Container) -> None:
+    await asyncio.to_thread(container.reload)
+    if container.status != "running":
+        raise Exception(f"Container {container.name} is no longer running (status: {container.status})")
+
+
+async def _stop_environment_eval_servers(client: docker.DockerClient, containers: dict, log_tasks: list) -> None:
+    for log_task in log_tasks:
+        log_task.cancel()
+
+    for c in containers.values():
+        try: await asyncio.to_thread(c.remove, force=True)
+        except: pass
+    client.close()
 
 
 async def run_evaluation_docker_environment(
@@ -407,31 +601,16 @@ async def run_evaluation_docker_environment(
     file_format: FileFormat,
     gpu_ids: list[int],
     num_eval_samples: int,
+    shared_vllm: bool = vcst.ENV_EVAL_SHARED_VLLM,
 ) -> DockerEvaluationResults:
     """
-    Run environment evaluation with separate containers for each model repo.
-    This approach launches one container per repo and merges results.
-    """
-
-    VLLM_HOST_PORT = 53421
-    AGENT_HOST_PORT = 53422
+    Run environment evaluation for each model repo against a vLLM server and AgentGym server(s).
 
-    dataset_type_str = dataset_type.model_dump_json()
-    dataset_filename = os.path.basename(dataset)
+    With shared_vllm, vLLM and AgentGym are started once for the whole task and every repo is
+    hot-swapped in as a runtime LoRA adapter. Otherwise both are restarted for every repo.
+    """
     dataset_dir = os.path.dirname(os.path.abspath(dataset))
 
-    # Shared environment settings
-    base_environment = {
-        "DATASET": f"/workspace/input_data/{dataset_filename}",
-        "ORIGINAL_MODEL": original_model,
-        "DATASET_TYPE": dataset_type_str,
-        "FILE_FORMAT": file_format.value,
-        "TRANSFORMERS_ALLOW_TORCH_LOAD": "true",
-        "HF_HOME": "/root/.cache/huggingface",
-        "TRANSFORMERS_CACHE": "/root/.cache/huggingface/hub",
-        "HF_DATASETS_CACHE": "/root/.cache/huggingface/datasets",
-    }
-
     volume_bindings = {
         dataset_dir: {
             "bind": "/workspace/input_data",
@@ -443,159 +622,105 @@ async def run_evaluation_docker_environment(
         }
     }
 
-    logger.info(f"Starting sequential environment evaluation for {len(models)} repos: {models}")
-
     environment_server_image = ""
     if dataset_type.environment_name == "alfworld":
         environment_server_image = "affinefoundation/agentgym:alfworld"
 
-    evaluation_results = {}
-    for repo in models:
+    agent_container_names = [
+        "agent-server" if replica == 0 else f"agent-server-{replica}"
+        for replica in range(max(1, vcst.ENV_EVAL_NUM_AGENT_REPLICAS))
+    ]
+    agent_base_urls = [f"http://localhost:{ENV_EVAL_AGENT_HOST_PORT + replica}" for replica in range(len(agent_container_names))]
+    vllm_url = f"http://localhost:{ENV_EVAL_VLLM_HOST_PORT}"
+    base_vllm_command = f"--model {original_model} --enable-lora --max-lora-rank 256 --port 8000 --trust-remote-code"
+
+    DATA_LEN_RANGE = 2500
+    random.seed(42)
+    eval_list = random.sample(range(1, DATA_LEN_RANGE + 1), num_eval_samples)
+
+    async def run_episodes_for(model_name: str) -> list[dict]:
+        return await run_environment_episodes(
+            agent_base_urls=agent_base_urls,
+            model_name=model_name,
+            vllm_base_url=f"http://{ENV_EVAL_VLLM_CONTAINER_NAME}:8000/v1",
+            task_ids=eval_list,
+            max_concurrent_episodes=vcst.ENV_EVAL_MAX_CONCURRENT_EPISODES,
+            episode_timeout=vcst.ENV_EVAL_EPISODE_TIMEOUT,
+        )
 
+    evaluation_results = {}
+    if shared_vllm:
+        logger.info(f"Starting shared-vLLM environment evaluation for {len(models)} repos: {models}")
         client = docker.from_env()
-        environment = base_environment.copy()
-        environment["MODELS"] = repo
-
         containers = {}
-        all_results = []
-        vllm_log_task = None
-        agent_log_task = None
-
-        # Pre-cleanup: Ensure names are free to prevent "Conflict" errors
-        try: client.containers.get("vllm-server").remove(force=True)
-        except: pass
-        try: client.containers.get("agent-server").remove(force=True)
-        except: pass
-
-        # Start VLLM server for model inference
+        log_tasks = []
         try:
-            # Docker Network Setup
-            networks = client.networks.list(names=["agent_eval_net"])
-            if not networks: client.networks.create("agent_eval_net", driver="bridge")
-            logger.info(f"Starting vLLM: {original_model} w/ lora {repo}")
-            vllm_command = f"--model {original_model} --enable-lora --lora-modules trained_lora={repo} --max-lora-rank 256 --port 8000 --trust-remote-code"
-
-            vllm_container: Container = await asyncio.to_thread(
-                client.containers.run,
-                "vllm/vllm-openai:latest",
-                name="vllm-server",
-                command=vllm_command,
-                volumes=volume_bindings,
-                runtime="nvidia",
-                device_requests=[docker.types.DeviceRequest(capabilities=[["gpu"]], device_ids=[str(gid) for gid in gpu_ids])],
-                detach=True,
-                network="agent_eval_net",
-                ports={'8000/tcp': VLLM_HOST_PORT},
-            )
-            containers['vllm'] = vllm_container
-            vllm_log_context = {**get_all_context_tags(), "container_type": "vllm", "repo": repo}
-            vllm_log_task = asyncio.create_task(asyncio.to_thread(stream_container_logs, vllm_container, None, vllm_log_context))
-
-            logger.info("Starting AgentGym Server...")
-            environment_container: Container = await asyncio.to_thread(
-                client.containers.run,
+            await _start_environment_eval_servers(
+                client,
+                base_vllm_command,
+                {"VLLM_ALLOW_RUNTIME_LORA_UPDATING": "True"},
+                volume_bindings,
+                gpu_ids,
                 environment_server_image,
-                name="agent-server",
-                detach=True,
-                network="agent_eval_net",
-                ports={'8000/tcp': AGENT_HOST_PORT} 
+                agent_container_names,
+                "shared",
+                containers,
+                log_tasks,
             )
-            containers['agent'] = environment_container
-            agent_log_context = {**get_all_context_tags(), "container_type": "agentgym", "repo": repo}
-            agent_log_task = asyncio.create_task(asyncio.to_thread(stream_container_logs, environment_container, None, agent_log_context))
-
-            logger.info("Waiting for vLLM health check...")
-            max_wait_time = 300  # 5 minutes timeout
-            start_time = time.time()
-            while True:
-                try:
-                    vllm_container.reload()
-                    if vllm_container.status == 'exited':
-                        exit_code = vllm_container.attrs['State']['ExitCode']
-                        raise Exception(f"vLLM container exited with code {exit_code}. Check logs for details.")
-                except Exception as container_error:
-                    if "exited" in str(container_error).lower():
-                        raise container_error
-                
-                if time.time() - start_time > max_wait_time:
-                    raise TimeoutError(f"vLLM health check timeout after {max_wait_time} seconds")
-                
-                try:
-                    if requests.get(f"http://localhost:{VLLM_HOST_PORT}/v1/models", timeout=2).status_code == 200:
-                        break
-                except:
-                    time.sleep(5)
-            logger.info("vLLM Ready.\n")
-
-            # Evaluation Loop
-            DATA_LEN_RANGE = 2500
-            random.seed(42)
-            eval_list = random.sample(range(1, DATA_LEN_RANGE + 1), num_eval_samples)
-            total_score = 0.0
-            total_time = 0.0
-
-            for i, task_id in enumerate(eval_list):
-                logger.info(f"[{i+1}/{num_eval_samples}] Task ID: {task_id}...")
-
-                payload = {
-                    "model": "trained_lora",
-                    "base_url": "http://vllm-server:8000/v1",
-                    "task_id": task_id,
-                    "temperature": 0.0,
-                    "max_round": 30
-                }
+            await _wait_for_environment_eval_servers(containers, agent_container_names)
 
+            for i, repo in enumerate(models):
+                lora_name = f"trained_lora_{i}"
                 try:
-                    start_ts = time.time()
-                    response = requests.post(f"http://localhost:{AGENT_HOST_PORT}/evaluate", json=payload, timeout=2500)
-                    result = response.json()
-
-                    latency = result.get('time_taken', time.time() - start_ts)
-                    score = result.get('score', 0.0)
-
-                    total_score += score
-                    total_time += latency
-
-                    all_results.append({
-                        "task_id": task_id,
-                        "task_name": result.get('task_name', 'unknown'),
-                        "score": score,
-                        "success": result.get('success', False),
-                        "time": latency,
-                        "error": result.get('error')
-                    })
-                    logger.info(f" Done (Score: {score})")
+                    await _ensure_container_running(containers['vllm'])
+                    await load_lora_adapter(vllm_url, lora_name, repo)
+                    all_results = await run_episodes_for(lora_name)
+                    # A vLLM crash mid-run would silently zero the remaining episodes
+                    await _ensure_container_running(containers['vllm'])
+                    evaluation_results[repo] = _score_environment_episodes(all_results)
                 except Exception as e:
-                    logger.info(f" Failed: {e}")
-
-            # Final Aggregation & File Writing
-            avg_score = total_score / len(all_results) if all_results else 0
-            logger.info(f"Calculated average score of model to be: {avg_score}")
-            avg_time = total_time / len(all_results) if all_results else 0
-            logger.info(f"Calculated average time of model to be: {avg_time}")
-
-            evaluation_results[repo] = {
-                'is_finetune': True,
-                'eval_loss': avg_score
-            }
+                    logger.error(f"Failed to evaluate repo {repo}: {str(e)}", exc_info=True)
+                    evaluation_results[repo] = str(e)
+                finally:
+                    await unload_lora_adapter(vllm_url, lora_name)
 
         except Exception as e:
-            logger.error(f"Failed to evaluate repo {repo}: {str(e)}", exc_info=True)
-            evaluation_results[repo] = str(e)
-            
+            logger.error(f"Failed to start shared environment evaluation servers: {str(e)}", exc_info=True)
+            for repo in models:
+                evaluation_results.setdefault(repo, str(e))
+
         finally:
+            await _stop_environment_eval_servers(client, containers, log_tasks)
+
+    else:
+        logger.info(f"Starting sequential environment evaluation for {len(models)} repos: {models}")
+        for repo in models:
+            client = docker.from_env()
+            containers = {}
+            log_tasks = []
             try:
-                if vllm_log_task is not None:
-                    vllm_log_task.cancel()
-                if agent_log_task is not None:
-                    agent_log_task.cancel()
-            except:
-                pass
-            
-            for c in containers.values():
-                try: c.remove(force=True)
-                except: pass
-            client.close()
+                await _start_environment_eval_servers(
+                    client,
+                    f"{base_vllm_command} --lora-modules trained_lora={repo}",
+                    {},
+                    volume_bindings,
+                    gpu_ids,
+                    environment_server_image,
+                    agent_container_names,
+                    repo,
+                    containers,
+                    log_tasks,
+                )
+                await _wait_for_environment_eval_servers(containers, agent_container_names)
+                all_results = await run_episodes_for("trained_lora")
+                evaluation_results[repo] = _score_environment_episodes(all_results)
+
+            except Exception as e:
+                logger.error(f"Failed to evaluate repo {repo}: {str(e)}", exc_info=True)
+                evaluation_results[repo] = str(e)
+
+            finally:
+                await _stop_environment_eval_servers(client, containers, log_tasks)
 
     logger.info(f"Environment evaluation results: {evaluation_results}")
     return process_evaluation_results(evaluation_results, is_image=False)
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import time
+
+import httpx
+
+from validator.core import constants as vcst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class AgentServerDispatcher:
+    """Round-robin dispatcher over one or more AgentGym server replicas sharing a pooled httpx client."""
+
+    def __init__(self, base_urls: list[str], max_connections: int, episode_timeout: float):
+        if not base_urls:
+            raise ValueError("At least one agent server url is required")
+        self.base_urls = base_urls
+        self.episode_timeout = episode_timeout
+        self._next_url = itertools.cycle(base_urls)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(episode_timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def evaluate(self, payload: dict) -> dict:
+        base_url = next(self._next_url)
+        response = await asyncio.wait_for(
+            self._client.post(f"{base_url}/evaluate", json=payload),
+            timeout=self.episode_timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def _run_single_episode(
+    dispatcher: AgentServerDispatcher,
+    semaphore: asyncio.Semaphore,
+    payload: dict,
+    position: int,
+    total: int,
+) -> dict | None:
+    async with semaphore:
+        task_id = payload["task_id"]
+        start_ts = time.time()
+        try:
+            result = await dispatcher.evaluate(payload)
+        except asyncio.TimeoutError:
+            logger.info(f"[{position}/{total}] Task ID: {task_id} timed out after {dispatcher.episode_timeout}s")
+            return None
+        except Exception as e:
+            logger.info(f"[{position}/{total}] Task ID: {task_id} failed: {e}")
+            return None
+
+        latency = result.get("time_taken", time.time() - start_ts)
+        score = result.get("score", 0.0)
+        logger.info(f"[{position}/{total}] Task ID: {task_id} done (Score: {score})")
+        return {
+            "task_id": task_id,
+            "task_name": result.get("task_name", "unknown"),
+            "score": score,
+            "success": result.get("success", False),
+            "time": latency,
+            "error": result.get("error"),
+        }
+
+
+async def run_environment_episodes(
+    agent_base_urls: list[str],
+    model_name: str,
+    vllm_base_url: str,
+    task_ids: list[int],
+    max_concurrent_episodes: int = vcst.ENV_EVAL_MAX_CONCURRENT_EPISODES,
+    episode_timeout: float = vcst.ENV_EVAL_EPISODE_TIMEOUT,
+    temperature: float = 0.0,
+    max_round: int = 30,
+) -> list[dict]:
+    """
+    Play a set of AgentGym episodes against the agent server(s) with a bounded concurrency window.
+
+    Episodes are spread round-robin across agent_base_urls so vLLM receives enough parallel
+    requests to batch. Failed or timed out episodes are logged and left out of the returned list.
+
+    Returns:
+        List of per-episode result dicts in task_ids order
+    """
+    total = len(task_ids)
+    max_concurrent_episodes = max(1, max_concurrent_episodes)
+    semaphore = asyncio.Semaphore(max_concurrent_episodes)
+    logger.info(
+        f"Running {total} episodes for {model_name} with concurrency {max_concurrent_episodes} "
+        f"across {len(agent_base_urls)} agent server(s)"
+    )
+
+    async with AgentServerDispatcher(agent_base_urls, max_concurrent_episodes, episode_timeout) as dispatcher:
+        episode_results = await asyncio.gather(
+            *[
+                _run_single_episode(
+                    dispatcher,
+                    semaphore,
+                    {
+                        "model": model_name,
+                        "base_url": vllm_base_url,
+                        "task_id": task_id,
+                        "temperature": temperature,
+                        "max_round": max_round,
+                    },
+                    i + 1,
+                    total,
+                )
+                for i, task_id in enumerate(task_ids)
+            ]
+        )
+
+    return [result for result in episode_results if result is not None]
+
+
+async def load_lora_adapter(vllm_url: str, lora_name: str, lora_path: str, timeout: float = 600.0) -> None:
+    """Register a LoRA adapter on a running vLLM server (requires VLLM_ALLOW_RUNTIME_LORA_UPDATING)."""
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        response = await client.post(
+            f"{vllm_url}/v1/load_lora_adapter", json={"lora_name": lora_name, "lora_path": lora_path}
+        )
+        if response.status_code != 200:
+            raise Exception(f"Failed to load LoRA adapter {lora_path} as {lora_name}: {response.text}")
+    logger.info(f"Loaded LoRA adapter {lora_path} as {lora_name}")
+
+
+async def unload_lora_adapter(vllm_url: str, lora_name: str, timeout: float = 60.0) -> None:
+    """Remove a LoRA adapter from a running vLLM server, logging rather than raising on failure."""
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(f"{vllm_url}/v1/unload_lora_adapter", json={"lora_name": lora_name})
+            if response.status_code != 200:
+                logger.warning(f"Failed to unload LoRA adapter {lora_name}: {response.text}")
+    except Exception as e:
+        logger.warning(f"Failed to unload LoRA adapter {lora_name}: {e}")
@@ -1,10 +1,10 @@
+import copy
 import json
 import os
 import re
 import random
 
 import numpy as np
-import safetensors.torch
 from diffusers import StableDiffusionPipeline
 from fiber.logging_utils import get_logger
 from huggingface_hub import HfApi
@@ -21,6 +21,7 @@ from validator.evaluation.utils import image_to_base64
 from validator.evaluation.utils import list_supported_images
 from validator.evaluation.utils import read_prompt_file
 from validator.utils import comfy_api_gate as api_gate
+from validator.utils.model_params import count_local_parameters
 from validator.utils.retry_utils import retry_on_5xx
 
 
@@ -168,13 +169,19 @@ def download_lora(repo_id: str) -> str:
         return f"{cst.LORAS_SAVE_PATH}/{lora_save_name}.safetensors"
 
 
-def calculate_l2_loss(test_image: Image.Image, generated_image: Image.Image) -> float:
-    test_image = np.array(test_image.convert("RGB")) / 255.0
-    generated_image = np.array(generated_image.convert("RGB")) / 255.0
-    if test_image.shape != generated_image.shape:
+def calculate_l2_losses(test_image: Image.Image, generated_images: list[Image.Image]) -> np.ndarray:
+    """Mean squared error in [0, 1] pixel space of every generated image against the test image, in one pass."""
+    test_pixels = np.asarray(test_image.convert("RGB"), dtype=np.int16)
+    generated_pixels = [np.asarray(image.convert("RGB"), dtype=np.int16) for image in generated_images]
+    if any(pixels.shape != test_pixels.shape for pixels in generated_pixels):
         raise ValueError("Images must have the same dimensions to calculate L2 loss.")
-    l2_loss = np.mean((test_image - generated_image) ** 2)
-    return l2_loss
+    # Integer differences are exact, so this matches a per-image float computation
+    squared_errors = np.square(np.stack(generated_pixels) - test_pixels, dtype=np.int32)
+    return squared_errors.mean(axis=(1, 2, 3)) / 255.0**2
+
+
+def calculate_l2_loss(test_image: Image.Image, generated_image: Image.Image) -> float:
+    return float(calculate_l2_losses(test_image, [generated_image])[0])
 
 
 def edit_workflow(
@@ -206,70 +213,81 @@ def edit_workflow(
     return payload
 
 
-def inference(image_base64: str, params: Img2ImgPayload, use_prompt: bool = False, prompt: str = None) -> tuple[float, float]:
-    if use_prompt and prompt:
-        params.prompt = prompt
-
+def build_variant_payloads(image_base64: str, params: Img2ImgPayload, seeds: list[int]) -> list[dict]:
+    """
+    One workflow per (mode, seed) for an image, text-guided first. Grouping by mode keeps the prompt encoding
+    cached in ComfyUI across consecutive seeds.
+    """
     params.base_image = image_base64
-
-    lora_payload = edit_workflow(
-        payload=params.comfy_template,
-        edit_elements=params,
-        text_guided=use_prompt,
-        model_type=params.model_type,
-        seed=params.seed,
-        is_safetensors=params.is_safetensors,
-    )
-    lora_gen = api_gate.generate(lora_payload)[0]
-    lora_gen_loss = calculate_l2_loss(base64_to_image(image_base64), lora_gen)
-    logger.info(f"Loss: {lora_gen_loss}")
-
-    return lora_gen_loss
+    payloads = []
+    for text_guided in (True, False):
+        for seed in seeds:
+            params.seed = seed
+            payload = edit_workflow(
+                payload=params.comfy_template,
+                edit_elements=params,
+                text_guided=text_guided,
+                model_type=params.model_type,
+                seed=seed,
+                is_safetensors=params.is_safetensors,
+            )
+            payloads.append(copy.deepcopy(payload))
+    return payloads
 
 
 def eval_loop(dataset_path: str, params: Img2ImgPayload) -> dict[str, list[float]]:
-    total_text_guided_losses = []
-    total_no_text_losses = []
-
     test_images_list = list_supported_images(dataset_path, cst.SUPPORTED_IMAGE_FILE_EXTENSIONS)
+    seeds = generate_reproducible_seeds(master_seed=42, n=10)
+    variants_per_image = 2 * len(seeds)
 
+    # Every seed and mode of every image goes through ComfyUI's rolling window in one stream, so the next image's
+    # prompts are already queued while the current one's outputs download
+    test_images = []
+    payloads = []
     for file_name in test_images_list:
-        logger.info(f"Calculating losses for {file_name}")
-
         base_name = os.path.splitext(file_name)[0]
         png_path = os.path.join(dataset_path, file_name)
         txt_path = os.path.join(dataset_path, f"{base_name}.txt")
         test_image = Image.open(png_path)
         test_image = adjust_image_size(test_image)
         image_base64 = image_to_base64(test_image)
-        prompt = read_prompt_file(txt_path)
-
-        params.prompt = prompt
-        seeds = generate_reproducible_seeds(master_seed=42, n=10)
-        text_guided_losses = []
-        no_text_losses = []
-        for seed in seeds:
-            params.seed = seed
-            text_guided_losses.append(inference(image_base64, params, use_prompt=True))
-            no_text_losses.append(inference(image_base64, params, use_prompt=False))
-        total_text_guided_losses.append(np.mean(text_guided_losses))
-        total_no_text_losses.append(np.mean(no_text_losses))
+        params.prompt = read_prompt_file(txt_path)
+        test_images.append(base64_to_image(image_base64))
+        payloads.extend(build_variant_payloads(image_base64, params, seeds))
+
+    total_text_guided_losses = [None] * len(test_images_list)
+    total_no_text_losses = [None] * len(test_images_list)
+    generated_images = [[None] * variants_per_image for _ in test_images_list]
+    remaining = [variants_per_image] * len(test_images_list)
+    for index, images in api_gate.generate_stream(payloads):
+        image_index, variant = divmod(index, variants_per_image)
+        generated_images[image_index][variant] = images[0]
+        remaining[image_index] -= 1
+        if remaining[image_index]:
+            continue
+
+        logger.info(f"Calculating losses for {test_images_list[image_index]}")
+        losses = calculate_l2_losses(test_images[image_index], generated_images[image_index])
+        generated_images[image_index] = None
+        logger.info(f"Losses: {losses.tolist()}")
+        total_text_guided_losses[image_index] = np.mean(losses[: len(seeds)])
+        total_no_text_losses[image_index] = np.mean(losses[len(seeds) :])
 
     return {"text_guided_losses": total_text_guided_losses, "no_text_losses": total_no_text_losses}
 
 
 def _count_model_parameters(model_path: str, is_safetensors: bool) -> int:
     try:
-        if is_safetensors:
-            state_dict = safetensors.torch.load_file(model_path)
-            return sum(p.numel() for p in state_dict.values()) or 0
-        else:
-            pipe = StableDiffusionPipeline.from_pretrained(model_path)
-            total_params = 0
-            for attr in pipe.__dict__.values():
-                if hasattr(attr, "parameters"):
-                    total_params += sum(p.numel() for p in attr.parameters())
-            return total_params
+        # Header-only count of the checkpoint, or of every component of a diffusers pipeline
+        num_params = count_local_parameters(model_path, recursive=not is_safetensors).num_params
+        if num_params or is_safetensors:
+            return num_params
+        pipe = StableDiffusionPipeline.from_pretrained(model_path)
+        total_params = 0
+        for attr in pipe.__dict__.values():
+            if hasattr(attr, "parameters"):
+                total_params += sum(p.numel() for p in attr.parameters())
+        return total_params
     except Exception as e:
         logger.error(f"Failed to count model parameters: {e}")
         return 0
@@ -326,8 +344,11 @@ def main():
                 model_type=model_type,
             )
 
+            api_gate.reset_stage_timings()
             loss_data = eval_loop(test_dataset_path, img2img_payload)
             results[repo_id] = {"eval_loss": loss_data}
+            stage_timings = ", ".join(f"{stage}={seconds:.1f}s" for stage, seconds in api_gate.get_stage_timings().items())
+            logger.info(f"Stage timings for {repo_id}: {stage_timings}")
 
             if os.path.exists(lora_local_path):
                 os.remove(lora_local_path)
@@ -1,11 +1,13 @@
 import os
 import subprocess
 import traceback
+from typing import Callable
 
 
 # Allow torch.load for transformers 4.46+ security check
 os.environ["TRANSFORMERS_ALLOW_TORCH_LOAD"] = "true"
 
+import numpy as np
 import torch
 from accelerate.utils import find_executable_batch_size
 from axolotl.utils.dict import DictDefault
@@ -31,12 +33,24 @@ from validator.evaluation.common import load_results_dict
 from validator.evaluation.common import load_tokenizer
 from validator.evaluation.common import log_memory_stats
 from validator.evaluation.common import save_results_dict
+from validator.evaluation.lora_eval_worker import evaluate_repos_with_lora_worker
+from validator.evaluation.reference_cache import ReferenceCache
+from validator.evaluation.reference_cache import base_model_revision
+from validator.evaluation.reference_cache import file_sha256
+from validator.evaluation.reference_cache import reference_cache_key
 from validator.evaluation.utils import model_is_a_finetune
 from validator.utils.logging import get_logger
 
 
 logger = get_logger(__name__)
 
+# Column names trl reads precomputed reference logps from
+REF_CHOSEN_LOGPS = "ref_chosen_logps"
+REF_REJECTED_LOGPS = "ref_rejected_logps"
+# DPOTrainer has no public option for an eval dataset that already carries them, only this private flag of the trl
+# version pinned in validator/requirements.txt
+PRECOMPUTED_EVAL_REF_LOGPS_FLAG = "_precomputed_eval_ref_log_probs"
+
 
 def _adapt_dpo_columns_to_trl(dataset: Dataset, dataset_type: DpoDatasetType) -> Dataset:
     """
@@ -92,6 +106,12 @@ def _adapt_dpo_columns_to_trl(dataset: Dataset, dataset_type: DpoDatasetType) ->
     return dataset
 
 
+def _load_dpo_dataset(evaluation_config: DictDefault, evaluation_args: EvaluationArgs) -> Dataset:
+    dataset_path = evaluation_config.datasets[0]["path"]
+    eval_dataset = load_dataset("json", data_files=dataset_path, split="train")
+    return _adapt_dpo_columns_to_trl(eval_dataset, evaluation_args.dataset_type)
+
+
 def _collate_dpo_batch(batch: list[dict[str, list[int]]], tokenizer: AutoTokenizer) -> dict[str, torch.Tensor]:
     logger.debug(f"Collating batch of size {len(batch)}")
     try:
@@ -129,19 +149,52 @@ def _collate_dpo_batch(batch: list[dict[str, list[int]]], tokenizer: AutoTokeniz
         raise
 
 
+def _dpo_training_args(evaluation_config: DictDefault, batch_size: int) -> DPOConfig:
+    # trl computes the reference logps up front, which is what lets them be stored and reused across repos
+    return DPOConfig(
+        output_dir=evaluation_config.output_dir,
+        per_device_eval_batch_size=batch_size,
+        report_to="none",
+        bf16=True,
+        beta=cst.BETA_DPO,
+        precompute_ref_log_probs=True,
+    )
+
+
+def _reference_logps_cache_key(
+    evaluation_config: DictDefault, evaluation_args: EvaluationArgs, tokenizer: AutoTokenizer
+) -> str:
+    training_args = _dpo_training_args(evaluation_config, evaluation_config.starting_batch_size)
+    return reference_cache_key(
+        "dpo_ref_logps",
+        base_model_revision(evaluation_args.original_model),
+        file_sha256(evaluation_config.datasets[0]["path"]),
+        tokenizer,
+        training_args.max_length,
+        max_prompt_length=training_args.max_prompt_length,
+        max_completion_length=getattr(training_args, "max_completion_length", None),
+        dataset_type=evaluation_args.dataset_type.model_dump_json(),
+    )
+
+
 def evaluate_dpo_model(
     evaluation_config: DictDefault,
     finetuned_model: AutoModelForCausalLM,
-    reference_model: AutoModelForCausalLM,
+    load_reference_model: Callable[[], AutoModelForCausalLM | None],
     tokenizer: AutoTokenizer,
     evaluation_args: EvaluationArgs,
+    eval_dataset: Dataset | None = None,
 ) -> dict[str, float]:
+    """
+    Reference chosen/rejected logps are read from the task's reference cache; load_reference_model is only
+    called when they still have to be computed. It may return None for a peft model, trl then uses the model
+    with the adapter disabled as the reference.
+    """
     evaluation_config.tokenizer_config = tokenizer.name_or_path
     logger.info(f"Config: {evaluation_config}")
 
-    dataset_path = evaluation_config.datasets[0]["path"]
-    eval_dataset = load_dataset("json", data_files=dataset_path, split="train")
-    eval_dataset = _adapt_dpo_columns_to_trl(eval_dataset, evaluation_args.dataset_type)
+    if eval_dataset is None:
+        eval_dataset = _load_dpo_dataset(evaluation_config, evaluation_args)
 
     _log_dataset_and_model_info(eval_dataset, finetuned_model, tokenizer)
 
@@ -149,24 +202,57 @@ def evaluate_dpo_model(
         logger.debug(f"Collating {len(features)} features")
         return _collate_dpo_batch(features, tokenizer)
 
+    reference_cache = ReferenceCache()
+    cache_key = _reference_logps_cache_key(evaluation_config, evaluation_args, tokenizer)
+    reference_logps = reference_cache.load(cache_key)
+    if reference_logps is not None and len(reference_logps["ref_chosen_logps"]) != len(eval_dataset):
+        logger.warning(f"Cached reference logps don't match the {len(eval_dataset)} samples, recomputing them")
+        reference_logps = None
+
+    reference_models = {}
+
     @find_executable_batch_size(starting_batch_size=evaluation_config.starting_batch_size)
     def evaluate_dpo_with_batch_size(batch_size):
-        training_args = DPOConfig(
-            output_dir=evaluation_config.output_dir,
-            per_device_eval_batch_size=batch_size,
-            report_to="none",
-            bf16=True,
-            beta=cst.BETA_DPO,
-        )
-        dpo_trainer = DPOTrainer(
-            model=finetuned_model,
-            ref_model=reference_model,
-            args=training_args,
-            train_dataset=Dataset.from_dict({col: [] for col in eval_dataset.column_names}),
-            eval_dataset=eval_dataset,
-            processing_class=tokenizer,
-            callbacks=[ProgressLoggerCallback(log_interval_seconds=evaluation_config.log_interval_seconds)],
-        )
+        nonlocal reference_logps
+        training_args = _dpo_training_args(evaluation_config, batch_size)
+
+        def build_trainer(dataset: Dataset) -> DPOTrainer:
+            return DPOTrainer(
+                model=finetuned_model,
+                ref_model=reference_models.get("reference"),
+                args=training_args,
+                train_dataset=Dataset.from_dict({col: [] for col in dataset.column_names}),
+                eval_dataset=dataset,
+                processing_class=tokenizer,
+                callbacks=[ProgressLoggerCallback(log_interval_seconds=evaluation_config.log_interval_seconds)],
+            )
+
+        dpo_trainer = None
+        if reference_logps is not None:
+            dataset = eval_dataset.add_column(REF_CHOSEN_LOGPS, reference_logps[REF_CHOSEN_LOGPS].tolist())
+            dataset = dataset.add_column(REF_REJECTED_LOGPS, reference_logps[REF_REJECTED_LOGPS].tolist())
+            dpo_trainer = build_trainer(dataset)
+            if hasattr(dpo_trainer, PRECOMPUTED_EVAL_REF_LOGPS_FLAG):
+                # The logps are already columns of the dataset, don't let trl recompute them
+                setattr(dpo_trainer, PRECOMPUTED_EVAL_REF_LOGPS_FLAG, True)
+            else:
+                logger.warning("This trl version can't take cached reference logps, computing them with the reference model")
+                reference_logps = None
+                dpo_trainer = None
+
+        if dpo_trainer is None:
+            if "reference" not in reference_models:
+                reference_models["reference"] = load_reference_model()
+            dpo_trainer = build_trainer(eval_dataset)
+            # Runs the reference pass once and attaches the logps to the trainer's eval dataset
+            dpo_trainer.get_eval_dataloader()
+            reference_cache.save(
+                cache_key,
+                {
+                    REF_CHOSEN_LOGPS: np.asarray(dpo_trainer.eval_dataset[REF_CHOSEN_LOGPS], dtype=np.float32),
+                    REF_REJECTED_LOGPS: np.asarray(dpo_trainer.eval_dataset[REF_REJECTED_LOGPS], dtype=np.float32),
+                },
+            )
 
         results = dpo_trainer.evaluate()
         return results
@@ -187,12 +273,38 @@ def evaluate_finetuned_dpo_model(
     evaluation_args: EvaluationArgs,
     finetuned_model: AutoModelForCausalLM,
     tokenizer: AutoTokenizer,
-    reference_model: AutoModelForCausalLM,
+    load_reference_model: Callable[[], AutoModelForCausalLM | None],
 ) -> dict[str, float]:
     evaluation_config = _load_and_update_evaluation_config(
         evaluation_args=evaluation_args, finetuned_model=finetuned_model, config_path=cst.VALI_CONFIG_PATH
     )
-    return evaluate_dpo_model(evaluation_config, finetuned_model, reference_model, tokenizer, evaluation_args)
+    return evaluate_dpo_model(evaluation_config, finetuned_model, load_reference_model, tokenizer, evaluation_args)
+
+
+def _load_reference_model(original_model: str) -> AutoModelForCausalLM:
+    logger.info(f"Loading reference model: {original_model}")
+    reference_model = load_model(original_model, is_base_model=True)
+    if reference_model is None:
+        raise ValueError(f"Reference model {original_model} failed to load")
+    reference_model.eval()
+    return reference_model
+
+
+def evaluate_dpo_adapter(
+    finetuned_model: AutoModelForCausalLM,
+    tokenizer: AutoTokenizer,
+    evaluation_args: EvaluationArgs,
+    cache: dict,
+) -> dict[str, float]:
+    """Evaluation worker entry point, the base model with the adapter disabled doubles as the reference model."""
+    evaluation_config = _load_and_update_evaluation_config(
+        evaluation_args=evaluation_args, finetuned_model=finetuned_model, config_path=cst.VALI_CONFIG_PATH
+    )
+    if "eval_dataset" not in cache:
+        cache["eval_dataset"] = _load_dpo_dataset(evaluation_config, evaluation_args)
+    return evaluate_dpo_model(
+        evaluation_config, finetuned_model, lambda: None, tokenizer, evaluation_args, eval_dataset=cache["eval_dataset"]
+    )
 
 
 def evaluate_dpo_repo(evaluation_args: EvaluationArgs) -> None:
@@ -210,14 +322,6 @@ def evaluate_dpo_repo(evaluation_args: EvaluationArgs) -> None:
         tokenizer.pad_token_id = tokenizer.eos_token_id
 
     try:
-        logger.info(f"Loading reference model: {evaluation_args.original_model}")
-        reference_model = load_model(evaluation_args.original_model, is_base_model=True)
-        if reference_model is None:
-            raise ValueError(f"Reference model {evaluation_args.original_model} failed to load")
-
-        if "model_params_count" not in results_dict:
-            results_dict["model_params_count"] = count_model_parameters(reference_model)
-
         try:
             logger.info(f"Loading finetuned model as LoRA adapter: {repo}")
             finetuned_model = load_finetuned_model(repo)
@@ -238,13 +342,18 @@ def evaluate_dpo_repo(evaluation_args: EvaluationArgs) -> None:
 
         log_memory_stats()
         finetuned_model.eval()
-        reference_model.eval()
+
+        def load_reference_model() -> AutoModelForCausalLM:
+            reference_model = _load_reference_model(evaluation_args.original_model)
+            if "model_params_count" not in results_dict:
+                results_dict["model_params_count"] = count_model_parameters(reference_model)
+            return reference_model
 
         results = evaluate_finetuned_dpo_model(
             evaluation_args=evaluation_args,
             finetuned_model=finetuned_model,
             tokenizer=tokenizer,
-            reference_model=reference_model,
+            load_reference_model=load_reference_model,
         )
         results["is_finetune"] = is_finetune
         results_dict[repo] = results
@@ -256,6 +365,14 @@ def evaluate_dpo_repo(evaluation_args: EvaluationArgs) -> None:
         log_memory_stats()
 
 
+def _run_repo_subprocess(evaluation_args: EvaluationArgs) -> None:
+    try:
+        subprocess.run(["python", "-m", "validator.evaluation.single_eval_dpo", evaluation_args.model_dump_json()], check=True)
+        logger.info(f"Subprocess completed for {evaluation_args.repo}")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error running subprocess for {evaluation_args.repo}: {e}")
+
+
 def main():
     logger.info("=== DPO EVALUATION SCRIPT STARTING ===")
     dataset = os.environ.get("DATASET")
@@ -268,22 +385,18 @@ def main():
         exit(1)
 
     repos = [m.strip() for m in models_str.split(",") if m.strip()]
-    for repo in repos:
-        try:
-            evaluation_args = EvaluationArgs(
-                dataset=dataset,
-                original_model=original_model,
-                dataset_type=dataset_type_str,
-                file_format=file_format_str,
-                repo=repo,
-            )
+    evaluation_args_list = [
+        EvaluationArgs(
+            dataset=dataset,
+            original_model=original_model,
+            dataset_type=dataset_type_str,
+            file_format=file_format_str,
+            repo=repo,
+        )
+        for repo in repos
+    ]
 
-            subprocess.run(
-                ["python", "-m", "validator.evaluation.single_eval_dpo", evaluation_args.model_dump_json()], check=True
-            )
-            logger.info(f"Subprocess completed for {repo}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error running subprocess for {repo}: {e}")
+    evaluate_repos_with_lora_worker(evaluation_args_list, evaluate_dpo_adapter, _run_repo_subprocess)
     try:
         check_and_log_base_model_size(original_model)
     except Exception as e:
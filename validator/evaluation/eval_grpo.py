@@ -18,9 +18,11 @@ from trl import GRPOTrainer
 from core.models.utility_models import GrpoDatasetType
 from validator.core import constants as cst
 from validator.core.models import EvaluationArgs
+from validator.evaluation.common import AdapterDisabledView
 from validator.evaluation.common import ProgressLoggerCallback
 from validator.evaluation.common import _load_and_update_evaluation_config
 from validator.evaluation.common import _log_dataset_and_model_info
+from validator.evaluation.common import calculate_cached_kl_divergence
 from validator.evaluation.common import check_and_log_base_model_size
 from validator.evaluation.common import load_finetuned_model
 from validator.evaluation.common import load_model
@@ -28,15 +30,43 @@ from validator.evaluation.common import load_results_dict
 from validator.evaluation.common import load_tokenizer
 from validator.evaluation.common import log_memory_stats
 from validator.evaluation.common import save_results_dict
+from validator.evaluation.lora_eval_worker import evaluate_repos_with_lora_worker
 from validator.evaluation.utils import check_for_lora
 from validator.evaluation.utils import model_is_a_finetune
 from validator.utils.logging import get_logger
+from validator.utils.reward_functions import RewardFunctionPool
 from validator.utils.reward_functions import supports_extra_data
 from validator.utils.reward_functions import validate_reward_function
 
 
 logger = get_logger(__name__)
 
+GRPO_REPO_TIMEOUT_SECONDS = 18_000
+
+_reward_pool: RewardFunctionPool | None = None
+
+
+def _get_reward_pool() -> RewardFunctionPool | None:
+    """Shared across the repos a worker evaluates, so the pool processes are only spawned once."""
+    global _reward_pool
+    if _reward_pool is None and cst.REWARD_FUNCTION_POOL_WORKERS > 0:
+        _reward_pool = RewardFunctionPool()
+    return _reward_pool
+
+
+def _reward_function_sample(func, sample_data: list[dict] | None) -> tuple[list, dict]:
+    """The completions and kwargs validate_reward_function checks func with."""
+    if not sample_data:
+        return [], {}
+    if supports_extra_data(func):
+        valid_rows = [row for row in sample_data if cst.STANDARD_GRPO_EXTRA_COLUMN in row]
+        if valid_rows:
+            return (
+                [row[cst.STANDARD_GRPO_PROMPT_COLUMN] for row in valid_rows],
+                {cst.STANDARD_GRPO_EXTRA_COLUMN: [row[cst.STANDARD_GRPO_EXTRA_COLUMN] for row in valid_rows]},
+            )
+    return [row.get(cst.STANDARD_GRPO_PROMPT_COLUMN, "Sample prompt") for row in sample_data], {}
+
 
 def _adapt_grpo_columns_to_trl(dataset: Dataset, dataset_type: GrpoDatasetType) -> Dataset:
     """
@@ -66,14 +96,15 @@ def evaluate_grpo_model(
     finetuned_model: AutoModelForCausalLM,
     tokenizer: AutoTokenizer,
     evaluation_args: EvaluationArgs,
+    eval_dataset: Dataset | None = None,
 ) -> dict[str, float]:
     evaluation_config.tokenizer_config = tokenizer.name_or_path
     logger.info(f"Config: {evaluation_config}")
 
-    dataset_path = evaluation_config.datasets[0]["path"]
-    eval_dataset = load_dataset("json", data_files=dataset_path, split="train")
-
-    eval_dataset = _adapt_grpo_columns_to_trl(eval_dataset, evaluation_args.dataset_type)
+    if eval_dataset is None:
+        dataset_path = evaluation_config.datasets[0]["path"]
+        eval_dataset = load_dataset("json", data_files=dataset_path, split="train")
+        eval_dataset = _adapt_grpo_columns_to_trl(eval_dataset, evaluation_args.dataset_type)
 
     _log_dataset_and_model_info(eval_dataset, finetuned_model, tokenizer)
 
@@ -96,6 +127,13 @@ def evaluate_grpo_model(
             logger.error(f"Validation error message: {error_msg}")
             raise ValueError(f"Invalid reward function: {error_msg}")
 
+        reward_pool = _get_reward_pool()
+        if reward_pool is not None:
+            sample_completions, sample_kwargs = _reward_function_sample(reward_func_callable, sample_data)
+            if reward_pool.accepts(reward_func_str, reward_func_callable, sample_completions, **sample_kwargs):
+                logger.info(f"Scoring reward function {i} in the worker pool")
+                reward_func_callable = reward_pool.wrap(reward_func_str, reward_func_callable)
+
         reward_weight = reward_weights_list[i]
         reward_funcs_callable.append(reward_func_callable)
 
@@ -259,6 +297,43 @@ def evaluate_finetuned_grpo_model(
     return evaluate_grpo_model(evaluation_config, finetuned_model, tokenizer, evaluation_args)
 
 
+def evaluate_grpo_adapter(
+    finetuned_model: AutoModelForCausalLM,
+    tokenizer: AutoTokenizer,
+    evaluation_args: EvaluationArgs,
+    cache: dict,
+) -> dict[str, float]:
+    """
+    Evaluation worker entry point: GRPO rewards followed by the KL divergence to the base model, which is the
+    same peft model with the adapter disabled, so no second copy of the base weights is loaded. With
+    GRPO_KL_REFERENCE_TOP_K set, reference log-probs for the KL come from the task's reference cache after the
+    first repo.
+    """
+    evaluation_config = _load_and_update_evaluation_config(
+        evaluation_args=evaluation_args, finetuned_model=finetuned_model, config_path=cst.VALI_CONFIG_PATH
+    )
+    if "eval_dataset" not in cache:
+        eval_dataset = load_dataset("json", data_files=evaluation_config.datasets[0]["path"], split="train")
+        cache["eval_dataset"] = _adapt_grpo_columns_to_trl(eval_dataset, evaluation_args.dataset_type)
+    if "kl_dataset" not in cache:
+        kl_dataset = load_dataset("json", data_files=evaluation_args.dataset, split="train")
+        cache["kl_dataset"] = _adapt_grpo_columns_to_trl(kl_dataset, evaluation_args.dataset_type)
+
+    results = evaluate_grpo_model(
+        evaluation_config, finetuned_model, tokenizer, evaluation_args, eval_dataset=cache["eval_dataset"]
+    )
+    results["kl_divergence"] = calculate_cached_kl_divergence(
+        finetuned_model=finetuned_model,
+        dataset=cache["kl_dataset"],
+        tokenizer=tokenizer,
+        load_original_model=lambda: AdapterDisabledView(finetuned_model),
+        original_model_name=evaluation_args.original_model,
+        dataset_path=evaluation_args.dataset,
+        local_files_only=True,
+    )
+    return results
+
+
 def evaluate_grpo_repo(evaluation_args: EvaluationArgs) -> None:
     """Evaluate a single model repository and save results directly to file."""
     results_dict = load_results_dict()
@@ -310,6 +385,42 @@ def evaluate_grpo_repo(evaluation_args: EvaluationArgs) -> None:
         log_memory_stats()
 
 
+def _run_repo_subprocess(evaluation_args: EvaluationArgs) -> None:
+    repo = evaluation_args.repo
+    try:
+        max_retries = 3
+        retry_count = 0
+        while retry_count < max_retries:
+            try:
+                start_time = time.monotonic()
+                # Launching subprocess to purge memory
+                subprocess.run(
+                    ["python", "-m", "validator.evaluation.single_eval_grpo", evaluation_args.model_dump_json()],
+                    check=True,
+                    timeout=GRPO_REPO_TIMEOUT_SECONDS,
+                )
+                elapsed = time.monotonic() - start_time
+                logger.info(f"GRPO subprocess completed for {repo} in {elapsed:.2f} seconds")
+                break
+            except subprocess.TimeoutExpired:
+                retry_count += 1
+                logger.warning(f"GRPO subprocess timed out for {repo} (attempt {retry_count}/{max_retries})")
+                if retry_count == max_retries:
+                    logger.error(f"Max retries reached for GRPO evaluation of {repo}")
+                    raise
+
+        # Now run KL divergence calculation in separate subprocess
+        logger.info(f"Starting KL divergence calculation for {repo}")
+        subprocess.run(
+            ["python", "-m", "validator.evaluation.single_eval_kl_divergence", evaluation_args.model_dump_json()],
+            check=True,
+            timeout=GRPO_REPO_TIMEOUT_SECONDS,
+        )
+
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error running GRPO subprocess for {repo}: {e}")
+
+
 def main():
     dataset = os.environ.get("DATASET")
     original_model = os.environ.get("ORIGINAL_MODEL")
@@ -321,51 +432,24 @@ def main():
         exit(1)
 
     repos = [m.strip() for m in models_str.split(",") if m.strip()]
-
-    timeout_seconds = 18_000
-    timeout_adjusted = False
-
-    for repo in repos:
-        try:
-            evaluation_args = EvaluationArgs(
-                dataset=dataset,
-                original_model=original_model,
-                dataset_type=dataset_type_str,
-                file_format=file_format_str,
-                repo=repo,
-            )
-
-            max_retries = 3
-            retry_count = 0
-            while retry_count < max_retries:
-                try:
-                    start_time = time.monotonic()
-                    # Launching subprocess to purge memory
-                    subprocess.run(
-                        ["python", "-m", "validator.evaluation.single_eval_grpo", evaluation_args.model_dump_json()],
-                        check=True,
-                        timeout=timeout_seconds,
-                    )
-                    elapsed = time.monotonic() - start_time
-                    logger.info(f"GRPO subprocess completed for {repo} in {elapsed:.2f} seconds")
-                    break
-                except subprocess.TimeoutExpired:
-                    retry_count += 1
-                    logger.warning(f"GRPO subprocess timed out for {repo} (attempt {retry_count}/{max_retries})")
-                    if retry_count == max_retries:
-                        logger.error(f"Max retries reached for GRPO evaluation of {repo}")
-                        raise
-
-            # Now run KL divergence calculation in separate subprocess
-            logger.info(f"Starting KL divergence calculation for {repo}")
-            subprocess.run(
-                ["python", "-m", "validator.evaluation.single_eval_kl_divergence", evaluation_args.model_dump_json()],
-                check=True,
-                timeout=timeout_seconds,
-            )
-
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error running GRPO subprocess for {repo}: {e}")
+    evaluation_args_list = [
+        EvaluationArgs(
+            dataset=dataset,
+            original_model=original_model,
+            dataset_type=dataset_type_str,
+            file_format=file_format_str,
+            repo=repo,
+        )
+        for repo in repos
+    ]
+
+    evaluate_repos_with_lora_worker(
+        evaluation_args_list,
+        evaluate_grpo_adapter,
+        _run_repo_subprocess,
+        local_files_only=True,
+        timeout=GRPO_REPO_TIMEOUT_SECONDS,
+    )
     try:
         check_and_log_base_model_size(original_model)
     except Exception as e:
@@ -33,6 +33,7 @@ from validator.evaluation.common import load_results_dict
 from validator.evaluation.common import load_tokenizer
 from validator.evaluation.common import log_memory_stats
 from validator.evaluation.common import save_results_dict
+from validator.evaluation.lora_eval_worker import evaluate_repos_with_lora_worker
 from validator.evaluation.utils import check_for_lora
 from validator.evaluation.utils import model_is_a_finetune
 from validator.utils.logging import get_logger
@@ -71,11 +72,13 @@ def evaluate_instruct_text_model(
     evaluation_config: DictDefault,
     language_model: AutoModelForCausalLM,
     tokenizer: AutoTokenizer,
+    eval_dataset: list[dict] | None = None,
 ) -> dict[str, float]:
     evaluation_config.tokenizer_config = tokenizer.name_or_path
     logger.info(f"Config: {evaluation_config}")
 
-    eval_dataset = _load_evaluation_dataset(evaluation_config, tokenizer)
+    if eval_dataset is None:
+        eval_dataset = _load_evaluation_dataset(evaluation_config, tokenizer)
 
     _log_dataset_and_model_info(eval_dataset, language_model, tokenizer)
 
@@ -122,6 +125,22 @@ def evaluate_finetuned_model(
     return evaluate_instruct_text_model(evaluation_config, finetuned_model, tokenizer)
 
 
+def evaluate_instruct_text_adapter(
+    finetuned_model: AutoModelForCausalLM,
+    tokenizer: AutoTokenizer,
+    evaluation_args: EvaluationArgs,
+    cache: dict,
+) -> dict[str, float]:
+    """Evaluation worker entry point, the tokenized dataset is kept in cache across adapters."""
+    evaluation_config = _load_and_update_evaluation_config(
+        evaluation_args=evaluation_args, finetuned_model=finetuned_model, config_path=cst.VALI_CONFIG_PATH
+    )
+    if "eval_dataset" not in cache:
+        evaluation_config.tokenizer_config = tokenizer.name_or_path
+        cache["eval_dataset"] = _load_evaluation_dataset(evaluation_config, tokenizer)
+    return evaluate_instruct_text_model(evaluation_config, finetuned_model, tokenizer, eval_dataset=cache["eval_dataset"])
+
+
 def evaluate_repo(evaluation_args: EvaluationArgs) -> None:
     """Evaluate a single model repository and save results directly to file."""
     results_dict = load_results_dict()
@@ -169,6 +188,17 @@ def evaluate_repo(evaluation_args: EvaluationArgs) -> None:
         log_memory_stats()
 
 
+def _run_repo_subprocess(evaluation_args: EvaluationArgs) -> None:
+    try:
+        # Launching subprocess to purge memory: https://github.com/huggingface/transformers/issues/26571
+        subprocess.run(
+            ["python", "-m", "validator.evaluation.single_eval_instruct_text", evaluation_args.model_dump_json()], check=True
+        )
+        logger.info(f"Subprocess completed for {evaluation_args.repo}")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error running subprocess for {evaluation_args.repo}: {e}")
+
+
 def main():
     logger.info("=== INSTRUCT TEXT EVALUATION SCRIPT STARTING ===")
     dataset = os.environ.get("DATASET")
@@ -185,20 +215,14 @@ def main():
     dataset_type = model_adapter.validate_python(json.loads(dataset_type_str))
 
     repos = [m.strip() for m in models_str.split(",") if m.strip()]
+    evaluation_args_list = [
+        EvaluationArgs(
+            dataset=dataset, original_model=original_model, dataset_type=dataset_type, file_format=file_format_str, repo=repo
+        )
+        for repo in repos
+    ]
 
-    for repo in repos:
-        try:
-            evaluation_args = EvaluationArgs(
-                dataset=dataset, original_model=original_model, dataset_type=dataset_type, file_format=file_format_str, repo=repo
-            )
-
-            # Launching subprocess to purge memory: https://github.com/huggingface/transformers/issues/26571
-            subprocess.run(
-                ["python", "-m", "validator.evaluation.single_eval_instruct_text", evaluation_args.model_dump_json()], check=True
-            )
-            logger.info(f"Subprocess completed for {repo}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error running subprocess for {repo}: {e}")
+    evaluate_repos_with_lora_worker(evaluation_args_list, evaluate_instruct_text_adapter, _run_repo_subprocess)
     try:
         check_and_log_base_model_size(original_model)
     except Exception as e:
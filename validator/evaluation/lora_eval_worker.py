@@ -0,0 +1,224 @@
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from typing import Callable
+
+import torch
+from peft import PeftConfig
+from peft import PeftModel
+from transformers import AutoTokenizer
+
+from validator.core import constants as cst
+from validator.core.models import EvaluationArgs
+from validator.evaluation.common import count_model_parameters
+from validator.evaluation.common import create_finetuned_cache_dir
+from validator.evaluation.common import load_model
+from validator.evaluation.common import load_results_dict
+from validator.evaluation.common import load_tokenizer
+from validator.evaluation.common import log_memory_stats
+from validator.evaluation.common import save_results_dict
+from validator.evaluation.utils import check_for_lora
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# (peft model with the repo's adapter active, tokenizer, evaluation args, per-worker cache) -> results
+AdapterEvaluator = Callable[[PeftModel, AutoTokenizer, EvaluationArgs, dict], dict]
+
+STATUS_READY = "ready"
+STATUS_OK = "ok"
+STATUS_FALLBACK = "fallback"
+STATUS_ERROR = "error"
+
+
+class AdapterNotCompatible(Exception):
+    """The adapter can't be attached to the worker's base model, the repo needs the subprocess path."""
+
+
+def _hub_kwargs(local_files_only: bool) -> dict:
+    # Same cache locations load_finetuned_model uses, so repos downloaded up front are found
+    if local_files_only:
+        return {"local_files_only": True}
+    return {"cache_dir": create_finetuned_cache_dir(), "token": os.environ.get("HUGGINGFACE_TOKEN")}
+
+
+def _attach_adapter(
+    base_model, peft_model: PeftModel | None, repo: str, adapter_name: str, original_model: str, local_files_only: bool
+) -> PeftModel:
+    hub_kwargs = _hub_kwargs(local_files_only)
+    adapter_config = PeftConfig.from_pretrained(repo, **hub_kwargs)
+    if adapter_config.base_model_name_or_path != original_model:
+        raise AdapterNotCompatible(f"{repo} was trained on {adapter_config.base_model_name_or_path}, not {original_model}")
+
+    if peft_model is None:
+        peft_model = PeftModel.from_pretrained(base_model, repo, adapter_name=adapter_name, is_trainable=False, **hub_kwargs)
+    else:
+        peft_model.load_adapter(repo, adapter_name=adapter_name, is_trainable=False, **hub_kwargs)
+    peft_model.set_adapter(adapter_name)
+    # peft can't drop the last remaining adapter, so the previous repo's is only unloaded once this one is active
+    for previous_adapter_name in [name for name in peft_model.peft_config if name != adapter_name]:
+        peft_model.delete_adapter(previous_adapter_name)
+    torch.cuda.empty_cache()
+    peft_model.eval()
+    return peft_model
+
+
+def _worker_main(connection: Connection, evaluate_adapter: AdapterEvaluator, original_model: str, local_files_only: bool):
+    """
+    Child process: load the tokenizer and base model once, then swap in and evaluate one adapter per
+    request. Exits after the first failure since a failed evaluation can leave CUDA or the model in a bad
+    state; the parent starts a fresh worker for the next repo.
+    """
+    try:
+        tokenizer = load_tokenizer(original_model, local_files_only=local_files_only)
+        if tokenizer.pad_token_id is None:
+            tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.pad_token_id = tokenizer.eos_token_id
+        base_model = load_model(original_model, is_base_model=True, local_files_only=local_files_only)
+        base_model.eval()
+        connection.send((STATUS_READY, count_model_parameters(base_model)))
+    except Exception as e:
+        logger.error(f"Evaluation worker failed to load {original_model}: {e}", exc_info=True)
+        connection.send((STATUS_ERROR, str(e)))
+        return
+
+    peft_model = None
+    cache = {}
+    adapter_index = 0
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+
+        evaluation_args = EvaluationArgs.model_validate_json(message)
+        adapter_name = f"repo_{adapter_index}"
+        adapter_index += 1
+        try:
+            peft_model = _attach_adapter(
+                base_model, peft_model, evaluation_args.repo, adapter_name, original_model, local_files_only
+            )
+        except AdapterNotCompatible as e:
+            connection.send((STATUS_FALLBACK, str(e)))
+            continue
+        except Exception as e:
+            logger.error(f"Error attaching adapter {evaluation_args.repo}: {e}", exc_info=True)
+            connection.send((STATUS_ERROR, str(e)))
+            return
+
+        try:
+            log_memory_stats()
+            results = evaluate_adapter(peft_model, tokenizer, evaluation_args, cache)
+        except Exception as e:
+            logger.error(f"Error evaluating {evaluation_args.repo} in the evaluation worker: {e}", exc_info=True)
+            connection.send((STATUS_ERROR, str(e)))
+            return
+        connection.send((STATUS_OK, results))
+
+
+class LoraEvalWorker:
+    """Parent side handle on a long-lived evaluation process that holds the base model."""
+
+    def __init__(self, evaluate_adapter: AdapterEvaluator, original_model: str, local_files_only: bool = False):
+        context = multiprocessing.get_context("spawn")  # CUDA can't be re-initialised in a forked child
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main, args=(child_connection, evaluate_adapter, original_model, local_files_only)
+        )
+        self._process.start()
+        child_connection.close()
+        self.model_params_count: int | None = None
+
+    def _receive(self, timeout: float | None) -> tuple[str, object]:
+        try:
+            if not self._connection.poll(timeout):
+                return STATUS_ERROR, f"no response within {timeout}s"
+            return self._connection.recv()
+        except (EOFError, OSError):
+            self._process.join(timeout=5)
+            return STATUS_ERROR, f"worker exited with code {self._process.exitcode}"
+
+    def wait_until_ready(self, timeout: float = cst.LORA_EVAL_WORKER_STARTUP_TIMEOUT) -> bool:
+        status, payload = self._receive(timeout)
+        if status != STATUS_READY:
+            logger.error(f"Evaluation worker did not start: {payload}")
+            return False
+        self.model_params_count = payload
+        return True
+
+    def evaluate(self, evaluation_args: EvaluationArgs, timeout: float | None = None) -> tuple[str, object]:
+        """Returns (STATUS_OK, results), (STATUS_FALLBACK, reason) or (STATUS_ERROR, reason)."""
+        try:
+            self._connection.send(evaluation_args.model_dump_json())
+        except (BrokenPipeError, OSError) as e:
+            return STATUS_ERROR, str(e)
+        return self._receive(timeout)
+
+    def close(self):
+        if self._process.is_alive():
+            try:
+                self._connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(timeout=30)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._connection.close()
+
+
+def evaluate_repos_with_lora_worker(
+    evaluation_args_list: list[EvaluationArgs],
+    evaluate_adapter: AdapterEvaluator,
+    run_repo_subprocess: Callable[[EvaluationArgs], None],
+    local_files_only: bool = False,
+    timeout: float | None = None,
+) -> None:
+    """
+    Evaluate LoRA repos in a worker that keeps the base model, tokenizer and dataset loaded across repos.
+
+    Full-weight repos, adapters trained on another base and any repo the worker fails on go through
+    run_repo_subprocess, the one-process-per-repo path. The worker is recycled after every failure so
+    one bad repo can't poison the evaluation of the next.
+    """
+    worker: LoraEvalWorker | None = None
+    worker_available = cst.LORA_EVAL_WORKER_ENABLED
+    try:
+        for evaluation_args in evaluation_args_list:
+            repo = evaluation_args.repo
+            if repo in load_results_dict():
+                logger.info(f"Skipping {repo} as it's already evaluated")
+                continue
+
+            if not worker_available or not check_for_lora(repo, local_files_only=local_files_only):
+                run_repo_subprocess(evaluation_args)
+                continue
+
+            if worker is None:
+                worker = LoraEvalWorker(evaluate_adapter, evaluation_args.original_model, local_files_only)
+                if not worker.wait_until_ready():
+                    worker.close()
+                    worker = None
+                    worker_available = False
+                    run_repo_subprocess(evaluation_args)
+                    continue
+
+            status, payload = worker.evaluate(evaluation_args, timeout=timeout)
+            if status == STATUS_OK:
+                results_dict = load_results_dict()
+                if "model_params_count" not in results_dict and worker.model_params_count:
+                    results_dict["model_params_count"] = worker.model_params_count
+                results_dict[repo] = {**payload, "is_finetune": True}
+                save_results_dict(results_dict, repo)
+                continue
+
+            if status == STATUS_FALLBACK:
+                logger.info(f"Evaluating {repo} in a separate process: {payload}")
+            else:
+                logger.warning(f"Evaluation worker failed on {repo} ({payload}), recycling it and retrying in a separate process")
+                worker.close()
+                worker = None
+            run_repo_subprocess(evaluation_args)
+    finally:
+        if worker is not None:
+            worker.close()
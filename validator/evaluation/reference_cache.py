@@ -0,0 +1,122 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from huggingface_hub import hf_hub_download
+from transformers import AutoTokenizer
+
+from validator.core import constants as cst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def base_model_revision(model_name: str, local_files_only: bool = False) -> str:
+    """Commit hash of the cached snapshot of model_name, falling back to the name itself."""
+    if os.path.isdir(model_name):
+        return os.path.abspath(model_name)
+    try:
+        config_path = hf_hub_download(
+            model_name, "config.json", local_files_only=local_files_only, token=os.environ.get("HUGGINGFACE_TOKEN")
+        )
+        return os.path.basename(os.path.dirname(config_path))
+    except Exception as e:
+        logger.warning(f"Could not resolve the revision of {model_name}, keying reference cache on the name: {e}")
+        return model_name
+
+
+def tokenizer_fingerprint(tokenizer: AutoTokenizer) -> str:
+    parts = [
+        tokenizer.name_or_path,
+        len(tokenizer),
+        tokenizer.pad_token_id,
+        tokenizer.eos_token_id,
+        getattr(tokenizer, "chat_template", None),
+    ]
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def reference_cache_key(
+    kind: str, base_revision: str, dataset_hash: str, tokenizer: AutoTokenizer, max_length: int | None, **extra
+) -> str:
+    parts = {
+        "kind": kind,
+        "base_revision": base_revision,
+        "dataset": dataset_hash,
+        "tokenizer": tokenizer_fingerprint(tokenizer),
+        "max_length": max_length,
+        **extra,
+    }
+    return f"{kind}-{hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:32]}"
+
+
+class ReferenceCache:
+    """
+    Reference model outputs for an evaluation task, stored once as .npy files and memory-mapped back for
+    every repo so only the policy forward pass runs per repo. Entries are written to a temporary directory
+    and renamed into place, and computed under a file lock so concurrent repo containers sharing the
+    directory compute each entry once.
+    """
+
+    def __init__(self, cache_dir: str = cst.EVAL_REFERENCE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    @contextmanager
+    def lock(self, key: str):
+        with open(os.path.join(self.cache_dir, f"{key}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, key: str) -> dict[str, torch.Tensor] | None:
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            # copy-on-write mapping: pages are shared and read lazily, tensors stay writable for torch
+            tensors = {
+                file_name[: -len(".npy")]: torch.from_numpy(np.load(os.path.join(entry_dir, file_name), mmap_mode="c"))
+                for file_name in os.listdir(entry_dir)
+                if file_name.endswith(".npy")
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable reference cache entry {key}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        logger.info(f"Loaded reference cache entry {key}")
+        return tensors
+
+    def save(self, key: str, tensors: dict[str, torch.Tensor | np.ndarray]) -> None:
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, tensor in tensors.items():
+            array = tensor.cpu().numpy() if isinstance(tensor, torch.Tensor) else np.asarray(tensor)
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        try:
+            os.rename(tmp_dir, entry_dir)
+            logger.info(f"Saved reference cache entry {key}")
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -3,7 +3,7 @@ import sys
 from datasets import load_dataset
 
 from validator.core.models import EvaluationArgs
-from validator.evaluation.common import calculate_kl_divergence
+from validator.evaluation.common import calculate_cached_kl_divergence
 from validator.evaluation.common import load_finetuned_model
 from validator.evaluation.common import load_model
 from validator.evaluation.common import load_results_dict
@@ -40,10 +40,6 @@ def evaluate_kl_divergence_repo(evaluation_args: EvaluationArgs) -> None:
             tokenizer.pad_token = tokenizer.eos_token
             tokenizer.pad_token_id = tokenizer.eos_token_id
 
-        logger.info(f"Loading original model: {evaluation_args.original_model}")
-        original_model = load_model(evaluation_args.original_model, is_base_model=True, local_files_only=True)
-        original_model.eval()
-
         logger.info(f"Loading finetuned model: {repo}")
         has_lora = check_for_lora(repo, local_files_only=True)
         if has_lora:
@@ -62,12 +58,19 @@ def evaluate_kl_divergence_repo(evaluation_args: EvaluationArgs) -> None:
 
         log_memory_stats()
 
-        # Calculate KL divergence
-        kl_divergence = calculate_kl_divergence(
-            original_model=original_model,
+        def load_original_model():
+            logger.info(f"Loading original model: {evaluation_args.original_model}")
+            return load_model(evaluation_args.original_model, is_base_model=True, local_files_only=True)
+
+        # Calculate KL divergence, with GRPO_KL_REFERENCE_TOP_K set only the first repo of the task loads the original model
+        kl_divergence = calculate_cached_kl_divergence(
             finetuned_model=finetuned_model,
             dataset=eval_dataset,
-            tokenizer=tokenizer
+            tokenizer=tokenizer,
+            load_original_model=load_original_model,
+            original_model_name=evaluation_args.original_model,
+            dataset_path=dataset_path,
+            local_files_only=True,
         )
 
         # Update results with KL divergence
@@ -100,10 +100,15 @@ if __name__ == "__main__":
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
+    workflows = []
     for prompt in prompts:
         workflow = deepcopy(avatar_template)
         workflow["Prompt"]["inputs"]["text"] += prompt
-        image = api_gate.generate(workflow)[0]
+        workflows.append(workflow)
+
+    for index, images in api_gate.generate_stream(workflows):
+        prompt = prompts[index]
+        image = images[0]
         image_id = uuid.uuid4()
         image.save(f"{save_dir}{image_id}.png")
         with open(f"{save_dir}{image_id}.txt", "w") as file:
@@ -81,7 +81,7 @@ async def _get_text_models(
 
 async def _get_image_models(keypair: Keypair) -> AsyncGenerator[ImageModelInfo, None]:
     while True:
-        response_data = await call_content_service(vcst.GET_IMAGE_MODELS_ENDPOINT, keypair)
+        response_data = await call_content_service(vcst.GET_IMAGE_MODELS_ENDPOINT, keypair, coalesce=True)
         try:
             response = ImageModelsResponse.model_validate(response_data)
         except Exception as e:
@@ -181,7 +181,7 @@ async def _get_columns_for_instruct_dataset(
     url = vcst.GET_COLUMNS_FOR_DATASET_ENDPOINT.replace("{dataset}", dataset_id)
     logger.info(f"Getting columns for dataset {dataset_id} - ACTUAL MAPPING CALL")
 
-    response = await call_content_service_fast(url, keypair)
+    response = await call_content_service_fast(url, keypair, name=vcst.GET_COLUMNS_FOR_DATASET_ENDPOINT, coalesce=True)
     if not isinstance(response, dict):
         raise TypeError(f"Expected dictionary response, got {type(response)}")
     try:
@@ -223,7 +223,7 @@ async def get_dataset(
 
                 url = vcst.GET_COLUMNS_FOR_DATASET_ENDPOINT.replace("{dataset}", dataset.dataset_id)
                 logger.info(f"PRE-VALIDATION: Checking column mapping for dataset {dataset.dataset_id}")
-                await call_content_service_fast(url, keypair)
+                await call_content_service_fast(url, keypair, name=vcst.GET_COLUMNS_FOR_DATASET_ENDPOINT, coalesce=True)
                 logger.info(f"PRE-VALIDATION: Dataset {dataset.dataset_id} column mapping validated successfully")
                 logger.info(f"Selected dataset: {dataset.dataset_id}")
                 return dataset
@@ -1,13 +1,15 @@
 import ast
+import asyncio
 import json
 import os
 import random
-import shutil
 import tempfile
+import time
 import uuid
 import zipfile
 from math import ceil
 from pathlib import Path
+from urllib.parse import urlparse
 
 from datasets import Dataset
 from datasets import DatasetDict
@@ -28,16 +30,38 @@ from validator.core.models import InstructTextRawTask
 from validator.db.sql.tasks import update_task
 from validator.evaluation.utils import get_default_dataset_config
 from validator.utils.cache_clear import delete_dataset_from_cache
+from validator.utils.dataset_pipeline import all_equal_mask
+from validator.utils.dataset_pipeline import count_matching_rows
+from validator.utils.dataset_pipeline import filter_rows
+from validator.utils.dataset_pipeline import non_blank_mask
+from validator.utils.dataset_pipeline import stringify_columns
+from validator.utils.dataset_pipeline import timed_stage
+from validator.utils.dataset_pipeline import write_json_rows
 from validator.utils.logging import get_logger
+from validator.utils.minio import async_minio_client
 from validator.utils.reward_functions import validate_reward_function
-from validator.utils.util import save_json_to_temp_file
 from validator.utils.util import upload_file_to_minio
 
 
 logger = get_logger(__name__)
 
 
-def create_zip_for_image_dataset(split_keys: set, zip_name: str, entries: dict, dataset_root: Path) -> Path:
+def _write_image_dataset_zip(
+    zip_target, split_keys: set, subfolder_name: str, entries: dict, dataset_root: Path, image_compression: int
+) -> None:
+    # Images are already compressed, deflating them costs CPU for ~no size gain; captions still deflate well
+    with zipfile.ZipFile(zip_target, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for key in split_keys:
+            img_file, txt_file = entries[key]
+            with open(txt_file, "r") as f:
+                logger.info(f"Adding the following prompt to the zip: {f.read()}")
+            zipf.write(img_file, Path(subfolder_name) / img_file.relative_to(dataset_root), compress_type=image_compression)
+            zipf.write(txt_file, Path(subfolder_name) / txt_file.relative_to(dataset_root))
+
+
+def create_zip_for_image_dataset(
+    split_keys: set, zip_name: str, entries: dict, dataset_root: Path, image_compression: int = zipfile.ZIP_STORED
+) -> Path:
     subfolder_name = Path(zip_name).stem
     zip_path = dataset_root / zip_name
 
@@ -45,17 +69,49 @@ def create_zip_for_image_dataset(split_keys: set, zip_name: str, entries: dict,
         logger.error(f"Zip path {zip_path} exists. This should not happen. Deleting it.")
         zip_path.unlink()
 
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for key in split_keys:
-            img_file, txt_file = entries[key]
-            with open(txt_file, "r") as f:
-                logger.info(f"Adding the following prompt to the zip: {f.read()}")
-            zipf.write(img_file, Path(subfolder_name) / img_file.relative_to(dataset_root))
-            zipf.write(txt_file, Path(subfolder_name) / txt_file.relative_to(dataset_root))
+    _write_image_dataset_zip(zip_path, split_keys, subfolder_name, entries, dataset_root, image_compression)
 
     return zip_path
 
 
+async def stream_image_dataset_zip_to_minio(
+    split_keys: set,
+    zip_name: str,
+    entries: dict,
+    dataset_root: Path,
+    object_name: str,
+    image_compression: int = zipfile.ZIP_STORED,
+) -> str:
+    """
+    Build the split zip and upload it at the same time through a pipe, without staging the archive on disk.
+
+    Returns:
+        Presigned URL of the uploaded zip
+    """
+    read_fd, write_fd = os.pipe()
+    source = os.fdopen(read_fd, "rb")
+
+    def write_zip():
+        with os.fdopen(write_fd, "wb") as sink:
+            _write_image_dataset_zip(sink, split_keys, Path(zip_name).stem, entries, dataset_root, image_compression)
+
+    async def upload():
+        try:
+            return await async_minio_client.upload_stream(cst.BUCKET_NAME, object_name, source)
+        finally:
+            # Unblocks the zip writer with a broken pipe if the upload stopped reading early
+            source.close()
+
+    write_result, upload_result = await asyncio.gather(asyncio.to_thread(write_zip), upload(), return_exceptions=True)
+    if isinstance(write_result, Exception) or isinstance(upload_result, Exception) or not upload_result:
+        # A failed writer closes the pipe early, which the upload would see as a complete (truncated) zip
+        await async_minio_client.delete_file(cst.BUCKET_NAME, object_name)
+        error = write_result if isinstance(write_result, Exception) else upload_result
+        raise RuntimeError(f"Failed to stream {zip_name} to {object_name}: {error}")
+
+    return await async_minio_client.get_presigned_url(cst.BUCKET_NAME, object_name)
+
+
 def unzip_to_temp_path(zip_file_path: str) -> str:
     random_tmp_id = uuid.uuid4()
     tmp_dir = f"{cst.TEMP_PATH_FOR_IMAGES}/{random_tmp_id}"
@@ -99,9 +155,12 @@ async def train_test_split(dataset: Dataset, test_size: float = cst.TRAIN_TEST_S
     return split_dataset
 
 
-def train_test_split_image(dataset_path: str) -> tuple[str, str]:
+def split_image_dataset(dataset_path: str) -> tuple[Path, dict, set, set]:
     """
     Dataset path is a folder containing the images and text files.
+
+    Returns:
+        (dataset root, {stem: (image file, text file)}, test keys, train keys)
     """
     dataset_path = Path(dataset_path)
 
@@ -130,6 +189,15 @@ def train_test_split_image(dataset_path: str) -> tuple[str, str]:
     test_keys = set(keys[:split_idx])
     train_keys = set(keys[split_idx:])
 
+    return dataset_path, dataset_entries, test_keys, train_keys
+
+
+def train_test_split_image(dataset_path: str) -> tuple[str, str]:
+    """
+    Dataset path is a folder containing the images and text files.
+    """
+    dataset_path, dataset_entries, test_keys, train_keys = split_image_dataset(dataset_path)
+
     test_zip_path = create_zip_for_image_dataset(
         split_keys=test_keys, zip_name=cst.IMAGE_TEST_SPLIT_ZIP_NAME, entries=dataset_entries, dataset_root=dataset_path
     )
@@ -174,67 +242,75 @@ def process_chat_row(value, role_field: str, content_field: str):
         return value if value is not None else ""
 
 
-def change_to_json_format(dataset: Dataset, columns: list[str], task: AnyTextTypeRawTask = None):
+def _chat_rows(rows: list[dict], columns: list[str], role_field: str, content_field: str) -> list[dict]:
     result = []
-    total_rows = 0
-    fully_empty_rows = 0
-    is_chat_task = isinstance(task, ChatRawTask)
-
-    for idx, row in enumerate(dataset):
-        row_dict = {}
-        is_row_empty = True
-        for col in columns:
-            if col in row:
-                value = row[col]
-
-                # Ensure consistent data types: strings for non-ChatTask, preserve type for ChatTask
-                if is_chat_task:
-                    processed_value = process_chat_row(value, task.chat_role_field, task.chat_content_field)
-                else:
-                    processed_value = str(value) if value is not None else ""
-
-                row_dict[col] = processed_value
-                if processed_value != "" and processed_value != []:
-                    is_row_empty = False
-
-        if is_chat_task and is_row_empty:
+    for row in rows:
+        row_dict = {col: process_chat_row(row[col], role_field, content_field) for col in columns}
+        if all(value == "" or value == [] for value in row_dict.values()):
             continue
-
         result.append(row_dict)
-        total_rows += 1
-        if is_row_empty:
-            fully_empty_rows += 1
+    return result
+
+
+def write_json_format(
+    dataset: Dataset, columns: list[str], path: str, task: AnyTextTypeRawTask = None, label: str = "dataset"
+) -> list[dict]:
+    """
+    Writes the rows the trainers get to `path` as a JSON list: every column as a string, except chat columns which keep
+    their message lists. Returns the first rows for reward function validation.
+    """
+    columns = [col for col in columns if col in dataset.column_names]
+
+    if isinstance(task, ChatRawTask):
+        dataset = dataset.select_columns(columns)
+        with timed_stage(label, "write") as stage:
+            stage.rows, head = write_json_rows(
+                dataset,
+                path,
+                transform=lambda rows: _chat_rows(rows, columns, task.chat_role_field, task.chat_content_field),
+                head_rows=cst.REWARD_FUNCTION_VALIDATION_ROWS,
+            )
+        return head
+
+    with timed_stage(label, "cast", len(dataset)):
+        dataset = stringify_columns(dataset, columns)
 
+    total_rows = len(dataset)
+    with timed_stage(label, "check", total_rows):
+        fully_empty_rows = count_matching_rows(dataset, lambda table: all_equal_mask(table, columns, ""))
     if total_rows > 0 and (fully_empty_rows / total_rows) > 0.8:
         raise ValueError(f"More than 80% of rows are fully empty ({fully_empty_rows}/{total_rows} rows)")
 
-    result = _validate_dpo_data(result, task)
+    with timed_stage(label, "filter", total_rows):
+        dataset = _validate_dpo_data(dataset, task)
 
-    return result
+    with timed_stage(label, "write") as stage:
+        stage.rows, head = write_json_rows(dataset, path, head_rows=cst.REWARD_FUNCTION_VALIDATION_ROWS)
+    return head
 
 
-def _validate_dpo_data(result: list[dict], task: AnyTextTypeRawTask) -> list[dict]:
+def _validate_dpo_data(dataset: Dataset, task: AnyTextTypeRawTask) -> Dataset:
     if not isinstance(task, DpoRawTask):
-        return result
-
-    original_count = len(result)
-    filtered_result = [
-        row
-        for row in result
-        if (
-            row.get(cst.STANDARD_DPO_PROMPT_COLUMN, "").strip()
-            and row.get(cst.STANDARD_DPO_CHOSEN_COLUMN, "").strip()
-            and row.get(cst.STANDARD_DPO_REJECTED_COLUMN, "").strip()
-        )
-    ]
+        return dataset
 
-    if len(filtered_result) < original_count:
-        logger.warning(f"Filtered out {original_count - len(filtered_result)} DPO rows with empty prompt/chosen/rejected fields")
+    original_count = len(dataset)
+    dpo_columns = [cst.STANDARD_DPO_PROMPT_COLUMN, cst.STANDARD_DPO_CHOSEN_COLUMN, cst.STANDARD_DPO_REJECTED_COLUMN]
+    filtered_dataset = filter_rows(dataset, lambda table: non_blank_mask(table, dpo_columns))
 
-    if len(filtered_result) == 0:
+    if len(filtered_dataset) < original_count:
+        logger.warning(
+            f"Filtered out {original_count - len(filtered_dataset)} DPO rows with empty prompt/chosen/rejected fields"
+        )
+
+    if len(filtered_dataset) == 0:
         raise ValueError("All DPO data points have empty prompt, chosen, or rejected fields")
 
-    return filtered_result
+    return filtered_dataset
+
+
+def _temp_json_path(prefix: str) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".json", prefix=prefix) as temp_file:
+        return temp_file.name
 
 
 async def _process_and_upload_datasets(
@@ -256,23 +332,27 @@ async def _process_and_upload_datasets(
 
     try:
         if should_reupload_train:
-            train_data_json = change_to_json_format(train_dataset, columns_to_sample, task)
+            train_json_path = _temp_json_path("train_data_")
+            files_to_delete.append(train_json_path)
+            train_head = await asyncio.to_thread(
+                write_json_format, train_dataset, columns_to_sample, train_json_path, task, f"{task.task_id} train"
+            )
 
-            await _validate_and_filter_grpo_reward_functions(task, train_data_json, psql_db)
+            await _validate_and_filter_grpo_reward_functions(task, train_head, psql_db)
 
-            train_json_path, train_json_size = await save_json_to_temp_file(train_data_json, prefix="train_data_")
-            files_to_delete.append(train_json_path)
-            await _check_file_size(train_json_size, "train_data")
+            await _check_file_size(os.path.getsize(train_json_path), "train_data")
             train_json_url = await upload_file_to_minio(
                 train_json_path, cst.BUCKET_NAME, f"{os.urandom(8).hex()}_train_data.json"
             )
         else:
             train_json_url = train_dataset
         if should_reupload_test:
-            test_data_json = change_to_json_format(test_dataset, columns_to_sample, task)
-            test_json_path, test_json_size = await save_json_to_temp_file(test_data_json, prefix="test_data_")
+            test_json_path = _temp_json_path("test_data_")
             files_to_delete.append(test_json_path)
-            await _check_file_size(test_json_size, "test_data")
+            await asyncio.to_thread(
+                write_json_format, test_dataset, columns_to_sample, test_json_path, task, f"{task.task_id} test"
+            )
+            await _check_file_size(os.path.getsize(test_json_path), "test_data")
             test_json_url = await upload_file_to_minio(test_json_path, cst.BUCKET_NAME, f"{os.urandom(8).hex()}_test_data.json")
         else:
             test_json_url = test_dataset
@@ -308,7 +388,7 @@ async def _validate_and_filter_grpo_reward_functions(task: GrpoRawTask, json_dat
     if not isinstance(task, GrpoRawTask) or not task.reward_functions:
         return False
 
-    sample_size = min(5, len(json_data))
+    sample_size = min(cst.REWARD_FUNCTION_VALIDATION_ROWS, len(json_data))
     json_sample = json_data[:sample_size]
 
     valid_reward_functions = []
@@ -531,27 +611,40 @@ async def prepare_text_task(task: AnyTextTypeRawTask, keypair: Keypair, psql_db=
     )
 
 
+async def _download_image_text_pair(pair: ImageTextPair, index: int, source_dir: str, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        # These pairs are one-off inputs, keep them out of the shared download cache
+        await download_s3_file(pair.text_url, str(Path(source_dir) / f"{index}.txt"), use_cache=False)
+        img_extension = Path(urlparse(pair.image_url).path).suffix
+        await download_s3_file(pair.image_url, str(Path(source_dir) / f"{index}{img_extension}"), use_cache=False)
+
+
 async def prepare_image_task(image_text_pairs: list[ImageTextPair]) -> tuple[str, str]:
     Path(cst.TEMP_PATH_FOR_IMAGES).mkdir(parents=True, exist_ok=True)
     with tempfile.TemporaryDirectory(dir=cst.TEMP_PATH_FOR_IMAGES) as source_dir:
-        for i, pair in enumerate(image_text_pairs):
-            txt_path = Path(source_dir) / f"{i}.txt"
-            await download_s3_file(pair.text_url, str(txt_path))
-
-            tmp_img_path = Path(await download_s3_file(pair.image_url))
-            img_extension = tmp_img_path.suffix
-            img_path = Path(source_dir) / f"{i}{img_extension}"
-            shutil.move(tmp_img_path, img_path)
-
-        test_zip_path, train_zip_path = train_test_split_image(dataset_path=source_dir)
-
-        test_url = await upload_file_to_minio(
-            file_path=str(test_zip_path), bucket_name=cst.BUCKET_NAME, object_name=f"{os.urandom(8).hex()}_test_data.zip"
+        start_time = time.monotonic()
+        semaphore = asyncio.Semaphore(cst.MAX_CONCURRENT_IMAGE_PAIR_DOWNLOADS)
+        await asyncio.gather(
+            *[_download_image_text_pair(pair, i, source_dir, semaphore) for i, pair in enumerate(image_text_pairs)]
         )
-        train_url = await upload_file_to_minio(
-            file_path=str(train_zip_path), bucket_name=cst.BUCKET_NAME, object_name=f"{os.urandom(8).hex()}_train_data.zip"
+        download_time = time.monotonic() - start_time
+
+        start_time = time.monotonic()
+        dataset_root, entries, test_keys, train_keys = split_image_dataset(dataset_path=source_dir)
+        test_url, train_url = await asyncio.gather(
+            stream_image_dataset_zip_to_minio(
+                test_keys, cst.IMAGE_TEST_SPLIT_ZIP_NAME, entries, dataset_root, f"{os.urandom(8).hex()}_test_data.zip"
+            ),
+            stream_image_dataset_zip_to_minio(
+                train_keys, cst.IMAGE_TRAIN_SPLIT_ZIP_NAME, entries, dataset_root, f"{os.urandom(8).hex()}_train_data.zip"
+            ),
         )
+        zip_upload_time = time.monotonic() - start_time
 
+        logger.info(
+            f"Prepared image task with {len(image_text_pairs)} pairs: "
+            f"download {download_time:.2f}s, zip and upload {zip_upload_time:.2f}s"
+        )
         return (test_url.strip('"'), train_url.strip('"'))
 
 
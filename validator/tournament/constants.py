@@ -29,6 +29,9 @@ DSTACK_TEXT_REGIONS = ["CA-MTL-1", "AP-JP-1", "US-KS-2", "US-GA-2", "US-CA-2", "
 
 # Trainer requests
 TRAINER_HTTP_TIMEOUT = 30.0  # seconds
+TRAINER_POLL_TIMEOUT = 45.0  # seconds a fleet poll waits on one trainer, retries included
+TRAINER_START_INTERVAL = 10  # seconds between training starts on the same trainer
+FLEET_STATE_MAX_AGE = 5 * 60  # seconds before the scheduler polls the trainers again
 EXPECTED_TRAINING_START_MESSAGE = "Started Training!"
 NO_RETRY_RESULT = "No Retry"
 
@@ -40,7 +43,10 @@ MIN_GROUP_SIZE = 20
 MIN_ENVIRONMENT_GROUP_SIZE = 5
 
 
-TOURNAMENT_PARTICIPANT_PING_BATCH_SIZE = 50
+# Participant pings fan out to every node at once; nodes that keep failing are skipped on later pings
+TOURNAMENT_PARTICIPANT_PING_CONCURRENCY = 256
+TOURNAMENT_PARTICIPANT_PING_TIMEOUT = 10  # seconds per node
+TOURNAMENT_PARTICIPANT_PING_DEADLINE = 30  # seconds for the whole ping
 
 # Tournament task allocation
 TEXT_TASKS_PER_GROUP = 1
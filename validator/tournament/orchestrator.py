@@ -1,4 +1,5 @@
 import asyncio
+import time
 
 import httpx
 from dotenv import load_dotenv
@@ -6,6 +7,7 @@ from tenacity import retry
 from tenacity import stop_after_attempt
 from tenacity import wait_exponential
 
+import validator.db.constants as db_cst
 import validator.tournament.constants as cst
 from core.models.payload_models import TrainerProxyRequest
 from core.models.payload_models import TrainerTaskLog
@@ -32,7 +34,10 @@ from validator.core.models import AnyTypeRawTask
 from validator.db.sql import tasks as task_sql
 from validator.db.sql import tournaments as tournament_sql
 from validator.db.sql.tournaments import get_tournament_id_by_task_id
+from validator.db.task_events import TaskEventBus
+from validator.db.task_events import wait_for_task_event
 from validator.evaluation.scoring import _get_dataset_type
+from validator.tournament.trainer_fleet import TrainerFleet
 from validator.tournament.utils import get_tournament_gpu_requirement
 from validator.utils.logging import LogContext
 from validator.utils.logging import get_logger
@@ -80,6 +85,9 @@ async def fetch_trainer_gpus(trainer_ip: str) -> list[GPUInfo]:
         return gpu_infos
 
 
+trainer_fleet = TrainerFleet(fetch_trainer_gpus)
+
+
 @simple_retry
 async def start_training_task(trainer_ip: str, training_request: TrainerProxyRequest) -> bool:
     """
@@ -158,10 +166,15 @@ async def get_training_task_details(trainer_ip: str, task_id: str, hotkey: str)
         return TrainerTaskLog.model_validate(response.json())
 
 
-async def fetch_tournament_tasks_ready_to_train(config: Config):
+async def fetch_tournament_tasks_ready_to_train(config: Config, task_events: TaskEventBus | None = None):
     """
     Fill the `tournament_task_hotkey_trainings` table with task-hotkey pairs that haven't been trained yet.
     """
+    subscription = (
+        task_events.subscribe(db_cst.TASK_STATUS_CHANNEL, {TaskStatus.READY.value, TaskStatus.LOOKING_FOR_NODES.value})
+        if task_events is not None
+        else None
+    )
     while True:
         try:
             logger.info("Fetching tournament tasks ready to train")
@@ -169,7 +182,7 @@ async def fetch_tournament_tasks_ready_to_train(config: Config):
         except Exception as e:
             logger.error(f"Error in tournament orchestrator cycles: {str(e)}", exc_info=True)
         finally:
-            await asyncio.sleep(cst.FETCH_TASKS_CYCLE_INTERVAL)
+            await wait_for_task_event(subscription, cst.FETCH_TASKS_CYCLE_INTERVAL)
 
 
 async def _fetch_tournament_tasks_ready_to_train(config: Config):
@@ -337,7 +350,12 @@ async def _process_tasks_for_training(tasks: list[AnyTypeRawTask], config: Confi
     logger.info(f"Moved {len(tasks_to_update)} tasks with priority {priority} to TRAINING status")
 
 
-async def process_pending_tournament_tasks(config: Config):
+async def process_pending_tournament_tasks(config: Config, task_events: TaskEventBus | None = None):
+    subscription = (
+        task_events.subscribe(db_cst.TRAINING_STATUS_CHANNEL, {TrainingStatus.PENDING.value})
+        if task_events is not None
+        else None
+    )
     while True:
         try:
             pending_training_tasks = await tournament_sql.get_tournament_training_tasks(
@@ -354,7 +372,7 @@ async def process_pending_tournament_tasks(config: Config):
             logger.info(f"Fetched {len(pending_training_tasks)} pending training tasks, {len(tournament_tasks)}")
 
             if not tournament_tasks:
-                await asyncio.sleep(cst.PROCESS_PENDING_TASKS_CYCLE_INTERVAL)
+                await wait_for_task_event(subscription, cst.PROCESS_PENDING_TASKS_CYCLE_INTERVAL)
                 continue
 
             await schedule_tasks_for_training(tournament_tasks, config)
@@ -367,12 +385,18 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
     """
     Process tasks from the list and schedule them for training.
     Only pop tasks when we're 100% sure GPUs are available.
+
+    The fleet is polled once up front and the whole batch is assigned against the cached GPU map, which is only polled
+    again if it goes stale during the pass.
     """
     # Track failed attempts for this scheduling session
     failed_attempts = {}
+    last_start_by_trainer = {}
 
     tasks_without_gpus = []
 
+    await _update_all_trainers_gpu_availability(config)
+
     while pending_training_tasks:
         oldest_task_training = pending_training_tasks[-1]
         tournament_id = await get_tournament_id_by_task_id(oldest_task_training.task.task_id, config.psql_db)
@@ -410,7 +434,6 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
             # Determine required GPUs for this task
             required_gpus = get_tournament_gpu_requirement(task.task_type, task.model_params_count, task.model_id)
             logger.info(f"Task {task.task_id} requires {required_gpus.value}")
-            await _update_all_trainers_gpu_availability(config)
             suitable_gpus_result = await _check_suitable_gpus(config, required_gpus)
 
             if not suitable_gpus_result:
@@ -419,7 +442,6 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
                 )
 
                 tasks_without_gpus.append(pending_training_tasks.pop())
-                await asyncio.sleep(1)  # TODO: put in constant or even remove
                 continue
 
             trainer_ip, gpu_ids = suitable_gpus_result
@@ -436,6 +458,13 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
                     training_task.training_commit_hash,
                     config,
                 )
+
+                # Avoid overwhelming a trainer; starts on different trainers don't need to wait for each other
+                wait = cst.TRAINER_START_INTERVAL - (time.monotonic() - last_start_by_trainer.get(trainer_ip, float("-inf")))
+                if wait > 0:
+                    logger.info(f"Waiting {wait:.0f} seconds before starting another task on trainer {trainer_ip}")
+                    await asyncio.sleep(wait)
+                last_start_by_trainer[trainer_ip] = time.monotonic()
                 training_result = await start_training_task(trainer_ip, training_request)
 
                 if training_result == cst.NO_RETRY_RESULT:
@@ -452,6 +481,7 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
                     await tournament_sql.update_gpu_availability(
                         trainer_ip, gpu_ids, training_task.task.hours_to_complete, config.psql_db
                     )
+                    trainer_fleet.reserve(trainer_ip, gpu_ids, training_task.task.hours_to_complete)
 
                     pending_training_tasks.pop()
                     logger.info(
@@ -460,9 +490,6 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
                         f"for {training_task.task.hours_to_complete} hours"
                     )
 
-                    logger.info("Waiting 10 seconds before scheduling next task to avoid overwhelming trainers")
-                    await asyncio.sleep(10)
-
                 else:
                     logger.error(f"Failed to start training for task {training_task.task.task_id} on trainer {trainer_ip}")
                     # Track failed attempts for this scheduling session
@@ -503,7 +530,7 @@ async def schedule_tasks_for_training(pending_training_tasks: list[TournamentTas
             f"Skipped {len(tasks_without_gpus)} tasks due to GPU unavailability. They will get picked up in the next cycle."
         )
 
-    logger.info(f"Completed scheduling cycle, {len(pending_training_tasks)} tasks remaining")
+    logger.info(f"Completed scheduling cycle, {len(pending_training_tasks)} tasks remaining, fleet: {trainer_fleet.metrics()}")
 
 
 async def _check_suitable_gpus(config: Config, required_gpus: GpuRequirement) -> tuple[str, list[int]] | None:
@@ -513,7 +540,7 @@ async def _check_suitable_gpus(config: Config, required_gpus: GpuRequirement) ->
     num_needed_GPUs_for_task / total_free_GPUs_in_trainer
 
     This ensures tasks are packed efficiently and smaller tasks don't occupy larger trainers
-    unnecessarily.
+    unnecessarily. Availability comes from the fleet's cached GPU map, polled again if it is stale.
 
     Args:
         config: Configuration object for database access
@@ -523,7 +550,9 @@ async def _check_suitable_gpus(config: Config, required_gpus: GpuRequirement) ->
         tuple[str, list[int]] | None: (trainer_ip, gpu_ids) if suitable GPUs found, None otherwise
     """
     try:
-        trainers = await tournament_sql.get_trainers(config.psql_db)
+        snapshot = await trainer_fleet.snapshot(config)
+        logger.info(f"Using trainer GPU availability polled {snapshot.age:.0f}s ago")
+        trainers = snapshot.trainers
         required_gpu_count = _get_gpu_count_from_requirement(required_gpus)
 
         best_trainer = None
@@ -796,77 +825,24 @@ async def _monitor_training_tasks(config: Config):
 async def _update_all_trainers_gpu_availability(config: Config):
     """
     Update GPU availability for all trainers by fetching current status and syncing with database.
+    Trainers are polled concurrently and the result refreshes the fleet's cached GPU map.
     """
     try:
-        # Get all trainers from database
-        trainers = await tournament_sql.get_trainers(config.psql_db)
-
-        for trainer in trainers:
-            try:
-                # Fetch current GPU availability from trainer
-                current_gpus = await fetch_trainer_gpus(trainer.trainer_ip)
-
-                # Find GPUs that are free according to trainer but marked as used in DB
-                gpus_to_reset = []
-                gpus_to_mark_unavailable = []
-                for current_gpu in current_gpus:
-                    if current_gpu.available:
-                        # Check if this GPU is marked as used in our database
-                        for db_gpu in trainer.gpus:
-                            if db_gpu.gpu_id == current_gpu.gpu_id and not db_gpu.available:
-                                gpus_to_reset.append(current_gpu.gpu_id)
-                                break
-                    else:
-                        for db_gpu in trainer.gpus:
-                            if db_gpu.gpu_id == current_gpu.gpu_id and db_gpu.available:
-                                gpus_to_mark_unavailable.append(current_gpu.gpu_id)
-                                break
-
-                # Reset GPU availability in database if needed
-                if gpus_to_reset:
-                    await tournament_sql.update_gpu_availability(trainer.trainer_ip, gpus_to_reset, 0, config.psql_db)
-                    logger.info(f"Reset {len(gpus_to_reset)} GPUs for trainer {trainer.trainer_ip}: {gpus_to_reset}")
-
-                if gpus_to_mark_unavailable:
-                    await tournament_sql.update_gpu_availability(trainer.trainer_ip, gpus_to_mark_unavailable, 2, config.psql_db)
-                    logger.info(
-                        f"Marked {len(gpus_to_mark_unavailable)} GPUs as unavailable for trainer "
-                        f"{trainer.trainer_ip}: {gpus_to_mark_unavailable}"
-                    )
-
-            except (httpx.HTTPStatusError, httpx.ConnectError, httpx.TimeoutException) as e:
-                # Handle both server errors and unreachable trainers
-                if isinstance(e, httpx.HTTPStatusError):
-                    status_code = e.response.status_code
-                    if 500 <= status_code < 600:
-                        error_msg = f"returned 5xx error ({status_code})"
-                    else:
-                        logger.error(f"HTTP error {status_code} from trainer {trainer.trainer_ip}: {str(e)}")
-                        continue
-                else:
-                    # ConnectError or TimeoutException
-                    error_msg = f"is unreachable ({type(e).__name__})"
-
-                # Common handling for unreachable trainers - set all GPUs to be available in 2 hours
-                all_gpu_ids = [gpu.gpu_id for gpu in trainer.gpus]
-                await tournament_sql.update_gpu_availability(trainer.trainer_ip, all_gpu_ids, 2, config.psql_db)
-                logger.warning(
-                    f"Trainer {trainer.trainer_ip} {error_msg}, setting {len(all_gpu_ids)} GPUs to be available in 2 hours"
-                )
-                continue
-            except Exception as e:
-                logger.error(f"Error updating GPU availability for trainer {trainer.trainer_ip}: {str(e)}")
-                continue
-
+        await trainer_fleet.poll(config)
     except Exception as e:
         logger.error(f"Error in _update_all_trainers_gpu_availability: {str(e)}")
 
 
-async def move_completed_tasks_to_preevaluation(config: Config):
+async def move_completed_tasks_to_preevaluation(config: Config, task_events: TaskEventBus | None = None):
     """
     Find tasks where all training tasks (task_id, hotkey) pairs have completed
     and move those tasks to preevaluation status.
     """
+    subscription = (
+        task_events.subscribe(db_cst.TRAINING_STATUS_CHANNEL, {TrainingStatus.SUCCESS.value, TrainingStatus.FAILURE.value})
+        if task_events is not None
+        else None
+    )
     while True:
         try:
             logger.info("Moving completed tournament tasks to preevaluation")
@@ -874,7 +850,7 @@ async def move_completed_tasks_to_preevaluation(config: Config):
         except Exception as e:
             logger.error(f"Error in move_completed_tasks_to_preevaluation cycle: {str(e)}", exc_info=True)
         finally:
-            await asyncio.sleep(cst.MOVE_COMPLETED_TASKS_CYCLE_INTERVAL)
+            await wait_for_task_event(subscription, cst.MOVE_COMPLETED_TASKS_CYCLE_INTERVAL)
 
 
 async def _move_completed_tasks_to_preevaluation(config: Config):
@@ -931,12 +907,15 @@ async def run_tournament_orchestrator_cycles():
     config = load_config()
     await try_db_connections(config)
 
+    task_events = TaskEventBus(config.psql_db, config.redis_db)
+    task_events.start()
+
     logger.info("Starting tournament orchestrator cycles")
     await asyncio.gather(
-        fetch_tournament_tasks_ready_to_train(config),
-        process_pending_tournament_tasks(config),
+        fetch_tournament_tasks_ready_to_train(config, task_events),
+        process_pending_tournament_tasks(config, task_events),
         monitor_training_tasks(config),
-        move_completed_tasks_to_preevaluation(config),
+        move_completed_tasks_to_preevaluation(config, task_events),
         update_all_trainers_gpu_availability_cycle(config),
     )
 
@@ -73,7 +73,7 @@ from validator.tournament.utils import notify_tournament_started
 from validator.tournament.utils import send_to_discord
 from validator.tournament.utils import validate_repo_license
 from validator.tournament.utils import validate_repo_obfuscation
-from validator.utils.call_endpoint import process_non_stream_fiber_get
+from validator.utils.call_endpoint import fan_out_fiber_get
 from validator.utils.logging import LogContext
 from validator.utils.logging import get_logger
 
@@ -572,28 +572,23 @@ async def populate_tournament_participants(tournament_id: str, config: Config, p
         logger.info(f"Found {len(eligible_nodes)} eligible nodes in database")
 
         responding_nodes: list[RespondingNode] = []
-        batch_size = t_cst.TOURNAMENT_PARTICIPANT_PING_BATCH_SIZE
 
-        for i in range(0, len(eligible_nodes), batch_size):
-            batch = eligible_nodes[i : i + batch_size]
-            logger.info(
-                f"Processing batch {i // batch_size + 1}/{(len(eligible_nodes) + batch_size - 1) // batch_size} "
-                f"with {len(batch)} nodes"
-            )
-
-            batch_results = await asyncio.gather(
-                *[_get_miner_training_repo(node, config, tournament.tournament_type) for node in batch],
-                return_exceptions=True,
-            )
-
-            for node, result in zip(batch, batch_results):
-                with LogContext(node_hotkey=node.hotkey):
-                    if isinstance(result, Exception):
-                        logger.warning(f"Exception pinging {node.hotkey}: {result}")
-                    elif result:
-                        responding_node = RespondingNode(node=node, training_repo_response=result)
-                        responding_nodes.append(responding_node)
-                        logger.info(f"Node responded with training repo {result.github_repo}@{result.commit_hash}")
+        async for reply in fan_out_fiber_get(
+            f"{cst.TRAINING_REPO_ENDPOINT}/{tournament.tournament_type.value}",
+            config,
+            eligible_nodes,
+            timeout=t_cst.TOURNAMENT_PARTICIPANT_PING_TIMEOUT,
+            deadline=t_cst.TOURNAMENT_PARTICIPANT_PING_DEADLINE,
+            concurrency=t_cst.TOURNAMENT_PARTICIPANT_PING_CONCURRENCY,
+        ):
+            if reply.skipped:
+                continue
+            with LogContext(node_hotkey=reply.node.hotkey):
+                result = _parse_training_repo_response(reply.node, reply.response)
+                if result:
+                    responding_node = RespondingNode(node=reply.node, training_repo_response=result)
+                    responding_nodes.append(responding_node)
+                    logger.info(f"Node responded with training repo {result.github_repo}@{result.commit_hash}")
 
         logger.info(f"Got {len(responding_nodes)} responding nodes")
 
@@ -697,12 +692,9 @@ async def populate_tournament_participants(tournament_id: str, config: Config, p
         await asyncio.sleep(30 * 60)
 
 
-async def _get_miner_training_repo(node: Node, config: Config, tournament_type: TournamentType) -> TrainingRepoResponse | None:
-    """Get training repo from a miner, similar to how submissions are fetched in the main validator cycle."""
+def _parse_training_repo_response(node: Node, response: dict | None) -> TrainingRepoResponse | None:
+    """Parse a miner's reply to the training repo endpoint, similar to how submissions are read in the main validator cycle."""
     try:
-        url = f"{cst.TRAINING_REPO_ENDPOINT}/{tournament_type.value}"
-        response = await process_non_stream_fiber_get(url, config, node)
-
         if response and isinstance(response, dict):
             return TrainingRepoResponse(**response)
         else:
@@ -0,0 +1,182 @@
+"""
+Cached view of the trainer fleet's GPUs for the tournament orchestrator.
+
+A poll asks every trainer for its GPUs concurrently, each bounded by TRAINER_POLL_TIMEOUT, syncs what they report into
+the trainers_gpus table and keeps the resulting availability in memory with the time it was taken. The scheduler
+assigns a whole batch of pending tasks against that snapshot, reserving GPUs in it as tasks start, and only polls again
+once the snapshot is older than FLEET_STATE_MAX_AGE.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Awaitable
+from typing import Callable
+
+import httpx
+
+import validator.tournament.constants as cst
+from core.models.utility_models import GPUInfo
+from core.models.utility_models import TrainerInfo
+from validator.core.config import Config
+from validator.db.sql import tournaments as tournament_sql
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TrainerPoll:
+    trainer_ip: str
+    latency: float
+    error: str | None = None
+
+
+@dataclass
+class FleetSnapshot:
+    trainers: list[TrainerInfo]
+    polls: dict[str, TrainerPoll]
+    poll_seconds: float
+    polled_at: float  # time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.polled_at
+
+    @property
+    def free_gpus(self) -> int:
+        return sum(gpu.available for trainer in self.trainers for gpu in trainer.gpus)
+
+
+async def _sync_trainer_gpus(trainer: TrainerInfo, current_gpus: list[GPUInfo], config: Config):
+    """Aligns the database with what the trainer reports: frees GPUs it says are idle and holds the ones it says are busy."""
+    db_gpus = {gpu.gpu_id: gpu for gpu in trainer.gpus}
+    gpus_to_reset = []
+    gpus_to_mark_unavailable = []
+    for current_gpu in current_gpus:
+        db_gpu = db_gpus.get(current_gpu.gpu_id)
+        if db_gpu is None:
+            continue
+        if current_gpu.available and not db_gpu.available:
+            gpus_to_reset.append(current_gpu.gpu_id)
+        elif not current_gpu.available and db_gpu.available:
+            gpus_to_mark_unavailable.append(current_gpu.gpu_id)
+
+    if gpus_to_reset:
+        await tournament_sql.update_gpu_availability(trainer.trainer_ip, gpus_to_reset, 0, config.psql_db)
+        logger.info(f"Reset {len(gpus_to_reset)} GPUs for trainer {trainer.trainer_ip}: {gpus_to_reset}")
+
+    if gpus_to_mark_unavailable:
+        await tournament_sql.update_gpu_availability(trainer.trainer_ip, gpus_to_mark_unavailable, 2, config.psql_db)
+        logger.info(
+            f"Marked {len(gpus_to_mark_unavailable)} GPUs as unavailable for trainer "
+            f"{trainer.trainer_ip}: {gpus_to_mark_unavailable}"
+        )
+
+
+class TrainerFleet:
+    def __init__(self, fetch_gpus: Callable[[str], Awaitable[list[GPUInfo]]]):
+        self._fetch_gpus = fetch_gpus
+        self._lock = asyncio.Lock()
+        self._snapshot: FleetSnapshot | None = None
+
+    async def _poll_trainer(self, trainer: TrainerInfo, config: Config) -> TrainerPoll:
+        start = time.monotonic()
+        error = None
+        try:
+            current_gpus = await asyncio.wait_for(self._fetch_gpus(trainer.trainer_ip), timeout=cst.TRAINER_POLL_TIMEOUT)
+            await _sync_trainer_gpus(trainer, current_gpus, config)
+        except (httpx.HTTPStatusError, httpx.ConnectError, httpx.TimeoutException, asyncio.TimeoutError) as e:
+            # Handle both server errors and unreachable trainers
+            if isinstance(e, httpx.HTTPStatusError) and not 500 <= e.response.status_code < 600:
+                error = f"HTTP error {e.response.status_code}"
+                logger.error(f"HTTP error {e.response.status_code} from trainer {trainer.trainer_ip}: {str(e)}")
+            else:
+                if isinstance(e, httpx.HTTPStatusError):
+                    error = f"returned 5xx error ({e.response.status_code})"
+                else:
+                    error = f"is unreachable ({type(e).__name__})"
+
+                # Common handling for unreachable trainers - set all GPUs to be available in 2 hours
+                all_gpu_ids = [gpu.gpu_id for gpu in trainer.gpus]
+                try:
+                    await tournament_sql.update_gpu_availability(trainer.trainer_ip, all_gpu_ids, 2, config.psql_db)
+                    logger.warning(
+                        f"Trainer {trainer.trainer_ip} {error}, setting {len(all_gpu_ids)} GPUs to be available in 2 hours"
+                    )
+                except Exception as db_error:
+                    logger.error(f"Error updating GPU availability for trainer {trainer.trainer_ip}: {str(db_error)}")
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error updating GPU availability for trainer {trainer.trainer_ip}: {str(e)}")
+
+        return TrainerPoll(trainer.trainer_ip, time.monotonic() - start, error)
+
+    async def _poll(self, config: Config) -> FleetSnapshot:
+        start = time.monotonic()
+        trainers = await tournament_sql.get_trainers(config.psql_db)
+        polls = await asyncio.gather(*(self._poll_trainer(trainer, config) for trainer in trainers))
+        # The syncs above moved used_until around, so take availability from the database rather than the trainers
+        trainers = await tournament_sql.get_trainers(config.psql_db)
+        self._snapshot = FleetSnapshot(
+            trainers=trainers,
+            polls={poll.trainer_ip: poll for poll in polls},
+            poll_seconds=time.monotonic() - start,
+            polled_at=time.monotonic(),
+        )
+        self._log_poll(self._snapshot)
+        return self._snapshot
+
+    @staticmethod
+    def _log_poll(snapshot: FleetSnapshot):
+        slowest = max(snapshot.polls.values(), key=lambda poll: poll.latency, default=None)
+        failed = [poll.trainer_ip for poll in snapshot.polls.values() if poll.error]
+        logger.info(
+            f"Polled {len(snapshot.polls)} trainers in {snapshot.poll_seconds:.2f}s"
+            + (f" (slowest {slowest.trainer_ip} in {slowest.latency:.2f}s)" if slowest else "")
+            + f", {snapshot.free_gpus} GPUs free"
+            + (f", {len(failed)} failed: {failed}" if failed else "")
+        )
+
+    async def poll(self, config: Config) -> FleetSnapshot:
+        """Polls every trainer now, regardless of how fresh the cached snapshot is."""
+        async with self._lock:
+            return await self._poll(config)
+
+    async def snapshot(self, config: Config, max_age: float = cst.FLEET_STATE_MAX_AGE) -> FleetSnapshot:
+        """The cached snapshot, polled again first if it is older than `max_age` seconds."""
+        async with self._lock:
+            if self._snapshot is None or self._snapshot.age > max_age:
+                return await self._poll(config)
+            return self._snapshot
+
+    def reserve(self, trainer_ip: str, gpu_ids: list[int], hours: int):
+        """Marks GPUs a task was just started on as busy in the snapshot, mirroring the database update."""
+        if self._snapshot is None:
+            return
+        used_until = datetime.now(timezone.utc) + timedelta(hours=hours)
+        for trainer in self._snapshot.trainers:
+            if trainer.trainer_ip != trainer_ip:
+                continue
+            for gpu in trainer.gpus:
+                if gpu.gpu_id in gpu_ids:
+                    gpu.available = False
+                    gpu.used_until = used_until
+
+    def metrics(self) -> dict:
+        """Poll latency and staleness of the cached snapshot; empty until the first poll."""
+        if self._snapshot is None:
+            return {}
+        polls = self._snapshot.polls.values()
+        return {
+            "trainers": len(self._snapshot.trainers),
+            "failed_trainers": sum(poll.error is not None for poll in polls),
+            "free_gpus": self._snapshot.free_gpus,
+            "poll_seconds": self._snapshot.poll_seconds,
+            "max_trainer_latency_seconds": max((poll.latency for poll in polls), default=0.0),
+            "staleness_seconds": self._snapshot.age,
+        }
@@ -1,5 +1,9 @@
 """
 Affine-style reward functions for GRPO tasks.
+
+Each function is stored in the database as its own source, so it imports everything it needs itself. When the
+validator package is importable it hands the whole batch to the matching verifier in affine_verifiers, which caches
+per-prompt work; stored copies running without the package fall back to checking each completion inline.
 """
 
 from .reward_functions import restricted_execution
@@ -25,6 +29,13 @@ def sat_reward_function(completions, extra_data=None, **kwargs):
     elif len(extra_data_list) == 1 and len(completions) > 1:
         extra_data_list = extra_data_list * len(completions)
 
+    try:
+        from validator.utils.affine_verifiers import score_sat_batch
+    except ImportError:
+        score_sat_batch = None
+    if score_sat_batch is not None:
+        return score_sat_batch(completions, extra_data_list)
+
     scores = []
 
     for completion, extra_data_item in zip(completions, extra_data_list):
@@ -111,6 +122,13 @@ def abd_reward_function(completions, extra_data=None, **kwargs):
     elif len(extra_data_list) == 1 and len(completions) > 1:
         extra_data_list = extra_data_list * len(completions)
 
+    try:
+        from validator.utils.affine_verifiers import score_abd_batch
+    except ImportError:
+        score_abd_batch = None
+    if score_abd_batch is not None:
+        return score_abd_batch(completions, extra_data_list)
+
     scores = []
 
     for completion, extra_data_item in zip(completions, extra_data_list):
@@ -207,6 +225,13 @@ def ded_reward_function(completions, extra_data=None, **kwargs):
     elif len(extra_data_list) == 1 and len(completions) > 1:
         extra_data_list = extra_data_list * len(completions)
 
+    try:
+        from validator.utils.affine_verifiers import score_ded_batch
+    except ImportError:
+        score_ded_batch = None
+    if score_ded_batch is not None:
+        return score_ded_batch(completions, extra_data_list)
+
     scores = []
 
     for completion, extra_data_item in zip(completions, extra_data_list):
@@ -0,0 +1,307 @@
+"""
+Batch verifiers behind the affine SAT/ABD/DED reward functions.
+
+A GRPO batch holds several generations of every prompt, each carrying the same extra_data. Problems are parsed once per
+distinct extra_data and cached, SAT assignments of all completions of a problem are checked together against bitsets
+of its clauses, and program executions are cached by (code, input) so a reference solution runs once per problem.
+Scores are identical to the per-completion implementations in affine_reward_functions.py.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from validator.core import constants as cst
+from validator.utils.reward_functions import restricted_execution
+
+
+SAT_ASSIGNMENT_PATTERN = re.compile(r"x(\d+)\s*=\s*(True|False|1|0)", re.IGNORECASE)
+CODE_FENCE_PATTERN = re.compile(r"```(?:python)?\s*([\s\S]*?)```", re.IGNORECASE)
+THINK_PATTERN = re.compile(r"<think>.*?</think>", flags=re.DOTALL)
+THINKING_PATTERN = re.compile(r"<thinking>.*?</thinking>", flags=re.DOTALL)
+INPUT_PATTERN = re.compile(r"<INPUT>(.*?)</INPUT>", re.IGNORECASE | re.DOTALL)
+CODE_KEYWORDS = ["def ", "print", "input", "return"]
+
+
+@dataclass(frozen=True)
+class SatProblem:
+    # [num_clauses, ceil(num_variables / 8)] packed bitsets of the variables appearing positively / negatively
+    positive: np.ndarray | None
+    negative: np.ndarray | None
+    num_clauses: int
+    num_variables: int
+    # Clauses the bitsets can't represent exactly (non-numeric literals, huge variable numbers), checked one by one
+    irregular_clauses: list | None = None
+
+
+@dataclass(frozen=True)
+class AbdProblem:
+    program: str
+    expected_clean: str
+
+
+@dataclass(frozen=True)
+class DedProblem:
+    solution: str | None  # None when the solution can't be extracted, which scores 0 once a completion gets that far
+    test_input: str | None  # None when the problem has no usable premises
+
+
+def _extra_data_key(item) -> str | None:
+    """Cache key of an extra_data item: the JSON string itself, or the canonical JSON of an already parsed dict."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        try:
+            return json.dumps(item, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def _problems(extra_data_list: list, parse_problem) -> list:
+    """Parsed problem of every extra_data item; generations of one prompt usually share the item object."""
+    problems_by_id = {}
+    problems = []
+    for item in extra_data_list:
+        if id(item) not in problems_by_id:
+            key = _extra_data_key(item)
+            problems_by_id[id(item)] = parse_problem(key) if key is not None else None
+        problems.append(problems_by_id[id(item)])
+    return problems
+
+
+def _load_item(key: str) -> dict | None:
+    try:
+        item = json.loads(key)
+    except json.JSONDecodeError:
+        return None
+    return item if isinstance(item, dict) else None
+
+
+def _clean_lines(text: str) -> str:
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+@lru_cache(maxsize=cst.AFFINE_EXECUTION_CACHE_SIZE)
+def cached_restricted_execution(code: str, input_data: str) -> tuple[str, str]:
+    # Restricted programs can't import anything, so their output only depends on the code and the input
+    return restricted_execution(code, input_data)
+
+
+@lru_cache(maxsize=cst.AFFINE_PROBLEM_CACHE_SIZE)
+def _sat_problem(key: str) -> SatProblem | None:
+    item = _load_item(key)
+    if item is None or item.get("task_type", "").upper() != "SAT":
+        return None
+    cls = item.get("cls", [])
+    if not isinstance(cls, list) or not cls:
+        return None
+
+    literals = []
+    try:
+        for clause_index, clause in enumerate(cls):
+            if not isinstance(clause, list):
+                continue
+            for literal in clause:
+                if isinstance(literal, str):
+                    raise TypeError("string literal")
+                literals.append((clause_index, abs(int(literal)), literal > 0))
+    except (TypeError, ValueError, OverflowError):
+        return SatProblem(None, None, len(cls), 0, irregular_clauses=cls)
+
+    num_variables = max((variable for _, variable, _ in literals), default=0) + 1
+    if num_variables > cst.SAT_BITSET_MAX_VARIABLES:
+        return SatProblem(None, None, len(cls), num_variables, irregular_clauses=cls)
+
+    positive = np.zeros((len(cls), num_variables), dtype=bool)
+    negative = np.zeros((len(cls), num_variables), dtype=bool)
+    for clause_index, variable, is_positive in literals:
+        (positive if is_positive else negative)[clause_index, variable] = True
+    return SatProblem(np.packbits(positive, axis=1), np.packbits(negative, axis=1), len(cls), num_variables)
+
+
+def _parse_assignments(completion) -> dict[int, bool]:
+    return {int(number): value.lower() in ("true", "1") for number, value in SAT_ASSIGNMENT_PATTERN.findall(str(completion))}
+
+
+def _satisfied_fraction_one_by_one(assignments: dict[int, bool], cls: list) -> float:
+    satisfied_count = 0
+    for clause in cls:
+        if not isinstance(clause, list):
+            continue
+        for literal in clause:
+            var = abs(int(literal))
+            is_positive = literal > 0
+            if var in assignments and assignments[var] == is_positive:
+                satisfied_count += 1
+                break
+    return satisfied_count / len(cls)
+
+
+def _satisfied_fractions(problem: SatProblem, assignments_list: list[dict[int, bool]]) -> np.ndarray:
+    true_variables = np.zeros((len(assignments_list), problem.num_variables), dtype=bool)
+    false_variables = np.zeros((len(assignments_list), problem.num_variables), dtype=bool)
+    for row, assignments in enumerate(assignments_list):
+        for variable, value in assignments.items():
+            # Variables no clause mentions can't satisfy anything
+            if variable < problem.num_variables:
+                (true_variables if value else false_variables)[row, variable] = True
+    true_bits = np.packbits(true_variables, axis=1)[:, None, :]
+    false_bits = np.packbits(false_variables, axis=1)[:, None, :]
+
+    # [completions, clauses]: some positive literal assigned True or negative literal assigned False
+    satisfied = ((problem.positive[None] & true_bits) | (problem.negative[None] & false_bits)).any(axis=2)
+    return satisfied.sum(axis=1) / problem.num_clauses
+
+
+def score_sat_batch(completions: list, extra_data_list: list) -> list[float]:
+    pairs = list(zip(completions, _problems(extra_data_list, _sat_problem)))
+    scores = [0.0] * len(pairs)
+    completions_by_problem: dict[int, tuple[SatProblem, list[int], list[dict[int, bool]]]] = {}
+
+    for i, (completion, problem) in enumerate(pairs):
+        if problem is None:
+            continue
+        try:
+            assignments = _parse_assignments(completion)
+        except Exception:
+            continue
+        if not assignments:
+            continue
+        if problem.irregular_clauses is not None:
+            try:
+                scores[i] = _satisfied_fraction_one_by_one(assignments, problem.irregular_clauses)
+            except Exception:
+                scores[i] = 0.0
+            continue
+        _, indices, assignments_list = completions_by_problem.setdefault(id(problem), (problem, [], []))
+        indices.append(i)
+        assignments_list.append(assignments)
+
+    for problem, indices, assignments_list in completions_by_problem.values():
+        for i, fraction in zip(indices, _satisfied_fractions(problem, assignments_list)):
+            scores[i] = float(fraction)
+    return scores
+
+
+@lru_cache(maxsize=cst.AFFINE_PROBLEM_CACHE_SIZE)
+def _abd_problem(key: str) -> AbdProblem | None:
+    item = _load_item(key)
+    if item is None or item.get("task_type", "").upper() != "ABD":
+        return None
+    program = item.get("program", "")
+    expected_output = item.get("expected_output", "")
+    if not program:
+        return None
+    try:
+        match = CODE_FENCE_PATTERN.search(program)
+        if match:
+            program = match.group(1).strip()
+        return AbdProblem(program, _clean_lines(str(expected_output)))
+    except Exception:
+        return None
+
+
+def _score_abd(completion, problem: AbdProblem) -> float:
+    response = THINKING_PATTERN.sub("", THINK_PATTERN.sub("", str(completion)))
+    input_matches = INPUT_PATTERN.findall(response)
+    if not input_matches:
+        return 0.1 if "<INPUT" in response.upper() else 0.0
+
+    lines = [line.rstrip() for line in input_matches[-1].strip().splitlines()]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    output, error = cached_restricted_execution(problem.program, "\n".join(lines))
+    if error:
+        return 0.2
+
+    output_clean = _clean_lines(output)
+    if output_clean == problem.expected_clean:
+        return 1.0
+    if not output_clean or not problem.expected_clean:
+        return 0.3
+    matches = sum(c1 == c2 for c1, c2 in zip(output_clean, problem.expected_clean))
+    similarity = matches / max(len(output_clean), len(problem.expected_clean))
+    return min(0.3 + (0.6 * similarity), 0.95)
+
+
+def score_abd_batch(completions: list, extra_data_list: list) -> list[float]:
+    scores = []
+    for completion, problem in zip(completions, _problems(extra_data_list, _abd_problem)):
+        if problem is None:
+            scores.append(0.0)
+            continue
+        try:
+            scores.append(_score_abd(completion, problem))
+        except Exception:
+            scores.append(0.0)
+    return scores
+
+
+@lru_cache(maxsize=cst.AFFINE_PROBLEM_CACHE_SIZE)
+def _ded_problem(key: str) -> DedProblem | None:
+    item = _load_item(key)
+    if item is None or item.get("task_type", "").upper() != "DED":
+        return None
+    solution = item.get("solution", "")
+    premises = item.get("premises", [])
+    if not solution:
+        return None
+    try:
+        match = CODE_FENCE_PATTERN.search(solution)
+        if match:
+            solution = match.group(1).strip()
+    except Exception:
+        solution = None
+
+    if not premises or not isinstance(premises, list):
+        return DedProblem(solution, None)
+    return DedProblem(solution, str(premises[0]))
+
+
+def _score_ded(completion, problem: DedProblem) -> float:
+    match = CODE_FENCE_PATTERN.search(str(completion))
+    if not match:
+        return 0.1 if any(keyword in str(completion) for keyword in CODE_KEYWORDS) else 0.0
+
+    submitted_code = match.group(1).strip()
+    try:
+        compile(submitted_code, "<string>", "exec")
+    except BaseException:
+        return 0.2
+    if problem.solution is None:
+        return 0.0
+    if problem.test_input is None:
+        return 0.3
+
+    # The reference output is computed once per problem, the first time a completion needs it
+    expected_output, expected_error = cached_restricted_execution(problem.solution, problem.test_input)
+    if expected_error:
+        return 0.35
+    actual_output, actual_error = cached_restricted_execution(submitted_code, problem.test_input)
+    if actual_error:
+        return 0.4
+
+    expected_clean = _clean_lines(expected_output)
+    actual_clean = _clean_lines(actual_output)
+    if expected_clean == actual_clean:
+        return 1.0
+    if expected_clean in actual_clean or actual_clean in expected_clean:
+        return 0.8
+    return 0.5
+
+
+def score_ded_batch(completions: list, extra_data_list: list) -> list[float]:
+    scores = []
+    for completion, problem in zip(completions, _problems(extra_data_list, _ded_problem)):
+        if problem is None:
+            scores.append(0.0)
+            continue
+        try:
+            scores.append(_score_ded(completion, problem))
+        except Exception:
+            scores.append(0.0)
+    return scores
@@ -5,6 +5,8 @@ import tempfile
 
 from core import constants as cst
 from validator.utils.logging import get_logger
+from validator.utils.model_cache_index import ModelCacheIndex
+from validator.utils.model_cache_index import get_model_cache_index
 
 
 logger = get_logger(__name__)
@@ -120,49 +122,11 @@ def remove_cache_models_except(models_to_keep: list[str]):
     logger.info(f"Cleaned cache: removed {deleted_count} dirs and {deleted_files} safetensors files.")
 
 
-def get_directory_size(path: str) -> int:
-    """Calculate total size of a directory in bytes.
-    Returns 0 if directory doesn't exist."""
-    try:
-        total = 0
-        with os.scandir(path) as it:
-            for entry in it:
-                if entry.is_file(follow_symlinks=False):
-                    total += entry.stat(follow_symlinks=False).st_size
-                elif entry.is_dir(follow_symlinks=False):
-                    total += get_directory_size(entry.path)
-        return total
-    except (FileNotFoundError, PermissionError):
-        return 0
-
-
-def get_hf_model_cache_size(model_id: str) -> int:
-    """Get size of a specific model in HF cache (case insensitive).
-    Returns 0 if model not found."""
-    model_pattern = f"models--{model_id.lower().replace('/', '--')}"
-    total_size = 0
-
-    # Find and measure directory size (case insensitive)
-    if os.path.exists(cst.CACHE_DIR_HUB):
-        for dir_name in os.listdir(cst.CACHE_DIR_HUB):
-            if dir_name.lower() == model_pattern:
-                total_size += get_directory_size(os.path.join(cst.CACHE_DIR_HUB, dir_name))
-
-        # Check for matching safetensor files
-        for file_name in os.listdir(cst.CACHE_DIR_HUB):
-            if file_name.endswith(".safetensors") and file_name.lower().startswith(model_pattern):
-                try:
-                    file_path = os.path.join(cst.CACHE_DIR_HUB, file_name)
-                    total_size += os.path.getsize(file_path)
-                except (OSError, FileNotFoundError):
-                    pass
-
-    return total_size
-
-
-def manage_models_cache(model_stats: dict[str, dict], max_size: int) -> None:
-    """Manage HF models cache based on model usage statistics."""
-    current_size = get_directory_size(cst.CACHE_DIR_HUB)
+def manage_models_cache(model_stats: dict[str, dict], max_size: int, index: ModelCacheIndex | None = None) -> None:
+    """Manage HF models cache based on model usage statistics, with sizes and last access from the cache index."""
+    index = index or get_model_cache_index()
+    index.refresh()
+    current_size = index.total_size()
     if current_size <= max_size:
         return
 
@@ -174,21 +138,25 @@ def manage_models_cache(model_stats: dict[str, dict], max_size: int) -> None:
     logger.info(f"Cache cleanup: Will remove models with no cache score record ({len(allowed_models)} records)")
     remove_cache_models_except(allowed_models)
 
-    current_size = get_directory_size(cst.CACHE_DIR_HUB)
+    index.refresh()
+    current_size = index.total_size()
     if current_size <= max_size:
         logger.info(f"Cache size now {current_size / 1024**3:.2f}GB after removing unused models.")
         return
 
-    # Second pass: calculate which models to remove based on scores and sizes
-    sorted_models = sorted(model_stats.items(), key=lambda x: x[1]["cache_score"])
+    # Second pass: remove cached models by lowest score; among equal scores least recently used, then largest, go first
+    usage = {model_id: index.model_usage(model_id) for model_id in model_stats}
+    sorted_models = sorted(
+        (model_id for model_id in model_stats if usage[model_id][0] > 0),
+        key=lambda model_id: (model_stats[model_id]["cache_score"], usage[model_id][1], -usage[model_id][0]),
+    )
 
     size_to_free = current_size - max_size
     cumulative_size = 0
     models_to_remove = []
 
-    for model_id, stats in sorted_models:
-        model_size = get_hf_model_cache_size(model_id)
-        cumulative_size += model_size
+    for model_id in sorted_models:
+        cumulative_size += usage[model_id][0]
         models_to_remove.append(model_id)
 
         if cumulative_size >= size_to_free:
@@ -198,5 +166,6 @@ def manage_models_cache(model_stats: dict[str, dict], max_size: int) -> None:
 
     logger.info(f"Cache cleanup: Will keep {len(models_to_keep)} models")
     remove_cache_models_except(models_to_keep)
-    final_size = get_directory_size(cst.CACHE_DIR_HUB)
+    index.refresh()
+    final_size = index.total_size()
     logger.info(f"Cache cleanup complete. Final size: {final_size / 1024**3:.2f}GB")
@@ -1,5 +1,6 @@
 import time
 from typing import Any
+from typing import AsyncIterator
 
 import httpx
 from fiber import Keypair
@@ -12,7 +13,10 @@ from validator.core.constants import IMAGE_GEN_ENDPOINT
 from validator.core.constants import NETUID
 from validator.core.constants import NINETEEN_API_KEY
 from validator.core.constants import PROMPT_GEN_ENDPOINT
+from validator.utils.http_clients import get_http_client_registry
 from validator.utils.logging import get_logger
+from validator.utils.node_fanout import NodeResponse
+from validator.utils.node_fanout import fan_out
 from validator.utils.util import retry_http_with_backoff
 
 
@@ -35,7 +39,7 @@ def _get_headers_for_signed_https_request(keypair: Keypair):
     return headers
 
 
-async def process_non_stream_fiber_get(endpoint: str, config: Config, node: Node) -> dict[str, Any] | None:
+async def process_non_stream_fiber_get(endpoint: str, config: Config, node: Node, timeout: float = 10) -> dict[str, Any] | None:
     server_address = client.construct_server_address(
         node=node,
         replace_with_docker_localhost=False,
@@ -50,7 +54,7 @@ async def process_non_stream_fiber_get(endpoint: str, config: Config, node: Node
             keypair=config.keypair,
             server_address=server_address,
             endpoint=endpoint,
-            timeout=10,
+            timeout=timeout,
         )
     except Exception as e:
         logger.error(f"Failed to communicate with node {node.node_id}: {e}")
@@ -63,6 +67,19 @@ async def process_non_stream_fiber_get(endpoint: str, config: Config, node: Node
     return response.json()
 
 
+def fan_out_fiber_get(
+    endpoint: str, config: Config, nodes: list[Node], timeout: float, deadline: float, concurrency: int
+) -> AsyncIterator[NodeResponse]:
+    """GETs `endpoint` from every node concurrently and yields the replies as they arrive; see node_fanout.fan_out."""
+    return fan_out(
+        nodes,
+        lambda node, node_timeout: process_non_stream_fiber_get(endpoint, config, node, timeout=node_timeout),
+        timeout=timeout,
+        deadline=deadline,
+        concurrency=concurrency,
+    )
+
+
 async def process_non_stream_fiber(
     endpoint: str, config: Config, node: Node, payload: dict[str, Any], timeout: int = 10
 ) -> dict[str, Any] | None:
@@ -119,31 +136,36 @@ async def _post_to_nineteen_ai(url: str, payload: dict[str, Any], keypair: Keypa
             "Content-Type": "application/json",
         }
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        response = await client.post(url=url, json=payload, headers=headers)
-        if response.status_code != 200:
-            # NOTE: What do to about these as they pollute everywhere
-            logger.error(f"Error in nineteen ai response: {response.content}")
-            response.raise_for_status()
+    response = await get_http_client_registry().post(url, json=payload, headers=headers, timeout=120)
+    if response.status_code != 200:
+        # NOTE: What do to about these as they pollute everywhere
+        logger.error(f"Error in nineteen ai response: {response.content}")
+        response.raise_for_status()
 
-        return response
+    return response
 
 
 @retry_http_with_backoff
-async def call_content_service(endpoint: str, keypair: Keypair, params: dict = None) -> dict[str, Any] | list[dict[str, Any]]:
-    """Make a signed request to the content service."""
+async def call_content_service(
+    endpoint: str, keypair: Keypair, params: dict = None, name: str | None = None, coalesce: bool = False
+) -> dict[str, Any] | list[dict[str, Any]]:
+    """
+    Make a signed request to the content service.
+    Only pass `coalesce` for endpoints that answer identical requests identically; the random ones must not share.
+    """
     headers = _get_headers_for_signed_https_request(keypair)
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        response = await client.get(url=endpoint, headers=headers, params=params)
-        if response.status_code != 200:
-            logger.error(f"Error in content service response. Status code: {response.status_code} and response: {response.text}")
-            response.raise_for_status()
-        return response.json()
+    response = await get_http_client_registry().get(
+        endpoint, headers=headers, params=params, timeout=120, name=name, coalesce=coalesce
+    )
+    if response.status_code != 200:
+        logger.error(f"Error in content service response. Status code: {response.status_code} and response: {response.text}")
+        response.raise_for_status()
+    return response.json()
 
 
 async def call_content_service_fast(
-    endpoint: str, keypair: Keypair, params: dict = None
+    endpoint: str, keypair: Keypair, params: dict = None, name: str | None = None, coalesce: bool = False
 ) -> dict[str, Any] | list[dict[str, Any]]:
     """Make a signed request to the content service with fast retries for LLM endpoints."""
     from validator.utils.util import retry_http_fast
@@ -152,14 +174,15 @@ async def call_content_service_fast(
     async def _make_request():
         headers = _get_headers_for_signed_https_request(keypair)
         logger.info(f"Making request to {endpoint} with params: {params}")
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(url=endpoint, headers=headers, params=params)
-            if response.status_code != 200:
-                logger.error(
-                    f"Error in content service response. URL: {endpoint}, Status code: {response.status_code} and response: {response.text}"
-                )
-                response.raise_for_status()
-            logger.info(f"Successful request to {endpoint}, response size: {len(response.text)} chars")
-            return response.json()
+        response = await get_http_client_registry().get(
+            endpoint, headers=headers, params=params, timeout=30, name=name, coalesce=coalesce
+        )
+        if response.status_code != 200:
+            logger.error(
+                f"Error in content service response. URL: {endpoint}, Status code: {response.status_code} and response: {response.text}"
+            )
+            response.raise_for_status()
+        logger.info(f"Successful request to {endpoint}, response size: {len(response.text)} chars")
+        return response.json()
 
     return await _make_request()
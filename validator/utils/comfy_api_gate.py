@@ -1,87 +1,82 @@
+"""
+Blocking facade over ComfyClient for the evaluation and image synth scripts, which run outside any event loop.
+
+The client and its websocket live on a private event loop that is driven only while one of these calls runs.
+"""
+
+import asyncio
 import io
-import json
-import time
-import urllib.parse
-import urllib.request
-import uuid
+from typing import Iterator
 
-import websocket
 from PIL import Image
 
+from validator.utils.comfy_client import ComfyClient
+
 
 # Configuration variables
 server_address = "127.0.0.1:8188"
-client_id = str(uuid.uuid4())
-ws = None  # WebSocket connection object
+
+_loop = asyncio.new_event_loop()
+_client: ComfyClient | None = None
 
 
 def connect():
-    global ws
-    ws = websocket.WebSocket()
-    while True:
-        try:
-            ws.connect(f"ws://{server_address}/ws?clientId={client_id}")
-            print("Connected to WebSocket.")
-            break
-        except ConnectionRefusedError:
-            print("Could not connect to ComfyUI because it is not up yet. Sleeping for 2 seconds before trying again.")
-            time.sleep(2)
+    global _client
+    if _client is not None:
+        _loop.run_until_complete(_client.close())
+    _client = ComfyClient(server_address)
+    _loop.run_until_complete(_client.connect())
+
 
+def reset_stage_timings():
+    _client.reset_stage_timings()
 
-def queue_prompt(prompt):
-    p = {"prompt": prompt, "client_id": client_id}
-    data = json.dumps(p).encode("utf-8")
-    req = urllib.request.Request(f"http://{server_address}/prompt", data=data)
-    return json.loads(urllib.request.urlopen(req).read())
 
+def get_stage_timings() -> dict[str, float]:
+    """
+    Seconds spent per stage since the last reset_stage_timings(): "queue" is time ComfyUI was not running any of our
+    prompts, "fetch" is downloading the outputs, the rest is node execution time.
+    """
+    return dict(_client.stage_timings)
 
-def get_image(filename, subfolder, folder_type):
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    with urllib.request.urlopen(f"http://{server_address}/view?{url_values}") as response:
-        return response.read()
 
+def _decode_images(images: dict[str, list[bytes]]) -> list[Image.Image]:
+    return [Image.open(io.BytesIO(image_data)) for node_images in images.values() for image_data in node_images]
 
-def get_history(prompt_id):
-    with urllib.request.urlopen(f"http://{server_address}/history/{prompt_id}") as response:
-        return json.loads(response.read())
+
+def generate_stream(payloads: list[dict]) -> Iterator[tuple[int, list[Image.Image]]]:
+    """
+    Yields (index, images) for every payload as soon as it finishes, keeping a rolling window of payloads queued in
+    ComfyUI so it never waits on us between prompts. Unfinished payloads are dropped from the queue if the caller
+    stops early.
+    """
+    stream = _client.generate_stream(payloads)
+    try:
+        while True:
+            try:
+                index, images = _loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+            yield index, _decode_images(images)
+    finally:
+        _loop.run_until_complete(stream.aclose())
+
+
+def get_images_batch(prompts: list[dict]) -> list[dict[str, list[bytes]]]:
+    return _loop.run_until_complete(_client.generate_batch(prompts))
 
 
 def get_images(prompt):
-    prompt_id = queue_prompt(prompt)["prompt_id"]
-    output_images = {}
-
-    while True:
-        out = ws.recv()
-        if isinstance(out, str):
-            message = json.loads(out)
-            if message["type"] == "executing":
-                data = message["data"]
-                if data["node"] is None and data["prompt_id"] == prompt_id:
-                    break  # Execution is done
-        else:
-            continue  # previews are binary data
-
-    history = get_history(prompt_id)[prompt_id]
-    for o in history["outputs"]:
-        for node_id in history["outputs"]:
-            node_output = history["outputs"][node_id]
-            if "images" in node_output:
-                images_output = []
-                for image in node_output["images"]:
-                    image_data = get_image(image["filename"], image["subfolder"], image["type"])
-                    images_output.append(image_data)
-            output_images[node_id] = images_output
-
-    return output_images
+    return get_images_batch([prompt])[0]
+
+
+def generate_batch(payloads: list[dict]) -> list[list[Image.Image]]:
+    """Run payloads through the rolling window, returning the images of each payload in order."""
+    results = [None] * len(payloads)
+    for index, images in generate_stream(payloads):
+        results[index] = images
+    return results
 
 
 def generate(payload):
-    img_list = []
-    images = get_images(payload)
-    for node_id in images:
-        for image_data in images[node_id]:
-            image = Image.open(io.BytesIO(image_data))
-            img_list.append(image)
-
-    return img_list
+    return generate_batch([payload])[0]
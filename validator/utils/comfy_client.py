@@ -0,0 +1,250 @@
+"""
+Asyncio ComfyUI client that keeps a rolling window of prompts in flight on one websocket.
+
+Prompts are queued in order, up to `max_in_flight` at a time, so ComfyUI always has the next prompt waiting and never
+sits idle on a client round trip. Websocket events are routed to their prompt by prompt_id, and as soon as a prompt
+finishes its images are fetched from /view concurrently while the following prompts keep running. Results are yielded
+in completion order.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import aiohttp
+
+
+MAX_PROMPTS_IN_FLIGHT = 4
+CONNECT_RETRY_INTERVAL = 2  # seconds
+
+# Node classes whose execution time is reported as its own stage, everything else counts as "other"
+STAGE_BY_CLASS_TYPE = {
+    "KSampler": "sampling",
+    "KSamplerAdvanced": "sampling",
+    "SamplerCustomAdvanced": "sampling",
+    "VAEDecode": "decode",
+    "VAEEncode": "encode",
+    "CheckpointLoaderSimple": "load",
+    "UNETLoader": "load",
+    "LoraLoader": "load",
+    "LoraLoaderModelOnly": "load",
+}
+
+
+@dataclass
+class _PromptState:
+    class_types: dict[str, str]
+    done: asyncio.Future
+
+
+class ComfyClient:
+    def __init__(self, server_address: str = "127.0.0.1:8188", max_in_flight: int = MAX_PROMPTS_IN_FLIGHT):
+        self.server_address = server_address
+        self.max_in_flight = max_in_flight
+        self.client_id = str(uuid.uuid4())
+        # Seconds spent per stage: "queue" is time ComfyUI was not running any of our prompts, "fetch" is downloading
+        # the outputs (overlapping with the next prompts), the rest is node execution time
+        self.stage_timings: dict[str, float] = defaultdict(float)
+        self._session: aiohttp.ClientSession | None = None
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._reader: asyncio.Task | None = None
+        self._prompts: dict[str, _PromptState] = {}
+        self._queue_lock = asyncio.Lock()
+        # Events that beat the /prompt response announcing their prompt_id; replayed once it arrives
+        self._early_messages: dict[str, list[dict]] | None = None
+        self._running_node: tuple[str, str, float] | None = None  # (prompt_id, node_id, started_at)
+        self._idle_since: float | None = None
+
+    async def connect(self):
+        self._session = aiohttp.ClientSession()
+        while True:
+            try:
+                self._ws = await self._session.ws_connect(
+                    f"ws://{self.server_address}/ws?clientId={self.client_id}", max_msg_size=0
+                )
+                print("Connected to WebSocket.")
+                break
+            except aiohttp.ClientConnectorError:
+                print(
+                    f"Could not connect to ComfyUI because it is not up yet. "
+                    f"Sleeping for {CONNECT_RETRY_INTERVAL} seconds before trying again."
+                )
+                await asyncio.sleep(CONNECT_RETRY_INTERVAL)
+        self._reader = asyncio.create_task(self._read_messages())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def reset_stage_timings(self):
+        self.stage_timings.clear()
+
+    async def _read_messages(self):
+        try:
+            async for message in self._ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self._route(json.loads(message.data))
+                # previews are binary data
+        finally:
+            for state in self._prompts.values():
+                if not state.done.done():
+                    state.done.set_exception(ConnectionError("ComfyUI websocket closed"))
+
+    def _route(self, message: dict):
+        data = message.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if prompt_id is None:
+            return
+        state = self._prompts.get(prompt_id)
+        if state is not None:
+            self._apply(prompt_id, state, message)
+        elif self._early_messages is not None:
+            self._early_messages[prompt_id].append(message)
+
+    def _apply(self, prompt_id: str, state: _PromptState, message: dict):
+        data = message.get("data") or {}
+        now = time.perf_counter()
+        if self._running_node is not None:
+            # A node has finished once the next event of our prompts arrives
+            node_prompt_id, node_id, started_at = self._running_node
+            class_types = self._prompts[node_prompt_id].class_types if node_prompt_id in self._prompts else {}
+            self.stage_timings[STAGE_BY_CLASS_TYPE.get(class_types.get(node_id), "other")] += now - started_at
+            self._running_node = None
+
+        if message["type"] == "execution_start":
+            if self._idle_since is not None:
+                self.stage_timings["queue"] += now - self._idle_since
+                self._idle_since = None
+        elif message["type"] == "executing":
+            if data["node"] is None:
+                self._idle_since = now
+                if not state.done.done():
+                    state.done.set_result(None)  # Execution is done
+            else:
+                self._running_node = (prompt_id, data["node"], now)
+        elif message["type"] in ("execution_error", "execution_interrupted"):
+            self._idle_since = now
+            if not state.done.done():
+                state.done.set_exception(RuntimeError(data.get("exception_message", message["type"])))
+
+    async def _queue_prompt(self, prompt: dict) -> str:
+        """Callers hold _queue_lock, so only one /prompt response is outstanding while events are buffered."""
+        if self._ws is None or self._ws.closed:
+            raise ConnectionError("Not connected to ComfyUI")
+        self._early_messages = defaultdict(list)
+        try:
+            async with self._session.post(
+                f"http://{self.server_address}/prompt", json={"prompt": prompt, "client_id": self.client_id}
+            ) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"ComfyUI rejected the prompt ({response.status}): {await response.text()}")
+                prompt_id = (await response.json())["prompt_id"]
+            if self._idle_since is None and not self._prompts:
+                self._idle_since = time.perf_counter()
+            state = _PromptState(
+                {node_id: node["class_type"] for node_id, node in prompt.items()},
+                asyncio.get_running_loop().create_future(),
+            )
+            self._prompts[prompt_id] = state
+            for message in self._early_messages.pop(prompt_id, []):
+                self._apply(prompt_id, state, message)
+        finally:
+            self._early_messages = None
+        return prompt_id
+
+    async def _get_image(self, image: dict) -> bytes:
+        params = {"filename": image["filename"], "subfolder": image["subfolder"], "type": image["type"]}
+        async with self._session.get(f"http://{self.server_address}/view", params=params) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def _get_output_images(self, prompt_id: str) -> dict[str, list[bytes]]:
+        started_at = time.perf_counter()
+        async with self._session.get(f"http://{self.server_address}/history/{prompt_id}") as response:
+            response.raise_for_status()
+            outputs = (await response.json())[prompt_id]["outputs"]
+        images = [(node_id, image) for node_id, node_output in outputs.items() for image in node_output.get("images", [])]
+        image_data = await asyncio.gather(*(self._get_image(image) for _, image in images))
+
+        output_images = {node_id: [] for node_id, node_output in outputs.items() if "images" in node_output}
+        for (node_id, _), data in zip(images, image_data):
+            output_images[node_id].append(data)
+        self.stage_timings["fetch"] += time.perf_counter() - started_at
+        return output_images
+
+    async def _cancel_queued(self, prompt_ids: list[str]):
+        """Best effort: drops prompts we no longer wait for from ComfyUI's queue so they don't delay the next burst."""
+        try:
+            async with self._session.post(f"http://{self.server_address}/queue", json={"delete": prompt_ids}):
+                pass
+        except aiohttp.ClientError:
+            pass
+
+    async def generate_stream(self, prompts: list[dict]) -> AsyncIterator[tuple[int, dict[str, list[bytes]]]]:
+        """
+        Yields (index, images by output node) for every prompt as it finishes. Stops at the first prompt ComfyUI
+        fails on with a RuntimeError, dropping the prompts still queued behind it.
+        """
+        window = asyncio.Semaphore(self.max_in_flight)
+        queued = []
+
+        async def _run(index: int, prompt: dict) -> tuple[int, dict[str, list[bytes]]]:
+            async with window:
+                async with self._queue_lock:
+                    # Once the POST is out ComfyUI may have the prompt, so see it through if we are cancelled to learn
+                    # the id it has to be dropped under
+                    post = asyncio.ensure_future(self._queue_prompt(prompt))
+                    try:
+                        prompt_id = await asyncio.shield(post)
+                    except asyncio.CancelledError:
+                        await asyncio.wait([post])
+                        if post.exception() is None:
+                            queued.append(post.result())
+                        raise
+                queued.append(prompt_id)
+                state = self._prompts[prompt_id]
+                try:
+                    # Shielded: if we are cancelled the prompt stays registered and is dropped from ComfyUI's queue below
+                    await asyncio.shield(state.done)
+                except RuntimeError as e:
+                    raise RuntimeError(f"ComfyUI failed on prompt {index} of {len(prompts)}: {e}") from e
+                finally:
+                    if state.done.done():
+                        self._prompts.pop(prompt_id, None)
+            # Outside the window, so the next prompt is queued while this one's images download
+            return index, await self._get_output_images(prompt_id)
+
+        tasks = [asyncio.ensure_future(_run(index, prompt)) for index, prompt in enumerate(prompts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            unfinished = [prompt_id for prompt_id in queued if prompt_id in self._prompts]
+            for prompt_id in unfinished:
+                self._prompts.pop(prompt_id)
+            if unfinished:
+                await self._cancel_queued(unfinished)
+
+    async def generate_batch(self, prompts: list[dict]) -> list[dict[str, list[bytes]]]:
+        results = [None] * len(prompts)
+        async for index, images in self.generate_stream(prompts):
+            results[index] = images
+        return results
@@ -0,0 +1,155 @@
+"""
+Column-oriented steps for turning HF datasets into the JSON rows the trainers receive.
+
+Rows stay in Arrow until they are written: casts run as batched maps (pyarrow compute for string columns, str() for
+the rest), filters build boolean masks with pyarrow compute and select the surviving indices, and the JSON writer
+streams record batches to disk, so memory is bounded by the batch size rather than the dataset size.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from datasets import Dataset
+from datasets import Features
+from datasets import Value
+
+import validator.core.constants as cst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@contextmanager
+def timed_stage(label: str, stage: str, rows: int = 0):
+    """Times a pipeline stage and logs its throughput; set `rows` on the yielded timing when it is known afterwards."""
+    timing = StageTiming(stage, rows)
+    start = time.perf_counter()
+    yield timing
+    timing.seconds = time.perf_counter() - start
+    logger.info(f"{label} {stage}: {timing.rows} rows in {timing.seconds:.2f}s ({timing.rows_per_second:.0f} rows/s)")
+
+
+def parallel_map_kwargs(dataset: Dataset) -> dict:
+    if cst.DATASET_PREP_NUM_PROC > 1 and len(dataset) >= cst.DATASET_PREP_PARALLEL_MIN_ROWS:
+        return {"num_proc": cst.DATASET_PREP_NUM_PROC}
+    return {}
+
+
+def _is_string_feature(feature) -> bool:
+    return isinstance(feature, Value) and feature.dtype in ("string", "large_string")
+
+
+def _stringify_table(table: pa.Table) -> pa.Table:
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            columns[name] = pc.fill_null(column, "")
+        else:
+            columns[name] = pa.array(["" if value is None else str(value) for value in column.to_pylist()], type=pa.string())
+    return pa.table(columns)
+
+
+def stringify_columns(dataset: Dataset, columns: list[str]) -> Dataset:
+    """Keeps only `columns`, as strings: nulls become "" and other types go through str(), like the row-wise code did."""
+    dataset = dataset.select_columns(columns)
+    if all(_is_string_feature(dataset.features[col]) and dataset.data.column(col).null_count == 0 for col in columns):
+        return dataset
+
+    return (
+        dataset.with_format("arrow")
+        .map(
+            _stringify_table,
+            batched=True,
+            batch_size=cst.DATASET_PREP_BATCH_SIZE,
+            features=Features({col: Value("string") for col in columns}),
+            desc="Casting columns to strings",
+            **parallel_map_kwargs(dataset),
+        )
+        .with_format(None)
+    )
+
+
+def all_equal_mask(table: pa.Table, columns: list[str], value: str) -> pa.Array:
+    mask = pa.array([True] * table.num_rows)
+    for col in columns:
+        mask = pc.and_(mask, pc.equal(table.column(col), value))
+    return mask
+
+
+def non_blank_mask(table: pa.Table, columns: list[str]) -> pa.Array:
+    """Rows where every column has something besides whitespace; a missing column counts as blank."""
+    mask = pa.array([True] * table.num_rows)
+    for col in columns:
+        if col not in table.column_names:
+            return pa.array([False] * table.num_rows)
+        stripped = pc.utf8_trim_whitespace(pc.fill_null(table.column(col), ""))
+        mask = pc.and_(mask, pc.not_equal(stripped, ""))
+    return mask
+
+
+def count_matching_rows(dataset: Dataset, mask_fn: Callable[[pa.Table], pa.Array]) -> int:
+    total = 0
+    for table in dataset.with_format("arrow").iter(batch_size=cst.DATASET_PREP_BATCH_SIZE):
+        total += pc.sum(pc.cast(mask_fn(table), pa.int64())).as_py() or 0
+    return total
+
+
+def filter_rows(dataset: Dataset, mask_fn: Callable[[pa.Table], pa.Array]) -> Dataset:
+    """Keeps the rows `mask_fn` marks True; only an indices mapping is built, the Arrow data isn't copied."""
+    indices = []
+    offset = 0
+    for table in dataset.with_format("arrow").iter(batch_size=cst.DATASET_PREP_BATCH_SIZE):
+        indices.extend((pc.indices_nonzero(mask_fn(table)).to_numpy() + offset).tolist())
+        offset += table.num_rows
+    if len(indices) == len(dataset):
+        return dataset
+    return dataset.select(indices)
+
+
+def write_json_rows(
+    dataset: Dataset,
+    path: str,
+    transform: Callable[[list[dict]], list[dict]] | None = None,
+    head_rows: int = 0,
+) -> tuple[int, list[dict]]:
+    """
+    Streams the dataset to `path` as one JSON list, byte for byte what json.dump(list(rows)) writes, one record batch
+    at a time. `transform` can rewrite or drop the rows of each batch. Returns the rows written and the first
+    `head_rows` of them.
+    """
+    num_rows = 0
+    head = []
+    with open(path, "w") as f:
+        f.write("[")
+        for table in dataset.with_format("arrow").iter(batch_size=cst.DATASET_PREP_BATCH_SIZE):
+            rows = table.to_pylist()
+            if transform is not None:
+                rows = transform(rows)
+            if not rows:
+                continue
+            if num_rows:
+                f.write(", ")
+            f.write(json.dumps(rows)[1:-1])
+            if len(head) < head_rows:
+                head.extend(rows[: head_rows - len(head)])
+            num_rows += len(rows)
+        f.write("]")
+    return num_rows, head
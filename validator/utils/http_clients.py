@@ -0,0 +1,188 @@
+"""
+Process-wide pooled httpx clients for the validator's calls to external services.
+
+Every host gets one long-lived client per event loop, so bursts of content service or nineteen calls reuse warm
+keep-alive connections instead of paying for a TCP and TLS handshake each time. HTTP/2 is used when the optional `h2`
+package is installed. Identical GETs already in flight can be coalesced onto one request, and every endpoint keeps a
+latency histogram that is summarised in the logs every HTTP_LATENCY_LOG_EVERY requests.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+import httpx
+
+from validator.core import constants as cst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds: tuple[float, ...] = cst.HTTP_LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile; the slowest request for the overflow bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        buckets[float("inf")] = self.count
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "coalesced": self.coalesced,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+def _origin(url: httpx.URL) -> str:
+    return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+
+class HttpClientRegistry:
+    def __init__(self, http2: bool | None = None):
+        self.http2 = importlib.util.find_spec("h2") is not None if http2 is None else http2
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def client(self, url: str | httpx.URL) -> httpx.AsyncClient:
+        """The pooled client for the host of `url` on the running event loop."""
+        loop = asyncio.get_running_loop()
+        origin = _origin(httpx.URL(url))
+        with self._lock:
+            clients = self._clients.setdefault(loop, {})
+            client = clients.get(origin)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=cst.HTTP_POOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=cst.HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=cst.HTTP_POOL_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                clients[origin] = client
+                logger.info(f"Opened pooled {'HTTP/2' if self.http2 else 'HTTP/1.1'} client for {origin}")
+            return client
+
+    def _observe(self, name: str, seconds: float, error: bool):
+        with self._lock:
+            histogram = self._histograms.setdefault(name, LatencyHistogram())
+            histogram.observe(seconds, error)
+            if histogram.count % cst.HTTP_LATENCY_LOG_EVERY == 0:
+                summary = histogram.summary()
+                logger.info(
+                    f"Latency for {name} over {summary['count']} requests: p50 {summary['p50']:.3f}s, "
+                    f"p95 {summary['p95']:.3f}s, max {summary['max']:.3f}s, {summary['errors']} errors, "
+                    f"{summary['coalesced']} coalesced"
+                )
+
+    async def _send(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await self.client(url).request(method, url, **kwargs)
+            error = response.status_code >= 400
+            return response
+        finally:
+            self._observe(name, time.perf_counter() - start, error)
+
+    async def request(
+        self, method: str, url: str, *, name: str | None = None, coalesce: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        Sends a request over the pooled client for its host. `name` is the endpoint its latency is recorded under and
+        defaults to the url; pass the url template for urls with ids in them. With `coalesce`, a GET identical to one
+        already in flight (same url and params, headers aside) waits for that request and shares its response.
+        """
+        name = name or url
+        if not (coalesce and method.upper() == "GET"):
+            return await self._send(name, method, url, **kwargs)
+
+        key = (asyncio.get_running_loop(), str(httpx.URL(url, params=kwargs.get("params"))))
+        future = self._in_flight.get(key)
+        if future is not None:
+            with self._lock:
+                self._histograms.setdefault(name, LatencyHistogram()).coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._send(name, method, url, **kwargs))
+        self._in_flight[key] = future
+
+        def _done(done: asyncio.Future):
+            self._in_flight.pop(key, None)
+            if not done.cancelled():
+                done.exception()  # whoever started it may have been cancelled; don't warn about an unretrieved error
+
+        future.add_done_callback(_done)
+        return await asyncio.shield(future)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def latency_histograms(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self._histograms.items()}
+
+    async def aclose(self):
+        """Closes the clients opened on the running event loop."""
+        with self._lock:
+            clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+_registry: HttpClientRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_http_client_registry() -> HttpClientRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = HttpClientRegistry()
+        return _registry
@@ -46,6 +46,17 @@ class AsyncMinioClient:
             logger.info(f"There was an issue with uploading file to s3. {e}")
             return False
 
+    async def upload_stream(self, bucket_name, object_name, stream, part_size=10 * 1024 * 1024):
+        """Upload from a readable stream of unknown length (multipart), e.g. the read end of a pipe."""
+        func = self.client.put_object
+        args = (bucket_name, object_name, stream, -1)
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.executor, lambda: func(*args, part_size=part_size))
+        except Exception as e:
+            logger.info(f"There was an issue with uploading stream to s3. {e}")
+            return False
+
     async def download_file(self, bucket_name, object_name, file_path):
         func = self.client.fget_object
         args = (bucket_name, object_name, file_path)
@@ -0,0 +1,230 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import validator.core.constants as vcst
+from core import constants as cst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+INCOMPLETE_SUFFIX = ".incomplete"  # huggingface_hub downloads into <blob>.incomplete and renames when done
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        name TEXT PRIMARY KEY,
+        model_key TEXT NOT NULL,
+        is_dir INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        signature TEXT,
+        pending INTEGER NOT NULL DEFAULT 0,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS entries_model_key_idx ON entries (model_key);
+    CREATE INDEX IF NOT EXISTS entries_lru_idx ON entries (last_access, size);
+    CREATE TABLE IF NOT EXISTS blobs (
+        entry TEXT NOT NULL,
+        name TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        PRIMARY KEY (entry, name)
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+"""
+
+
+def model_cache_key(model_id: str) -> str:
+    return f"models--{model_id.lower().replace('/', '--')}"
+
+
+def get_directory_size(path: str) -> int:
+    """Calculate total size of a directory in bytes.
+    Returns 0 if directory doesn't exist."""
+    try:
+        total = 0
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    total += get_directory_size(entry.path)
+        return total
+    except (FileNotFoundError, PermissionError):
+        return 0
+
+
+class ModelCacheIndex:
+    """
+    SQLite index of the HF hub cache: one row per top-level entry (repo directory or loose file) with its size and last
+    access, plus the size of every blob of each repo.
+
+    Blobs are content-addressed and never change once complete, so refresh() only lists the blobs directory of repos
+    whose directory mtimes moved since the last pass and stats blobs it hasn't seen, instead of walking the whole tree.
+    Directories without a blobs folder (locks, odd layouts) are small and measured every pass. A full rescan that
+    trusts nothing from the index runs every MODEL_CACHE_RECONCILE_INTERVAL to catch anything mtimes missed.
+    """
+
+    def __init__(self, db_path: str | Path = vcst.MODEL_CACHE_INDEX_PATH, cache_dir: str = cst.CACHE_DIR_HUB):
+        self.cache_dir = cache_dir
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def _last_full_scan(self) -> float:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'last_full_scan'").fetchone()
+        return float(row["value"]) if row else 0.0
+
+    def _upsert(self, name: str, is_dir: bool, size: int, signature: str | None, pending: int, last_access: float) -> None:
+        self._connection.execute(
+            """
+            INSERT INTO entries (name, model_key, is_dir, size, signature, pending, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                size = excluded.size,
+                signature = excluded.signature,
+                pending = excluded.pending,
+                last_access = MAX(entries.last_access, excluded.last_access)
+            """,
+            (name, name.lower(), int(is_dir), size, signature, pending, last_access),
+        )
+
+    def _scan_blobs(self, name: str, blobs_path: str, trust_index: bool) -> tuple[int, int]:
+        """Syncs the blobs table of one repo; returns its total size and the number of downloads in progress."""
+        known = {}
+        if trust_index:
+            rows = self._connection.execute("SELECT name, size FROM blobs WHERE entry = ?", (name,)).fetchall()
+            known = {row["name"]: row["size"] for row in rows}
+
+        sizes = {}
+        pending = 0
+        with os.scandir(blobs_path) as it:
+            for blob in it:
+                if blob.name.endswith(INCOMPLETE_SUFFIX):
+                    pending += 1
+                if blob.name in known and not blob.name.endswith(INCOMPLETE_SUFFIX):
+                    sizes[blob.name] = known[blob.name]
+                    continue
+                try:
+                    sizes[blob.name] = blob.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    continue  # renamed or removed while we were listing
+
+        self._connection.execute("DELETE FROM blobs WHERE entry = ?", (name,))
+        self._connection.executemany(
+            "INSERT INTO blobs (entry, name, size) VALUES (?, ?, ?)", [(name, blob, size) for blob, size in sizes.items()]
+        )
+        return sum(sizes.values()), pending
+
+    def _refresh_dir(self, entry: os.DirEntry, row: sqlite3.Row | None, full: bool) -> bool:
+        """Returns whether the entry had to be measured again."""
+        blobs_path = os.path.join(entry.path, "blobs")
+        try:
+            blobs_mtime_ns = os.stat(blobs_path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            self._upsert(entry.name, True, get_directory_size(entry.path), None, 0, entry.stat().st_mtime)
+            return True
+
+        signature = f"{entry.stat().st_mtime_ns}:{blobs_mtime_ns}"
+        if not full and row is not None and row["signature"] == signature and not row["pending"]:
+            return False
+
+        size, pending = self._scan_blobs(entry.name, blobs_path, trust_index=not full)
+        # Blobs land (or disappear) when a model is downloaded, which counts as an access
+        self._upsert(entry.name, True, size, signature, pending, blobs_mtime_ns / 1e9)
+        return True
+
+    def refresh(self, full: bool = False) -> None:
+        """Brings the index up to date with the cache directory, rescanning everything if `full` or reconciliation is due."""
+        start = time.monotonic()
+        with self._lock:
+            full = full or time.time() - self._last_full_scan() >= vcst.MODEL_CACHE_RECONCILE_INTERVAL
+            rows = {row["name"]: row for row in self._connection.execute("SELECT name, signature, pending FROM entries")}
+            seen = set()
+            rescanned = 0
+
+            self._connection.execute("BEGIN")
+            try:
+                try:
+                    entries = list(os.scandir(self.cache_dir))
+                except FileNotFoundError:
+                    entries = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            rescanned += self._refresh_dir(entry, rows.get(entry.name), full)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            self._upsert(entry.name, False, stat.st_size, None, 0, stat.st_mtime)
+                        else:
+                            continue
+                    except (FileNotFoundError, PermissionError) as e:
+                        logger.warning(f"Skipping {entry.name} in the model cache index: {e}")
+                        continue
+                    seen.add(entry.name)
+
+                removed = [(name,) for name in rows if name not in seen]
+                self._connection.executemany("DELETE FROM entries WHERE name = ?", removed)
+                self._connection.executemany("DELETE FROM blobs WHERE entry = ?", removed)
+                if full:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_full_scan', ?)", (str(time.time()),)
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        logger.info(
+            f"Model cache index {'reconciled' if full else 'refreshed'} in {time.monotonic() - start:.2f}s: "
+            f"{len(seen)} entries, {rescanned} directories measured, {len(removed)} removed"
+        )
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def model_usage(self, model_id: str) -> tuple[int, float]:
+        """Size in bytes and last access of a model: its repo directory plus loose safetensors files named after it."""
+        key = model_cache_key(model_id)
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_access), 0) FROM entries
+                WHERE model_key = ? OR (is_dir = 0 AND model_key LIKE '%.safetensors' AND substr(model_key, 1, ?) = ?)
+                """,
+                (key, len(key), key),
+            ).fetchone()
+        return row[0], row[1]
+
+    def touch(self, model_id: str) -> None:
+        """Marks a model as just used; models read without being downloaded again don't show up in mtimes."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE entries SET last_access = ? WHERE model_key = ?", (time.time(), model_cache_key(model_id))
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_index: ModelCacheIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_model_cache_index() -> ModelCacheIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ModelCacheIndex()
+        return _index
@@ -0,0 +1,195 @@
+"""
+Parameter counts read from safetensors headers, without loading any weights.
+
+A safetensors file starts with an 8 byte little-endian header length followed by a JSON header holding the dtype
+and shape of every tensor, so counting the parameters of a checkpoint of any size costs one small read per shard:
+from disk for local checkpoints, or a ranged HTTP request against the Hub for remote ones.
+"""
+
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from dataclasses import field
+from math import prod
+
+from huggingface_hub import HfApi
+from huggingface_hub import snapshot_download
+
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+SAFETENSORS_SUFFIX = ".safetensors"
+SAFETENSORS_INDEX_SUFFIX = ".safetensors.index.json"
+# Upper bound accepted by the safetensors library itself, anything larger is a corrupt file
+SAFETENSORS_MAX_HEADER_BYTES = 100 * 1024 * 1024
+
+SAFETENSORS_DTYPE_BITS = {
+    "BOOL": 8,
+    "U8": 8,
+    "I8": 8,
+    "F8_E4M3": 8,
+    "F8_E5M2": 8,
+    "F8_E8M0": 8,
+    "F4": 4,
+    "I16": 16,
+    "U16": 16,
+    "F16": 16,
+    "BF16": 16,
+    "I32": 32,
+    "U32": 32,
+    "F32": 32,
+    "I64": 64,
+    "U64": 64,
+    "F64": 64,
+}
+
+hf_api = HfApi()
+
+# (repo_id, commit sha) -> stats; a commit's weights never change so entries never go stale
+_stats_cache: dict[tuple[str, str], "ParameterStats"] = {}
+_stats_cache_lock = threading.Lock()
+
+
+@dataclass
+class ParameterStats:
+    params_by_dtype: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def num_params(self) -> int:
+        return sum(self.params_by_dtype.values())
+
+    @property
+    def num_bytes(self) -> int:
+        """Size of the weights on disk, from the element size of each dtype (unknown dtypes count as 16-bit)."""
+        return sum(count * SAFETENSORS_DTYPE_BITS.get(dtype, 16) // 8 for dtype, count in self.params_by_dtype.items())
+
+    def add(self, other: "ParameterStats") -> None:
+        for dtype, count in other.params_by_dtype.items():
+            self.params_by_dtype[dtype] = self.params_by_dtype.get(dtype, 0) + count
+
+
+def parse_safetensors_header(header: dict) -> ParameterStats:
+    stats = ParameterStats()
+    for name, tensor in header.items():
+        if name == "__metadata__":
+            continue
+        stats.params_by_dtype[tensor["dtype"]] = stats.params_by_dtype.get(tensor["dtype"], 0) + prod(tensor["shape"])
+    return stats
+
+
+def read_safetensors_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        if header_size > SAFETENSORS_MAX_HEADER_BYTES:
+            raise ValueError(f"{path} has a {header_size} byte header, not a safetensors file")
+        return json.loads(f.read(header_size))
+
+
+def _safetensors_files_in(directory: str) -> list[str]:
+    """
+    The weight files of one checkpoint directory: the shards listed by its index files when there are any,
+    otherwise every .safetensors file, keeping only the full precision file when diffusers variants
+    (e.g. diffusion_pytorch_model.fp16.safetensors) sit next to it.
+    """
+    names = os.listdir(directory)
+    index_names = sorted(name for name in names if name.endswith(SAFETENSORS_INDEX_SUFFIX))
+    if index_names:
+        shards = set()
+        for index_name in index_names:
+            with open(os.path.join(directory, index_name)) as f:
+                shards.update(json.load(f)["weight_map"].values())
+        return [os.path.join(directory, shard) for shard in sorted(shards)]
+
+    files_by_stem = {}
+    for name in sorted(name for name in names if name.endswith(SAFETENSORS_SUFFIX)):
+        files_by_stem.setdefault(name.split(".")[0], []).append(name)
+    return [os.path.join(directory, min(group, key=len)) for group in files_by_stem.values()]
+
+
+def count_local_parameters(path: str, recursive: bool = False) -> ParameterStats:
+    """
+    Count the parameters of a local .safetensors file or checkpoint directory.
+
+    Args:
+        path: A .safetensors file or a directory holding one checkpoint (sharded or not)
+        recursive: Also count the checkpoints in subdirectories, e.g. the components of a diffusers pipeline
+
+    Raises:
+        FileNotFoundError: If a shard listed in an index file is missing
+    """
+    if os.path.isfile(path):
+        return parse_safetensors_header(read_safetensors_header(path))
+
+    stats = ParameterStats()
+    directories = [root for root, _, _ in os.walk(path)] if recursive else [path]
+    for directory in directories:
+        for file_path in _safetensors_files_in(directory):
+            stats.add(parse_safetensors_header(read_safetensors_header(file_path)))
+    return stats
+
+
+def _cached(key: tuple[str, str], compute) -> ParameterStats:
+    with _stats_cache_lock:
+        if key in _stats_cache:
+            return _stats_cache[key]
+    stats = compute()
+    if stats.num_params:
+        # An empty result may be a snapshot that only holds config files so far, don't pin it
+        with _stats_cache_lock:
+            _stats_cache[key] = stats
+    return stats
+
+
+def _local_snapshot(repo_id: str, revision: str | None) -> str | None:
+    try:
+        return snapshot_download(repo_id, revision=revision, local_files_only=True)
+    except Exception:
+        return None
+
+
+def count_checkpoint_parameters(
+    model: str, revision: str | None = None, local_files_only: bool = False, recursive: bool = False
+) -> ParameterStats | None:
+    """
+    Count the parameters of a local path or Hub repo from safetensors headers only, cached per revision.
+
+    The local Hugging Face cache is tried first; otherwise the headers are fetched from the Hub with ranged
+    requests, one per shard. Returns None when the model has no safetensors weights or can't be reached.
+    """
+    if os.path.exists(model):
+        # Local directories can be rewritten in place, and reading their headers is cheap, so they aren't cached
+        stats = count_local_parameters(model, recursive=recursive)
+        return stats if stats.num_params else None
+
+    snapshot_path = _local_snapshot(model, revision)
+    if snapshot_path:
+        try:
+            stats = _cached(
+                (model, os.path.basename(snapshot_path)), lambda: count_local_parameters(snapshot_path, recursive=recursive)
+            )
+            if stats.num_params:
+                return stats
+        except (OSError, ValueError) as e:
+            # Shards missing from a partial download, fall through to the Hub
+            logger.info(f"Incomplete local snapshot of {model}, reading headers from the Hub: {e}")
+    if local_files_only:
+        return None
+
+    def read_hub_headers(sha: str) -> ParameterStats:
+        return ParameterStats(dict(hf_api.get_safetensors_metadata(model, revision=sha).parameter_count))
+
+    try:
+        model_info = hf_api.model_info(model, revision=revision)
+        if model_info.safetensors:
+            # The Hub has already parsed the headers of this commit
+            stats = _cached((model, model_info.sha), lambda: ParameterStats(dict(model_info.safetensors.parameters)))
+        else:
+            stats = _cached((model, model_info.sha), lambda: read_hub_headers(model_info.sha))
+        return stats if stats.num_params else None
+    except Exception as e:
+        logger.warning(f"Could not read safetensors headers of {model}: {e}")
+        return None
@@ -1,8 +1,14 @@
 import json
 
+import pyarrow as pa
+import pyarrow.compute as pc
+from datasets import Dataset
+from datasets import Features
+from datasets import Value
 from datasets import load_dataset
 from fiber import Keypair
 
+import validator.core.constants as cst
 from core.models.payload_models import TaskType
 from validator.core.constants import STANDARD_DPO_CHOSEN_COLUMN
 from validator.core.constants import STANDARD_DPO_PROMPT_COLUMN
@@ -14,6 +20,9 @@ from validator.core.constants import STANDARD_OUTPUT_COLUMN
 from validator.core.constants import STANDARD_SYSTEM_COLUMN
 from validator.core.models import AnyTextTypeRawTask
 from validator.evaluation.utils import get_default_dataset_config
+from validator.utils.dataset_pipeline import filter_rows
+from validator.utils.dataset_pipeline import parallel_map_kwargs
+from validator.utils.dataset_pipeline import timed_stage
 from validator.utils.logging import get_logger
 
 
@@ -26,7 +35,9 @@ async def get_dataset_column_mapping(dataset_id: str, task_type: TaskType, keypa
     from validator.utils.call_endpoint import call_content_service_fast
 
     url = f"{CONTENT_BASE_URL}/dataset/{dataset_id}/columns/suggest"
-    response = await call_content_service_fast(url, keypair)
+    response = await call_content_service_fast(
+        url, keypair, name=f"{CONTENT_BASE_URL}/dataset/{{dataset}}/columns/suggest", coalesce=True
+    )
 
     logger.info(f"Raw response from content service for {dataset_id}: {response}")
 
@@ -71,86 +82,86 @@ async def get_dataset_column_mapping(dataset_id: str, task_type: TaskType, keypa
         raise ValueError(f"Unsupported task type: {task_type}")
 
 
-def standardize_instruct_sample(sample: dict, task: AnyTextTypeRawTask) -> dict:
-    """Standardize a single instruct/grpo sample to use standard column names."""
-    std_sample = {}
-    std_sample[STANDARD_INSTRUCT_COLUMN] = sample.get(task.field_instruction, "")
-    std_sample[STANDARD_OUTPUT_COLUMN] = sample.get(task.field_output, "")
-    if hasattr(task, "field_input") and task.field_input:
-        std_sample[STANDARD_INPUT_COLUMN] = sample.get(task.field_input, "")
-    if hasattr(task, "field_system") and task.field_system:
-        std_sample[STANDARD_SYSTEM_COLUMN] = sample.get(task.field_system, "")
-    return std_sample
-
-
-def standardize_dpo_sample(sample: dict, task: AnyTextTypeRawTask) -> dict:
-    """Standardize a single DPO sample."""
-    std_sample = {
-        STANDARD_DPO_PROMPT_COLUMN: sample.get(task.field_prompt, ""),
-        STANDARD_DPO_CHOSEN_COLUMN: sample.get(task.field_chosen, ""),
-        STANDARD_DPO_REJECTED_COLUMN: sample.get(task.field_rejected, ""),
-    }
-    if hasattr(task, "field_system") and task.field_system:
-        std_sample[STANDARD_SYSTEM_COLUMN] = sample.get(task.field_system, "")
-    return std_sample
-
-
-def standardize_grpo_sample(sample: dict, task: AnyTextTypeRawTask) -> dict:
-    """Standardize a single GRPO sample to use standard column names."""
-    std_sample = {}
-    std_sample[STANDARD_GRPO_PROMPT_COLUMN] = sample.get(task.field_prompt, "")
-    return std_sample
-
-
-def standardize_samples(samples: list[dict], task: AnyTextTypeRawTask) -> list[dict]:
-    """Standardize a list of samples based on task type."""
+def _standard_column_mapping(task: AnyTextTypeRawTask) -> dict[str, str]:
+    """Standard column name -> dataset column for the task type."""
     from validator.core.models import DpoRawTask
     from validator.core.models import GrpoRawTask
     from validator.core.models import InstructTextRawTask
+    from validator.core.models import TaskType
 
-    logger.info(f"Standardizing {len(samples)} samples with task type: {type(task).__name__}")
-    if hasattr(task, "__dict__"):
-        logger.info(f"Task fields: {vars(task)}")
+    if isinstance(task, DpoRawTask):
+        is_dpo, is_grpo = True, False
+    elif isinstance(task, GrpoRawTask):
+        is_dpo, is_grpo = False, True
+    elif isinstance(task, InstructTextRawTask):
+        is_dpo, is_grpo = False, False
+    else:
+        # Temp task objects from create_temp_task_from_mapping don't inherit from the models
+        task_type = getattr(task, "task_type", None)
+        is_dpo, is_grpo = task_type == TaskType.DPOTASK, task_type == TaskType.GRPOTASK
 
-    standardized = []
-    for i, sample in enumerate(samples):
+    if is_grpo:
+        return {STANDARD_GRPO_PROMPT_COLUMN: task.field_prompt}
+    if is_dpo:
+        mapping = {
+            STANDARD_DPO_PROMPT_COLUMN: task.field_prompt,
+            STANDARD_DPO_CHOSEN_COLUMN: task.field_chosen,
+            STANDARD_DPO_REJECTED_COLUMN: task.field_rejected,
+        }
+    else:
+        mapping = {STANDARD_INSTRUCT_COLUMN: task.field_instruction, STANDARD_OUTPUT_COLUMN: task.field_output}
+        if getattr(task, "field_input", None):
+            mapping[STANDARD_INPUT_COLUMN] = task.field_input
+    if getattr(task, "field_system", None):
+        mapping[STANDARD_SYSTEM_COLUMN] = task.field_system
+    return mapping
+
+
+def _standard_value(value) -> str | None:
+    if isinstance(value, dict):
         try:
-            processed_sample = {}
-            for key, value in sample.items():
-                if isinstance(value, dict):
-                    processed_sample[key] = json.dumps(value)
-                else:
-                    processed_sample[key] = str(value) if value is not None else ""
-
-            if isinstance(task, InstructTextRawTask):
-                result = standardize_instruct_sample(processed_sample, task)
-            elif isinstance(task, DpoRawTask):
-                result = standardize_dpo_sample(processed_sample, task)
-            elif isinstance(task, GrpoRawTask):
-                result = standardize_grpo_sample(processed_sample, task)
-            else:
-                # Handle temp task objects that don't inherit from the models
-                if hasattr(task, "task_type"):
-                    from validator.core.models import TaskType
-
-                    if task.task_type == TaskType.GRPOTASK:
-                        result = standardize_grpo_sample(processed_sample, task)
-                    elif task.task_type == TaskType.DPOTASK:
-                        result = standardize_dpo_sample(processed_sample, task)
-                    else:
-                        result = standardize_instruct_sample(processed_sample, task)
-                else:
-                    # Fallback for old behavior
-                    result = standardize_instruct_sample(processed_sample, task)
+            return json.dumps(value)
+        except (TypeError, ValueError):
+            return None  # marks the sample as failed, it gets dropped
+    return str(value) if value is not None else ""
+
+
+def _standardize_batch(batch: dict[str, list], column_mapping: dict[str, str]) -> dict[str, list]:
+    num_rows = len(next(iter(batch.values())))
+    return {
+        standard_column: [_standard_value(value) for value in batch[column]] if column in batch else [""] * num_rows
+        for standard_column, column in column_mapping.items()
+    }
+
+
+def _no_nulls_mask(table: pa.Table) -> pa.Array:
+    mask = pa.array([True] * table.num_rows)
+    for column in table.columns:
+        mask = pc.and_(mask, pc.is_valid(column))
+    return mask
+
 
-            if i == 0:  # Log first sample
-                logger.info(f"Sample {i}: {sample} -> {result}")
+def standardize_dataset(dataset: Dataset, task: AnyTextTypeRawTask) -> Dataset:
+    """Renames and casts the task columns of a dataset to the standard string columns, dropping every other column."""
+    column_mapping = _standard_column_mapping(task)
+    logger.info(f"Standardizing {len(dataset)} samples with task type {type(task).__name__}, mapping {column_mapping}")
 
-            standardized.append(result)
-        except Exception as e:
-            logger.error(f"Failed to standardize sample {i}: {sample}, error: {e}")
+    standardized = dataset.map(
+        _standardize_batch,
+        batched=True,
+        batch_size=cst.DATASET_PREP_BATCH_SIZE,
+        fn_kwargs={"column_mapping": column_mapping},
+        remove_columns=dataset.column_names,
+        features=Features({column: Value("string") for column in column_mapping}),
+        desc="Standardizing samples",
+        **parallel_map_kwargs(dataset),
+    )
 
-    logger.info(f"Standardization complete: {len(samples)} -> {len(standardized)} samples")
+    if any(standardized.data.column(column).null_count for column in column_mapping):
+        standardized = filter_rows(standardized, _no_nulls_mask)
+        logger.error(f"Dropped {len(dataset) - len(standardized)} samples with values that can't be JSON encoded")
+
+    logger.info(f"Standardization complete: {len(dataset)} -> {len(standardized)} samples")
     return standardized
 
 
@@ -220,7 +231,8 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
 
     logger.info(f"Loading and merging {len(dataset_ids)} datasets")
 
-    all_samples = []
+    standardized_datasets = []
+    dataset_names = []
     dataset_sizes = []
 
     primary_id = dataset_ids[0]
@@ -228,7 +240,9 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
 
     try:
         config_name = get_default_dataset_config(primary_id)
-        dataset = load_dataset(primary_id, config_name, trust_remote_code=True)
+        with timed_stage(primary_id, "load") as stage:
+            dataset = load_dataset(primary_id, config_name, trust_remote_code=True)
+            stage.rows = sum(len(split) for split in dataset.values()) if isinstance(dataset, dict) else len(dataset)
 
         if isinstance(dataset, dict):
             if "train" in dataset:
@@ -241,12 +255,12 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
                 raise ValueError(f"No valid splits found in dataset {primary_id}")
 
         dataset = dataset.select_columns(primary_columns)
-        samples = list(dataset)
-
-        standardized = standardize_samples(samples, task)
-        all_samples.extend(standardized)
+        with timed_stage(primary_id, "standardize", len(dataset)):
+            standardized = standardize_dataset(dataset, task)
+        standardized_datasets.append(standardized)
+        dataset_names.append(primary_id)
         dataset_sizes.append(len(standardized))
-        logger.info(f"Loaded {len(samples)} samples from primary dataset {primary_id}")
+        logger.info(f"Loaded {len(dataset)} samples from primary dataset {primary_id}")
     except Exception as e:
         logger.error(f"Failed to load primary dataset {primary_id}: {e}")
         raise e
@@ -265,7 +279,9 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
                         from validator.utils.call_endpoint import call_content_service_fast
 
                         url = f"{CONTENT_BASE_URL}/dataset/{dataset_id}/detectcolumns"
-                        response = await call_content_service_fast(url, keypair)
+                        response = await call_content_service_fast(
+                            url, keypair, name=f"{CONTENT_BASE_URL}/dataset/{{dataset}}/detectcolumns", coalesce=True
+                        )
 
                         if response.get("is_dpo") and response.get("columns"):
                             columns = response["columns"]
@@ -293,7 +309,9 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
                 logger.info(f"Loading {dataset_id} with config {config_name} and columns {columns}")
                 logger.info(f"Column mapping: {column_mapping}")
 
-                dataset = load_dataset(dataset_id, config_name, trust_remote_code=True)
+                with timed_stage(dataset_id, "load") as stage:
+                    dataset = load_dataset(dataset_id, config_name, trust_remote_code=True)
+                    stage.rows = sum(len(split) for split in dataset.values()) if isinstance(dataset, dict) else len(dataset)
 
                 # Handle DatasetDict vs Dataset
                 if hasattr(dataset, "column_names") and not isinstance(dataset, dict):
@@ -325,32 +343,31 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
                     raise ValueError(f"Missing required columns: {missing_columns}")
 
                 dataset = dataset.select_columns(columns)
-                samples = list(dataset)
-                logger.info(f"After column selection, {dataset_id} has {len(samples)} samples")
+                logger.info(f"After column selection, {dataset_id} has {len(dataset)} samples")
 
-                if samples:
-                    logger.info(f"Sample data from {dataset_id}: {samples[0]}")
+                if len(dataset):
+                    logger.info(f"Sample data from {dataset_id}: {dataset[0]}")
 
                 temp_task = create_temp_task_from_mapping(column_mapping, task.task_type)
                 logger.info(f"Created temp task for {dataset_id}: {vars(temp_task)}")
 
-                standardized = standardize_samples(samples, temp_task)
+                with timed_stage(dataset_id, "standardize", len(dataset)):
+                    standardized = standardize_dataset(dataset, temp_task)
                 logger.info(f"After standardization, {dataset_id} has {len(standardized)} samples")
 
-                if standardized:
+                if len(standardized):
                     logger.info(f"Standardized sample from {dataset_id}: {standardized[0]}")
-                all_samples.extend(standardized)
+                standardized_datasets.append(standardized)
+                dataset_names.append(dataset_id)
                 dataset_sizes.append(len(standardized))
-                logger.info(f"Successfully loaded {len(samples)} samples from {dataset_id}")
-                if standardized:
-                    logger.info(f"Example from {dataset_id}: {standardized[0]}")
+                logger.info(f"Successfully loaded {len(dataset)} samples from {dataset_id}")
             except Exception as e:
                 logger.error(f"Failed to load dataset {dataset_id}: {e}")
                 logger.info("Continuing with remaining datasets...")
                 continue
 
     # Ensure we have at least one dataset loaded
-    if not all_samples:
+    if not sum(dataset_sizes):
         raise ValueError("Failed to load any datasets successfully")
 
     if len(dataset_sizes) == 0:
@@ -383,33 +400,20 @@ async def load_and_merge_multiple_datasets(dataset_ids: list[str], task: AnyText
     logger.info(f"Taking {samples_per_dataset} samples from each dataset (with {remainder} extra distributed)")
 
     final_samples = []
-    start_idx = 0
-
-    for i, size in enumerate(dataset_sizes):
-        dataset_name = dataset_ids[i] if i < len(dataset_ids) else f"Dataset_{i}"
-        end_idx = start_idx + size
-        dataset_samples = all_samples[start_idx:end_idx]
-
-        # Shuffle samples from this dataset
-        random.shuffle(dataset_samples)
-
-        # Take appropriate number of samples (respecting both equal distribution and max cap)
-        num_to_take = samples_per_dataset + (1 if i < remainder else 0)
-        num_to_take = min(num_to_take, len(dataset_samples), max_samples_per_dataset)
-
-        logger.info(f"Dataset {i} ({dataset_name}): has {len(dataset_samples)} samples, taking {num_to_take}")
-
-        # Take appropriate number of samples
-        num_to_take = samples_per_dataset + (1 if i < remainder else 0)
-        num_to_take = min(num_to_take, len(dataset_samples))
+    with timed_stage(f"{len(dataset_sizes)} merged datasets", "sample") as stage:
+        for i, (dataset_name, standardized) in enumerate(zip(dataset_names, standardized_datasets)):
+            num_to_take = samples_per_dataset + (1 if i < remainder else 0)
+            num_to_take = min(num_to_take, len(standardized))
 
-        logger.info(f"Dataset {i}: has {len(dataset_samples)} samples, taking {num_to_take}")
+            logger.info(f"Dataset {i} ({dataset_name}): has {len(standardized)} samples, taking {num_to_take}")
 
-        final_samples.extend(dataset_samples[:num_to_take])
-        start_idx = end_idx
+            # Only the sampled rows leave Arrow
+            indices = random.sample(range(len(standardized)), num_to_take)
+            final_samples.extend(standardized.select(indices).to_list())
 
-    # Final shuffle to mix samples from all datasets
-    random.shuffle(final_samples)
+        # Final shuffle to mix samples from all datasets
+        random.shuffle(final_samples)
+        stage.rows = len(final_samples)
 
     logger.info(f"Merged {len(dataset_sizes)} datasets, returning {len(final_samples)} samples")
     return final_samples
@@ -0,0 +1,156 @@
+"""
+Concurrent fan-out of queries to miner nodes.
+
+fan_out() queries a set of nodes with bounded concurrency under one global deadline and yields every reply as soon as
+it lands, so a round takes about as long as its slowest healthy node instead of the sum of per-batch timeouts.
+NodeHealthTracker keeps a rolling RTT and failure count per hotkey across rounds: nodes that failed their last query
+only get NODE_SUSPECT_TIMEOUT, and nodes that failed NODE_DEAD_AFTER_FAILURES times in a row are skipped until
+NODE_DEAD_RETRY_AFTER has passed, after which they are probed again with the short timeout.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+
+from fiber.chain.models import Node
+
+from validator.core import constants as cst
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class NodeHealth:
+    rtt: float | None = None  # EWMA of successful round trips, seconds
+    consecutive_failures: int = 0
+    last_failure: float = 0.0  # time.monotonic()
+    successes: int = 0
+    failures: int = 0
+
+
+@dataclass
+class NodeResponse:
+    node: Node
+    response: Any | None
+    seconds: float = 0.0
+    skipped: bool = False
+
+
+class NodeHealthTracker:
+    def __init__(self):
+        self._health: dict[str, NodeHealth] = {}
+
+    def get(self, hotkey: str) -> NodeHealth:
+        return self._health.setdefault(hotkey, NodeHealth())
+
+    def record_success(self, hotkey: str, seconds: float):
+        health = self.get(hotkey)
+        if health.rtt is None:
+            health.rtt = seconds
+        else:
+            health.rtt += cst.NODE_RTT_EWMA_ALPHA * (seconds - health.rtt)
+        health.consecutive_failures = 0
+        health.successes += 1
+
+    def record_failure(self, hotkey: str):
+        health = self.get(hotkey)
+        health.consecutive_failures += 1
+        health.last_failure = time.monotonic()
+        health.failures += 1
+
+    def timeout_for(self, hotkey: str, timeout: float) -> float | None:
+        """The timeout to give this node in the next round, or None to skip it."""
+        health = self._health.get(hotkey)
+        if health is None or not health.consecutive_failures:
+            return timeout
+        if (
+            health.consecutive_failures >= cst.NODE_DEAD_AFTER_FAILURES
+            and time.monotonic() - health.last_failure < cst.NODE_DEAD_RETRY_AFTER
+        ):
+            return None
+        return min(timeout, cst.NODE_SUSPECT_TIMEOUT)
+
+
+async def fan_out(
+    nodes: list[Node],
+    query: Callable[[Node, float], Awaitable[Any | None]],
+    *,
+    timeout: float,
+    deadline: float,
+    concurrency: int,
+    tracker: NodeHealthTracker | None = None,
+) -> AsyncIterator[NodeResponse]:
+    """
+    Calls `query(node, timeout)` for every node, at most `concurrency` at a time, and yields a NodeResponse per node in
+    completion order. A None response or an exception counts as a failure. Nothing is started after `deadline` seconds
+    and queries still running then are cut short; skipped and cut nodes are yielded with a None response.
+    """
+    tracker = tracker or get_node_health_tracker()
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + deadline
+    semaphore = asyncio.Semaphore(concurrency)
+
+    planned = []
+    skipped = []
+    for node in nodes:
+        node_timeout = tracker.timeout_for(node.hotkey, timeout)
+        if node_timeout is None:
+            skipped.append(node)
+        else:
+            planned.append((node, node_timeout))
+    # Nodes that are known to answer take the first slots, suspect ones queue behind them
+    planned.sort(key=lambda item: (tracker.get(item[0].hotkey).consecutive_failures, tracker.get(item[0].hotkey).rtt or timeout))
+
+    async def _query(node: Node, node_timeout: float) -> NodeResponse:
+        async with semaphore:
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                return NodeResponse(node, None)
+            budget = min(node_timeout, remaining)
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(query(node, budget), timeout=budget)
+            except Exception as e:
+                logger.debug(f"Query to node {node.hotkey} failed: {type(e).__name__} {e}")
+                response = None
+            seconds = time.monotonic() - start
+            if response is not None:
+                tracker.record_success(node.hotkey, seconds)
+            elif budget == node_timeout or seconds < budget:
+                # Running into the global deadline says nothing about the node
+                tracker.record_failure(node.hotkey)
+            return NodeResponse(node, response, seconds)
+
+    tasks = [asyncio.ensure_future(_query(node, node_timeout)) for node, node_timeout in planned]
+    start = time.monotonic()
+    answered = 0
+    try:
+        for node in skipped:
+            yield NodeResponse(node, None, skipped=True)
+        for next_done in asyncio.as_completed(tasks):
+            reply = await next_done
+            answered += reply.response is not None
+            yield reply
+    finally:
+        for task in tasks:
+            task.cancel()
+        logger.info(
+            f"Fanned out to {len(nodes)} nodes in {time.monotonic() - start:.2f}s: {answered} answered, "
+            f"{len(skipped)} skipped as unresponsive"
+        )
+
+
+_tracker: NodeHealthTracker | None = None
+
+
+def get_node_health_tracker() -> NodeHealthTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = NodeHealthTracker()
+    return _tracker
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+import httpx
+from docker.models.containers import Container
+
+from validator.utils.logging import LogContext
+from validator.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[Any]]
+
+DEAD_CONTAINER_STATUSES = ("exited", "dead", "removing")
+
+
+def http_probe(url: str, expected_status: int = 200, request_timeout: float = 2.0) -> Probe:
+    """Ready once a GET on url returns expected_status."""
+
+    async def probe() -> bool:
+        async with httpx.AsyncClient(timeout=request_timeout) as client:
+            response = await client.get(url)
+            return response.status_code == expected_status
+
+    return probe
+
+
+def container_ip_probe(container: Container, preferred_network: str | None = None) -> Probe:
+    """Ready once the container has an IP, returning it (preferred_network first, then any network)."""
+
+    async def probe() -> str | None:
+        await asyncio.to_thread(container.reload)
+        settings = container.attrs.get("NetworkSettings", {})
+        networks = settings.get("Networks", {}) or {}
+
+        ip_address = None
+        if preferred_network and preferred_network in networks:
+            ip_address = networks[preferred_network].get("IPAddress")
+        if not ip_address:
+            ip_address = settings.get("IPAddress")
+        if not ip_address:
+            for network in networks.values():
+                ip_address = network.get("IPAddress")
+                if ip_address:
+                    break
+        return ip_address or None
+
+    return probe
+
+
+async def _raise_if_container_dead(container: Container) -> None:
+    await asyncio.to_thread(container.reload)
+    if container.status in DEAD_CONTAINER_STATUSES:
+        exit_code = container.attrs.get("State", {}).get("ExitCode")
+        raise RuntimeError(f"Container {container.name} {container.status} with code {exit_code} before becoming ready")
+
+
+async def wait_until_ready(
+    probe: Probe,
+    name: str,
+    container: Container | None = None,
+    timeout: float = 300.0,
+    initial_delay: float = 0.5,
+    max_delay: float = 10.0,
+    backoff_factor: float = 2.0,
+) -> tuple[Any, float]:
+    """
+    Poll probe with exponential backoff until it returns a truthy value, without blocking the event loop.
+
+    If container is given it is reloaded before every attempt, and the wait is abandoned as soon as
+    the container has exited. Probe exceptions count as "not ready yet".
+
+    Returns:
+        (probe result, seconds until ready)
+
+    Raises:
+        TimeoutError: if the probe is not ready within timeout seconds
+        RuntimeError: if the container dies first
+    """
+    start_time = time.monotonic()
+    delay = initial_delay
+    attempts = 0
+    last_error = None
+
+    while True:
+        attempts += 1
+        if container is not None:
+            await _raise_if_container_dead(container)
+
+        try:
+            result = await probe()
+            if result:
+                time_to_ready = time.monotonic() - start_time
+                with LogContext(ready_target=name, time_to_ready_seconds=f"{time_to_ready:.2f}"):
+                    logger.info(f"{name} ready after {time_to_ready:.2f}s ({attempts} probes)")
+                return result, time_to_ready
+        except Exception as e:
+            last_error = e
+
+        elapsed = time.monotonic() - start_time
+        if elapsed >= timeout:
+            raise TimeoutError(f"{name} not ready after {timeout} seconds (last error: {last_error})")
+
+        await asyncio.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * backoff_factor, max_delay)
@@ -1,7 +1,19 @@
 import ast
+import functools
+import hashlib
 import inspect
+import multiprocessing
 import numbers
 import re
+import resource
+import signal
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from types import CodeType
 from typing import Callable
 
 import astor
@@ -21,15 +33,19 @@ def supports_extra_data(func: Callable) -> bool:
         return False
 
 
+def load_reward_function(func_def: str) -> Callable:
+    namespace = {}
+    exec(func_def, namespace)
+    return next(v for k, v in namespace.items() if callable(v))
+
+
 def validate_reward_function(func_def: str, json_sample: list[dict] = None) -> tuple[bool, str, Callable | None]:
     """
     Validate a reward function definition, optionally with real dataset sample.
     Returns (is_valid: bool, error_message: str, func: callable | None)
     """
     try:
-        namespace = {}
-        exec(func_def, namespace)
-        func = next(v for k, v in namespace.items() if callable(v))
+        func = load_reward_function(func_def)
         # If function supports extra_data and we have real data, test with it
         if supports_extra_data(func) and json_sample:
             valid_rows = [row for row in json_sample if cst.STANDARD_GRPO_EXTRA_COLUMN in row]
@@ -70,6 +86,51 @@ def validate_reward_function(func_def: str, json_sample: list[dict] = None) -> t
         return False, str(e), None
 
 
+class CompiledCodeCache:
+    """LRU of RestrictedPython code objects keyed by the sha256 of their source."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> CodeType | None:
+        from RestrictedPython import compile_restricted
+
+        key = hashlib.sha256(code.encode()).digest()
+        with self._lock:
+            compiled_code = self._entries.get(key)
+            if compiled_code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled_code
+            self.misses += 1
+
+        # Compile outside the lock, a duplicate compile on a race is harmless
+        compiled_code = compile_restricted(code, "<string>", "exec")
+        if compiled_code is not None and self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = compiled_code
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return compiled_code
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+compiled_code_cache = CompiledCodeCache(cst.RESTRICTED_CODE_CACHE_SIZE)
+
+
+def compile_restricted_cached(code: str) -> CodeType | None:
+    return compiled_code_cache.get(code)
+
+
 def restricted_execution(code: str, input_data: str) -> tuple[str, str]:
     """Execute Python code with RestrictedPython restrictions.
 
@@ -91,7 +152,17 @@ def restricted_execution(code: str, input_data: str) -> tuple[str, str]:
     stderr_capture = io.StringIO()
 
     try:
-        compiled_code = compile_restricted(code, "<string>", "exec")
+        # Copies of this function are injected into stored reward functions, which may run without this package
+        # installed; those compile on every call instead of going through the compiled-code cache
+        try:
+            from validator.utils.reward_functions import compile_restricted_cached
+        except ImportError:
+            compile_restricted_cached = None
+
+        if compile_restricted_cached is not None:
+            compiled_code = compile_restricted_cached(code)
+        else:
+            compiled_code = compile_restricted(code, "<string>", "exec")
         if compiled_code is None:
             return "", "Failed to compile restricted code"
 
@@ -169,6 +240,179 @@ def restricted_execution(code: str, input_data: str) -> tuple[str, str]:
         return "", str(e)
 
 
+class _RewardCallTimeout(BaseException):
+    """Raised by the alarm in pool workers; a BaseException so reward functions' `except Exception` can't swallow it."""
+
+
+# Reward functions loaded in this pool worker, keyed by the sha256 of their source
+_worker_reward_functions: dict[bytes, Callable] = {}
+
+
+def _raise_reward_call_timeout(signum, frame):
+    raise _RewardCallTimeout()
+
+
+def _init_reward_worker(memory_limit_bytes: int | None):
+    if memory_limit_bytes:
+        resource.setrlimit(resource.RLIMIT_DATA, (memory_limit_bytes, memory_limit_bytes))
+    signal.signal(signal.SIGALRM, _raise_reward_call_timeout)
+
+
+def _score_in_worker(func_def: str, completions: list, kwargs: dict, timeout: float) -> list[float] | None:
+    """Runs in a pool worker. Returns None if the call ran out of time or memory."""
+    key = hashlib.sha256(func_def.encode()).digest()
+    func = _worker_reward_functions.get(key)
+    if func is None:
+        func = _worker_reward_functions[key] = load_reward_function(func_def)
+
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(completions, **kwargs)
+    except (_RewardCallTimeout, MemoryError):
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _slice_kwargs(kwargs: dict, num_completions: int, start: int, end: int) -> dict:
+    # Per-completion columns are sliced with the completions, anything else is passed through as is
+    return {
+        key: value[start:end] if isinstance(value, list) and len(value) == num_completions else value
+        for key, value in kwargs.items()
+    }
+
+
+class RewardFunctionPool:
+    """
+    Scores completion batches with reward functions in a pool of worker processes.
+
+    A batch is split into chunks scored in parallel, so this is only valid for reward functions that score each
+    completion independently (see scores_are_per_completion). Every worker call runs under a timeout and each worker
+    under a memory limit; a chunk that exceeds either is rescored one completion at a time, and only the completions
+    that still exceed them score 0. A worker stuck where the alarm can't interrupt it has the whole pool recycled.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = cst.REWARD_FUNCTION_POOL_WORKERS,
+        chunk_size: int = cst.REWARD_FUNCTION_POOL_CHUNK_SIZE,
+        timeout: float = cst.REWARD_FUNCTION_TIMEOUT_SECONDS,
+        memory_limit_bytes: int | None = cst.REWARD_FUNCTION_MEMORY_LIMIT_BYTES,
+    ):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_bytes
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),  # the evaluation process holds CUDA state
+                initializer=_init_reward_worker,
+                initargs=(self.memory_limit_bytes,),
+            )
+        return self._executor
+
+    def _recycle(self):
+        if self._executor is None:
+            return
+        for process in list((self._executor._processes or {}).values()):
+            process.kill()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _submit(self, func_def: str, completions: list, kwargs: dict, start: int, end: int) -> Future | None:
+        try:
+            return self._get_executor().submit(
+                _score_in_worker,
+                func_def,
+                completions[start:end],
+                _slice_kwargs(kwargs, len(completions), start, end),
+                self.timeout,
+            )
+        except BrokenProcessPool:
+            self._recycle()
+            return None
+
+    def _result(self, future: Future | None) -> list[float] | None:
+        if future is None:
+            return None
+        try:
+            # The alarm inside the worker fires first, this only catches workers it can't interrupt
+            return future.result(timeout=self.timeout * 2 + 10)
+        except FutureTimeoutError:
+            logger.warning("Reward function worker did not honour its timeout, recycling the pool")
+            self._recycle()
+            return None
+        except BrokenProcessPool:
+            self._recycle()
+            return None
+
+    def score(self, func_def: str, completions: list, **kwargs) -> list[float]:
+        num_completions = len(completions)
+        ranges = [(start, min(start + self.chunk_size, num_completions)) for start in range(0, num_completions, self.chunk_size)]
+        futures = [self._submit(func_def, completions, kwargs, start, end) for start, end in ranges]
+
+        scores = []
+        for (start, end), future in zip(ranges, futures):
+            chunk_scores = self._result(future)
+            if chunk_scores is None:
+                single_futures = [self._submit(func_def, completions, kwargs, i, i + 1) for i in range(start, end)]
+                chunk_scores = []
+                for i, single_future in zip(range(start, end), single_futures):
+                    single_scores = self._result(single_future)
+                    if single_scores is None:
+                        logger.warning(f"Reward function exceeded its time or memory limit on completion {i}, scoring 0")
+                        single_scores = [0.0]
+                    chunk_scores.extend(single_scores)
+            scores.extend(chunk_scores)
+        return scores
+
+    def accepts(self, func_def: str, func: Callable, completions: list, **kwargs) -> bool:
+        """
+        Whether func can be scored in the pool: it must score completions independently, and give the same
+        scores on the sample in a worker (under the time and memory limits) as in this process.
+        """
+        if not scores_are_per_completion(func, completions, **kwargs):
+            return False
+        try:
+            return self.score(func_def, completions, **kwargs) == func(completions, **kwargs)
+        except Exception as e:
+            logger.warning(f"Reward function can't run in the worker pool: {e}")
+            return False
+
+    def wrap(self, func_def: str, func: Callable) -> Callable:
+        """func with its calls scored in the pool; keeps func's signature for supports_extra_data."""
+
+        @functools.wraps(func)
+        def pooled(completions, **kwargs):
+            return self.score(func_def, completions, **kwargs)
+
+        return pooled
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def scores_are_per_completion(func: Callable, completions: list, **kwargs) -> bool:
+    """Whether func scores a batch the same as its two halves, i.e. it is safe to split across pool workers."""
+    if len(completions) < 2:
+        return False
+    middle = len(completions) // 2
+    try:
+        whole = func(completions, **kwargs)
+        halves = func(completions[:middle], **_slice_kwargs(kwargs, len(completions), 0, middle)) + func(
+            completions[middle:], **_slice_kwargs(kwargs, len(completions), middle, len(completions))
+        )
+    except Exception:
+        return False
+    return whole == halves
+
+
 def process_reward_function_code(code: str) -> str:
     """Process reward function code to inject restricted_execution if needed and fix function signature.
 